@@ -0,0 +1,412 @@
+"""
+Benchmark harness for worker startup time and request latency.
+
+Starts a fake OpenAI-compatible backend, boots Open WebUI against it with a
+throwaway DATA_DIR and SQLite database, then reports how long the worker
+took to answer /health and the p50/p99 latency of a few hot endpoints
+(chat completions, retrieval, courses, SPICE health).
+
+Run from the backend directory:
+
+    cd backend
+    python benchmark.py --requests 200 --concurrency 10
+
+Set ENABLE_IMPORT_PROFILING=true to also print the slowest imports, and
+ENABLE_LAZY_STARTUP=true to compare against a lazy start.
+
+`--content-blocks` instead runs a micro-benchmark of rendering the content
+blocks of a long streamed reasoning response after every token, with and
+without the serializer's cached prefix:
+
+    python benchmark.py --content-blocks
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import aiohttp
+from aiohttp import web
+
+FAKE_MODEL = "benchmark-model"
+EMBEDDING_DIMENSIONS = 16
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+####################################
+# Fake OpenAI-compatible backend
+####################################
+
+
+async def fake_models(request):
+    return web.json_response(
+        {"object": "list", "data": [{"id": FAKE_MODEL, "object": "model"}]}
+    )
+
+
+async def fake_chat_completions(request):
+    payload = await request.json()
+    words = ["This", " is", " a", " benchmark", " response."]
+
+    if not payload.get("stream"):
+        return web.json_response(
+            {
+                "id": f"chatcmpl-{uuid.uuid4()}",
+                "object": "chat.completion",
+                "model": FAKE_MODEL,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "".join(words)},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+        )
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    for word in words:
+        chunk = {
+            "object": "chat.completion.chunk",
+            "model": FAKE_MODEL,
+            "choices": [{"index": 0, "delta": {"content": word}}],
+        }
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+    await response.write(b"data: [DONE]\n\n")
+    return response
+
+
+async def fake_embeddings(request):
+    payload = await request.json()
+    inputs = payload.get("input", [])
+    if isinstance(inputs, str):
+        inputs = [inputs]
+
+    data = []
+    for idx, text in enumerate(inputs):
+        # Deterministic vectors so identical texts match
+        seed = sum(text.encode()) or 1
+        data.append(
+            {
+                "object": "embedding",
+                "index": idx,
+                "embedding": [
+                    ((seed * (i + 1)) % 97) / 97 for i in range(EMBEDDING_DIMENSIONS)
+                ],
+            }
+        )
+    return web.json_response({"object": "list", "data": data, "model": FAKE_MODEL})
+
+
+async def start_fake_backend(port: int) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get("/v1/models", fake_models)
+    app.router.add_post("/v1/chat/completions", fake_chat_completions)
+    app.router.add_post("/v1/embeddings", fake_embeddings)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+####################################
+# Open WebUI worker
+####################################
+
+
+def start_worker(port: int, backend_url: str, data_dir: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATA_DIR": data_dir,
+        "DATABASE_URL": f"sqlite:///{data_dir}/webui.db",
+        "WEBUI_SECRET_KEY": "benchmark",
+        "ENABLE_OLLAMA_API": "false",
+        "ENABLE_OPENAI_API": "true",
+        "OPENAI_API_BASE_URL": backend_url,
+        "OPENAI_API_KEY": "benchmark",
+        "RAG_EMBEDDING_ENGINE": "openai",
+        "RAG_EMBEDDING_MODEL": FAKE_MODEL,
+        "RAG_OPENAI_API_BASE_URL": backend_url,
+        "RAG_OPENAI_API_KEY": "benchmark",
+        "BYPASS_EMBEDDING_AND_RETRIEVAL": "false",
+        "ENABLE_VERSION_UPDATE_CHECK": "false",
+        "OFFLINE_MODE": "true",
+    }
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "open_webui.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+
+
+async def wait_until_healthy(
+    session: aiohttp.ClientSession, base_url: str, timeout: float
+) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            async with session.get(f"{base_url}/health") as r:
+                if r.status == 200:
+                    return time.perf_counter() - start
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.1)
+    raise TimeoutError(f"Worker did not become healthy within {timeout}s")
+
+
+####################################
+# Benchmarks
+####################################
+
+
+async def measure(
+    name: str, count: int, concurrency: int, request_fn
+) -> dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def run_one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await request_fn()
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_one() for _ in range(count)))
+    elapsed = time.perf_counter() - start
+
+    if len(latencies) < 2:
+        return {"name": name, "errors": errors}
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "name": name,
+        "p50_ms": round(quantiles[49] * 1000, 1),
+        "p99_ms": round(quantiles[98] * 1000, 1),
+        "rps": round(len(latencies) / elapsed, 1),
+        "errors": errors,
+    }
+
+
+async def run_benchmarks(
+    session: aiohttp.ClientSession, base_url: str, count: int, concurrency: int
+) -> list[dict]:
+    async with session.post(
+        f"{base_url}/api/v1/auths/signup",
+        json={
+            "name": "Benchmark",
+            "email": "benchmark@example.com",
+            "password": "benchmark",
+        },
+    ) as r:
+        r.raise_for_status()
+        token = (await r.json())["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def request(method: str, path: str, **kwargs):
+        async with session.request(
+            method, f"{base_url}{path}", headers=headers, **kwargs
+        ) as r:
+            r.raise_for_status()
+            await r.read()
+
+    # Give the worker something to retrieve from
+    collection_name = "benchmark"
+    await request(
+        "POST",
+        "/api/v1/retrieval/process/text",
+        json={
+            "name": "benchmark.txt",
+            "content": "An RC low-pass filter attenuates frequencies above 1/(2*pi*R*C).",
+            "collection_name": collection_name,
+        },
+    )
+
+    chat_payload = {
+        "model": FAKE_MODEL,
+        "messages": [{"role": "user", "content": "Hello"}],
+        "stream": False,
+    }
+
+    return [
+        await measure(
+            "chat completions",
+            count,
+            concurrency,
+            lambda: request("POST", "/api/chat/completions", json=chat_payload),
+        ),
+        await measure(
+            "chat completions (stream)",
+            count,
+            concurrency,
+            lambda: request(
+                "POST",
+                "/api/chat/completions",
+                json={**chat_payload, "stream": True},
+            ),
+        ),
+        await measure(
+            "retrieval query",
+            count,
+            concurrency,
+            lambda: request(
+                "POST",
+                "/api/v1/retrieval/query/doc",
+                json={"collection_name": collection_name, "query": "low-pass"},
+            ),
+        ),
+        await measure(
+            "courses list",
+            count,
+            concurrency,
+            lambda: request("GET", "/api/v1/courses/"),
+        ),
+        await measure(
+            "spice health",
+            count,
+            concurrency,
+            lambda: request("GET", "/api/v1/spice/health"),
+        ),
+    ]
+
+
+def benchmark_content_blocks(sizes: list[int]) -> list[dict]:
+    from open_webui.utils.streaming import ContentBlockSerializer
+
+    def stream(tokens: int, cached: bool) -> float:
+        serializer = ContentBlockSerializer()
+        content_blocks = [
+            {
+                "type": "reasoning",
+                "start_tag": "<think>",
+                "end_tag": "</think>",
+                "attributes": {"type": "reasoning_content"},
+                "content": "",
+            }
+        ]
+
+        start = time.perf_counter()
+        for idx in range(tokens):
+            # Answer after the first 90% of tokens, like a reasoning model
+            if idx == tokens * 9 // 10:
+                content_blocks[-1]["duration"] = 1
+                content_blocks.append({"type": "text", "content": ""})
+
+            token = " step" if idx % 12 else "\n- step"
+            content_blocks[-1]["content"] += token
+            if cached:
+                serializer.serialize(content_blocks)
+            else:
+                ContentBlockSerializer().serialize(content_blocks)
+        return time.perf_counter() - start
+
+    results = []
+    for tokens in sizes:
+        result = {"tokens": tokens}
+        for name, cached in (("cached", True), ("uncached", False)):
+            elapsed = stream(tokens, cached)
+            result[f"{name}_ms"] = round(elapsed * 1000, 1)
+            result[f"{name}_us_per_token"] = round(elapsed / tokens * 1e6, 2)
+        results.append(result)
+    return results
+
+
+async def main(args):
+    backend_port = get_free_port()
+    worker_port = get_free_port()
+    backend_url = f"http://127.0.0.1:{backend_port}/v1"
+    base_url = f"http://127.0.0.1:{worker_port}"
+
+    runner = await start_fake_backend(backend_port)
+    with tempfile.TemporaryDirectory() as data_dir:
+        process = start_worker(worker_port, backend_url, data_dir)
+        try:
+            async with aiohttp.ClientSession() as session:
+                startup = await wait_until_healthy(session, base_url, args.timeout)
+                print(f"Startup: healthy after {startup:.2f}s")
+
+                results = await run_benchmarks(
+                    session, base_url, args.requests, args.concurrency
+                )
+                for result in results:
+                    print(json.dumps(result))
+
+                if os.environ.get("ENABLE_IMPORT_PROFILING", "").lower() == "true":
+                    await print_startup_profile(session, base_url)
+        finally:
+            process.terminate()
+            process.wait()
+            await runner.cleanup()
+
+
+async def print_startup_profile(session: aiohttp.ClientSession, base_url: str):
+    async with session.post(
+        f"{base_url}/api/v1/auths/signin",
+        json={"email": "benchmark@example.com", "password": "benchmark"},
+    ) as r:
+        token = (await r.json())["token"]
+
+    async with session.get(
+        f"{base_url}/api/v1/utils/profile/startup",
+        params={"limit": 20},
+        headers={"Authorization": f"Bearer {token}"},
+    ) as r:
+        print(json.dumps(await r.json(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--timeout", type=float, default=300, help="Seconds to wait for startup"
+    )
+    parser.add_argument(
+        "--content-blocks",
+        action="store_true",
+        help="Only benchmark content block serialization",
+    )
+    parser.add_argument(
+        "--tokens",
+        type=int,
+        nargs="+",
+        default=[1000, 2000, 4000, 8000],
+        help="Response lengths for --content-blocks",
+    )
+    args = parser.parse_args()
+
+    if args.content_blocks:
+        for result in benchmark_content_blocks(args.tokens):
+            print(json.dumps(result))
+    else:
+        asyncio.run(main(args))
@@ -35,6 +35,7 @@ from open_webui.env import (
 )
 from open_webui.internal.db import Base, get_db
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.startup import startup_timer
 
 
 class EndpointFilter(logging.Filter):
@@ -68,7 +69,8 @@ def run_migrations():
         log.exception(f"Error running migrations: {e}")
 
 
-run_migrations()
+with startup_timer.phase("alembic migrations"):
+    run_migrations()
 
 
 class Config(Base):
@@ -2171,6 +2173,21 @@ log.info(f"VECTOR_DB: {VECTOR_DB}")
 S3_VECTOR_BUCKET_NAME = os.environ.get("S3_VECTOR_BUCKET_NAME", None)
 S3_VECTOR_REGION = os.environ.get("S3_VECTOR_REGION", None)
 
+# Embedded (in-process NumPy store)
+EMBEDDED_VECTOR_DATA_PATH = os.environ.get(
+    "EMBEDDED_VECTOR_DATA_PATH", f"{DATA_DIR}/vector_db/embedded"
+)
+# float32, or float16 to halve memory at a small cost in precision
+EMBEDDED_VECTOR_DTYPE = os.environ.get("EMBEDDED_VECTOR_DTYPE", "float32")
+# Approximate search for large segments, requires hnswlib
+EMBEDDED_VECTOR_ENABLE_HNSW = (
+    os.environ.get("EMBEDDED_VECTOR_ENABLE_HNSW", "false").lower() == "true"
+)
+EMBEDDED_VECTOR_HNSW_MIN_ITEMS = int(
+    os.environ.get("EMBEDDED_VECTOR_HNSW_MIN_ITEMS", "20000")
+)
+EMBEDDED_VECTOR_MAX_SEGMENTS = int(os.environ.get("EMBEDDED_VECTOR_MAX_SEGMENTS", "8"))
+
 ####################################
 # Information Retrieval (RAG)
 ####################################
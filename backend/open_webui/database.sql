@@ -1,9 +1,15 @@
 CREATE TABLE spice_files (
   id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
   circuit_name text NOT NULL,
+  user_id text,
+  lab_id text,
+  models jsonb,
+  verified_diagnosis text,
   created_at timestamp default now()
 );
 
+CREATE INDEX IF NOT EXISTS spice_files_lab_idx ON spice_files (lab_id);
+
 CREATE TABLE spice_nets (
   id serial PRIMARY KEY,
   spice_id uuid REFERENCES spice_files(id) ON DELETE CASCADE,
@@ -358,6 +358,25 @@ if DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL is not None:
     except Exception:
         DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL = 0.0
 
+# Seconds a user row loaded for authentication is reused (0 disables)
+USER_CACHE_TTL = os.environ.get("USER_CACHE_TTL", "5")
+
+try:
+    USER_CACHE_TTL = float(USER_CACHE_TTL)
+except Exception:
+    USER_CACHE_TTL = 5.0
+
+# Seconds between batched writes of buffered last active timestamps
+# (0 writes them one by one as before)
+USER_LAST_ACTIVE_FLUSH_INTERVAL = os.environ.get(
+    "USER_LAST_ACTIVE_FLUSH_INTERVAL", "10"
+)
+
+try:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = float(USER_LAST_ACTIVE_FLUSH_INTERVAL)
+except Exception:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = 10.0
+
 RESET_CONFIG_ON_START = (
     os.environ.get("RESET_CONFIG_ON_START", "False").lower() == "true"
 )
@@ -366,6 +385,11 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Defer embedding/reranking models, the vector database client and the SPICE
+# API until first use, and install tool/function requirements in the
+# background (see /ready)
+ENABLE_LAZY_STARTUP = os.environ.get("ENABLE_LAZY_STARTUP", "False").lower() == "true"
+
 ENABLE_QUERIES_CACHE = os.environ.get("ENABLE_QUERIES_CACHE", "False").lower() == "true"
 
 ####################################
@@ -553,6 +577,22 @@ else:
     except Exception:
         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE = 1
 
+# Streamed content is sent to the client at most this often (seconds), or
+# sooner once CHAT_RESPONSE_STREAM_FLUSH_BYTES of new content arrived
+try:
+    CHAT_RESPONSE_STREAM_FLUSH_INTERVAL = float(
+        os.environ.get("CHAT_RESPONSE_STREAM_FLUSH_INTERVAL", "0.05")
+    )
+except Exception:
+    CHAT_RESPONSE_STREAM_FLUSH_INTERVAL = 0.05
+
+try:
+    CHAT_RESPONSE_STREAM_FLUSH_BYTES = int(
+        os.environ.get("CHAT_RESPONSE_STREAM_FLUSH_BYTES", "2048")
+    )
+except Exception:
+    CHAT_RESPONSE_STREAM_FLUSH_BYTES = 2048
+
 
 CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = os.environ.get(
     "CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES", "30"
@@ -567,6 +607,21 @@ else:
         CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = 30
 
 
+# Start retrieval with the last user message while query generation runs
+ENABLE_SPECULATIVE_RETRIEVAL = (
+    os.environ.get("ENABLE_SPECULATIVE_RETRIEVAL", "False").lower() == "true"
+)
+
+# Seconds to wait for generated queries (and their retrieval) before the
+# speculative results are used alone
+SPECULATIVE_RETRIEVAL_BUDGET = os.environ.get("SPECULATIVE_RETRIEVAL_BUDGET", "2")
+
+try:
+    SPECULATIVE_RETRIEVAL_BUDGET = float(SPECULATIVE_RETRIEVAL_BUDGET)
+except Exception:
+    SPECULATIVE_RETRIEVAL_BUDGET = 2.0
+
+
 ####################################
 # WEBSOCKET SUPPORT
 ####################################
@@ -593,6 +648,15 @@ except ValueError:
 WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 
+# Streamed content updates are skipped for a session with this many packets
+# still queued, it gets the next update once it has caught up
+WEBSOCKET_MAX_SESSION_BACKLOG = os.environ.get("WEBSOCKET_MAX_SESSION_BACKLOG", "16")
+
+try:
+    WEBSOCKET_MAX_SESSION_BACKLOG = int(WEBSOCKET_MAX_SESSION_BACKLOG)
+except ValueError:
+    WEBSOCKET_MAX_SESSION_BACKLOG = 16
+
 
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
@@ -643,6 +707,33 @@ AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL = (
 )
 
 
+# MCP sessions are pooled per worker; idle ones are closed after this many seconds
+MCP_SESSION_IDLE_TIMEOUT = os.environ.get("MCP_SESSION_IDLE_TIMEOUT", "300")
+
+try:
+    MCP_SESSION_IDLE_TIMEOUT = int(MCP_SESSION_IDLE_TIMEOUT)
+except Exception:
+    MCP_SESSION_IDLE_TIMEOUT = 300
+
+# Seconds a pooled session's tool list is reused before it is fetched again
+MCP_TOOL_SPECS_CACHE_TTL = os.environ.get("MCP_TOOL_SPECS_CACHE_TTL", "300")
+
+try:
+    MCP_TOOL_SPECS_CACHE_TTL = int(MCP_TOOL_SPECS_CACHE_TTL)
+except Exception:
+    MCP_TOOL_SPECS_CACHE_TTL = 300
+
+# Seconds between background refreshes of OpenAPI tool server specs (0 disables)
+TOOL_SERVER_SPECS_REFRESH_INTERVAL = os.environ.get(
+    "TOOL_SERVER_SPECS_REFRESH_INTERVAL", "300"
+)
+
+try:
+    TOOL_SERVER_SPECS_REFRESH_INTERVAL = int(TOOL_SERVER_SPECS_REFRESH_INTERVAL)
+except Exception:
+    TOOL_SERVER_SPECS_REFRESH_INTERVAL = 300
+
+
 ####################################
 # SENTENCE TRANSFORMERS
 ####################################
@@ -798,6 +889,12 @@ OTEL_LOGS_OTLP_SPAN_EXPORTER = os.environ.get(
     "OTEL_LOGS_OTLP_SPAN_EXPORTER", OTEL_OTLP_SPAN_EXPORTER
 ).lower()  # grpc or http
 
+# Serve metrics in the Prometheus text format at /metrics, with or without an
+# OTLP collector (ENABLE_OTEL)
+ENABLE_PROMETHEUS_METRICS = (
+    os.environ.get("ENABLE_PROMETHEUS_METRICS", "False").lower() == "true"
+)
+
 ####################################
 # TOOLS/FUNCTIONS PIP OPTIONS
 ####################################
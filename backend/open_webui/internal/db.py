@@ -5,6 +5,7 @@ from contextlib import contextmanager
 from typing import Any, Optional
 
 from open_webui.internal.wrappers import register_connection
+from open_webui.utils.startup import startup_timer
 from open_webui.env import (
     OPEN_WEBUI_DIR,
     DATABASE_URL,
@@ -77,7 +78,8 @@ def handle_peewee_migration(DATABASE_URL):
         assert db.is_closed(), "Database connection is still open."
 
 
-handle_peewee_migration(DATABASE_URL)
+with startup_timer.phase("peewee migration"):
+    handle_peewee_migration(DATABASE_URL)
 
 
 SQLALCHEMY_DATABASE_URL = DATABASE_URL
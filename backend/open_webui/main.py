@@ -1,3 +1,9 @@
+# Imported first so the import tracer (ENABLE_IMPORT_PROFILING) sees everything
+from open_webui.utils.profiling import (
+    ENABLE_REQUEST_PROFILING,
+    RequestProfilingMiddleware,
+)
+
 import asyncio
 import inspect
 import json
@@ -10,6 +16,8 @@ import time
 import random
 from uuid import uuid4
 
+from open_webui.utils.startup import startup_timer, LazyProxy, LazyASGIApp
+
 
 from contextlib import asynccontextmanager
 from urllib.parse import urlencode, parse_qs, urlparse
@@ -421,6 +429,7 @@ from open_webui.config import (
     reset_config,
 )
 from open_webui.env import (
+    ENABLE_LAZY_STARTUP,
     LICENSE_KEY,
     AUDIT_EXCLUDED_PATHS,
     AUDIT_LOG_LEVEL,
@@ -453,6 +462,7 @@ from open_webui.env import (
     RESET_CONFIG_ON_START,
     ENABLE_VERSION_UPDATE_CHECK,
     ENABLE_OTEL,
+    ENABLE_PROMETHEUS_METRICS,
     EXTERNAL_PWA_MANIFEST_URL,
     AIOHTTP_CLIENT_SESSION_SSL,
 )
@@ -479,8 +489,18 @@ from open_webui.utils.auth import (
     decode_token,
     get_admin_user,
     get_verified_user,
+    periodic_user_last_active_flush,
+    redis_user_cache_listener,
+)
+from open_webui.utils.plugin import (
+    dependencies_ready,
+    install_tool_and_function_dependencies,
+)
+from open_webui.utils.mcp.pool import MCPSessionPool
+from open_webui.utils.tools import (
+    redis_tool_servers_listener,
+    periodic_tool_servers_refresh,
 )
-from open_webui.utils.plugin import install_tool_and_function_dependencies
 from open_webui.utils.oauth import (
     OAuthManager,
     OAuthClientManager,
@@ -503,6 +523,8 @@ from open_webui.utils.redis import get_sentinels_from_env
 
 from open_webui.constants import ERROR_MESSAGES
 
+startup_timer.mark("imports")
+
 
 if SAFE_MODE:
     print("SAFE MODE ENABLED")
@@ -548,6 +570,7 @@ https://github.com/open-webui/open-webui
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.instance_id = INSTANCE_ID
+    startup_timer.mark("app setup")
     start_logger()
     # --- DB hotfix: ensure folder table has context columns (older DBs may miss these)
     try:
@@ -596,10 +619,29 @@ async def lifespan(app: FastAPI):
     if LICENSE_KEY:
         get_license_data(app, LICENSE_KEY)
 
-    # This should be blocking (sync) so functions are not deactivated on first /get_models calls
-    # when the first user lands on the / route.
-    log.info("Installing external dependencies of functions and tools...")
-    install_tool_and_function_dependencies()
+    startup_timer.mark("database fixes")
+
+    if ENABLE_LAZY_STARTUP:
+        # Functions that fail to load meanwhile are not deactivated, and
+        # /ready reports 503 until the install is done
+        log.info("Installing external dependencies of functions and tools in the background...")
+        dependencies_ready.clear()
+
+        async def install_dependencies():
+            start = time.perf_counter()
+            await asyncio.to_thread(install_tool_and_function_dependencies)
+            startup_timer.phases["dependencies (background)"] = round(
+                time.perf_counter() - start, 3
+            )
+            app.state.startup_timings = startup_timer.report()
+
+        app.state.dependencies_install = asyncio.create_task(install_dependencies())
+    else:
+        # This should be blocking (sync) so functions are not deactivated on first /get_models calls
+        # when the first user lands on the / route.
+        log.info("Installing external dependencies of functions and tools...")
+        install_tool_and_function_dependencies()
+        startup_timer.mark("dependencies")
 
     app.state.redis = get_redis_connection(
         redis_url=REDIS_URL,
@@ -609,17 +651,42 @@ async def lifespan(app: FastAPI):
         redis_cluster=REDIS_CLUSTER,
         async_mode=True,
     )
+    startup_timer.mark("redis")
 
     if app.state.redis is not None:
         app.state.redis_task_command_listener = asyncio.create_task(
             redis_task_command_listener(app)
         )
+        app.state.redis_tool_servers_listener = asyncio.create_task(
+            redis_tool_servers_listener(app)
+        )
+
+        Users.redis = get_redis_connection(
+            redis_url=REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+            ),
+            redis_cluster=REDIS_CLUSTER,
+        )
+        app.state.redis_user_cache_listener = asyncio.create_task(
+            redis_user_cache_listener(app)
+        )
+
+    app.state.tool_servers_refresh = asyncio.create_task(
+        periodic_tool_servers_refresh(app)
+    )
 
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    app.state.user_last_active_flush = asyncio.create_task(
+        periodic_user_last_active_flush()
+    )
+
+    # Move avatars still stored inline in user rows into storage
+    asyncio.create_task(asyncio.to_thread(Users.migrate_inline_profile_images))
 
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
         await get_all_models(
@@ -641,12 +708,29 @@ async def lifespan(app: FastAPI):
             ),
             None,
         )
+        startup_timer.mark("models cache")
+
+    app.state.startup_timings = startup_timer.report()
+    log.info(f"Startup timings (seconds): {app.state.startup_timings}")
 
     yield
 
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    if hasattr(app.state, "redis_tool_servers_listener"):
+        app.state.redis_tool_servers_listener.cancel()
+
+    if hasattr(app.state, "redis_user_cache_listener"):
+        app.state.redis_user_cache_listener.cancel()
+
+    app.state.tool_servers_refresh.cancel()
+
+    app.state.user_last_active_flush.cancel()
+    await asyncio.to_thread(Users.flush_user_last_active)
+
+    await app.state.mcp_session_pool.close_all()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -683,6 +767,9 @@ app.state.oauth_manager = oauth_manager
 oauth_client_manager = OAuthClientManager(app)
 app.state.oauth_client_manager = oauth_client_manager
 
+# MCP sessions reused across chat requests in this worker
+app.state.mcp_session_pool = MCPSessionPool()
+
 app.state.instance_id = None
 app.state.config = AppConfig(
     redis_url=REDIS_URL,
@@ -733,7 +820,7 @@ async def root_user_png():
 #
 ########################################
 
-if ENABLE_OTEL:
+if ENABLE_OTEL or ENABLE_PROMETHEUS_METRICS:
     from open_webui.utils.telemetry.setup import setup as setup_opentelemetry
 
     setup_opentelemetry(app=app, db_engine=engine)
@@ -1047,28 +1134,59 @@ app.state.rf = None
 app.state.YOUTUBE_LOADER_TRANSLATION = None
 
 
-try:
-    app.state.ef = get_ef(
-        app.state.config.RAG_EMBEDDING_ENGINE,
-        app.state.config.RAG_EMBEDDING_MODEL,
-        RAG_EMBEDDING_MODEL_AUTO_UPDATE,
-    )
-    if (
-        app.state.config.ENABLE_RAG_HYBRID_SEARCH
-        and not app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
-    ):
-        app.state.rf = get_rf(
-            app.state.config.RAG_RERANKING_ENGINE,
-            app.state.config.RAG_RERANKING_MODEL,
-            app.state.config.RAG_EXTERNAL_RERANKER_URL,
-            app.state.config.RAG_EXTERNAL_RERANKER_API_KEY,
-            RAG_RERANKING_MODEL_AUTO_UPDATE,
+startup_timer.mark("app config")
+
+with startup_timer.phase("embedding models"):
+    try:
+        load_rf = (
+            app.state.config.ENABLE_RAG_HYBRID_SEARCH
+            and not app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
         )
-    else:
-        app.state.rf = None
-except Exception as e:
-    log.error(f"Error updating models: {e}")
-    pass
+
+        if ENABLE_LAZY_STARTUP:
+            # Only local models are worth deferring, get_ef returns None otherwise
+            if (
+                app.state.config.RAG_EMBEDDING_MODEL
+                and app.state.config.RAG_EMBEDDING_ENGINE == ""
+            ):
+                app.state.ef = LazyProxy(
+                    lambda: get_ef(
+                        app.state.config.RAG_EMBEDDING_ENGINE,
+                        app.state.config.RAG_EMBEDDING_MODEL,
+                        RAG_EMBEDDING_MODEL_AUTO_UPDATE,
+                    ),
+                    "embedding model",
+                )
+            if load_rf and app.state.config.RAG_RERANKING_MODEL:
+                app.state.rf = LazyProxy(
+                    lambda: get_rf(
+                        app.state.config.RAG_RERANKING_ENGINE,
+                        app.state.config.RAG_RERANKING_MODEL,
+                        app.state.config.RAG_EXTERNAL_RERANKER_URL,
+                        app.state.config.RAG_EXTERNAL_RERANKER_API_KEY,
+                        RAG_RERANKING_MODEL_AUTO_UPDATE,
+                    ),
+                    "reranking model",
+                )
+        else:
+            app.state.ef = get_ef(
+                app.state.config.RAG_EMBEDDING_ENGINE,
+                app.state.config.RAG_EMBEDDING_MODEL,
+                RAG_EMBEDDING_MODEL_AUTO_UPDATE,
+            )
+            if load_rf:
+                app.state.rf = get_rf(
+                    app.state.config.RAG_RERANKING_ENGINE,
+                    app.state.config.RAG_RERANKING_MODEL,
+                    app.state.config.RAG_EXTERNAL_RERANKER_URL,
+                    app.state.config.RAG_EXTERNAL_RERANKER_API_KEY,
+                    RAG_RERANKING_MODEL_AUTO_UPDATE,
+                )
+            else:
+                app.state.rf = None
+    except Exception as e:
+        log.error(f"Error updating models: {e}")
+        pass
 
 
 app.state.EMBEDDING_FUNCTION = get_embedding_function(
@@ -1288,6 +1406,9 @@ if ENABLE_COMPRESSION_MIDDLEWARE:
 app.add_middleware(RedirectMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
 
+if ENABLE_REQUEST_PROFILING:
+    app.add_middleware(RequestProfilingMiddleware)
+
 
 @app.middleware("http")
 async def commit_session_after_request(request: Request, call_next):
@@ -1341,16 +1462,28 @@ app.add_middleware(
 # --- SPICE Circuit Analyzer API (embedded) ---
 # Exposes:
 #   POST /api/v1/spice/upload
-#   POST /api/v1/spice/chat
+#   POST /api/v1/spice/chat      (per-user history, requires auth)
 #   POST /api/v1/spice/diagnose
+#   POST /api/v1/spice/diagnose/verify (admin; confirmed diagnoses are reused)
+#   POST /api/v1/spice/diagnose/batch  (admin; progress via GET .../batch/{job_id})
 #   GET  /api/v1/spice/health
 # open_webui/main.py
-try:
+def load_spice_app():
     from open_webui.spice_api import app as spice_app
-    app.mount("/api/v1/spice", spice_app)
-    log.info("Mounted SPICE API at /api/v1/spice")
-except Exception as e:
-    log.warning(f"SPICE API not mounted: {e}")
+
+    return spice_app
+
+
+if ENABLE_LAZY_STARTUP:
+    # spice_api connects to its circuit store and LLM when imported
+    app.mount("/api/v1/spice", LazyASGIApp(load_spice_app, "SPICE API"))
+    log.info("Mounted SPICE API at /api/v1/spice (loaded on first request)")
+else:
+    try:
+        app.mount("/api/v1/spice", load_spice_app())
+        log.info("Mounted SPICE API at /api/v1/spice")
+    except Exception as e:
+        log.warning(f"SPICE API not mounted: {e}")
 
 
 app.mount("/ws", socket_app)
@@ -1403,6 +1536,8 @@ app.include_router(utils.router, prefix="/api/v1/utils", tags=["utils"])
 if SCIM_ENABLED:
     app.include_router(scim.router, prefix="/api/v1/scim/v2", tags=["scim"])
 
+startup_timer.mark("routers")
+
 
 try:
     audit_level = AuditLevel(AUDIT_LOG_LEVEL)
@@ -1517,6 +1652,9 @@ async def chat_completion(
     form_data: dict,
     user=Depends(get_verified_user),
 ):
+    # Start of the time-to-first-token measurement
+    request.state.chat_started_at = time.perf_counter()
+
     if not request.app.state.MODELS:
         await get_all_models(request, user=user)
 
@@ -1668,14 +1806,6 @@ async def chat_completion(
 
                 except:
                     pass
-        finally:
-            try:
-                if mcp_clients := metadata.get("mcp_clients"):
-                    for client in mcp_clients.values():
-                        await client.disconnect()
-            except Exception as e:
-                log.debug(f"Error cleaning up: {e}")
-                pass
 
     if (
         metadata.get("session_id")
@@ -2146,6 +2276,18 @@ async def healthcheck():
     return {"status": True}
 
 
+@app.get("/ready")
+async def readiness_check():
+    ready = dependencies_ready.is_set()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": ready,
+            "startup": getattr(app.state, "startup_timings", None),
+        },
+    )
+
+
 @app.get("/health/db")
 async def healthcheck_with_db():
     Session.execute(text("SELECT 1;")).all()
@@ -150,6 +150,19 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+def _merge_message(chat: dict, message_id: str, message: dict) -> None:
+    """Upsert a message into the chat history and make it the current one."""
+    # Sanitize message content for null characters before upserting
+    if isinstance(message.get("content"), str):
+        message["content"] = message["content"].replace("\x00", "")
+
+    history = chat.get("history", {})
+    messages = history.setdefault("messages", {})
+    messages[message_id] = {**messages.get(message_id, {}), **message}
+    history["currentId"] = message_id
+    chat["history"] = history
+
+
 class ChatTable:
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
@@ -249,6 +262,27 @@ class ChatTable:
 
         return self.update_chat_by_id(id, chat)
 
+    def update_chat_title_and_message_by_id(
+        self,
+        id: str,
+        message_id: str,
+        title: Optional[str] = None,
+        message: Optional[dict] = None,
+    ) -> Optional[ChatModel]:
+        # Combined title + message update so post-response tasks rewrite the chat once
+        chat = self.get_chat_by_id(id)
+        if chat is None:
+            return None
+
+        chat = chat.chat
+        if title is not None:
+            chat["title"] = title
+
+        if message:
+            _merge_message(chat, message_id, message)
+
+        return self.update_chat_by_id(id, chat)
+
     def update_chat_tags_by_id(
         self, id: str, tags: list[str], user
     ) -> Optional[ChatModel]:
@@ -299,24 +333,8 @@ class ChatTable:
         if chat is None:
             return None
 
-        # Sanitize message content for null characters before upserting
-        if isinstance(message.get("content"), str):
-            message["content"] = message["content"].replace("\x00", "")
-
         chat = chat.chat
-        history = chat.get("history", {})
-
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
-        else:
-            history["messages"][message_id] = message
-
-        history["currentId"] = message_id
-
-        chat["history"] = history
+        _merge_message(chat, message_id, message)
         return self.update_chat_by_id(id, chat)
 
     def add_message_status_to_chat_by_id_and_message_id(
@@ -664,6 +682,39 @@ class ChatTable:
             )
             return [ChatModel.model_validate(chat) for chat in all_chats]
 
+    def get_chats_after(
+        self,
+        user_id: Optional[str] = None,
+        after: Optional[tuple[int, str]] = None,
+        limit: int = 50,
+    ) -> list[ChatModel]:
+        """
+        Page through chats in creation order. `after` is the (created_at, id)
+        of the last chat of the previous page, so chats updated or created
+        while paging are neither skipped nor repeated.
+        """
+        with get_db() as db:
+            query = db.query(Chat)
+            if user_id:
+                query = query.filter_by(user_id=user_id)
+            if after:
+                created_at, id = after
+                query = query.filter(
+                    or_(
+                        Chat.created_at > created_at,
+                        and_(Chat.created_at == created_at, Chat.id > id),
+                    )
+                )
+            all_chats = query.order_by(Chat.created_at, Chat.id).limit(limit).all()
+            return [ChatModel.model_validate(chat) for chat in all_chats]
+
+    def count_chats(self, user_id: Optional[str] = None) -> int:
+        with get_db() as db:
+            query = db.query(Chat)
+            if user_id:
+                query = query.filter_by(user_id=user_id)
+            return query.count()
+
     def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
             all_chats = (
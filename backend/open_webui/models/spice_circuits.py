@@ -0,0 +1,378 @@
+# backend/open_webui/models/spice_circuits.py
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    String,
+    Text,
+)
+
+from open_webui.internal.db import Base, get_db, engine
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+# Per-net statistic columns, shared by the simulated_* and measured_* sets.
+NET_STAT_KEYS = ("voltage", "avg", "max", "min", "pp", "rms", "period", "freq")
+
+
+####################
+# SPICE Circuit DB Schema
+####################
+
+
+class SpiceCircuit(Base):
+    __tablename__ = "spice_circuit"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=True)
+    lab_id = Column(String, nullable=True, index=True)  # labs.Lab.id
+    circuit_name = Column(Text, nullable=False)
+    models = Column(JSON, nullable=True)  # .model cards of the netlist
+    verified_diagnosis = Column(Text, nullable=True)  # confirmed by an instructor
+    created_at = Column(BigInteger, index=True)
+
+
+class SpiceNet(Base):
+    __tablename__ = "spice_net"
+
+    id = Column(String, primary_key=True)
+    circuit_id = Column(
+        String, ForeignKey("spice_circuit.id", ondelete="CASCADE"), nullable=False
+    )
+    node_name = Column(Text, nullable=False)
+
+    simulated_voltage = Column(Float, nullable=True)
+    simulated_avg = Column(Float, nullable=True)
+    simulated_max = Column(Float, nullable=True)
+    simulated_min = Column(Float, nullable=True)
+    simulated_pp = Column(Float, nullable=True)
+    simulated_rms = Column(Float, nullable=True)
+    simulated_period = Column(Float, nullable=True)
+    simulated_freq = Column(Float, nullable=True)
+
+    measured_voltage = Column(Float, nullable=True)
+    measured_avg = Column(Float, nullable=True)
+    measured_max = Column(Float, nullable=True)
+    measured_min = Column(Float, nullable=True)
+    measured_pp = Column(Float, nullable=True)
+    measured_rms = Column(Float, nullable=True)
+    measured_period = Column(Float, nullable=True)
+    measured_freq = Column(Float, nullable=True)
+
+    __table_args__ = (Index("spice_net_circuit_id_idx", "circuit_id"),)
+
+
+class SpiceElement(Base):
+    __tablename__ = "spice_element"
+
+    id = Column(String, primary_key=True)
+    circuit_id = Column(
+        String, ForeignKey("spice_circuit.id", ondelete="CASCADE"), nullable=False
+    )
+    position = Column(Integer, nullable=False)  # netlist order
+
+    element_name = Column(Text, nullable=False)
+    type = Column(String, nullable=True)
+    model = Column(Text, nullable=True)
+    value = Column(Text, nullable=True)
+    parameters = Column(JSON, nullable=True)
+
+    simulated_current = Column(Float, nullable=True)
+    measured_current = Column(Float, nullable=True)
+
+    __table_args__ = (Index("spice_element_circuit_id_idx", "circuit_id", "position"),)
+
+
+class SpiceElementConnection(Base):
+    __tablename__ = "spice_element_connection"
+
+    element_id = Column(
+        String, ForeignKey("spice_element.id", ondelete="CASCADE"), primary_key=True
+    )
+    node_order = Column(Integer, primary_key=True)
+    node_name = Column(Text, nullable=False)
+
+
+####################
+# Pydantic models
+####################
+
+
+class SpiceCircuitModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    user_id: Optional[str] = None
+    lab_id: Optional[str] = None
+    circuit_name: str
+    models: Optional[dict] = None
+    verified_diagnosis: Optional[str] = None
+    created_at: int
+
+
+####################
+# Table helper
+####################
+
+
+def _net_row(net: SpiceNet) -> Dict:
+    row = {"id": net.id, "spice_id": net.circuit_id, "node_name": net.node_name}
+    for key in NET_STAT_KEYS:
+        row[f"simulated_{key}"] = getattr(net, f"simulated_{key}")
+        row[f"measured_{key}"] = getattr(net, f"measured_{key}")
+    return row
+
+
+class SpiceCircuitTable:
+    def insert_circuit(
+        self,
+        circuit_name: str,
+        elements: List[Dict],
+        volts: Dict[str, float],
+        net_stats: Optional[Dict[str, Dict]] = None,
+        user_id: Optional[str] = None,
+        lab_id: Optional[str] = None,
+        models: Optional[Dict[str, Dict]] = None,
+    ) -> Optional[SpiceCircuitModel]:
+        """Insert a circuit with its nets, elements and connections in one transaction.
+
+        Ids are generated client-side so every table is written with a single
+        bulk insert and no name -> id lookups are needed in between.
+        """
+        circuit_id = str(uuid.uuid4())
+        nets, elems, conns = [], [], []
+
+        for node_name, voltage in volts.items():
+            row = {
+                "id": str(uuid.uuid4()),
+                "circuit_id": circuit_id,
+                "node_name": node_name,
+                "simulated_voltage": voltage,
+            }
+            stats = (net_stats or {}).get(node_name)
+            if stats:
+                row.update(
+                    {
+                        f"simulated_{key}": stats.get(key)
+                        for key in NET_STAT_KEYS
+                        if key in stats
+                    }
+                )
+            nets.append(row)
+
+        for position, e in enumerate(elements):
+            element_id = str(uuid.uuid4())
+            elems.append(
+                {
+                    "id": element_id,
+                    "circuit_id": circuit_id,
+                    "position": position,
+                    "element_name": e["name"],
+                    "type": e["type"],
+                    "model": e["model"],
+                    "value": e["value"],
+                    "parameters": e["params"],
+                    "simulated_current": e.get("simulated_current"),
+                }
+            )
+            conns.extend(
+                {"element_id": element_id, "node_order": i, "node_name": node}
+                for i, node in enumerate(e["nodes"])
+            )
+
+        with get_db() as db:
+            try:
+                circuit = SpiceCircuit(
+                    id=circuit_id,
+                    user_id=user_id,
+                    lab_id=lab_id,
+                    circuit_name=circuit_name,
+                    models=models or None,
+                    created_at=int(time.time()),
+                )
+                db.add(circuit)
+                db.flush()
+                if nets:
+                    db.bulk_insert_mappings(SpiceNet, nets)
+                if elems:
+                    db.bulk_insert_mappings(SpiceElement, elems)
+                if conns:
+                    db.bulk_insert_mappings(SpiceElementConnection, conns)
+                db.commit()
+                return SpiceCircuitModel.model_validate(circuit)
+            except Exception as e:
+                db.rollback()
+                log.exception(e)
+                return None
+
+    def get_circuit_by_id(self, id: str) -> Optional[SpiceCircuitModel]:
+        with get_db() as db:
+            row = db.query(SpiceCircuit).filter_by(id=id).first()
+            return SpiceCircuitModel.model_validate(row) if row else None
+
+    def get_latest_circuit(self) -> Optional[SpiceCircuitModel]:
+        with get_db() as db:
+            row = (
+                db.query(SpiceCircuit).order_by(SpiceCircuit.created_at.desc()).first()
+            )
+            return SpiceCircuitModel.model_validate(row) if row else None
+
+    def get_circuits(
+        self,
+        ids: Optional[List[str]] = None,
+        lab_id: Optional[str] = None,
+        verified: bool = False,
+    ) -> List[SpiceCircuitModel]:
+        with get_db() as db:
+            query = db.query(SpiceCircuit)
+            if ids is not None:
+                query = query.filter(SpiceCircuit.id.in_(ids))
+            if lab_id is not None:
+                query = query.filter_by(lab_id=lab_id)
+            if verified:
+                query = query.filter(SpiceCircuit.verified_diagnosis.isnot(None))
+            rows = query.order_by(SpiceCircuit.created_at.desc()).all()
+            return [SpiceCircuitModel.model_validate(r) for r in rows]
+
+    def get_circuit_rows(self, id: str) -> Tuple[List[Dict], List[Dict]]:
+        """Return (net rows, element rows) shaped like the Supabase tables.
+
+        Elements are read together with their connections in one joined
+        query; each element row carries its ordered "nodes".
+        """
+        return self.get_circuit_rows_many([id]).get(id, ([], []))
+
+    def get_circuit_rows_many(
+        self, ids: List[str]
+    ) -> Dict[str, Tuple[List[Dict], List[Dict]]]:
+        """Set-based `get_circuit_rows` for several circuits (still two queries)."""
+        result: Dict[str, Tuple[List[Dict], List[Dict]]] = {id: ([], []) for id in ids}
+        if not ids:
+            return result
+
+        with get_db() as db:
+            for n in db.query(SpiceNet).filter(SpiceNet.circuit_id.in_(ids)).all():
+                result[n.circuit_id][0].append(_net_row(n))
+
+            rows = (
+                db.query(
+                    SpiceElement,
+                    SpiceElementConnection.node_order,
+                    SpiceElementConnection.node_name,
+                )
+                .outerjoin(
+                    SpiceElementConnection,
+                    SpiceElementConnection.element_id == SpiceElement.id,
+                )
+                .filter(SpiceElement.circuit_id.in_(ids))
+                .order_by(
+                    SpiceElement.circuit_id,
+                    SpiceElement.position,
+                    SpiceElementConnection.node_order,
+                )
+                .all()
+            )
+
+            elements: Dict[str, Dict] = {}
+            for element, _, node_name in rows:
+                row = elements.get(element.id)
+                if row is None:
+                    row = elements[element.id] = {
+                        "id": element.id,
+                        "spice_id": element.circuit_id,
+                        "element_name": element.element_name,
+                        "type": element.type,
+                        "model": element.model,
+                        "value": element.value,
+                        "parameters": element.parameters,
+                        "simulated_current": element.simulated_current,
+                        "measured_current": element.measured_current,
+                        "nodes": [],
+                    }
+                    result[element.circuit_id][1].append(row)
+                if node_name is not None:
+                    row["nodes"].append(node_name)
+        return result
+
+    def update_measurements(
+        self,
+        id: str,
+        net_measurements: Optional[Dict[str, Dict]] = None,
+        element_currents: Optional[Dict[str, float]] = None,
+    ) -> bool:
+        """Record bench measurements ({node: {"voltage"|stat: value}}, {element: amps})."""
+        with get_db() as db:
+            try:
+                for node_name, stats in (net_measurements or {}).items():
+                    data = {
+                        f"measured_{key}": stats[key]
+                        for key in NET_STAT_KEYS
+                        if key in stats
+                    }
+                    if data:
+                        db.query(SpiceNet).filter_by(
+                            circuit_id=id, node_name=node_name
+                        ).update(data)
+                for element_name, current in (element_currents or {}).items():
+                    db.query(SpiceElement).filter_by(
+                        circuit_id=id, element_name=element_name
+                    ).update({"measured_current": current})
+                db.commit()
+                return True
+            except Exception as e:
+                db.rollback()
+                log.exception(e)
+                return False
+
+    def update_verified_diagnosis(self, id: str, diagnosis: str) -> bool:
+        with get_db() as db:
+            try:
+                updated = (
+                    db.query(SpiceCircuit)
+                    .filter_by(id=id)
+                    .update({"verified_diagnosis": diagnosis})
+                )
+                db.commit()
+                return bool(updated)
+            except Exception as e:
+                db.rollback()
+                log.exception(e)
+                return False
+
+    def delete_circuit_by_id(self, id: str) -> bool:
+        """Delete a circuit and its rows; SQLite does not enforce ON DELETE CASCADE."""
+        with get_db() as db:
+            try:
+                element_ids = db.query(SpiceElement.id).filter_by(circuit_id=id)
+                db.query(SpiceElementConnection).filter(
+                    SpiceElementConnection.element_id.in_(element_ids.scalar_subquery())
+                ).delete(synchronize_session=False)
+                db.query(SpiceElement).filter_by(circuit_id=id).delete()
+                db.query(SpiceNet).filter_by(circuit_id=id).delete()
+                deleted = db.query(SpiceCircuit).filter_by(id=id).delete()
+                db.commit()
+                return bool(deleted)
+            except Exception as e:
+                db.rollback()
+                log.exception(e)
+                return False
+
+
+SpiceCircuits = SpiceCircuitTable()
+
+
+# Ensure the tables exist
+for _table in (SpiceCircuit, SpiceNet, SpiceElement, SpiceElementConnection):
+    _table.__table__.create(bind=engine, checkfirst=True)
@@ -1,21 +1,50 @@
+import logging
+import threading
 import time
+import uuid
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
 
 
-from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
+from open_webui.env import (
+    DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL,
+    REDIS_KEY_PREFIX,
+    SRC_LOG_LEVELS,
+    USER_CACHE_TTL,
+)
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups
 from open_webui.utils.misc import throttle
+from open_webui.utils.telemetry.stages import record_cache
 
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, Date
-from sqlalchemy import or_
+from sqlalchemy import or_, update
+from sqlalchemy.sql.expression import bindparam
 
 import datetime
 
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+REDIS_USER_CACHE_CHANNEL = f"{REDIS_KEY_PREFIX}:users:invalidate"
+REDIS_PROFILE_IMAGE_MIGRATION_LOCK = f"{REDIS_KEY_PREFIX}:users:profile_image_migration"
+PROFILE_IMAGE_MIGRATION_LOCK_TIMEOUT = 300
+
+
+def store_profile_image(profile_image_url: Optional[str]) -> Optional[str]:
+    if not profile_image_url or not profile_image_url.startswith("data:image"):
+        return profile_image_url
+
+    # Imported on first use: the storage providers pull in the cloud SDKs,
+    # and open_webui.config, which imports this module during migrations
+    from open_webui.utils.avatars import store_profile_image
+
+    return store_profile_image(profile_image_url)
+
+
 ####################
 # User DB Schema
 ####################
@@ -151,6 +180,15 @@ class UserUpdateForm(BaseModel):
 
 
 class UsersTable:
+    def __init__(self):
+        # id -> (expires at, user) for users loaded by get_cached_user_by_id
+        self._user_cache: dict[str, tuple[float, UserModel]] = {}
+        # id -> last active timestamp waiting for flush_user_last_active
+        self._last_active: dict[str, int] = {}
+        self._last_active_lock = threading.Lock()
+        # Sync Redis client used to tell other workers to drop a cached user
+        self.redis = None
+
     def insert_new_user(
         self,
         id: str,
@@ -167,7 +205,7 @@ class UsersTable:
                     "name": name,
                     "email": email,
                     "role": role,
-                    "profile_image_url": profile_image_url,
+                    "profile_image_url": store_profile_image(profile_image_url),
                     "last_active_at": int(time.time()),
                     "created_at": int(time.time()),
                     "updated_at": int(time.time()),
@@ -191,6 +229,42 @@ class UsersTable:
         except Exception:
             return None
 
+    def get_cached_user_by_id(self, id: str) -> Optional[UserModel]:
+        """
+        Like get_user_by_id, but reuses the row for USER_CACHE_TTL seconds.
+        Updates made through this table drop the entry right away and, when
+        Redis is configured, on the other workers too. Without Redis other
+        workers may serve the previous row until it expires.
+        """
+        if USER_CACHE_TTL <= 0:
+            return self.get_user_by_id(id)
+
+        now = time.monotonic()
+        cached = self._user_cache.get(id)
+        record_cache("users", cached is not None and cached[0] > now)
+        if cached is None or cached[0] <= now:
+            user = self.get_user_by_id(id)
+            if user is None:
+                self._user_cache.pop(id, None)
+                return None
+            cached = (now + USER_CACHE_TTL, user)
+            self._user_cache[id] = cached
+
+        return cached[1].model_copy(deep=True)
+
+    def invalidate_cached_user(self, id: str):
+        self.drop_cached_user(id)
+
+        if self.redis is not None:
+            try:
+                self.redis.publish(REDIS_USER_CACHE_CHANNEL, id)
+            except Exception as e:
+                log.error(f"Error publishing user cache invalidation: {e}")
+
+    def drop_cached_user(self, id: str):
+        """Drop a cached user on this worker only."""
+        self._user_cache.pop(id, None)
+
     def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -327,6 +401,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                self.invalidate_cached_user(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -338,9 +413,10 @@ class UsersTable:
         try:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(
-                    {"profile_image_url": profile_image_url}
+                    {"profile_image_url": store_profile_image(profile_image_url)}
                 )
                 db.commit()
+                self.invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -361,6 +437,115 @@ class UsersTable:
         except Exception:
             return None
 
+    def record_user_last_active(self, id: str):
+        """Buffer a last active timestamp until the next flush_user_last_active."""
+        with self._last_active_lock:
+            self._last_active[id] = int(time.time())
+
+    def flush_user_last_active(self) -> int:
+        """
+        Write all buffered last active timestamps in a single executemany
+        UPDATE and drop expired entries from the user cache.
+        """
+        now = time.monotonic()
+        for id, (expires_at, _) in list(self._user_cache.items()):
+            if expires_at <= now:
+                self._user_cache.pop(id, None)
+
+        with self._last_active_lock:
+            pending, self._last_active = self._last_active, {}
+
+        if not pending:
+            return 0
+
+        try:
+            with get_db() as db:
+                db.execute(
+                    update(User.__table__)
+                    .where(User.__table__.c.id == bindparam("_id"))
+                    .values(last_active_at=bindparam("_last_active_at")),
+                    [
+                        {"_id": id, "_last_active_at": last_active_at}
+                        for id, last_active_at in pending.items()
+                    ],
+                )
+                db.commit()
+            return len(pending)
+        except Exception as e:
+            log.error(f"Error flushing last active timestamps: {e}")
+            # Keep the timestamps for the next flush unless newer ones arrived
+            with self._last_active_lock:
+                for id, last_active_at in pending.items():
+                    self._last_active.setdefault(id, last_active_at)
+            return 0
+
+    def migrate_inline_profile_images(self, batch_size: int = 50) -> int:
+        """
+        Move profile images still stored as data URIs in the user row into
+        storage, a batch of users at a time. With Redis configured only the
+        worker holding the migration lock runs it, the others return 0.
+        """
+        if self.redis is None:
+            return self._migrate_inline_profile_images(batch_size)
+
+        lock_id = str(uuid.uuid4())
+        if not self.redis.set(
+            REDIS_PROFILE_IMAGE_MIGRATION_LOCK,
+            lock_id,
+            nx=True,
+            ex=PROFILE_IMAGE_MIGRATION_LOCK_TIMEOUT,
+        ):
+            log.debug("Profile image migration is running on another worker")
+            return 0
+
+        def renew_lock():
+            self.redis.set(
+                REDIS_PROFILE_IMAGE_MIGRATION_LOCK,
+                lock_id,
+                xx=True,
+                ex=PROFILE_IMAGE_MIGRATION_LOCK_TIMEOUT,
+            )
+
+        try:
+            return self._migrate_inline_profile_images(batch_size, renew_lock)
+        finally:
+            if self.redis.get(REDIS_PROFILE_IMAGE_MIGRATION_LOCK) == lock_id:
+                self.redis.delete(REDIS_PROFILE_IMAGE_MIGRATION_LOCK)
+
+    def _migrate_inline_profile_images(self, batch_size: int, renew_lock=None) -> int:
+        migrated = 0
+        last_id = ""
+        while True:
+            if renew_lock is not None:
+                renew_lock()
+
+            with get_db() as db:
+                ids = [
+                    row.id
+                    for row in db.query(User.id)
+                    .filter(User.profile_image_url.like("data:image%"))
+                    .filter(User.id > last_id)
+                    .order_by(User.id)
+                    .limit(batch_size)
+                    .all()
+                ]
+
+            if not ids:
+                return migrated
+            last_id = ids[-1]
+
+            for id in ids:
+                with get_db() as db:
+                    user = db.query(User).filter_by(id=id).first()
+                    profile_image_url = store_profile_image(user.profile_image_url)
+                    if profile_image_url != user.profile_image_url:
+                        db.query(User).filter_by(id=id).update(
+                            {"profile_image_url": profile_image_url}
+                        )
+                        db.commit()
+                        self.invalidate_cached_user(id)
+                        migrated += 1
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -368,6 +553,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                self.invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -375,10 +561,17 @@ class UsersTable:
             return None
 
     def update_user_by_id(self, id: str, updated: dict) -> Optional[UserModel]:
+        if "profile_image_url" in updated:
+            updated = {
+                **updated,
+                "profile_image_url": store_profile_image(updated["profile_image_url"]),
+            }
+
         try:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                self.invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -399,6 +592,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                self.invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -417,6 +611,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                    self.invalidate_cached_user(id)
 
                 return True
             else:
@@ -429,6 +624,7 @@ class UsersTable:
             with get_db() as db:
                 result = db.query(User).filter_by(id=id).update({"api_key": api_key})
                 db.commit()
+                self.invalidate_cached_user(id)
                 return True if result == 1 else False
         except Exception:
             return False
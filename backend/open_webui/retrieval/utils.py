@@ -26,6 +26,7 @@ from open_webui.models.notes import Notes
 from open_webui.retrieval.vector.main import GetResult
 from open_webui.utils.access_control import has_access
 from open_webui.utils.misc import get_message_list
+from open_webui.utils.telemetry.stages import record_vector_db_query, stage
 
 
 from open_webui.env import (
@@ -60,11 +61,15 @@ class VectorSearchRetriever(BaseRetriever):
         *,
         run_manager: CallbackManagerForRetrieverRun,
     ) -> list[Document]:
-        result = VECTOR_DB_CLIENT.search(
-            collection_name=self.collection_name,
-            vectors=[self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)],
-            limit=self.top_k,
-        )
+        with stage("rag.embedding"):
+            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
+        with stage("rag.vector_search"):
+            result = VECTOR_DB_CLIENT.search(
+                collection_name=self.collection_name,
+                vectors=[query_embedding],
+                limit=self.top_k,
+            )
+        record_vector_db_query(result)
 
         ids = result.ids[0]
         metadatas = result.metadatas[0]
@@ -86,11 +91,13 @@ def query_doc(
 ):
     try:
         log.debug(f"query_doc:doc {collection_name}")
-        result = VECTOR_DB_CLIENT.search(
-            collection_name=collection_name,
-            vectors=[query_embedding],
-            limit=k,
-        )
+        with stage("rag.vector_search"):
+            result = VECTOR_DB_CLIENT.search(
+                collection_name=collection_name,
+                vectors=[query_embedding],
+                limit=k,
+            )
+        record_vector_db_query(result)
 
         if result:
             log.info(f"query_doc:result {result.ids} {result.metadatas}")
@@ -139,10 +146,11 @@ def query_doc_with_hybrid_search(
 
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
 
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
-        )
+        with stage("rag.bm25_index"):
+            bm25_retriever = BM25Retriever.from_texts(
+                texts=collection_result.documents[0],
+                metadatas=collection_result.metadatas[0],
+            )
         bm25_retriever.k = k
 
         vector_search_retriever = VectorSearchRetriever(
@@ -176,7 +184,8 @@ def query_doc_with_hybrid_search(
             base_compressor=compressor, base_retriever=ensemble_retriever
         )
 
-        result = compression_retriever.invoke(query)
+        with stage("rag.hybrid_search"):
+            result = compression_retriever.invoke(query)
 
         distances = [d.metadata.get("score") for d in result]
         documents = [d.page_content for d in result]
@@ -291,44 +300,64 @@ def query_collection(
     k: int,
 ) -> dict:
     results = []
-    error = False
-
-    def process_query_collection(collection_name, query_embedding):
-        try:
-            if collection_name:
-                result = query_doc(
-                    collection_name=collection_name,
-                    k=k,
-                    query_embedding=query_embedding,
-                )
-                if result is not None:
-                    return result.model_dump(), None
-            return None, None
-        except Exception as e:
-            log.exception(f"Error when querying the collection: {e}")
-            return None, e
 
     # Generate all query embeddings (in one call)
-    query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
+    with stage("rag.embedding"):
+        query_embeddings = embedding_function(
+            queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+        )
     log.debug(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
+    def search_collection(collection_name):
+        try:
+            result = VECTOR_DB_CLIENT.search_many(
+                collection_names=[collection_name],
+                vectors=query_embeddings,
+                limit=k,
+            )
+            return result.get(collection_name), None
+        except Exception as e:
+            log.exception(f"Error when querying the collection: {e}")
+            return None, e
 
-    for result, err in task_results:
-        if err is not None:
-            error = True
-        elif result is not None:
-            results.append(result)
+    # One search_many call covers every collection and query; backends that
+    # support it answer in a single round trip.
+    collection_names = [name for name in collection_names if name]
+    error = False
+    with stage("rag.vector_search"):
+        try:
+            search_results = VECTOR_DB_CLIENT.search_many(
+                collection_names=collection_names,
+                vectors=query_embeddings,
+                limit=k,
+            )
+        except Exception as e:
+            # Retry the collections one by one so a single failing collection
+            # does not cost the results of the others.
+            log.exception(f"Error when querying the collections: {e}")
+            with ThreadPoolExecutor() as executor:
+                outcomes = list(executor.map(search_collection, collection_names))
+            search_results = {}
+            for collection_name, (result, err) in zip(collection_names, outcomes):
+                error = error or err is not None
+                search_results[collection_name] = result
+
+    for collection_name, result in search_results.items():
+        if result is None:
+            continue
+        record_vector_db_query(result)
+        for distances, documents, metadatas in zip(
+            result.distances, result.documents, result.metadatas
+        ):
+            results.append(
+                {
+                    "distances": [distances],
+                    "documents": [documents],
+                    "metadatas": [metadatas],
+                }
+            )
 
     if error and not results:
         log.warning("All collection queries failed. No results returned.")
@@ -356,9 +385,10 @@ def query_collection_with_hybrid_search(
             log.debug(
                 f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
-            )
+            with stage("rag.vector_fetch"):
+                collection_results[collection_name] = VECTOR_DB_CLIENT.get(
+                    collection_name=collection_name
+                )
         except Exception as e:
             log.exception(f"Failed to fetch collection {collection_name}: {e}")
             collection_results[collection_name] = None
@@ -740,6 +770,51 @@ def get_sources_from_items(
     return sources
 
 
+def merge_sources(*source_lists: list[dict]) -> list[dict]:
+    """
+    Merge the results of get_sources_from_items run over the same items with
+    different queries. Scored sources of the same item are merged by document,
+    keeping the best score; unscored (full context) sources keep the first result.
+    """
+    merged = {}
+
+    for sources in source_lists:
+        for source in sources or []:
+            item = source.get("source") or {}
+            key = item.get("id") or item.get("collection_name") or item.get("name")
+            if key is None:
+                key = id(item)
+
+            if key not in merged:
+                merged[key] = source
+                continue
+
+            current = merged[key]
+            if "distances" not in current or "distances" not in source:
+                continue
+
+            k = max(len(current["document"]), len(source["document"]))
+            result = merge_and_sort_query_results(
+                [
+                    {
+                        "distances": [s["distances"]],
+                        "documents": [s["document"]],
+                        "metadatas": [s["metadata"]],
+                    }
+                    for s in (current, source)
+                ],
+                k=k,
+            )
+            merged[key] = {
+                **current,
+                "document": result["documents"][0],
+                "metadata": result["metadatas"][0],
+                "distances": result["distances"][0],
+            }
+
+    return list(merged.values())
+
+
 def get_model_path(model: str, update_model: bool = False):
     # Construct huggingface_hub kwargs with local_files_only to return the snapshot path
     cache_dir = os.getenv("SENTENCE_TRANSFORMERS_HOME")
@@ -1000,18 +1075,22 @@ class RerankCompressor(BaseDocumentCompressor):
         reranking = self.reranking_function is not None
 
         scores = None
-        if reranking:
-            scores = self.reranking_function(
-                [(query, doc.page_content) for doc in documents]
-            )
-        else:
-            from sentence_transformers import util
+        with stage("rag.rerank", reranker=reranking, documents=len(documents)):
+            if reranking:
+                scores = self.reranking_function(
+                    [(query, doc.page_content) for doc in documents]
+                )
+            else:
+                from sentence_transformers import util
 
-            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            document_embedding = self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
-            )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+                query_embedding = self.embedding_function(
+                    query, RAG_EMBEDDING_QUERY_PREFIX
+                )
+                document_embedding = self.embedding_function(
+                    [doc.page_content for doc in documents],
+                    RAG_EMBEDDING_CONTENT_PREFIX,
+                )
+                scores = util.cos_sim(query_embedding, document_embedding)[0]
 
         if scores is not None:
             docs_with_scores = list(
@@ -0,0 +1,752 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import numpy as np
+
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
+from open_webui.retrieval.vector.utils import process_metadata
+
+from open_webui.config import (
+    EMBEDDED_VECTOR_DATA_PATH,
+    EMBEDDED_VECTOR_DTYPE,
+    EMBEDDED_VECTOR_ENABLE_HNSW,
+    EMBEDDED_VECTOR_HNSW_MIN_ITEMS,
+    EMBEDDED_VECTOR_MAX_SEGMENTS,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+try:
+    import hnswlib
+
+    HNSW_AVAILABLE = True
+except ImportError:
+    HNSW_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process locking
+    fcntl = None
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".lock"
+SAFE_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+# Compact once this fraction of a collection's rows are deleted.
+COMPACT_DEAD_RATIO = 0.25
+
+
+def _write_json(path: str, data) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _remove_segment_files(path: str, name: str) -> None:
+    for suffix in (".npy", ".json", ".hnsw"):
+        file_path = os.path.join(path, f"{name}{suffix}")
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class _Segment:
+    """
+    One append-only batch of rows: a memory-mapped .npy of unit vectors plus
+    a JSON sidecar holding ids, documents and metadata stored column-wise.
+    """
+
+    def __init__(self, path: str, name: str, deleted: Optional[list[int]] = None):
+        self.name = name
+        self.vectors = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        with open(os.path.join(path, f"{name}.json")) as f:
+            sidecar = json.load(f)
+        self.ids = sidecar["ids"]
+        self.documents = sidecar["documents"]
+        self.columns = {
+            key: np.array(values, dtype=object)
+            for key, values in sidecar["columns"].items()
+        }
+
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        if deleted:
+            self.alive[deleted] = False
+
+        self.index = None
+
+    @staticmethod
+    def write(
+        path: str,
+        name: str,
+        vectors: np.ndarray,
+        ids: list[str],
+        documents: list[str],
+        columns: dict[str, list],
+    ) -> None:
+        tmp = os.path.join(path, f"{name}.tmp.npy")
+        np.save(tmp, vectors)
+        os.replace(tmp, os.path.join(path, f"{name}.npy"))
+        _write_json(
+            os.path.join(path, f"{name}.json"),
+            {"ids": ids, "documents": documents, "columns": columns},
+        )
+
+    def metadata(self, row: int) -> dict:
+        return {
+            key: column[row]
+            for key, column in self.columns.items()
+            if column[row] is not None
+        }
+
+    def filter_mask(self, filter: dict) -> np.ndarray:
+        mask = self.alive.copy()
+        for key, condition in filter.items():
+            if key == "$and":
+                for sub in condition:
+                    mask &= self.filter_mask(sub)
+            elif key == "$or":
+                any_mask = np.zeros(len(self.ids), dtype=bool)
+                for sub in condition:
+                    any_mask |= self.filter_mask(sub)
+                mask &= any_mask
+            else:
+                mask &= self._match(key, condition)
+        return mask
+
+    def _match(self, key: str, condition) -> np.ndarray:
+        column = self.columns.get(key)
+        if column is None:
+            column = np.full(len(self.ids), None, dtype=object)
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        mask = np.ones(len(self.ids), dtype=bool)
+        for op, value in condition.items():
+            if op == "$eq":
+                mask &= column == value
+            elif op == "$ne":
+                mask &= column != value
+            elif op in ("$in", "$nin"):
+                values = set(value)
+                matches = np.fromiter(
+                    (v in values for v in column), dtype=bool, count=len(column)
+                )
+                mask &= matches if op == "$in" else ~matches
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        return mask
+
+
+class _Collection:
+    """
+    In-memory view of a collection directory. Several workers may share the
+    directory: writers hold an flock on its lock file and every access first
+    re-reads the manifest if another process replaced it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.segments: list[_Segment] = []
+        self.locations: dict[str, tuple[_Segment, int]] = {}
+        self.next_segment = 0
+        self.dropped = False
+        self.compacting = False
+        self.lock = threading.RLock()
+        self.index_loader: Optional[Callable[[_Segment], None]] = None
+
+        self._manifest_stat = None
+        self._lock_fd = None
+        self._lock_depth = 0
+        self.refresh()
+
+    @contextmanager
+    def exclusive(self):
+        """Thread lock plus the inter-process file lock, for writes."""
+        with self.lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                os.makedirs(self.path, exist_ok=True)
+                fd = os.open(os.path.join(self.path, LOCK_FILE), os.O_CREAT | os.O_RDWR)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                self._lock_fd = fd
+            self._lock_depth += 1
+            try:
+                self.refresh()
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_fd is not None:
+                    os.close(self._lock_fd)  # releases the flock
+                    self._lock_fd = None
+
+    def refresh(self) -> None:
+        """Reload the manifest if another process has replaced it since we last read it."""
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        with self.lock:
+            for _ in range(3):
+                try:
+                    stat = os.stat(manifest_path)
+                except FileNotFoundError:
+                    if self._manifest_stat is not None:
+                        # Dropped by another process
+                        self.segments, self.locations = [], {}
+                        self._manifest_stat = None
+                    return
+
+                signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                if signature == self._manifest_stat:
+                    return
+                try:
+                    self._load_manifest(manifest_path)
+                except FileNotFoundError:
+                    # Segments were compacted away after we read the manifest
+                    continue
+                self._manifest_stat = signature
+                return
+
+    def _load_manifest(self, manifest_path: str) -> None:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+        # Keep the segments (and their indexes) we already have open
+        current = {segment.name: segment for segment in self.segments}
+        loaded, new = [], []
+        for entry in manifest["segments"]:
+            segment = current.get(entry["name"])
+            if segment is None:
+                segment = _Segment(self.path, entry["name"])
+                new.append(segment)
+            alive = np.ones(len(segment.ids), dtype=bool)
+            alive[entry["deleted"]] = False
+            loaded.append((segment, alive))
+
+        self.next_segment = max(self.next_segment, manifest["next_segment"])
+        self.segments, self.locations = [], {}
+        for segment, alive in loaded:
+            segment.alive = alive
+            self._add_segment(segment)
+
+        if self.index_loader is not None:
+            for segment in new:
+                self.index_loader(segment)
+
+    def _add_segment(self, segment: _Segment) -> None:
+        self.segments.append(segment)
+        for row in np.flatnonzero(segment.alive):
+            self.locations[segment.ids[row]] = (segment, int(row))
+
+    def save_manifest(self) -> None:
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        _write_json(
+            manifest_path,
+            {
+                "next_segment": self.next_segment,
+                "segments": [
+                    {
+                        "name": s.name,
+                        "deleted": np.flatnonzero(~s.alive).tolist(),
+                    }
+                    for s in self.segments
+                ],
+            },
+        )
+        stat = os.stat(manifest_path)
+        self._manifest_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self.segments[0].vectors.shape[1] if self.segments else None
+
+    @property
+    def dead_ratio(self) -> float:
+        total = sum(len(s.ids) for s in self.segments)
+        return 1 - len(self.locations) / total if total else 0.0
+
+    def remove(self, ids) -> int:
+        removed = 0
+        for id in ids:
+            location = self.locations.pop(id, None)
+            if location:
+                segment, row = location
+                segment.alive[row] = False
+                removed += 1
+        return removed
+
+
+class EmbeddedClient(VectorDBBase):
+    """
+    In-process vector store for small and medium deployments.
+
+    Each collection is a directory of append-only segments: memory-mapped
+    float32/float16 arrays of unit vectors with a columnar metadata sidecar,
+    tied together by a manifest that also records deleted rows. Search is a
+    single matrix product over all query vectors per segment; segments large
+    enough can carry an HNSW index (requires hnswlib). Once a collection has
+    too many segments or deleted rows it is compacted in a background thread.
+
+    Several workers can share the data path: writes take an flock per
+    collection and readers pick up manifests written by other processes.
+    fcntl is POSIX-only, so on Windows run a single worker.
+    """
+
+    def __init__(
+        self,
+        path: str = EMBEDDED_VECTOR_DATA_PATH,
+        dtype: str = EMBEDDED_VECTOR_DTYPE,
+        enable_hnsw: bool = EMBEDDED_VECTOR_ENABLE_HNSW,
+        hnsw_min_items: int = EMBEDDED_VECTOR_HNSW_MIN_ITEMS,
+        max_segments: int = EMBEDDED_VECTOR_MAX_SEGMENTS,
+    ):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.enable_hnsw = enable_hnsw and HNSW_AVAILABLE
+        self.hnsw_min_items = hnsw_min_items
+        self.max_segments = max(1, max_segments)
+
+        if enable_hnsw and not HNSW_AVAILABLE:
+            log.warning("hnswlib is not installed, using exact search only")
+
+        self._collections: dict[str, _Collection] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def _collection_path(self, collection_name: str) -> str:
+        if SAFE_NAME.match(collection_name):
+            return os.path.join(self.path, collection_name)
+        digest = hashlib.sha256(collection_name.encode()).hexdigest()
+        return os.path.join(self.path, digest)
+
+    def _get_collection(
+        self, collection_name: str, create: bool = False
+    ) -> Optional[_Collection]:
+        with self._lock:
+            path = self._collection_path(collection_name)
+            exists = os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+            collection = self._collections.get(collection_name)
+            if collection is not None:
+                if exists or create:
+                    return collection
+                # Dropped by another process
+                del self._collections[collection_name]
+
+            if not exists:
+                if not create:
+                    return None
+                os.makedirs(path, exist_ok=True)
+
+            collection = self._collections[collection_name] = _Collection(path)
+
+        for segment in collection.segments:
+            self._load_index(collection, segment)
+        collection.index_loader = lambda segment: self._load_index(collection, segment)
+        return collection
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self._get_collection(collection_name) is not None
+
+    def delete_collection(self, collection_name: str):
+        collection = self._get_collection(collection_name)
+        with self._lock:
+            self._collections.pop(collection_name, None)
+        if collection:
+            with collection.exclusive():
+                collection.dropped = True
+                shutil.rmtree(collection.path, ignore_errors=True)
+
+    def _append(self, collection_name: str, items: list[VectorItem]):
+        if not items:
+            return
+
+        vectors = _normalize(np.asarray([item["vector"] for item in items], np.float32))
+        ids = [str(item["id"]) for item in items]
+        documents = [item["text"] for item in items]
+        metadatas = [process_metadata(dict(item["metadata"] or {})) for item in items]
+
+        keys = sorted({key for metadata in metadatas for key in metadata})
+        columns = {key: [metadata.get(key) for metadata in metadatas] for key in keys}
+
+        collection = self._get_collection(collection_name, create=True)
+        with collection.exclusive():
+            if collection.dim is not None and collection.dim != vectors.shape[1]:
+                raise ValueError(
+                    f"Vector dimension {vectors.shape[1]} does not match collection "
+                    f"{collection_name} ({collection.dim})"
+                )
+
+            # Later rows win: replace existing ids, including duplicates within the batch.
+            collection.remove(ids)
+            name = f"segment-{collection.next_segment:06d}"
+            collection.next_segment += 1
+
+            _Segment.write(
+                collection.path,
+                name,
+                vectors.astype(self.dtype),
+                ids,
+                documents,
+                columns,
+            )
+            segment = _Segment(collection.path, name)
+            seen = set()
+            for row in range(len(ids) - 1, -1, -1):
+                if ids[row] in seen:
+                    segment.alive[row] = False
+                seen.add(ids[row])
+
+            collection._add_segment(segment)
+            collection.save_manifest()
+
+        self._maybe_compact(collection)
+
+    def insert(self, collection_name: str, items: list[VectorItem]):
+        # Insert the items into the collection, if the collection does not exist, it will be created.
+        self._append(collection_name, items)
+
+    def upsert(self, collection_name: str, items: list[VectorItem]):
+        # Segments are append-only, so an upsert is an insert that supersedes older rows.
+        self._append(collection_name, items)
+
+    def search(
+        self, collection_name: str, vectors: list[list[float | int]], limit: int
+    ) -> Optional[SearchResult]:
+        # Search all query vectors at once; scores are cosine similarity mapped to 0 (worst) -> 1 (best).
+        collection = self._get_collection(collection_name)
+        if collection is None or not vectors:
+            return None
+
+        queries = _normalize(np.asarray(vectors, dtype=np.float32))
+
+        with collection.lock:
+            collection.refresh()
+            segments = list(collection.segments)
+            alive = [segment.alive.copy() for segment in segments]
+
+        if not segments or limit <= 0:
+            return None
+        if queries.shape[1] != segments[0].vectors.shape[1]:
+            log.warning(f"Query dimension does not match collection {collection_name}")
+            return None
+
+        n = queries.shape[0]
+        candidate_scores, candidate_refs = [], []
+        for segment_index, (segment, mask) in enumerate(zip(segments, alive)):
+            scores, rows = self._search_segment(segment, mask, queries, limit)
+            candidate_scores.append(scores)
+            candidate_refs.append(
+                np.stack([np.full_like(rows, segment_index), rows], axis=-1)
+            )
+
+        scores = np.concatenate(candidate_scores, axis=1)
+        refs = np.concatenate(candidate_refs, axis=1)
+
+        k = min(limit, scores.shape[1])
+        if k == 0:
+            return SearchResult(
+                ids=[[] for _ in range(n)],
+                documents=[[] for _ in range(n)],
+                metadatas=[[] for _ in range(n)],
+                distances=[[] for _ in range(n)],
+            )
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for q in range(n):
+            ids, documents, metadatas, distances = [], [], [], []
+            for column in top[q]:
+                score = scores[q, column]
+                if not np.isfinite(score):
+                    break
+                segment = segments[refs[q, column, 0]]
+                row = int(refs[q, column, 1])
+                ids.append(segment.ids[row])
+                documents.append(segment.documents[row])
+                metadatas.append(segment.metadata(row))
+                distances.append(float((score + 1) / 2))
+            result["ids"].append(ids)
+            result["documents"].append(documents)
+            result["metadatas"].append(metadatas)
+            result["distances"].append(distances)
+
+        return SearchResult(**result)
+
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> dict[str, Optional[SearchResult]]:
+        # search already scores every query vector in one pass per collection.
+        return {
+            collection_name: self.search(collection_name, vectors, limit)
+            for collection_name in collection_names
+        }
+
+    def _search_segment(
+        self, segment: _Segment, alive: np.ndarray, queries: np.ndarray, limit: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Top `limit` (scores, rows) of one segment for every query; -inf pads dead slots."""
+        n_rows = len(segment.ids)
+        dead = n_rows - int(alive.sum())
+
+        if n_rows == 0:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+
+        if segment.index is not None:
+            # Over-fetch by the number of deleted rows so they can be dropped afterwards.
+            k = min(limit + dead, n_rows)
+            segment.index.set_ef(max(64, k))
+            labels, distances = segment.index.knn_query(queries, k=k)
+            rows = labels.astype(np.int64)
+            scores = (1 - distances).astype(np.float32)
+        else:
+            scores = queries @ np.asarray(segment.vectors, dtype=np.float32).T
+            rows = np.broadcast_to(np.arange(n_rows), scores.shape)
+            k = min(limit, n_rows)
+            if k < n_rows:
+                scores = scores.copy()
+                scores[:, ~alive] = -np.inf
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                rows = top
+            else:
+                rows = rows.copy()
+
+        scores = np.where(alive[rows], scores, -np.inf)
+        return scores, rows
+
+    def query(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        # Query the items from the collection based on the filter.
+        collection = self._get_collection(collection_name)
+        if collection is None:
+            return None
+
+        try:
+            with collection.lock:
+                collection.refresh()
+                matches = [
+                    (segment, row)
+                    for segment in collection.segments
+                    for row in np.flatnonzero(segment.filter_mask(filter or {}))
+                ]
+        except ValueError as e:
+            log.warning(e)
+            return None
+
+        if limit is not None:
+            matches = matches[:limit]
+        return self._get_result(matches)
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        # Get all the items in the collection.
+        collection = self._get_collection(collection_name)
+        if collection is None:
+            return None
+
+        with collection.lock:
+            collection.refresh()
+            matches = [
+                (segment, row)
+                for segment in collection.segments
+                for row in np.flatnonzero(segment.alive)
+            ]
+        return self._get_result(matches)
+
+    @staticmethod
+    def _get_result(matches: list[tuple[_Segment, int]]) -> GetResult:
+        return GetResult(
+            **{
+                "ids": [[segment.ids[row] for segment, row in matches]],
+                "documents": [[segment.documents[row] for segment, row in matches]],
+                "metadatas": [[segment.metadata(row) for segment, row in matches]],
+            }
+        )
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        # Delete the items from the collection based on the ids or filter.
+        collection = self._get_collection(collection_name)
+        if collection is None:
+            return
+
+        with collection.exclusive():
+            if ids:
+                removed = collection.remove(ids)
+            elif filter:
+                removed = collection.remove(
+                    [
+                        segment.ids[row]
+                        for segment in collection.segments
+                        for row in np.flatnonzero(segment.filter_mask(filter))
+                    ]
+                )
+            else:
+                return
+
+            if removed:
+                collection.save_manifest()
+
+        self._maybe_compact(collection)
+
+    def reset(self):
+        # Resets the database. This will delete all collections and item entries.
+        with self._lock:
+            collections = list(self._collections.values())
+            self._collections = {}
+        for collection in collections:
+            with collection.lock:
+                collection.dropped = True
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+
+    ####################
+    # Compaction and indexing
+    ####################
+
+    def _maybe_compact(self, collection: _Collection) -> None:
+        with collection.lock:
+            if collection.compacting or not collection.segments:
+                return
+            if (
+                len(collection.segments) <= self.max_segments
+                and collection.dead_ratio <= COMPACT_DEAD_RATIO
+            ):
+                return
+            collection.compacting = True
+
+        threading.Thread(target=self._compact, args=(collection,), daemon=True).start()
+
+    def _compact(self, collection: _Collection) -> None:
+        """Merge the current segments' live rows into one segment, then swap it in."""
+        try:
+            with collection.exclusive():
+                if collection.dropped or not collection.segments:
+                    return
+                snapshot = list(collection.segments)
+                alive = [segment.alive.copy() for segment in snapshot]
+                name = f"segment-{collection.next_segment:06d}"
+                collection.next_segment += 1
+                # Reserve the name for other processes
+                collection.save_manifest()
+
+            origins = [
+                (segment, int(row))
+                for segment, mask in zip(snapshot, alive)
+                for row in np.flatnonzero(mask)
+            ]
+            keys = sorted({key for segment in snapshot for key in segment.columns})
+
+            if origins:
+                vectors = np.concatenate(
+                    [segment.vectors[mask] for segment, mask in zip(snapshot, alive)]
+                )
+            else:
+                vectors = np.empty((0, snapshot[0].vectors.shape[1]), self.dtype)
+
+            _Segment.write(
+                collection.path,
+                name,
+                vectors,
+                [segment.ids[row] for segment, row in origins],
+                [segment.documents[row] for segment, row in origins],
+                {
+                    key: [
+                        (segment.columns[key][row] if key in segment.columns else None)
+                        for segment, row in origins
+                    ]
+                    for key in keys
+                },
+            )
+            merged = _Segment(collection.path, name)
+            self._build_index(collection, merged)
+
+            with collection.exclusive():
+                if collection.dropped:
+                    return
+                if len(collection.segments) < len(snapshot) or any(
+                    a is not b for a, b in zip(collection.segments, snapshot)
+                ):
+                    # Another process compacted or dropped these segments first
+                    _remove_segment_files(collection.path, name)
+                    return
+
+                # Rows deleted or superseded while compacting stay deleted.
+                for row, (segment, origin_row) in enumerate(origins):
+                    location = collection.locations.get(merged.ids[row])
+                    if (
+                        location is None
+                        or location[0] is not segment
+                        or location[1] != origin_row
+                    ):
+                        merged.alive[row] = False
+
+                remaining = collection.segments[len(snapshot) :]
+                collection.segments = []
+                collection.locations = {}
+                collection._add_segment(merged)
+                for segment in remaining:
+                    collection._add_segment(segment)
+                collection.save_manifest()
+
+            for segment in snapshot:
+                _remove_segment_files(collection.path, segment.name)
+            log.debug(f"Compacted {len(snapshot)} segments in {collection.path}")
+        except Exception as e:
+            log.exception(f"Error compacting {collection.path}: {e}")
+        finally:
+            collection.compacting = False
+
+    def _load_index(self, collection: _Collection, segment: _Segment) -> None:
+        if not self.enable_hnsw or len(segment.ids) < self.hnsw_min_items:
+            return
+
+        path = os.path.join(collection.path, f"{segment.name}.hnsw")
+        if os.path.exists(path):
+            index = hnswlib.Index(space="cosine", dim=segment.vectors.shape[1])
+            index.load_index(path, max_elements=len(segment.ids))
+            segment.index = index
+        else:
+            self._build_index(collection, segment)
+
+    def _build_index(self, collection: _Collection, segment: _Segment) -> None:
+        if not self.enable_hnsw or len(segment.ids) < self.hnsw_min_items:
+            return
+
+        index = hnswlib.Index(space="cosine", dim=segment.vectors.shape[1])
+        index.init_index(max_elements=len(segment.ids), ef_construction=200, M=16)
+        index.add_items(
+            np.asarray(segment.vectors, dtype=np.float32), np.arange(len(segment.ids))
+        )
+        index.save_index(os.path.join(collection.path, f"{segment.name}.hnsw"))
+        segment.index = index
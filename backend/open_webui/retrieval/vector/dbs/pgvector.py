@@ -456,6 +456,111 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during search: {e}")
             return None
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: int,
+    ) -> Dict[str, Optional[SearchResult]]:
+        # Same lateral query as search, with collections as a second values list,
+        # so every (collection, query vector) pair is answered in one round trip.
+        try:
+            if not vectors or not collection_names:
+                return {name: None for name in collection_names}
+
+            vectors = [self.adjust_vector_length(vector) for vector in vectors]
+            num_queries = len(vectors)
+
+            qid_col = column("qid", Integer)
+            q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
+            query_vectors = (
+                values(qid_col, q_vector_col)
+                .data(
+                    [
+                        (idx, cast(array(vector), Vector(VECTOR_LENGTH)))
+                        for idx, vector in enumerate(vectors)
+                    ]
+                )
+                .alias("query_vectors")
+            )
+            collections = (
+                values(column("cname", Text))
+                .data([(name,) for name in collection_names])
+                .alias("collections")
+            )
+
+            result_fields = [DocumentChunk.id]
+            if PGVECTOR_PGCRYPTO:
+                result_fields.append(
+                    pgcrypto_decrypt(
+                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
+                    ).label("text")
+                )
+                result_fields.append(
+                    pgcrypto_decrypt(
+                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                    ).label("vmetadata")
+                )
+            else:
+                result_fields.append(DocumentChunk.text)
+                result_fields.append(DocumentChunk.vmetadata)
+            result_fields.append(
+                (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
+                    "distance"
+                )
+            )
+
+            subq = (
+                select(*result_fields)
+                .where(DocumentChunk.collection_name == collections.c.cname)
+                .order_by(
+                    (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
+                )
+            )
+            if limit is not None:
+                subq = subq.limit(limit)
+            subq = subq.lateral("result")
+
+            stmt = (
+                select(
+                    collections.c.cname,
+                    query_vectors.c.qid,
+                    subq.c.id,
+                    subq.c.text,
+                    subq.c.vmetadata,
+                    subq.c.distance,
+                )
+                .select_from(collections.join(query_vectors, true()))
+                .join(subq, true())
+                .order_by(collections.c.cname, query_vectors.c.qid, subq.c.distance)
+            )
+
+            results = self.session.execute(stmt).all()
+            self.session.rollback()  # read-only transaction
+
+            grouped = {}
+            for row in results:
+                result = grouped.get(row.cname)
+                if result is None:
+                    result = grouped[row.cname] = SearchResult(
+                        ids=[[] for _ in range(num_queries)],
+                        distances=[[] for _ in range(num_queries)],
+                        documents=[[] for _ in range(num_queries)],
+                        metadatas=[[] for _ in range(num_queries)],
+                    )
+                qid = int(row.qid)
+                result.ids[qid].append(row.id)
+                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+                result.distances[qid].append((2.0 - row.distance) / 2.0)
+                result.documents[qid].append(row.text)
+                result.metadatas[qid].append(row.vmetadata)
+
+            return {name: grouped.get(name) for name in collection_names}
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during search_many: {e}")
+            return {name: None for name in collection_names}
+
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ) -> Optional[GetResult]:
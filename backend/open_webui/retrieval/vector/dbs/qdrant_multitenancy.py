@@ -283,6 +283,66 @@ class QdrantClient(VectorDBBase):
             distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
         )
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float | int]],
+        limit: int,
+    ) -> Dict[str, Optional[SearchResult]]:
+        """
+        Search several tenants with one batched request per multi-tenant collection.
+        """
+        results = {name: None for name in collection_names}
+        if not self.client or not vectors:
+            return results
+
+        by_collection: Dict[str, List[Tuple[str, str]]] = {}
+        for collection_name in collection_names:
+            mt_collection, tenant_id = self._get_collection_and_tenant_id(
+                collection_name
+            )
+            by_collection.setdefault(mt_collection, []).append(
+                (collection_name, tenant_id)
+            )
+
+        for mt_collection, tenants in by_collection.items():
+            if not self.client.collection_exists(collection_name=mt_collection):
+                log.debug(f"Collection {mt_collection} doesn't exist, skipping search")
+                continue
+
+            requests = [
+                models.QueryRequest(
+                    query=vector,
+                    limit=limit,
+                    filter=models.Filter(must=[_tenant_filter(tenant_id)]),
+                    with_payload=True,
+                )
+                for _, tenant_id in tenants
+                for vector in vectors
+            ]
+            responses = self.client.query_batch_points(
+                collection_name=mt_collection, requests=requests
+            )
+
+            for i, (collection_name, _) in enumerate(tenants):
+                ids, documents, metadatas, distances = [], [], [], []
+                for response in responses[i * len(vectors) : (i + 1) * len(vectors)]:
+                    get_result = self._result_to_get_result(response.points)
+                    ids.extend(get_result.ids)
+                    documents.extend(get_result.documents)
+                    metadatas.extend(get_result.metadatas)
+                    distances.append(
+                        [(point.score + 1.0) / 2.0 for point in response.points]
+                    )
+                results[collection_name] = SearchResult(
+                    ids=ids,
+                    documents=documents,
+                    metadatas=metadatas,
+                    distances=distances,
+                )
+
+        return results
+
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ):
@@ -5,6 +5,8 @@ from open_webui.config import (
     ENABLE_QDRANT_MULTITENANCY_MODE,
     ENABLE_MILVUS_MULTITENANCY_MODE,
 )
+from open_webui.env import ENABLE_LAZY_STARTUP
+from open_webui.utils.startup import LazyProxy
 
 
 class Vector:
@@ -67,8 +69,18 @@ class Vector:
                 from open_webui.retrieval.vector.dbs.oracle23ai import Oracle23aiClient
 
                 return Oracle23aiClient()
+            case VectorType.EMBEDDED:
+                from open_webui.retrieval.vector.dbs.embedded import EmbeddedClient
+
+                return EmbeddedClient()
             case _:
                 raise ValueError(f"Unsupported vector type: {vector_type}")
 
 
-VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
+if ENABLE_LAZY_STARTUP:
+    # Client libraries are imported and connections opened on first use
+    VECTOR_DB_CLIENT = LazyProxy(
+        lambda: Vector.get_vector(VECTOR_DB), f"{VECTOR_DB} vector database"
+    )
+else:
+    VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Union
@@ -58,6 +60,62 @@ class VectorDBBase(ABC):
         """Search for similar vectors in a collection."""
         pass
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+    ) -> Dict[str, Optional[SearchResult]]:
+        """
+        Search several collections with the same query vectors.
+
+        Returns one SearchResult per collection, with one result list per query
+        vector. Backends that can answer this in a single round trip override it;
+        the default runs one search per collection and vector in a thread pool.
+        Errors propagate; callers that need per-collection isolation retry the
+        collections one at a time.
+        """
+        with ThreadPoolExecutor() as executor:
+            futures = {
+                collection_name: [
+                    executor.submit(self.search, collection_name, [vector], limit)
+                    for vector in vectors
+                ]
+                for collection_name in collection_names
+            }
+
+        results = {}
+        for collection_name, pending in futures.items():
+            per_vector = [future.result() for future in pending]
+            if any(result is None for result in per_vector):
+                results[collection_name] = None
+                continue
+
+            results[collection_name] = SearchResult(
+                ids=[r.ids[0] for r in per_vector],
+                documents=[r.documents[0] for r in per_vector],
+                metadatas=[r.metadatas[0] for r in per_vector],
+                distances=[r.distances[0] for r in per_vector],
+            )
+        return results
+
+    async def asearch(
+        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+    ) -> Optional[SearchResult]:
+        """Async search. Runs the synchronous search in a worker thread unless overridden."""
+        return await asyncio.to_thread(self.search, collection_name, vectors, limit)
+
+    async def asearch_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+    ) -> Dict[str, Optional[SearchResult]]:
+        """Async search_many. Runs search_many in a worker thread unless overridden."""
+        return await asyncio.to_thread(
+            self.search_many, collection_names, vectors, limit
+        )
+
     @abstractmethod
     def query(
         self, collection_name: str, filter: Dict, limit: Optional[int] = None
@@ -2,10 +2,12 @@ import hashlib
 import json
 import logging
 import os
+import shutil
+import subprocess
+import tempfile
 import uuid
+import wave
 from functools import lru_cache
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
 from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
@@ -16,6 +18,8 @@ import requests
 import mimetypes
 from urllib.parse import urljoin, quote
 
+import numpy as np
+
 from fastapi import (
     Depends,
     FastAPI,
@@ -58,6 +62,14 @@ MAX_FILE_SIZE_MB = 20
 MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024  # Convert MB to bytes
 AZURE_MAX_FILE_SIZE_MB = 200
 AZURE_MAX_FILE_SIZE = AZURE_MAX_FILE_SIZE_MB * 1024 * 1024  # Convert MB to bytes
+MAX_CHUNK_DURATION = 10 * 60  # seconds of audio per transcription chunk
+
+# Transcription chunks are 16 kHz mono 16-bit PCM WAV, so their size is exact
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_SAMPLE_WIDTH = 2
+WAV_HEADER_SIZE = 44
+SILENCE_WINDOW_MS = 50
+SILENCE_SEARCH_MS = 10000  # look this far back from the budget for a pause
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["AUDIO"])
@@ -72,14 +84,13 @@ SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 #
 ##########################################
 
-from pydub import AudioSegment
-from pydub.utils import mediainfo
-
 
 def is_audio_conversion_required(file_path):
     """
     Check if the given audio file needs conversion to mp3.
     """
+    from pydub.utils import mediainfo
+
     SUPPORTED_FORMATS = {"flac", "m4a", "mp3", "mp4", "mpeg", "wav", "webm"}
 
     if not os.path.isfile(file_path):
@@ -106,17 +117,110 @@ def is_audio_conversion_required(file_path):
         return False
 
 
-def convert_audio_to_mp3(file_path):
-    """Convert audio file to mp3 format."""
+def decode_audio_stream(file_path, block_size=1024 * 1024):
+    """
+    Decode an audio/video file once with ffmpeg into 16 kHz mono 16-bit PCM,
+    yielding raw blocks as they are produced.
+    """
+    from pydub import AudioSegment
+
+    # stderr goes to a file: a full stderr pipe would block ffmpeg while we
+    # block reading stdout.
+    stderr = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        [
+            AudioSegment.converter,
+            "-nostdin",
+            "-v",
+            "error",
+            "-i",
+            file_path,
+            "-f",
+            "s16le",
+            "-ac",
+            "1",
+            "-ar",
+            str(AUDIO_SAMPLE_RATE),
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=stderr,
+    )
     try:
-        output_path = os.path.splitext(file_path)[0] + ".mp3"
-        audio = AudioSegment.from_file(file_path)
-        audio.export(output_path, format="mp3")
-        log.info(f"Converted {file_path} to {output_path}")
-        return output_path
-    except Exception as e:
-        log.error(f"Error converting audio file: {e}")
-        return None
+        while block := process.stdout.read(block_size):
+            yield block
+
+        if process.wait() != 0:
+            stderr.seek(0)
+            error = stderr.read().decode(errors="ignore").strip()
+            raise Exception(f"Error decoding audio file: {error}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        stderr.close()
+
+
+def find_silence_cut(pcm: np.ndarray, start: int, end: int) -> int:
+    """Sample index at the centre of the quietest window between start and end."""
+    window = AUDIO_SAMPLE_RATE * SILENCE_WINDOW_MS // 1000
+    count = (end - start) // window
+    if count < 2:
+        return end
+
+    region = pcm[start : start + count * window].astype(np.float32)
+    energy = np.square(region).reshape(count, window).mean(axis=1)
+    return start + int(np.argmin(energy)) * window + window // 2
+
+
+def write_wav_chunk(path, pcm: bytes):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(AUDIO_SAMPLE_WIDTH)
+        f.setframerate(AUDIO_SAMPLE_RATE)
+        f.writeframes(pcm)
+
+
+def stream_audio_chunks(file_path, max_bytes, max_seconds=None):
+    """
+    Decode the file once and yield WAV chunk paths as soon as each is cut.
+
+    Chunks are 16 kHz mono PCM, so their size is known exactly: each one holds
+    at most max_bytes (and max_seconds) of audio, cut at the quietest point of
+    the last few seconds before the budget so words are not split.
+    """
+    max_samples = (max_bytes - WAV_HEADER_SIZE) // AUDIO_SAMPLE_WIDTH
+    if max_seconds:
+        max_samples = min(max_samples, int(max_seconds * AUDIO_SAMPLE_RATE))
+    search_samples = min(
+        SILENCE_SEARCH_MS * AUDIO_SAMPLE_RATE // 1000, max_samples // 2
+    )
+
+    base, _ = os.path.splitext(file_path)
+    buffer = bytearray()
+    index = 0
+
+    def write_chunk(pcm: bytes):
+        nonlocal index
+        chunk_path = f"{base}_chunk_{index}.wav"
+        write_wav_chunk(chunk_path, pcm)
+        index += 1
+        return chunk_path
+
+    for block in decode_audio_stream(file_path):
+        buffer += block
+        while len(buffer) // AUDIO_SAMPLE_WIDTH > max_samples:
+            pcm = np.frombuffer(buffer, dtype=np.int16, count=max_samples)
+            cut = find_silence_cut(pcm, max_samples - search_samples, max_samples)
+            del pcm  # release the view before resizing the buffer
+
+            yield write_chunk(bytes(buffer[: cut * AUDIO_SAMPLE_WIDTH]))
+            del buffer[: cut * AUDIO_SAMPLE_WIDTH]
+
+    remaining = len(buffer) - len(buffer) % AUDIO_SAMPLE_WIDTH
+    if remaining:
+        yield write_chunk(bytes(buffer[:remaining]))
 
 
 def set_faster_whisper_model(model: str, auto_update: bool = False):
@@ -822,34 +926,36 @@ def transcription_handler(request, file_path, metadata):
 def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None):
     log.info(f"transcribe: {file_path} {metadata}")
 
-    if is_audio_conversion_required(file_path):
-        file_path = convert_audio_to_mp3(file_path)
-
-    try:
-        file_path = compress_audio(file_path)
-    except Exception as e:
-        log.exception(e)
-
-    # Always produce a list of chunk paths (could be one entry if small)
-    try:
-        chunk_paths = split_audio(file_path, MAX_FILE_SIZE)
-        print(f"Chunk paths: {chunk_paths}")
-    except Exception as e:
-        log.exception(e)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=ERROR_MESSAGES.DEFAULT(e),
-        )
+    if os.path.getsize(file_path) <= MAX_FILE_SIZE and not is_audio_conversion_required(
+        file_path
+    ):
+        result = transcription_handler(request, file_path, metadata)
+        return {"text": result["text"]}
 
+    # Decode once and transcribe chunks while the rest is still being decoded
+    chunk_paths = []
     results = []
     try:
         with ThreadPoolExecutor() as executor:
-            # Submit tasks for each chunk_path
-            futures = [
-                executor.submit(transcription_handler, request, chunk_path, metadata)
-                for chunk_path in chunk_paths
-            ]
-            # Gather results as they complete
+            futures = []
+            try:
+                for chunk_path in stream_audio_chunks(
+                    file_path, MAX_FILE_SIZE, MAX_CHUNK_DURATION
+                ):
+                    chunk_paths.append(chunk_path)
+                    futures.append(
+                        executor.submit(
+                            transcription_handler, request, chunk_path, metadata
+                        )
+                    )
+            except Exception as e:
+                log.exception(e)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=ERROR_MESSAGES.DEFAULT(e),
+                )
+
+            # Gather results in chunk order
             for future in futures:
                 try:
                     results.append(future.result())
@@ -861,7 +967,7 @@ def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None
     finally:
         # Clean up only the temporary chunks, never the original file
         for chunk_path in chunk_paths:
-            if chunk_path != file_path and os.path.isfile(chunk_path):
+            if os.path.isfile(chunk_path):
                 try:
                     os.remove(chunk_path)
                 except Exception:
@@ -872,68 +978,6 @@ def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None
     }
 
 
-def compress_audio(file_path):
-    if os.path.getsize(file_path) > MAX_FILE_SIZE:
-        id = os.path.splitext(os.path.basename(file_path))[
-            0
-        ]  # Handles names with multiple dots
-        file_dir = os.path.dirname(file_path)
-
-        audio = AudioSegment.from_file(file_path)
-        audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
-
-        compressed_path = os.path.join(file_dir, f"{id}_compressed.mp3")
-        audio.export(compressed_path, format="mp3", bitrate="32k")
-        # log.debug(f"Compressed audio to {compressed_path}")  # Uncomment if log is defined
-
-        return compressed_path
-    else:
-        return file_path
-
-
-def split_audio(file_path, max_bytes, format="mp3", bitrate="32k"):
-    """
-    Splits audio into chunks not exceeding max_bytes.
-    Returns a list of chunk file paths. If audio fits, returns list with original path.
-    """
-    file_size = os.path.getsize(file_path)
-    if file_size <= max_bytes:
-        return [file_path]  # Nothing to split
-
-    audio = AudioSegment.from_file(file_path)
-    duration_ms = len(audio)
-    orig_size = file_size
-
-    approx_chunk_ms = max(int(duration_ms * (max_bytes / orig_size)) - 1000, 1000)
-    chunks = []
-    start = 0
-    i = 0
-
-    base, _ = os.path.splitext(file_path)
-
-    while start < duration_ms:
-        end = min(start + approx_chunk_ms, duration_ms)
-        chunk = audio[start:end]
-        chunk_path = f"{base}_chunk_{i}.{format}"
-        chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        # Reduce chunk duration if still too large
-        while os.path.getsize(chunk_path) > max_bytes and (end - start) > 5000:
-            end = start + ((end - start) // 2)
-            chunk = audio[start:end]
-            chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        if os.path.getsize(chunk_path) > max_bytes:
-            os.remove(chunk_path)
-            raise Exception("Audio chunk cannot be reduced below max file size.")
-
-        chunks.append(chunk_path)
-        start = end
-        i += 1
-
-    return chunks
-
-
 @router.post("/transcriptions")
 def transcription(
     request: Request,
@@ -966,14 +1010,13 @@ def transcription(
         id = uuid.uuid4()
 
         filename = f"{id}.{ext}"
-        contents = file.file.read()
 
         file_dir = f"{CACHE_DIR}/audio/transcriptions"
         os.makedirs(file_dir, exist_ok=True)
         file_path = f"{file_dir}/{filename}"
 
         with open(file_path, "wb") as f:
-            f.write(contents)
+            shutil.copyfileobj(file.file, f)
 
         try:
             metadata = None
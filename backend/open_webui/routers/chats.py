@@ -1,6 +1,7 @@
 import json
 import logging
 from typing import Optional
+from uuid import uuid4
 
 
 from open_webui.socket.main import get_event_emitter
@@ -18,11 +19,20 @@ from open_webui.config import ENABLE_ADMIN_CHAT_ACCESS, ENABLE_ADMIN_EXPORT
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_permission
+from open_webui.utils.chat_export import (
+    EXPORT_MEDIA_TYPES,
+    cleanup_exports,
+    get_export_file_path,
+    get_export_progress_id,
+    run_chat_export,
+)
+from open_webui.tasks import create_task, get_task_progress, set_task_progress
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -338,6 +348,112 @@ async def get_all_user_chats_in_db(user=Depends(get_admin_user)):
     return [ChatResponse(**chat.model_dump()) for chat in Chats.get_chats()]
 
 
+############################
+# ExportChats
+############################
+
+
+class ChatExportForm(BaseModel):
+    format: str = "json"  # "json" or "pdf"
+    chat_id: Optional[str] = None
+    all_users: bool = False
+
+
+@router.post("/export")
+async def export_chats(
+    request: Request, form_data: ChatExportForm, user=Depends(get_verified_user)
+):
+    if form_data.format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("Unsupported export format"),
+        )
+
+    if form_data.format == "pdf" and not form_data.chat_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("PDF export needs a chat id"),
+        )
+
+    if form_data.all_users and (user.role != "admin" or not ENABLE_ADMIN_EXPORT):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
+        )
+
+    if form_data.chat_id and not Chats.get_chat_by_id_and_user_id(
+        form_data.chat_id, user.id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
+        )
+
+    cleanup_exports()
+
+    export_id = str(uuid4())
+    redis = request.app.state.redis
+    await set_task_progress(
+        redis,
+        get_export_progress_id(export_id),
+        {
+            "status": "queued",
+            "user_id": user.id,
+            "format": form_data.format,
+            "total": 0,
+            "completed": 0,
+        },
+    )
+    task_id, _ = await create_task(
+        redis,
+        run_chat_export(
+            redis,
+            export_id,
+            user.id,
+            form_data.format,
+            chat_id=form_data.chat_id,
+            all_users=form_data.all_users,
+        ),
+        id=get_export_progress_id(export_id),
+    )
+    return {"id": export_id, "task_id": task_id}
+
+
+async def get_export_progress(request: Request, id: str, user) -> dict:
+    progress = await get_task_progress(
+        request.app.state.redis, get_export_progress_id(id)
+    )
+    if progress is None or progress.get("user_id") != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
+        )
+    return progress
+
+
+@router.get("/export/{id}")
+async def get_chat_export_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
+    return await get_export_progress(request, id, user)
+
+
+@router.get("/export/{id}/download")
+async def download_chat_export_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
+    progress = await get_export_progress(request, id, user)
+    path = get_export_file_path(id, progress.get("format", "json"))
+    if progress.get("status") != "completed" or not path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
+        )
+
+    return FileResponse(
+        path,
+        media_type=EXPORT_MEDIA_TYPES[progress["format"]],
+        filename=f"chat-export-{id}.{progress['format']}",
+    )
+
+
 ############################
 # GetArchivedChats
 ############################
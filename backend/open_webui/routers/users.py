@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Optional
 import base64
@@ -36,6 +37,11 @@ from open_webui.env import SRC_LOG_LEVELS, STATIC_DIR
 
 
 from open_webui.utils.auth import get_admin_user, get_password_hash, get_verified_user
+from open_webui.utils.avatars import (
+    PROFILE_IMAGE_FILENAME_PATTERN,
+    PROFILE_IMAGE_URL_PREFIX,
+    get_profile_image_file,
+)
 from open_webui.utils.access_control import get_permissions, has_permission
 
 
@@ -323,6 +329,45 @@ async def update_user_info_by_session_user(
         )
 
 
+############################
+# GetUserAvatar
+############################
+
+
+@router.get("/avatars/{filename}")
+async def get_user_avatar(
+    filename: str, request: Request, user=Depends(get_verified_user)
+):
+    if not PROFILE_IMAGE_FILENAME_PATTERN.fullmatch(filename):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    # Avatars are content addressed, a name always refers to the same bytes
+    etag = f'"{filename}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=31536000, immutable",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        file_path = await asyncio.to_thread(get_profile_image_file, filename)
+    except Exception as e:
+        log.debug(f"Error loading avatar {filename}: {e}")
+        file_path = None
+
+    if file_path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    return FileResponse(file_path, headers=headers)
+
+
 ############################
 # GetUserById
 ############################
@@ -389,7 +434,7 @@ async def get_user_profile_image_by_id(user_id: str, user=Depends(get_verified_u
     if user:
         if user.profile_image_url:
             # check if it's url or base64
-            if user.profile_image_url.startswith("http"):
+            if user.profile_image_url.startswith(("http", PROFILE_IMAGE_URL_PREFIX)):
                 return Response(
                     status_code=status.HTTP_302_FOUND,
                     headers={"Location": user.profile_image_url},
@@ -1,3 +1,4 @@
+import asyncio
 import black
 import logging
 import markdown
@@ -14,6 +15,11 @@ from open_webui.utils.misc import get_gravatar_url
 from open_webui.utils.pdf_generator import PDFGenerator
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.profiling import (
+    get_profile_path,
+    import_tracer,
+    list_profiles,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 
@@ -93,7 +99,7 @@ async def download_chat_as_pdf(
     form_data: ChatTitleMessagesForm, user=Depends(get_verified_user)
 ):
     try:
-        pdf_bytes = PDFGenerator(form_data).generate_chat_pdf()
+        pdf_bytes = await asyncio.to_thread(PDFGenerator(form_data).generate_chat_pdf)
 
         return Response(
             content=pdf_bytes,
@@ -133,3 +139,33 @@ async def download_litellm_config_yaml(user=Depends(get_admin_user)):
         media_type="application/octet-stream",
         filename="config.yaml",
     )
+
+
+@router.get("/profile/startup")
+async def get_startup_profile(
+    request: Request, limit: int = 50, user=Depends(get_admin_user)
+):
+    return {
+        "startup": getattr(request.app.state, "startup_timings", None),
+        "imports": import_tracer.report(limit) if import_tracer else None,
+    }
+
+
+@router.get("/profiles")
+async def get_request_profiles(user=Depends(get_admin_user)):
+    return await asyncio.to_thread(list_profiles)
+
+
+@router.get("/profiles/{profile_id}")
+async def download_request_profile(profile_id: str, user=Depends(get_admin_user)):
+    path = get_profile_path(profile_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+    return FileResponse(
+        path,
+        media_type="text/plain",
+        filename=path.name,
+    )
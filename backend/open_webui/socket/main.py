@@ -26,6 +26,7 @@ from open_webui.env import (
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_MAX_SESSION_BACKLOG,
     REDIS_KEY_PREFIX,
 )
 from open_webui.utils.auth import decode_token
@@ -33,6 +34,7 @@ from open_webui.socket.utils import RedisDict, RedisLock, YdocManager
 from open_webui.tasks import create_task, stop_item_tasks
 from open_webui.utils.redis import get_redis_connection
 from open_webui.utils.access_control import has_access, get_users_with_access
+from open_webui.utils.telemetry.stages import stage
 
 
 from open_webui.env import (
@@ -638,8 +640,128 @@ async def disconnect(sid):
         # print(f"Unknown session ID {sid} disconnected")
 
 
+# Event types get_event_emitter writes to the chat message
+PERSISTED_EVENT_TYPES = {
+    "status",
+    "message",
+    "replace",
+    "embeds",
+    "files",
+    "source",
+    "citation",
+}
+
+
+def persist_chat_event(request_info, event_data):
+    if "type" in event_data and event_data["type"] == "status":
+        Chats.add_message_status_to_chat_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
+            event_data.get("data", {}),
+        )
+
+    if "type" in event_data and event_data["type"] == "message":
+        message = Chats.get_message_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
+        )
+
+        if message:
+            content = message.get("content", "")
+            content += event_data.get("data", {}).get("content", "")
+
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                request_info["chat_id"],
+                request_info["message_id"],
+                {
+                    "content": content,
+                },
+            )
+
+    if "type" in event_data and event_data["type"] == "replace":
+        content = event_data.get("data", {}).get("content", "")
+
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
+            {
+                "content": content,
+            },
+        )
+
+    if "type" in event_data and event_data["type"] == "embeds":
+        message = Chats.get_message_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
+        )
+
+        embeds = event_data.get("data", {}).get("embeds", [])
+        embeds.extend(message.get("embeds", []))
+
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
+            {
+                "embeds": embeds,
+            },
+        )
+
+    if "type" in event_data and event_data["type"] == "files":
+        message = Chats.get_message_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
+        )
+
+        files = event_data.get("data", {}).get("files", [])
+        files.extend(message.get("files", []))
+
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
+            {
+                "files": files,
+            },
+        )
+
+    if event_data.get("type") in ["source", "citation"]:
+        data = event_data.get("data", {})
+        if data.get("type") == None:
+            message = Chats.get_message_by_id_and_message_id(
+                request_info["chat_id"],
+                request_info["message_id"],
+            )
+
+            sources = message.get("sources", [])
+            sources.append(data)
+
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                request_info["chat_id"],
+                request_info["message_id"],
+                {
+                    "sources": sources,
+                },
+            )
+
+
+def get_session_backlog(sid) -> int:
+    """
+    Number of packets queued for a session connected to this worker, 0 for
+    sessions on other workers.
+    """
+    try:
+        eio_sid = sio.manager.eio_sid_from_sid(sid, "/")
+        socket = sio.eio.sockets.get(eio_sid) if eio_sid else None
+        return socket.queue.qsize() if socket else 0
+    except Exception:
+        return 0
+
+
 def get_event_emitter(request_info, update_db=True):
-    async def __event_emitter__(event_data):
+    async def __event_emitter__(event_data, superseded=False):
+        """
+        `superseded` marks updates a later one replaces (streamed content),
+        those are skipped for sessions that fell behind.
+        """
         user_id = request_info["user_id"]
 
         session_ids = list(
@@ -653,6 +775,13 @@ def get_event_emitter(request_info, update_db=True):
             )
         )
 
+        if superseded:
+            session_ids = [
+                session_id
+                for session_id in session_ids
+                if get_session_backlog(session_id) < WEBSOCKET_MAX_SESSION_BACKLOG
+            ]
+
         emit_tasks = [
             sio.emit(
                 "chat-events",
@@ -668,95 +797,9 @@ def get_event_emitter(request_info, update_db=True):
 
         await asyncio.gather(*emit_tasks)
 
-        if update_db:
-            if "type" in event_data and event_data["type"] == "status":
-                Chats.add_message_status_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    event_data.get("data", {}),
-                )
-
-            if "type" in event_data and event_data["type"] == "message":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
-
-                if message:
-                    content = message.get("content", "")
-                    content += event_data.get("data", {}).get("content", "")
-
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "content": content,
-                        },
-                    )
-
-            if "type" in event_data and event_data["type"] == "replace":
-                content = event_data.get("data", {}).get("content", "")
-
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "content": content,
-                    },
-                )
-
-            if "type" in event_data and event_data["type"] == "embeds":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
-
-                embeds = event_data.get("data", {}).get("embeds", [])
-                embeds.extend(message.get("embeds", []))
-
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "embeds": embeds,
-                    },
-                )
-
-            if "type" in event_data and event_data["type"] == "files":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
-
-                files = event_data.get("data", {}).get("files", [])
-                files.extend(message.get("files", []))
-
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "files": files,
-                    },
-                )
-
-            if event_data.get("type") in ["source", "citation"]:
-                data = event_data.get("data", {})
-                if data.get("type") == None:
-                    message = Chats.get_message_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                    )
-
-                    sources = message.get("sources", [])
-                    sources.append(data)
-
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "sources": sources,
-                        },
-                    )
+        if update_db and event_data.get("type") in PERSISTED_EVENT_TYPES:
+            with stage("chat.persist", event=event_data["type"]):
+                persist_chat_event(request_info, event_data)
 
     return __event_emitter__
 
@@ -0,0 +1,132 @@
+"""Memoized circuit diagnoses.
+
+A diagnosis only depends on the circuit rows fed into the prompt, the LLM
+that answers it and the prompt template, so repeated "diagnose again"
+requests for an unchanged circuit can be served without calling the model.
+Entries are keyed by a hash of those three inputs; the in-memory cache is
+LRU-capped, and when REDIS_URL is configured entries are shared across
+workers in Redis with a TTL.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from open_webui.env import (
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+REDIS_SPICE_DIAGNOSIS_KEY = f"{REDIS_KEY_PREFIX}:spice:diagnosis"
+
+# Row fields that identify storage rather than circuit content.
+VOLATILE_FIELDS = {"id", "spice_id", "element_id", "created_at", "updated_at"}
+
+
+def _normalize_rows(rows: Iterable[Dict], sort_key: str) -> List[Dict]:
+    normalized = [
+        {k: v for k, v in row.items() if k not in VOLATILE_FIELDS} for row in rows
+    ]
+    return sorted(normalized, key=lambda r: str(r.get(sort_key, "")))
+
+
+def diagnosis_key(
+    nets: List[Dict], elements: List[Dict], model: str, prompt_version: str
+) -> str:
+    """Hash the normalized circuit rows together with the model and prompt version."""
+    payload = {
+        "nets": _normalize_rows(nets, "node_name"),
+        "elements": _normalize_rows(elements, "element_name"),
+        "model": model,
+        "prompt_version": prompt_version,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class DiagnosisCache:
+    """In-process diagnosis cache with LRU eviction and optional expiry."""
+
+    def __init__(self, max_entries: int = 512, ttl: int = 0):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, diagnosis = entry
+            if self.ttl and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return diagnosis
+
+    def set(self, key: str, diagnosis: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), diagnosis)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisDiagnosisCache:
+    """Redis-backed diagnosis cache shared across workers."""
+
+    def __init__(self, redis, ttl: int = 0):
+        self.redis = redis
+        self.ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return f"{REDIS_SPICE_DIAGNOSIS_KEY}:{key}"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self.redis.get(self._key(key))
+        except Exception as e:
+            log.warning(f"Failed to read SPICE diagnosis from Redis: {e}")
+            return None
+
+    def set(self, key: str, diagnosis: str) -> None:
+        try:
+            self.redis.set(self._key(key), diagnosis, ex=self.ttl or None)
+        except Exception as e:
+            log.warning(f"Failed to write SPICE diagnosis to Redis: {e}")
+
+
+def get_diagnosis_cache(max_entries: int = 512, ttl: int = 0):
+    if REDIS_URL:
+        try:
+            redis = get_redis_connection(
+                redis_url=REDIS_URL,
+                redis_sentinels=get_sentinels_from_env(
+                    REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+                ),
+                redis_cluster=REDIS_CLUSTER,
+                decode_responses=True,
+            )
+            if redis is not None:
+                return RedisDiagnosisCache(redis, ttl=ttl)
+        except Exception as e:
+            log.warning(f"Falling back to in-memory SPICE diagnosis cache: {e}")
+
+    return DiagnosisCache(max_entries=max_entries, ttl=ttl)
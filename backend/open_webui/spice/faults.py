@@ -0,0 +1,368 @@
+"""Fault dictionary for breadboard debugging.
+
+Perturbs a circuit once per plausible breadboard mistake from the diagnosis
+checklist (swapped op-amp inputs, opens, reversed diodes, wrong resistor
+decade, swapped similar components, supply and rail faults), re-solves
+every variant's DC operating point in one batch, and ranks the variants by
+how well they reproduce the measured node voltages and element currents.
+"""
+
+import logging
+from dataclasses import dataclass, field, replace
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from open_webui.spice.mna import OperatingPoint, solve_batch
+from open_webui.spice.netlist import GROUND_NAMES, Element, parse_si_value
+
+log = logging.getLogger(__name__)
+
+# Residual scale floors so tiny nominal values do not dominate the distance.
+VOLTAGE_FLOOR = 0.05
+CURRENT_FLOOR = 1e-5
+
+# Checklist numbers as used in spice_api.build_diagnosis_prompt.
+FAULT_CLASSES = {
+    "no_fault": (0, "No error detected"),
+    "swapped_opamp_inputs": (1, "Swapped Op-Amp Inputs (+/-)"),
+    "wrong_rail": (5, "Wrong Rail Usage"),
+    "open": (6, "Open Circuit"),
+    "reversed_diode": (4, "Reversed Diode"),
+    "wrong_decade": (7, "Component Value Error (wrong decade)"),
+    "swapped_values": (7, "Component Value Error (components swapped)"),
+    "supply_off": (9, "Power Supply Fault"),
+}
+
+CONFIRMATION_STEPS = {
+    "no_fault": "Spot-check the key node voltages with a multimeter to confirm.",
+    "swapped_opamp_inputs": "Verify Pin 3 (+) and Pin 2 (-) wiring against the schematic with a multimeter (ohmmeter) continuity check.",
+    "wrong_rail": "With power off, use a multimeter (ohmmeter) to check which rail the component lead is connected to.",
+    "open": "With power off, use a multimeter (ohmmeter) to check continuity across the component and its jumper wires.",
+    "reversed_diode": "Check the diode's cathode band orientation, then measure its forward drop with a multimeter in diode mode.",
+    "wrong_decade": "Remove the resistor from the circuit and measure it with a multimeter (ohmmeter).",
+    "swapped_values": "Remove both resistors from the circuit and measure each with a multimeter (ohmmeter).",
+    "supply_off": "Measure the supply terminals with a multimeter to confirm the supply is on and set correctly.",
+}
+
+
+@dataclass
+class FaultVariant:
+    fault_class: str
+    description: str
+    elements: List[Element]
+    # Op-amp rails the solve starts from, see mna.solve_elements(saturate=...)
+    saturate: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def checklist_item(self) -> int:
+        return FAULT_CLASSES[self.fault_class][0]
+
+
+@dataclass
+class FaultCandidate:
+    fault_class: str
+    checklist_item: int
+    description: str
+    distance: float
+    residuals: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class FaultRanking:
+    candidates: List[FaultCandidate]
+    confident: bool = False
+    variants_tested: int = 0
+
+
+####################
+# Variant generation
+####################
+
+
+def elements_from_rows(rows: Iterable[Dict]) -> List[Element]:
+    """Rebuild Element records from stored spice_elements rows (with "nodes")."""
+    out = []
+    for r in rows:
+        name = r.get("element_name") or r.get("name")
+        if not name:
+            continue
+        value = r.get("value")
+        out.append(
+            Element(
+                name=name,
+                type=(r.get("type") or name[0]).upper(),
+                nodes=tuple(r.get("nodes") or ()),
+                model=r.get("model"),
+                value=value,
+                params=r.get("parameters") or r.get("params") or {},
+                value_si=parse_si_value(value.split()[0]) if value else None,
+            )
+        )
+    return out
+
+
+def _is_ground(node: str) -> bool:
+    return node.upper() in GROUND_NAMES
+
+
+def _supply_nets(elements: List[Element]) -> List[str]:
+    nets = []
+    for e in elements:
+        if e.type == "V" and len(e.nodes) == 2 and e.value_si:
+            a, b = e.nodes
+            if _is_ground(b) and not _is_ground(a):
+                nets.append(a)
+            elif _is_ground(a) and not _is_ground(b):
+                nets.append(b)
+    return list(dict.fromkeys(nets))
+
+
+def generate_variants(elements: List[Element]) -> List[FaultVariant]:
+    variants: List[FaultVariant] = []
+
+    def variant(
+        fault_class: str,
+        description: str,
+        index: int,
+        new: Optional[Element],
+        saturate: Optional[Dict[str, float]] = None,
+    ):
+        els = list(elements)
+        if new is None:
+            els.pop(index)
+        else:
+            els[index] = new
+        variants.append(FaultVariant(fault_class, description, els, saturate or {}))
+
+    supplies = _supply_nets(elements)
+
+    for i, e in enumerate(elements):
+        if e.type == "X" and len(e.nodes) == 5:
+            # Swapped inputs turn negative feedback into positive feedback:
+            # the output latches to a rail, while a solve from 0 V settles on
+            # the unstable balance point, i.e. the unfaulted solution.
+            nodes = (e.nodes[1], e.nodes[0]) + e.nodes[2:]
+            for rail, label in ((1.0, "V+"), (-1.0, "V-")):
+                variant(
+                    "swapped_opamp_inputs",
+                    f"{e.name}: (+) and (-) inputs swapped, output latched at the {label} rail",
+                    i,
+                    replace(e, nodes=nodes),
+                    {e.name.upper(): rail},
+                )
+
+        if e.type in ("R", "D", "L"):
+            variant(
+                "open", f"{e.name} open (missing jumper or lead not inserted)", i, None
+            )
+
+        if e.type == "D":
+            variant(
+                "reversed_diode",
+                f"{e.name} inserted backwards",
+                i,
+                replace(e, nodes=e.nodes[::-1]),
+            )
+
+        if e.type == "R" and e.value_si:
+            for factor, label in ((10.0, "10x"), (0.1, "1/10")):
+                variant(
+                    "wrong_decade",
+                    f"{e.name} is {label} its intended value ({e.value} expected)",
+                    i,
+                    replace(e, value_si=e.value_si * factor),
+                )
+
+        if e.type == "V" and e.value_si:
+            variant(
+                "supply_off", f"{e.name} off or set to 0 V", i, replace(e, value_si=0.0)
+            )
+
+        if e.type in ("R", "D") and supplies:
+            for pin, node in enumerate(e.nodes):
+                targets = (
+                    supplies
+                    if _is_ground(node)
+                    else (["0"] if node in supplies else [])
+                )
+                for target in targets:
+                    nodes = tuple(
+                        target if p == pin else n for p, n in enumerate(e.nodes)
+                    )
+                    rail = "ground" if target == "0" else target
+                    variant(
+                        "wrong_rail",
+                        f"{e.name} lead on {node} placed in the {rail} rail",
+                        i,
+                        replace(e, nodes=nodes),
+                    )
+
+    resistors = [(i, e) for i, e in enumerate(elements) if e.type == "R" and e.value_si]
+    for (i, a), (j, b) in combinations(resistors, 2):
+        if a.value_si == b.value_si:
+            continue
+        els = list(elements)
+        els[i] = replace(a, value=b.value, value_si=b.value_si)
+        els[j] = replace(b, value=a.value, value_si=a.value_si)
+        variants.append(
+            FaultVariant(
+                "swapped_values", f"{a.name} and {b.name} swapped in position", els
+            )
+        )
+
+    return variants
+
+
+####################
+# Ranking
+####################
+
+
+def _observations(
+    measured_voltages: Dict[str, float], measured_currents: Dict[str, float]
+) -> Tuple[List[Tuple[str, str]], np.ndarray]:
+    keys, values = [], []
+    for name, v in measured_voltages.items():
+        if v is not None and not _is_ground(str(name)):
+            keys.append(("V", str(name).upper()))
+            values.append(float(v))
+    for name, i in measured_currents.items():
+        if i is not None:
+            keys.append(("I", str(name).upper()))
+            values.append(float(i))
+    return keys, np.asarray(values, dtype=np.float64)
+
+
+def _simulated_matrix(
+    ops: List[OperatingPoint], keys: List[Tuple[str, str]]
+) -> np.ndarray:
+    sim = np.full((len(ops), len(keys)), np.nan)
+    for r, op in enumerate(ops):
+        if not op.converged:
+            continue
+        for c, (kind, name) in enumerate(keys):
+            source = op.voltages if kind == "V" else op.currents
+            if name in source:
+                sim[r, c] = source[name]
+    return sim
+
+
+def rank_faults(
+    elements: List[Element],
+    measured_voltages: Dict[str, float],
+    measured_currents: Optional[Dict[str, float]] = None,
+    models: Optional[Dict[str, Dict[str, str]]] = None,
+    top_k: int = 5,
+    confident_distance: float = 0.05,
+    confident_margin: float = 3.0,
+) -> Optional[FaultRanking]:
+    """Rank fault hypotheses by distance between simulated and measured data.
+
+    The distance is the RMS of per-quantity residuals, each normalized by the
+    larger of the measured and nominal magnitude (with a small floor). A
+    ranking is `confident` when the best candidate fits within
+    `confident_distance` and the runner-up is at least `confident_margin`
+    times further away.
+    """
+    keys, measured = _observations(measured_voltages, measured_currents or {})
+    if not keys:
+        return None
+
+    variants = [
+        FaultVariant("no_fault", "Circuit matches the reference", list(elements))
+    ]
+    variants += generate_variants(elements)
+    ops = solve_batch(
+        [v.elements for v in variants], models, saturate=[v.saturate for v in variants]
+    )
+
+    sim = _simulated_matrix(ops, keys)
+    nominal = np.nan_to_num(sim[0], nan=0.0)
+    floors = np.array([VOLTAGE_FLOOR if k == "V" else CURRENT_FLOOR for k, _ in keys])
+    scale = np.maximum(np.maximum(np.abs(measured), np.abs(nominal)), floors)
+
+    residuals = (sim - measured) / scale
+    # A quantity missing from a variant (e.g. the current of an opened
+    # element) counts as a full-scale miss unless it was measured as ~0.
+    missing = np.isnan(residuals)
+    residuals[missing] = np.where(np.abs(measured) <= floors, 0.0, 1.0)[
+        np.nonzero(missing)[1]
+    ]
+    distances = np.sqrt(np.mean(residuals**2, axis=1))
+    distances[[not op.converged for op in ops]] = np.inf
+
+    order = np.argsort(distances, kind="stable")
+    candidates = []
+    seen = set()
+    for r in order:
+        if not np.isfinite(distances[r]):
+            break
+        v = variants[r]
+        if v.description in seen:
+            continue
+        seen.add(v.description)
+        worst = np.argsort(-np.abs(residuals[r]))[:3]
+        candidates.append(
+            FaultCandidate(
+                fault_class=v.fault_class,
+                checklist_item=v.checklist_item,
+                description=v.description,
+                distance=float(distances[r]),
+                residuals={
+                    f"{keys[c][0]}({keys[c][1]})": float(residuals[r, c]) for c in worst
+                },
+            )
+        )
+        if len(candidates) >= top_k:
+            break
+
+    confident = False
+    if candidates and candidates[0].distance <= confident_distance:
+        runner_up = candidates[1].distance if len(candidates) > 1 else np.inf
+        confident = runner_up >= confident_margin * max(candidates[0].distance, 1e-9)
+
+    return FaultRanking(
+        candidates=candidates, confident=confident, variants_tested=len(variants)
+    )
+
+
+def format_candidates(ranking: FaultRanking) -> str:
+    lines = []
+    for n, c in enumerate(ranking.candidates, start=1):
+        worst = ", ".join(f"{k} {v:+.2f}" for k, v in c.residuals.items())
+        lines.append(
+            f"{n}. [Checklist #{c.checklist_item}] {c.description} "
+            f"(fit distance {c.distance:.3f}; largest normalized residuals: {worst})"
+        )
+    return "\n".join(lines)
+
+
+def format_direct_diagnosis(
+    ranking: FaultRanking, key_discrepancy: str, has_opamp: bool = False
+) -> str:
+    best = ranking.candidates[0]
+    runner_up = ranking.candidates[1] if len(ranking.candidates) > 1 else None
+    label = FAULT_CLASSES[best.fault_class][1]
+
+    reasoning = (
+        f"Re-simulating the circuit with this fault reproduces the measured voltages and "
+        f"currents (fit distance {best.distance:.3f}, out of {ranking.variants_tested} simulated variants)"
+    )
+    if runner_up is not None:
+        reasoning += f"; the next best hypothesis ({runner_up.description}) fits far worse ({runner_up.distance:.3f})"
+    reasoning += "."
+
+    lines = [
+        f"1. **Key Discrepancy:** {key_discrepancy}",
+        f"2. **Most Likely Physical Error:** {label}: {best.description}.",
+        f"3. **Reasoning:** {reasoning}",
+        f"4. **Confirmation Step:** {CONFIRMATION_STEPS[best.fault_class]}",
+    ]
+    if has_opamp and best.fault_class == "no_fault":
+        lines.append(
+            "Note: Swapped Op-Amp inputs can produce identical DC Operating Points in simulation. "
+            "Verify Pin 3 (+) and Pin 2 (-) polarity manually."
+        )
+    return "\n".join(lines)
@@ -0,0 +1,539 @@
+"""DC operating-point solver (modified nodal analysis) for parsed netlists.
+
+Builds the MNA system from a `Netlist` and solves it with Newton iteration:
+linear elements are stamped once, nonlinear ones (diodes, op-amp macros)
+are re-linearized into companion conductances/sources on every iteration.
+A single circuit is assembled in COO form and solved with SciPy's sparse LU
+when SciPy is available (dense NumPy otherwise); `solve_batch` runs many
+circuit variants in lockstep through one batched dense solve per iteration.
+
+Supported at DC: R, V, I, L (short), C (open), D, E, F, G, H, K (ignored),
+expanded subcircuits, and unresolved 5-pin X instances, which are treated as
+op-amp macros using LTspice's pin order (In+ In- V+ V- OUT).
+
+Newton starts from 0 V, which for an op-amp with positive feedback is the
+unstable balance point rather than one of the rails it latches to. Callers
+can start such op-amps from a rail instead (`saturate`).
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from open_webui.spice.netlist import GROUND_NAMES, Element, Netlist, parse_si_value
+
+try:
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.linalg import spsolve
+except ImportError:  # pragma: no cover - SciPy is optional
+    coo_matrix = None
+    spsolve = None
+
+log = logging.getLogger(__name__)
+
+GMIN = 1e-12
+THERMAL_VOLTAGE = 0.025852
+
+# Defaults for `.model D D` (LTspice's ideal-ish default diode).
+DEFAULT_DIODE = {"IS": 1e-14, "N": 1.0}
+
+OPAMP_GAIN = 1e5
+OPAMP_HEADROOM = 0.0
+
+
+@dataclass
+class OperatingPoint:
+    voltages: Dict[str, float] = field(default_factory=dict)
+    currents: Dict[str, float] = field(default_factory=dict)
+    converged: bool = False
+    iterations: int = 0
+
+
+_WAVEFORM_RE = re.compile(r"^(PULSE|SINE|SIN|EXP|PWL|SFFM)\s*\((.*)\)", re.IGNORECASE)
+
+
+def dc_value(e: Element) -> float:
+    """DC value of an independent source: plain value or waveform offset."""
+    if e.value_si is not None:
+        return e.value_si
+    m = _WAVEFORM_RE.match(e.value or "")
+    if m:
+        args = m.group(2).replace(",", " ").split()
+        # PWL is (t0 v0 t1 v1 ...); the others start with the DC/initial level.
+        idx = 1 if m.group(1).upper() == "PWL" else 0
+        if len(args) > idx:
+            return parse_si_value(args[idx]) or 0.0
+    return 0.0
+
+
+def _diode_params(models: Dict[str, Dict[str, str]], e: Element) -> Tuple[float, float]:
+    model = models.get((e.model or "").upper(), {})
+    params = {k.upper(): v for k, v in model.items()}
+    i_s = parse_si_value(params.get("IS")) or DEFAULT_DIODE["IS"]
+    n = parse_si_value(params.get("N")) or DEFAULT_DIODE["N"]
+    area = parse_si_value(e.value) if e.value else None
+    return i_s * (area or 1.0), n * THERMAL_VOLTAGE
+
+
+####################
+# Compilation
+####################
+
+
+@dataclass
+class _Compiled:
+    elements: List[Element]
+    nodes: Dict[str, int]
+    branches: Dict[str, int]
+    size: int
+    # Linear stamps (ground rows/cols already dropped) and source vector.
+    rows: np.ndarray
+    cols: np.ndarray
+    vals: np.ndarray
+    rhs: np.ndarray
+    # Diodes: anode/cathode indices (-1 = ground), Is, n*Vt.
+    d_names: List[str]
+    d_pins: np.ndarray
+    d_is: np.ndarray
+    d_nvt: np.ndarray
+    # Op-amp macros: names, (In+, In-, V+, V-, OUT) indices and output
+    # branch index.
+    o_names: List[str]
+    o_pins: np.ndarray
+    o_branch: np.ndarray
+
+    @property
+    def nonlinear(self) -> bool:
+        return bool(len(self.d_names) or len(self.o_branch))
+
+
+def _compile(elements: List[Element], models: Dict[str, Dict[str, str]]) -> _Compiled:
+    # Net numbering: ground is -1 (dropped from the matrix), others 0..N-1.
+    nodes: Dict[str, int] = {}
+    for e in elements:
+        for n in e.nodes:
+            if n.upper() not in GROUND_NAMES and n not in nodes:
+                nodes[n] = len(nodes)
+
+    def idx(n: str) -> int:
+        return -1 if n.upper() in GROUND_NAMES else nodes[n]
+
+    # Extra unknowns: branch currents of voltage-defined elements.
+    branches: Dict[str, int] = {}
+    for e in elements:
+        if e.type in ("V", "L", "E", "H") or (e.type == "X" and len(e.nodes) == 5):
+            branches[e.name.upper()] = len(nodes) + len(branches)
+
+    size = len(nodes) + len(branches)
+    rows: List[int] = list(range(len(nodes)))
+    cols: List[int] = list(range(len(nodes)))
+    vals: List[float] = [GMIN] * len(nodes)
+    rhs = np.zeros(size)
+
+    def add(r: int, c: int, v: float):
+        if r >= 0 and c >= 0:
+            rows.append(r)
+            cols.append(c)
+            vals.append(v)
+
+    def vsource(a: int, b: int, k: int):
+        add(a, k, 1.0)
+        add(b, k, -1.0)
+        add(k, a, 1.0)
+        add(k, b, -1.0)
+
+    d_names, d_pins, d_is, d_nvt = [], [], [], []
+    o_names, o_pins, o_branch = [], [], []
+
+    for e in elements:
+        pins = [idx(n) for n in e.nodes]
+        key = e.name.upper()
+        if e.type == "R":
+            if e.value_si is None:
+                continue
+            g = 1.0 / e.value_si if e.value_si else 1e12
+            add(pins[0], pins[0], g)
+            add(pins[1], pins[1], g)
+            add(pins[0], pins[1], -g)
+            add(pins[1], pins[0], -g)
+        elif e.type == "I":
+            i = dc_value(e)
+            if pins[0] >= 0:
+                rhs[pins[0]] -= i
+            if pins[1] >= 0:
+                rhs[pins[1]] += i
+        elif e.type in ("V", "L"):
+            vsource(pins[0], pins[1], branches[key])
+            rhs[branches[key]] = dc_value(e) if e.type == "V" else 0.0
+        elif e.type == "E":
+            # VCVS; a behavioral E source we cannot evaluate is held at 0 V.
+            k = branches[key]
+            vsource(pins[0], pins[1], k)
+            if len(pins) == 4 and e.value_si is not None:
+                add(k, pins[2], -e.value_si)
+                add(k, pins[3], e.value_si)
+        elif e.type == "H":
+            k = branches[key]
+            vsource(pins[0], pins[1], k)
+            sense = branches.get((e.model or "").upper())
+            if sense is not None and e.value_si is not None:
+                add(k, sense, -e.value_si)
+        elif e.type == "G" and len(pins) == 4 and e.value_si is not None:
+            gm = e.value_si
+            add(pins[0], pins[2], gm)
+            add(pins[0], pins[3], -gm)
+            add(pins[1], pins[2], -gm)
+            add(pins[1], pins[3], gm)
+        elif e.type == "F" and e.model and e.value_si is not None:
+            sense = branches.get(e.model.upper())
+            if sense is not None:
+                add(pins[0], sense, e.value_si)
+                add(pins[1], sense, -e.value_si)
+        elif e.type == "D":
+            i_s, n_vt = _diode_params(models, e)
+            d_names.append(key)
+            d_pins.append(pins[:2])
+            d_is.append(i_s)
+            d_nvt.append(n_vt)
+        elif e.type == "X" and key in branches:
+            o_names.append(key)
+            o_pins.append(pins)
+            o_branch.append(branches[key])
+
+    return _Compiled(
+        elements=elements,
+        nodes=nodes,
+        branches=branches,
+        size=size,
+        rows=np.asarray(rows, dtype=np.int64),
+        cols=np.asarray(cols, dtype=np.int64),
+        vals=np.asarray(vals, dtype=np.float64),
+        rhs=rhs,
+        d_names=d_names,
+        d_pins=np.asarray(d_pins, dtype=np.int64).reshape(-1, 2),
+        d_is=np.asarray(d_is, dtype=np.float64),
+        d_nvt=np.asarray(d_nvt, dtype=np.float64),
+        o_names=o_names,
+        o_pins=np.asarray(o_pins, dtype=np.int64).reshape(-1, 5),
+        o_branch=np.asarray(o_branch, dtype=np.int64),
+    )
+
+
+####################
+# Newton iteration
+####################
+
+
+def _extended(x: np.ndarray) -> np.ndarray:
+    """Append a trailing 0 so index -1 (ground) reads as 0 V."""
+    return np.append(x, 0.0)
+
+
+def _diode_current(vd: np.ndarray, i_s: np.ndarray, n_vt: np.ndarray):
+    ex = np.exp(np.minimum(vd / n_vt, 80.0))
+    return i_s * (ex - 1.0), i_s * ex / n_vt + GMIN
+
+
+def _limit_junction(
+    v_new: np.ndarray, v_old: np.ndarray, n_vt: np.ndarray
+) -> np.ndarray:
+    """SPICE pnjlim: keep forward-bias Newton steps logarithmic."""
+    v_crit = n_vt * np.log(n_vt / (np.sqrt(2) * 1e-14))
+    big = (v_new > v_crit) & (np.abs(v_new - v_old) > 2 * n_vt)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        arg = 1 + (v_new - v_old) / n_vt
+        from_old = np.where(
+            arg > 0, v_old + n_vt * np.log(np.maximum(arg, 1e-300)), v_crit
+        )
+        from_zero = n_vt * np.log(np.maximum(v_new / n_vt, 1e-300))
+    limited = np.where(v_old > 0, from_old, from_zero)
+    return np.where(big, limited, v_new)
+
+
+def _saturation(c: _Compiled, saturate: Optional[Dict[str, float]]) -> np.ndarray:
+    """Per op-amp output state to start from: +1 / -1 for a rail, NaN if free."""
+    state = np.full(len(c.o_names), np.nan)
+    for i, name in enumerate(c.o_names):
+        if saturate and name in saturate:
+            state[i] = np.sign(saturate[name])
+    return state
+
+
+def _nonlinear_stamps(
+    c: _Compiled,
+    x: np.ndarray,
+    v_diode: np.ndarray,
+    saturation: Optional[np.ndarray] = None,
+):
+    """Companion-model stamps for diodes and op-amps linearized at `x`.
+
+    Op-amps with a `saturation` of +1 / -1 are stamped as sitting on that
+    rail instead. Returns (rows, cols, vals, rhs_rows, rhs_vals) with ground
+    entries removed.
+    """
+    xe = _extended(x)
+    rows, cols, vals, r_rows, r_vals = [], [], [], [], []
+
+    if len(c.d_names):
+        a, k = c.d_pins[:, 0], c.d_pins[:, 1]
+        i_d, gd = _diode_current(v_diode, c.d_is, c.d_nvt)
+        ieq = i_d - gd * v_diode
+        rows += [a, k, a, k]
+        cols += [a, k, k, a]
+        vals += [gd, gd, -gd, -gd]
+        r_rows += [a, k]
+        r_vals += [-ieq, ieq]
+
+    if len(c.o_branch):
+        inp, inn, vcc, vee, out = c.o_pins.T
+        br = c.o_branch
+        vp, vn, vc, ve = xe[inp], xe[inn], xe[vcc], xe[vee]
+        hi, lo = vc - OPAMP_HEADROOM, ve + OPAMP_HEADROOM
+        mid, half = 0.5 * (hi + lo), np.maximum(0.5 * (hi - lo), 1e-3)
+        u = OPAMP_GAIN * (vp - vn) / half
+        th = np.tanh(u)
+        dth = 1.0 - th * th
+        if saturation is not None:
+            forced = ~np.isnan(saturation)
+            u = np.where(forced, 0.0, u)
+            th = np.where(forced, saturation, th)
+            dth = np.where(forced, 0.0, dth)
+        f0 = mid + half * th
+        dfd = OPAMP_GAIN * dth
+        dhalf = th - u * dth
+        dfcc, dfee = 0.5 + 0.5 * dhalf, 0.5 - 0.5 * dhalf
+        one = np.ones_like(f0)
+        # Output behaves as a voltage source: vout = f(vp, vn, vcc, vee)
+        rows += [out, br, br, br, br, br]
+        cols += [br, out, inp, inn, vcc, vee]
+        vals += [one, one, -dfd, dfd, -dfcc, -dfee]
+        r_rows += [br]
+        r_vals += [f0 - dfd * (vp - vn) - dfcc * vc - dfee * ve]
+
+    if not rows:
+        empty_i, empty_f = np.zeros(0, dtype=np.int64), np.zeros(0)
+        return empty_i, empty_i, empty_f, empty_i, empty_f
+
+    r, cc, v = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+    keep = (r >= 0) & (cc >= 0)
+    rr, rv = np.concatenate(r_rows), np.concatenate(r_vals)
+    keep_rhs = rr >= 0
+    return r[keep], cc[keep], v[keep], rr[keep_rhs], rv[keep_rhs]
+
+
+def _diode_voltages(c: _Compiled, x: np.ndarray) -> np.ndarray:
+    if not len(c.d_names):
+        return np.zeros(0)
+    xe = _extended(x)
+    return xe[c.d_pins[:, 0]] - xe[c.d_pins[:, 1]]
+
+
+def _settled(c: _Compiled, x_old, x_new, vd_limited, vd_new, abstol, vntol) -> bool:
+    n = len(c.nodes)
+    tol = np.empty_like(x_new)
+    tol[:n] = vntol + 1e-3 * np.abs(x_new[:n])
+    tol[n:] = abstol + 1e-3 * np.abs(x_new[n:])
+    return bool(
+        np.all(np.abs(x_new - x_old) <= tol)
+        and np.allclose(vd_limited, vd_new, atol=vntol)
+    )
+
+
+def _solve_sparse(size: int, rows, cols, vals, rhs) -> np.ndarray:
+    if coo_matrix is not None:
+        matrix = coo_matrix((vals, (rows, cols)), shape=(size, size)).tocsc()
+        return np.atleast_1d(spsolve(matrix, rhs))
+    dense = np.zeros((size, size))
+    np.add.at(dense, (rows, cols), vals)
+    return np.linalg.solve(dense, rhs)
+
+
+def _report(c: _Compiled, x: np.ndarray, op: OperatingPoint) -> OperatingPoint:
+    xe = _extended(x)
+
+    def idx(n: str) -> int:
+        return -1 if n.upper() in GROUND_NAMES else c.nodes[n]
+
+    op.voltages = {name.upper(): float(xe[i]) for name, i in c.nodes.items()}
+    op.voltages["0"] = 0.0
+
+    for e in c.elements:
+        pins = [idx(n) for n in e.nodes]
+        key = e.name.upper()
+        if key in c.branches:
+            op.currents[key] = float(xe[c.branches[key]])
+        elif e.type == "R" and e.value_si:
+            op.currents[key] = float(xe[pins[0]] - xe[pins[1]]) / e.value_si
+        elif e.type == "I":
+            op.currents[key] = dc_value(e)
+        elif e.type == "C":
+            op.currents[key] = 0.0
+        elif e.type == "G" and len(pins) == 4 and e.value_si is not None:
+            op.currents[key] = e.value_si * float(xe[pins[2]] - xe[pins[3]])
+        elif e.type == "F" and e.model and e.value_si is not None:
+            sense = c.branches.get(e.model.upper())
+            if sense is not None:
+                op.currents[key] = e.value_si * float(xe[sense])
+
+    if len(c.d_names):
+        i_d, _ = _diode_current(_diode_voltages(c, x), c.d_is, c.d_nvt)
+        op.currents.update({name: float(i) for name, i in zip(c.d_names, i_d)})
+    return op
+
+
+def solve_elements(
+    elements: List[Element],
+    models: Optional[Dict[str, Dict[str, str]]] = None,
+    max_iterations: int = 200,
+    abstol: float = 1e-9,
+    vntol: float = 1e-6,
+    saturate: Optional[Dict[str, float]] = None,
+) -> OperatingPoint:
+    """Solve one circuit.
+
+    `saturate` maps op-amp names to the rail (+1 for V+, -1 for V-) their
+    output starts from; the first Newton step places them there.
+    """
+    c = _compile(elements, models or {})
+    op = OperatingPoint()
+    if c.size == 0:
+        return op
+
+    x = np.zeros(c.size)
+    v_diode = np.zeros(len(c.d_names))
+    saturation = _saturation(c, saturate)
+
+    for iteration in range(1, max_iterations + 1):
+        nr, nc, nv, rr, rv = _nonlinear_stamps(
+            c, x, v_diode, saturation if iteration == 1 else None
+        )
+        rhs = c.rhs.copy()
+        np.add.at(rhs, rr, rv)
+        try:
+            x_new = _solve_sparse(
+                c.size,
+                np.concatenate([c.rows, nr]),
+                np.concatenate([c.cols, nc]),
+                np.concatenate([c.vals, nv]),
+                rhs,
+            )
+        except Exception as e:
+            log.debug(f"MNA solve failed at iteration {iteration}: {e}")
+            break
+        if not np.all(np.isfinite(x_new)):
+            break
+
+        vd_new = _diode_voltages(c, x_new)
+        vd_limited = _limit_junction(vd_new, v_diode, c.d_nvt)
+        settled = _settled(c, x, x_new, vd_limited, vd_new, abstol, vntol)
+
+        x, v_diode = x_new, vd_limited
+        op.iterations = iteration
+        if (settled and iteration > 1) or not c.nonlinear:
+            op.converged = True
+            break
+
+    if not op.converged:
+        log.warning(
+            f"DC operating point did not converge after {op.iterations} iterations"
+        )
+    return _report(c, x, op)
+
+
+def solve_operating_point(netlist: Netlist, **kwargs) -> OperatingPoint:
+    return solve_elements(netlist.flatten(), netlist.models, **kwargs)
+
+
+def solve_batch(
+    variants: Sequence[List[Element]],
+    models: Optional[Dict[str, Dict[str, str]]] = None,
+    max_iterations: int = 200,
+    abstol: float = 1e-9,
+    vntol: float = 1e-6,
+    saturate: Optional[Sequence[Optional[Dict[str, float]]]] = None,
+) -> List[OperatingPoint]:
+    """Solve many circuit variants in lockstep.
+
+    Every variant is padded to the largest system size (unused unknowns get
+    an identity row) so each Newton iteration is one batched dense
+    `np.linalg.solve` over a (variants, n, n) stack. Intended for the small
+    circuits used in labs, e.g. fault-dictionary sweeps. `saturate` holds
+    an optional per-variant `solve_elements(saturate=...)` start state.
+    """
+    compiled = [_compile(list(v), models or {}) for v in variants]
+    if not compiled:
+        return []
+    saturations = [
+        _saturation(c, saturate[i] if saturate else None)
+        for i, c in enumerate(compiled)
+    ]
+
+    n = max(1, max(c.size for c in compiled))
+    count = len(compiled)
+
+    base = np.zeros((count, n, n))
+    base_rhs = np.zeros((count, n))
+    for i, c in enumerate(compiled):
+        np.add.at(base[i], (c.rows, c.cols), c.vals)
+        base_rhs[i, : c.size] = c.rhs
+        pad = np.arange(c.size, n)
+        base[i, pad, pad] = 1.0
+
+    x = np.zeros((count, n))
+    v_diodes = [np.zeros(len(c.d_names)) for c in compiled]
+    active = np.ones(count, dtype=bool)
+    ops = [OperatingPoint() for _ in compiled]
+
+    for iteration in range(1, max_iterations + 1):
+        matrix = base.copy()
+        rhs = base_rhs.copy()
+        for i in np.flatnonzero(active):
+            c = compiled[i]
+            if c.nonlinear:
+                nr, nc, nv, rr, rv = _nonlinear_stamps(
+                    c,
+                    x[i, : c.size],
+                    v_diodes[i],
+                    saturations[i] if iteration == 1 else None,
+                )
+                np.add.at(matrix[i], (nr, nc), nv)
+                np.add.at(rhs[i], rr, rv)
+
+        live = np.flatnonzero(active)
+        try:
+            x_new = np.linalg.solve(matrix[live], rhs[live][..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            # Fall back to per-variant solves so one singular variant cannot
+            # take the rest of the batch down with it.
+            x_new = np.full((len(live), n), np.nan)
+            for j, i in enumerate(live):
+                try:
+                    x_new[j] = np.linalg.solve(matrix[i], rhs[i])
+                except np.linalg.LinAlgError:
+                    pass
+
+        for j, i in enumerate(live):
+            c = compiled[i]
+            xi_new = x_new[j, : c.size]
+            if not np.all(np.isfinite(xi_new)):
+                active[i] = False
+                continue
+            vd_new = _diode_voltages(c, xi_new)
+            vd_limited = _limit_junction(vd_new, v_diodes[i], c.d_nvt)
+            settled = _settled(
+                c, x[i, : c.size], xi_new, vd_limited, vd_new, abstol, vntol
+            )
+            x[i, : c.size] = xi_new
+            v_diodes[i] = vd_limited
+            ops[i].iterations = iteration
+            if (settled and iteration > 1) or not c.nonlinear:
+                ops[i].converged = True
+                active[i] = False
+
+        if not active.any():
+            break
+
+    return [_report(c, x[i, : c.size], ops[i]) for i, c in enumerate(compiled)]
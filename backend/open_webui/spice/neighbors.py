@@ -0,0 +1,206 @@
+"""Nearest-neighbour reuse of past circuit diagnoses.
+
+Students in the same lab build the same reference circuit and tend to make
+the same mistakes, so the sim-vs-measured residual pattern of a new upload
+is often close to one that was already diagnosed. Circuits are grouped by a
+hash of their topology (element names, types, values and connections);
+within a group every diagnosed circuit is a row in a residual matrix and a
+query is a single vectorized distance computation against that matrix.
+
+LTspice names unlabelled nets N001, N002, ... in the order they were drawn,
+so two copies of one schematic can number them differently. Those nets are
+identified by the element pins they connect instead of by name.
+
+The index lives in process memory and is bounded per topology; verified
+diagnoses are kept with the circuits and re-added when it is rebuilt.
+"""
+
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from open_webui.spice.netlist import GROUND_NAMES
+
+VOLTAGE_FLOOR = 0.05
+CURRENT_FLOOR = 1e-5
+
+_AUTO_NODE = re.compile(r"^N\d{3,}$", re.IGNORECASE)
+
+
+@dataclass
+class CircuitFeatures:
+    topology: str
+    vector: np.ndarray
+
+
+@dataclass
+class Neighbor:
+    distance: float
+    diagnosis: str
+    verified: bool
+    circuit_id: Optional[str] = None
+
+
+def _value(row: Dict, *keys: str) -> Optional[float]:
+    for key in keys:
+        if row.get(key) is not None:
+            try:
+                return float(row[key])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def canonical_node_names(elements: List[Dict]) -> Dict[str, str]:
+    """Names for auto-generated nodes built from the pins they connect ("R1.1+R2.0")."""
+    pins: Dict[str, List[str]] = {}
+    for e in elements:
+        for i, node in enumerate(e.get("nodes") or ()):
+            pins.setdefault(str(node), []).append(f"{e.get('element_name')}.{i}")
+    return {
+        node: "+".join(sorted(connected))
+        for node, connected in pins.items()
+        if _AUTO_NODE.match(node)
+    }
+
+
+def topology_hash(
+    elements: List[Dict], node_names: Optional[Dict[str, str]] = None
+) -> str:
+    """Hash of the circuit structure, independent of row ids and measurements."""
+    if node_names is None:
+        node_names = canonical_node_names(elements)
+    parts = sorted(
+        "{}|{}|{}|{}".format(
+            e.get("element_name"),
+            e.get("type"),
+            e.get("value") or e.get("model") or "",
+            ",".join(node_names.get(str(n), str(n)) for n in e.get("nodes") or ()),
+        )
+        for e in elements
+    )
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def circuit_features(
+    nets: List[Dict], elements: List[Dict]
+) -> Optional[CircuitFeatures]:
+    """Normalized residual vector (node voltages, then element currents).
+
+    Entries without both a simulated and a measured value are zero, so
+    partially measured circuits still compare on what was measured. Returns
+    None when nothing was measured.
+    """
+    residuals = []
+    measured_any = False
+    node_names = canonical_node_names(elements)
+
+    def node_key(row: Dict) -> str:
+        name = str(row.get("node_name"))
+        return node_names.get(name, name)
+
+    rows = []
+    for n in sorted(nets, key=node_key):
+        if str(n.get("node_name")).upper() in GROUND_NAMES:
+            continue
+        sim = _value(n, "simulated_avg", "simulated_voltage")
+        meas = _value(n, "measured_avg", "measured_voltage")
+        rows.append((sim, meas, VOLTAGE_FLOOR))
+    for e in sorted(elements, key=lambda r: str(r.get("element_name"))):
+        rows.append(
+            (
+                _value(e, "simulated_current"),
+                _value(e, "measured_current"),
+                CURRENT_FLOOR,
+            )
+        )
+
+    for sim, meas, floor in rows:
+        if sim is None or meas is None:
+            residuals.append(0.0)
+            continue
+        measured_any = True
+        residuals.append((meas - sim) / max(abs(sim), abs(meas), floor))
+
+    if not measured_any:
+        return None
+    return CircuitFeatures(
+        topology_hash(elements, node_names), np.asarray(residuals, dtype=np.float64)
+    )
+
+
+class _Group:
+    def __init__(self, dim: int):
+        self.vectors = np.empty((0, dim), dtype=np.float64)
+        self.entries: List[Tuple[str, bool, Optional[str]]] = []
+
+
+class DiagnosisIndex:
+    """Per-topology residual matrices searched with vectorized distances."""
+
+    def __init__(self, max_per_topology: int = 500):
+        self.max_per_topology = max(1, max_per_topology)
+        self._groups: Dict[str, _Group] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        features: CircuitFeatures,
+        diagnosis: str,
+        verified: bool = False,
+        circuit_id: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            group = self._groups.get(features.topology)
+            if group is None or group.vectors.shape[1] != features.vector.shape[0]:
+                group = self._groups[features.topology] = _Group(
+                    features.vector.shape[0]
+                )
+
+            # Re-adding a circuit (e.g. once verified) replaces its old entry.
+            if circuit_id is not None:
+                keep = [
+                    i for i, entry in enumerate(group.entries) if entry[2] != circuit_id
+                ]
+                if len(keep) != len(group.entries):
+                    group.vectors = group.vectors[keep]
+                    group.entries = [group.entries[i] for i in keep]
+
+            group.vectors = np.vstack([group.vectors, features.vector[None, :]])
+            group.entries.append((diagnosis, verified, circuit_id))
+
+            overflow = len(group.entries) - self.max_per_topology
+            if overflow > 0:
+                # Drop the oldest unverified entries first.
+                order = sorted(
+                    range(len(group.entries)), key=lambda i: (group.entries[i][1], i)
+                )
+                drop = set(order[:overflow])
+                keep = [i for i in range(len(group.entries)) if i not in drop]
+                group.vectors = group.vectors[keep]
+                group.entries = [group.entries[i] for i in keep]
+
+    def search(self, features: CircuitFeatures, k: int = 3) -> List[Neighbor]:
+        with self._lock:
+            group = self._groups.get(features.topology)
+            if group is None or not group.entries:
+                return []
+            vectors, entries = group.vectors, list(group.entries)
+
+        if vectors.shape[1] != features.vector.shape[0]:
+            return []
+        distances = np.sqrt(np.mean((vectors - features.vector) ** 2, axis=1))
+        k = min(k, len(entries))
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        return [
+            Neighbor(float(distances[i]), entries[i][0], entries[i][1], entries[i][2])
+            for i in nearest
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(g.entries) for g in self._groups.values())
@@ -0,0 +1,607 @@
+"""SPICE / LTspice netlist parser.
+
+Single pass over the logical lines of a netlist (continuation lines folded
+in as they stream past) producing a compact element/net graph:
+
+    netlist = parse_netlist(text)
+    netlist.elements      # top-level Element records, in file order
+    netlist.subckts       # .subckt definitions by upper-cased name
+    netlist.nets          # net name -> [(element name, pin index), ...]
+    netlist.flatten()     # elements with every resolvable X instance expanded
+
+`parse_netlist_bytes` caches parsed results by content hash, so re-uploading
+or re-diagnosing the same circuit skips decoding and parsing entirely.
+"""
+
+import ast
+import hashlib
+import operator
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+####################
+# Values
+####################
+
+SI_SCALE = {
+    "t": 1e12,
+    "g": 1e9,
+    "meg": 1e6,
+    "k": 1e3,
+    "mil": 25.4e-6,
+    "m": 1e-3,
+    "u": 1e-6,
+    "µ": 1e-6,
+    "n": 1e-9,
+    "p": 1e-12,
+    "f": 1e-15,
+}
+
+_SI_RE = re.compile(
+    r"^([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|mil|[tgkmuµnpf])?",
+    re.IGNORECASE,
+)
+# LTspice "4k7" / "2r2" notation: the multiplier doubles as the decimal point.
+_SI_INFIX_RE = re.compile(r"^(\d+)(meg|[tgkmuµnpfr])(\d+)$", re.IGNORECASE)
+
+
+def parse_si_value(token) -> Optional[float]:
+    """Parse a SPICE number such as "4.621k", "10u", "1Meg", "4k7" or "100nF"."""
+    if token is None:
+        return None
+    if isinstance(token, (int, float)):
+        return float(token)
+
+    text = str(token).strip()
+    if not text:
+        return None
+
+    m = _SI_INFIX_RE.match(text)
+    if m:
+        suffix = m.group(2).lower()
+        scale = 1.0 if suffix == "r" else SI_SCALE[suffix]
+        return float(f"{m.group(1)}.{m.group(3)}") * scale
+
+    m = _SI_RE.match(text)
+    if not m:
+        return None
+    value = float(m.group(1))
+    suffix = (m.group(2) or "").lower()
+    return value * SI_SCALE.get(suffix, 1.0)
+
+
+_EXPR_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+_SI_LITERAL_RE = re.compile(
+    r"(?<![\w.])((?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|mil|[tgkmuµnpf])[a-z]*",
+    re.IGNORECASE,
+)
+
+
+def evaluate_expression(expr: str, scope: Dict[str, float]) -> Optional[float]:
+    """Evaluate a brace expression ("{2*rval}") against numeric .param values.
+
+    Only arithmetic on numbers and known parameter names is supported;
+    anything else (functions, unknown names) yields None.
+    """
+    text = expr.strip()
+    if text.startswith("{") and text.endswith("}"):
+        text = text[1:-1]
+    text = _SI_LITERAL_RE.sub(
+        lambda m: repr(parse_si_value(m.group(1) + m.group(2))), text
+    ).replace("^", "**")
+
+    def _eval(node):
+        if isinstance(node, ast.Expression):
+            return _eval(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return scope[node.id.lower()]
+        if isinstance(node, ast.BinOp) and type(node.op) in _EXPR_OPS:
+            return _EXPR_OPS[type(node.op)](_eval(node.left), _eval(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _EXPR_OPS:
+            return _EXPR_OPS[type(node.op)](_eval(node.operand))
+        raise ValueError("unsupported expression")
+
+    try:
+        return float(_eval(ast.parse(text, mode="eval")))
+    except Exception:
+        return None
+
+
+def resolve_value(token: Optional[str], scope: Dict[str, float]) -> Optional[float]:
+    if token is None:
+        return None
+    if token.startswith("{"):
+        return evaluate_expression(token, scope)
+    value = parse_si_value(token)
+    if value is None and token.lower() in scope:
+        return scope[token.lower()]
+    return value
+
+
+####################
+# Netlist graph
+####################
+
+# Fixed pin counts; Q and M are variable and handled separately.
+NODE_COUNTS = {
+    "R": 2,
+    "C": 2,
+    "L": 2,
+    "V": 2,
+    "I": 2,
+    "D": 2,
+    "B": 2,
+    "F": 2,
+    "H": 2,
+    "W": 2,
+    "E": 4,
+    "G": 4,
+    "S": 4,
+    "T": 4,
+    "O": 4,
+    "J": 3,
+    "Z": 3,
+}
+
+GROUND_NAMES = ("0", "GND", "GROUND")
+
+
+@dataclass
+class Element:
+    name: str
+    type: str
+    nodes: Tuple[str, ...]
+    model: Optional[str] = None
+    value: Optional[str] = None
+    params: Dict[str, str] = field(default_factory=dict)
+    value_si: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        """Row shape used by the upload/merge/ingest helpers in spice_api."""
+        nodes = list(self.nodes)
+        return {
+            "name": self.name,
+            "type": self.type,
+            "nodes": nodes,
+            "model": self.model,
+            "value": self.value,
+            "params": dict(self.params),
+            "simulated_current": None,
+            "node_voltages": {n: None for n in nodes},
+        }
+
+
+@dataclass
+class Subckt:
+    name: str
+    ports: Tuple[str, ...]
+    params: Dict[str, str] = field(default_factory=dict)
+    elements: List[Element] = field(default_factory=list)
+
+
+@dataclass
+class Netlist:
+    title: Optional[str] = None
+    elements: List[Element] = field(default_factory=list)
+    subckts: Dict[str, Subckt] = field(default_factory=dict)
+    models: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    params: Dict[str, str] = field(default_factory=dict)
+    includes: List[str] = field(default_factory=list)
+    directives: List[str] = field(default_factory=list)
+    nets: Dict[str, List[Tuple[str, int]]] = field(default_factory=dict)
+
+    def param_scope(self) -> Dict[str, float]:
+        return _resolve_params(self.params, {})
+
+    def net_index(self) -> Dict[str, int]:
+        """Dense integer ids for nets; every ground alias maps to 0."""
+        index = {name: 0 for name in GROUND_NAMES}
+        for name in self.nets:
+            if name.upper() not in GROUND_NAMES:
+                index.setdefault(name, len(index) - len(GROUND_NAMES) + 1)
+        return index
+
+    def element_dicts(self) -> List[dict]:
+        return [e.to_dict() for e in self.elements]
+
+    def flatten(self, max_depth: int = 16) -> List[Element]:
+        """Expand X instances whose .subckt definition is known.
+
+        Expanded elements are named "<instance>.<element>" and internal nets
+        "<instance>.<net>"; instances of unknown subcircuits (vendor models
+        pulled in via .lib) are kept as opaque X elements.
+        """
+        scope = self.param_scope()
+        out: List[Element] = []
+        for e in self.elements:
+            self._expand(e, "", {}, scope, out, max_depth)
+        return out
+
+    def _expand(self, e, prefix, net_map, scope, out, depth):
+        nodes = tuple(
+            (
+                net_map[n]
+                if n in net_map
+                else n if n.upper() in GROUND_NAMES else f"{prefix}{n}"
+            )
+            for n in e.nodes
+        )
+        name = f"{prefix}{e.name}"
+        sub = self.subckts.get((e.model or "").upper()) if e.type == "X" else None
+
+        if sub is None or depth <= 0 or len(sub.ports) != len(nodes):
+            value_si = resolve_value(e.value, scope) if e.value else e.value_si
+            out.append(
+                Element(name, e.type, nodes, e.model, e.value, e.params, value_si)
+            )
+            return
+
+        local_scope = dict(scope)
+        local_scope.update(_resolve_params(sub.params, scope))
+        local_scope.update(_resolve_params(e.params, scope))
+        child_map = dict(zip(sub.ports, nodes))
+        for child in sub.elements:
+            self._expand(child, f"{name}.", child_map, local_scope, out, depth - 1)
+
+
+def _resolve_params(raw: Dict[str, str], scope: Dict[str, float]) -> Dict[str, float]:
+    resolved: Dict[str, float] = {}
+    pending = dict(raw)
+    # .param values may reference each other in any order; iterate to a fixpoint.
+    while pending:
+        progressed = False
+        for key, expr in list(pending.items()):
+            value = resolve_value(expr, {**scope, **resolved})
+            if value is not None:
+                resolved[key.lower()] = value
+                pending.pop(key)
+                progressed = True
+        if not progressed:
+            break
+    return resolved
+
+
+####################
+# Tokenizing
+####################
+
+
+def _logical_lines(lines: Iterable[str]):
+    """Yield (line_no, text) with "+" continuation lines folded in."""
+    pending, pending_no = None, 0
+    for no, raw in enumerate(lines, start=1):
+        line = raw.replace("\x00", "").strip()
+        if not line:
+            continue
+        if line.startswith("+"):
+            if pending is not None:
+                pending = f"{pending} {line[1:].strip()}"
+            continue
+        if pending is not None:
+            yield pending_no, pending
+        pending, pending_no = line, no
+    if pending is not None:
+        yield pending_no, pending
+
+
+def _tokenize(line: str) -> List[str]:
+    """Split on whitespace, keeping (...), {...} and quoted groups intact.
+
+    "k = v" spacing is normalized to a single "k=v" token.
+    """
+    line = re.sub(r"\s*=\s*", "=", line)
+    tokens, buf, depth, quote = [], [], 0, None
+    for ch in line:
+        if quote:
+            buf.append(ch)
+            if ch == quote:
+                quote = None
+            continue
+        if ch in "\"'":
+            quote = ch
+            buf.append(ch)
+        elif ch in "({":
+            depth += 1
+            buf.append(ch)
+        elif ch in ")}":
+            depth = max(0, depth - 1)
+            buf.append(ch)
+        elif ch.isspace() and depth == 0:
+            if buf:
+                tokens.append("".join(buf))
+                buf = []
+        else:
+            buf.append(ch)
+    if buf:
+        tokens.append("".join(buf))
+
+    # Attach "SINE (...)"-style groups to the word before them.
+    merged: List[str] = []
+    for tok in tokens:
+        if tok.startswith("(") and merged and "=" not in merged[-1]:
+            merged[-1] += tok
+        else:
+            merged.append(tok)
+    return merged
+
+
+def _strip_comment(line: str) -> str:
+    for marker in (";", " $ "):
+        idx = line.find(marker)
+        if idx != -1:
+            line = line[:idx]
+    return line.strip()
+
+
+def _split_params(tokens: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    positional, params = [], {}
+    for tok in tokens:
+        if "=" in tok and not tok.startswith(("{", "(")):
+            key, _, val = tok.partition("=")
+            params[key] = val
+        else:
+            positional.append(tok)
+    return positional, params
+
+
+def _is_number(tok: str) -> bool:
+    return parse_si_value(tok) is not None or tok.startswith("{")
+
+
+def _parse_element(tokens: List[str]) -> Optional[Element]:
+    name = tokens[0]
+    type_ = name[0].upper()
+    rest = tokens[1:]
+
+    if type_ == "X":
+        # Everything after "params:" (or the first k=v) is a parameter override.
+        if any(t.lower() == "params:" for t in rest):
+            idx = [t.lower() for t in rest].index("params:")
+            rest = rest[:idx] + rest[idx + 1 :]
+        positional, params = _split_params(rest)
+        if not positional:
+            return None
+        *nodes, model = positional
+        return Element(name, type_, tuple(nodes), model=model, params=params)
+
+    if type_ == "K":
+        positional, params = _split_params(rest)
+        if not positional:
+            return None
+        *refs, coupling = positional
+        params = {**params, "inductors": " ".join(refs)}
+        return Element(
+            name,
+            type_,
+            (),
+            value=coupling,
+            params=params,
+            value_si=parse_si_value(coupling),
+        )
+
+    positional, params = _split_params(rest)
+
+    if type_ == "Q":
+        count = 4 if len(positional) >= 5 and not _is_number(positional[4]) else 3
+    elif type_ == "M":
+        count = 4 if len(positional) >= 5 else 3
+    elif type_ in NODE_COUNTS:
+        count = NODE_COUNTS[type_]
+        if type_ in ("E", "G"):
+            behavioral = any(
+                k.upper() in ("VALUE", "TABLE", "LAPLACE") for k in params
+            ) or (len(positional) > 2 and positional[2].upper().startswith("POLY"))
+            if behavioral:
+                count = 2
+    else:
+        return None
+
+    if len(positional) < count:
+        return None
+
+    nodes = tuple(positional[:count])
+    tail = positional[count:]
+    model, value = None, None
+
+    if type_ in ("D", "Q", "M", "J", "Z", "S", "O"):
+        model = tail[0] if tail else None
+        value = tail[1] if len(tail) > 1 else None
+    elif type_ == "W":
+        # W1 n+ n- Vctrl model
+        value = tail[0] if tail else None
+        model = tail[1] if len(tail) > 1 else None
+    elif type_ in ("F", "H"):
+        # F1 n+ n- Vsense gain
+        model = tail[0] if tail else None
+        value = tail[1] if len(tail) > 1 else None
+    elif type_ in ("V", "I") and tail:
+        if tail[0].upper() == "DC" and len(tail) > 1:
+            tail = tail[1:]
+        value = " ".join(tail)
+    elif type_ in ("E", "G") and count == 2 and tail:
+        # POLY(n) controlling nodes and coefficients
+        value = " ".join(tail)
+    elif type_ in ("B", "E", "G") and count == 2:
+        value = next(
+            (
+                f"{k}={v}"
+                for k, v in params.items()
+                if k.upper() in ("V", "I", "VALUE", "TABLE", "LAPLACE")
+            ),
+            None,
+        )
+    elif tail:
+        value = tail[0]
+        if len(tail) > 1 and not _is_number(tail[0]):
+            # "R1 a b RMOD 10k" style: model name before the value.
+            model, value = tail[0], tail[1]
+
+    value_si = None
+    if value is not None and "=" not in value and type_ not in ("B", "F", "H", "W"):
+        value_si = parse_si_value(value.split()[0])
+    elif type_ in ("F", "H"):
+        value_si = parse_si_value(value) if value else None
+
+    return Element(
+        name, type_, nodes, model=model, value=value, params=params, value_si=value_si
+    )
+
+
+####################
+# Parsing
+####################
+
+
+def parse_netlist(source) -> Netlist:
+    """Parse netlist text (or any iterable of lines) into a Netlist."""
+    lines = source.splitlines() if isinstance(source, str) else source
+    netlist = Netlist()
+    current: Optional[Subckt] = None
+
+    for no, raw in _logical_lines(lines):
+        if raw.startswith("*"):
+            if no == 1 and netlist.title is None:
+                netlist.title = raw.lstrip("* ").strip()
+            continue
+
+        line = _strip_comment(raw)
+        if not line:
+            continue
+
+        if line.startswith("."):
+            tokens = _tokenize(line)
+            cmd = tokens[0].lower()
+
+            if cmd == ".end":
+                break
+            if cmd == ".subckt" and len(tokens) >= 2:
+                rest = [t for t in tokens[2:] if t.lower() != "params:"]
+                ports, params = _split_params(rest)
+                current = Subckt(tokens[1], tuple(ports), params)
+                netlist.subckts[tokens[1].upper()] = current
+            elif cmd == ".ends":
+                current = None
+            elif cmd == ".param":
+                _, params = _split_params(tokens[1:])
+                target = current.params if current is not None else netlist.params
+                target.update(params)
+            elif cmd in (".include", ".inc", ".lib"):
+                if len(tokens) >= 2:
+                    netlist.includes.append(tokens[1].strip("\"'"))
+            elif cmd == ".model" and len(tokens) >= 3:
+                m = re.match(r"([^(]+)(?:\((.*)\))?$", " ".join(tokens[2:]))
+                kind = (m.group(1) if m else tokens[2]).strip()
+                _, params = _split_params(_tokenize(m.group(2) or "") if m else [])
+                netlist.models[tokens[1].upper()] = {"type": kind, **params}
+            else:
+                netlist.directives.append(line)
+            continue
+
+        element = _parse_element(_tokenize(line))
+        if element is None:
+            continue
+        if current is not None:
+            current.elements.append(element)
+            continue
+
+        netlist.elements.append(element)
+        for pin, node in enumerate(element.nodes):
+            netlist.nets.setdefault(node, []).append((element.name, pin))
+
+    return netlist
+
+
+# Bytes inspected when guessing an encoding; enough for a few header lines.
+SNIFF_BYTES = 4096
+
+TextSource = Union[bytes, bytearray, memoryview, str, "os.PathLike[str]", BinaryIO]
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """Guess the encoding of LTspice output from its first bytes.
+
+    Netlists are UTF-8 (or latin-1); .log files are often UTF-16 without a
+    BOM, which shows up as NULs in every other byte.
+    """
+    if prefix.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if prefix.startswith(b"\xff\xfe") or prefix.startswith(b"\xfe\xff"):
+        return "utf-16"
+    if b"\x00" in prefix:
+        odd_nuls = prefix[1::2].count(0)
+        even_nuls = prefix[0::2].count(0)
+        return "utf-16-le" if odd_nuls >= even_nuls else "utf-16-be"
+    return "utf-8"
+
+
+def decode_text(data: bytes) -> str:
+    """Decode LTspice output using the encoding sniffed from its prefix."""
+    encoding = sniff_encoding(bytes(data[:SNIFF_BYTES]))
+    data = bytes(data)
+    for enc in dict.fromkeys((encoding, "utf-8")):
+        try:
+            return data.decode(enc)
+        except UnicodeError:
+            continue
+    return data.decode("latin-1")
+
+
+def read_source(source: TextSource) -> bytes:
+    """Return the bytes of an in-memory buffer, binary stream or file path."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "read"):
+        return source.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+####################
+# Parse cache
+####################
+
+PARSE_CACHE_SIZE = 256
+
+_parse_cache: "OrderedDict[str, Netlist]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def parse_netlist_bytes(data: bytes) -> Netlist:
+    """Parse raw netlist bytes, reusing the cached result for identical content.
+
+    The returned Netlist is shared between callers and must be treated as
+    read-only; use `element_dicts()` for mutable per-request rows.
+    """
+    key = content_hash(data)
+    with _parse_cache_lock:
+        cached = _parse_cache.get(key)
+        if cached is not None:
+            _parse_cache.move_to_end(key)
+            return cached
+
+    netlist = parse_netlist(decode_text(data))
+
+    with _parse_cache_lock:
+        _parse_cache[key] = netlist
+        while len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return netlist
@@ -0,0 +1,348 @@
+"""LTspice .raw waveform reader and server-side .meas statistics.
+
+Reads both binary and ASCII .raw files, from a path or an in-memory buffer.
+Binary data is memory-mapped (or viewed in place, for buffers) with NumPy
+rather than decoded into Python lists: every variable is exposed as a view
+of the file in its stored type, so multi-million point transient runs only
+page in what the statistics touch. `measure_traces` then computes
+AVG/MAX/MIN/PP/RMS/period/frequency trace by trace, matching the
+`.meas TRAN` block that `generate_meas_block` used to ask students to
+paste back into LTspice.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+####################
+# Header parsing
+####################
+
+_HEADER_END_MARKERS = ("binary:", "values:")
+
+# A file path, or the complete file contents already in memory.
+RawSource = Union[str, bytes, bytearray, memoryview]
+
+
+def _is_buffer(source: RawSource) -> bool:
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+@dataclass
+class RawFile:
+    title: str = ""
+    plotname: str = ""
+    command: str = ""
+    flags: Tuple[str, ...] = ()
+    variables: List[Tuple[str, str]] = field(default_factory=list)
+    n_points: int = 0
+    binary: bool = True
+    ltspice: bool = True
+    # One array per variable: memmap / buffer views in their stored type for
+    # binary files, float64 (complex128) columns for ASCII ones.
+    columns: List[np.ndarray] = field(default_factory=list)
+
+    @property
+    def is_complex(self) -> bool:
+        return "complex" in self.flags
+
+    @property
+    def is_transient(self) -> bool:
+        return "transient" in self.plotname.lower()
+
+    @property
+    def has_axis(self) -> bool:
+        # Single-point plots list no independent variable
+        plotname = self.plotname.lower()
+        return "operating point" not in plotname and "transfer function" not in plotname
+
+    def trace(self, name: str) -> np.ndarray:
+        idx = [v[0].lower() for v in self.variables].index(name.lower())
+        return self.columns[idx]
+
+
+def _detect_header(head: bytes) -> Tuple[str, int, bool]:
+    """Return (encoding, data offset, is_binary) for a .raw header.
+
+    LTspice writes headers in UTF-16LE, other simulators (ngspice, older
+    LTspice exports) in ASCII/UTF-8.
+    """
+    utf16 = head[1:2] == b"\x00" or head.startswith(b"\xff\xfe")
+    encoding = "utf-16-le" if utf16 else "latin-1"
+
+    for marker in _HEADER_END_MARKERS:
+        for variant in (marker.capitalize(), marker.upper(), marker):
+            needle = (variant + "\n").encode(encoding)
+            idx = head.find(needle)
+            if idx != -1:
+                return encoding, idx + len(needle), marker == "binary:"
+    raise ValueError(
+        "Not an LTspice .raw file: missing 'Binary:' or 'Values:' section."
+    )
+
+
+def is_raw_file(source: RawSource) -> bool:
+    """Sniff whether `source` is a .raw waveform (as opposed to a .log)."""
+    if _is_buffer(source):
+        head = bytes(source[:4096])
+    else:
+        with open(source, "rb") as f:
+            head = f.read(4096)
+    utf16 = head[1:2] == b"\x00" or head.startswith(b"\xff\xfe")
+    text = head.decode("utf-16-le" if utf16 else "latin-1", errors="ignore")
+    text = text.lstrip("\ufeff")
+    return text.startswith("Title:") and "Plotname:" in text
+
+
+def _parse_header(text: str) -> RawFile:
+    raw = RawFile()
+    in_vars = False
+    for line in text.splitlines():
+        if in_vars:
+            if line[:1] in ("\t", " "):
+                parts = line.split()
+                if len(parts) >= 3:
+                    raw.variables.append((parts[1], parts[2]))
+                continue
+            in_vars = False
+
+        key, _, value = line.partition(":")
+        key = key.strip().lower()
+        value = value.strip()
+        if key == "title":
+            raw.title = value
+        elif key == "plotname":
+            raw.plotname = value
+        elif key == "command":
+            raw.command = value
+        elif key == "flags":
+            raw.flags = tuple(value.lower().split())
+        elif key == "no. points":
+            raw.n_points = int(value)
+        elif key == "variables":
+            in_vars = True
+    return raw
+
+
+####################
+# Data loading
+####################
+
+
+def _variable_dtypes(raw: RawFile) -> List[np.dtype]:
+    """Stored type of every variable, as implied by the header."""
+    n_vars = len(raw.variables)
+    if raw.is_complex:
+        return [np.dtype("<c16")] * n_vars
+    if "double" in raw.flags or not raw.ltspice:
+        # ngspice and friends always write doubles
+        return [np.dtype("<f8")] * n_vars
+    # LTspice stores traces as float32 and the sweep axis (time, swept
+    # source) as float64; single-point plots such as .op have no axis.
+    axis = np.dtype("<f8") if raw.has_axis else np.dtype("<f4")
+    return [axis] + [np.dtype("<f4")] * (n_vars - 1)
+
+
+def _map(source: RawSource, dtype: np.dtype, offset: int, count: int) -> np.ndarray:
+    if _is_buffer(source):
+        return np.frombuffer(source, dtype=dtype, count=count, offset=offset)
+    return np.memmap(source, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+
+def _load_binary(source: RawSource, raw: RawFile, offset: int) -> List[np.ndarray]:
+    dtypes = _variable_dtypes(raw)
+
+    if "fastaccess" in raw.flags:
+        # Variable-major layout: each trace is one contiguous block.
+        columns = []
+        pos = offset
+        for dtype in dtypes:
+            columns.append(_map(source, dtype, pos, raw.n_points))
+            pos += dtype.itemsize * raw.n_points
+        return columns
+
+    # Point-major layout: field views of the records keep the mapping
+    records = _map(
+        source,
+        np.dtype([(f"v{i}", dtype) for i, dtype in enumerate(dtypes)]),
+        offset,
+        raw.n_points,
+    )
+    return [records[f"v{i}"] for i in range(len(dtypes))]
+
+
+def _load_ascii(text: str, raw: RawFile) -> List[np.ndarray]:
+    n_vars = len(raw.variables)
+    tokens = text.split()[: raw.n_points * (n_vars + 1)]
+    # Each point is "<index> <v0> <v1> ...", so drop the index column.
+    if raw.is_complex:
+        pairs = np.array([t.split(",") for t in tokens if "," in t], dtype=np.float64)
+        values = (pairs[:, 0] + 1j * pairs[:, 1]).reshape(-1, n_vars)
+    else:
+        values = np.array(tokens, dtype=np.float64).reshape(-1, n_vars + 1)[:, 1:]
+    return [values[:, i] for i in range(n_vars)]
+
+
+MAX_HEADER_BYTES = 16 * 1024 * 1024
+
+
+def _read_header(source: RawSource) -> Tuple[bytes, str, int, bool]:
+    if _is_buffer(source):
+        head = bytes(source[:MAX_HEADER_BYTES])
+        return (head, *_detect_header(head))
+
+    with open(source, "rb") as f:
+        head = b""
+        while True:
+            chunk = f.read(64 * 1024)
+            head += chunk
+            try:
+                return (head, *_detect_header(head))
+            except ValueError:
+                if not chunk or len(head) > MAX_HEADER_BYTES:
+                    raise
+
+
+def read_raw(source: RawSource) -> RawFile:
+    head, encoding, offset, binary = _read_header(source)
+
+    raw = _parse_header(head[:offset].decode(encoding, errors="ignore"))
+    raw.binary = binary
+    # LTspice writes UTF-16 headers; older versions are recognised by name
+    raw.ltspice = encoding == "utf-16-le" or any(
+        name in raw.command.lower() for name in ("ltspice", "linear technology")
+    )
+    if not raw.variables:
+        raise ValueError("LTspice .raw file lists no variables.")
+
+    if binary:
+        raw.columns = _load_binary(source, raw, offset)
+    elif _is_buffer(source):
+        raw.columns = _load_ascii(
+            bytes(source[offset:]).decode(encoding, errors="ignore"), raw
+        )
+    else:
+        with open(source, "rb") as f:
+            f.seek(offset)
+            raw.columns = _load_ascii(f.read().decode(encoding, errors="ignore"), raw)
+    if not binary:
+        raw.n_points = len(raw.columns[0])
+    return raw
+
+
+####################
+# Measurements
+####################
+
+
+def _rising_crossing(t: np.ndarray, y: np.ndarray, idx: int, level: float) -> float:
+    y0, y1 = y[idx], y[idx + 1]
+    frac = (level - y0) / (y1 - y0) if y1 != y0 else 0.0
+    return t[idx] + frac * (t[idx + 1] - t[idx])
+
+
+def _period(t: np.ndarray, y: np.ndarray, level: float) -> float:
+    """Time between the first two rising crossings of `level`, or NaN."""
+    above = y >= level
+    rising = np.flatnonzero(~above[:-1] & above[1:])
+    if len(rising) < 2:
+        return np.nan
+    return _rising_crossing(t, y, rising[1], level) - _rising_crossing(
+        t, y, rising[0], level
+    )
+
+
+def measure_traces(
+    raw: RawFile, level: float = 0.0
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """Compute .meas-style statistics for every trace in a transient .raw.
+
+    Returns {trace name: {"avg", "max", "min", "pp", "rms", "period", "freq"}}.
+    AVG and RMS are time-weighted (trapezoidal), as LTspice computes them.
+    Period/frequency use the first two rising crossings of `level`.
+
+    Traces are converted to float64 one at a time, so only a single trace
+    is held in memory beyond the mapped file.
+    """
+    if not raw.columns or raw.is_complex:
+        return {}
+    if raw.n_points < 2 or not raw.has_axis:
+        return measure_operating_point(raw)
+
+    # LTspice flags compressed points with a negative time stamp.
+    t = np.abs(np.asarray(raw.columns[0], dtype=np.float64))
+    dt = np.diff(t)
+    span = (t[-1] - t[0]) or 1.0
+
+    def _f(x):
+        return None if not np.isfinite(x) else float(x)
+
+    stats = {}
+    for (name, _), column in zip(raw.variables[1:], raw.columns[1:]):
+        y = np.asarray(column, dtype=np.float64)
+        y_max = y.max()
+        y_min = y.min()
+        avg = np.dot((y[1:] + y[:-1]) * 0.5, dt) / span
+        sq = y * y
+        rms = np.sqrt(np.dot((sq[1:] + sq[:-1]) * 0.5, dt) / span)
+        period = _period(t, y, level)
+
+        stats[name] = {
+            "avg": _f(avg),
+            "max": _f(y_max),
+            "min": _f(y_min),
+            "pp": _f(y_max - y_min),
+            "rms": _f(rms),
+            "period": _f(period),
+            "freq": _f(1.0 / period) if period > 0 else None,
+        }
+    return stats
+
+
+def measure_operating_point(raw: RawFile) -> Dict[str, Dict[str, Optional[float]]]:
+    """Statistics for a single-point (.op) plot: every value is the DC level."""
+    if not raw.columns or raw.is_complex or not len(raw.columns[0]):
+        return {}
+    return {
+        name: {
+            "avg": float(column[0]),
+            "max": float(column[0]),
+            "min": float(column[0]),
+            "pp": 0.0,
+            "rms": abs(float(column[0])),
+            "period": None,
+            "freq": None,
+        }
+        for (name, _), column in zip(raw.variables, raw.columns)
+        if name.lower() != "time"
+    }
+
+
+_TRACE_RE = re.compile(r"^([VI])x?\((.+)\)$", re.IGNORECASE)
+
+
+def split_traces(
+    stats: Dict[str, Dict[str, Optional[float]]],
+) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """Split trace statistics into node voltages and element currents.
+
+    Keys are upper-cased net/element names ("V(n001)" -> "N001",
+    "I(R1)" -> "R1"), the same convention `parse_log_file` uses.
+    """
+    volts, currs = {}, {}
+    for name, s in stats.items():
+        m = _TRACE_RE.match(name)
+        if not m:
+            continue
+        target = volts if m.group(1).upper() == "V" else currs
+        # Subcircuit pin currents ("Ix(u2:out)") are kept under their pin name.
+        target.setdefault(m.group(2).upper(), s)
+    return volts, currs
+
+
+def read_raw_measurements(
+    source: RawSource, level: float = 0.0
+) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    return split_traces(measure_traces(read_raw(source), level))
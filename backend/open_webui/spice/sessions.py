@@ -0,0 +1,135 @@
+"""Per-user conversation history for the SPICE lab assistant chat.
+
+Each (user, lab) pair gets its own bounded ring buffer of recent turns. The
+in-memory store caps the number of live sessions with LRU eviction; when
+REDIS_URL is configured the history is kept in Redis lists instead so every
+worker sees the same conversation.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+
+from open_webui.env import (
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+REDIS_SPICE_HISTORY_KEY = f"{REDIS_KEY_PREFIX}:spice:history"
+
+
+def session_key(user_id: str, lab: Optional[str] = None) -> str:
+    return f"{user_id}:{lab or '-'}"
+
+
+class ConversationStore:
+    """In-process history store: one deque per session, LRU-capped."""
+
+    def __init__(self, max_turns: int = 2, max_sessions: int = 1000):
+        self.max_turns = max(1, max_turns)
+        self.max_sessions = max(1, max_sessions)
+        self._sessions: "OrderedDict[str, Deque[Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> List[Dict[str, str]]:
+        with self._lock:
+            turns = self._sessions.get(key)
+            if turns is None:
+                return []
+            self._sessions.move_to_end(key)
+            return list(turns)
+
+    def append(self, key: str, user: str, ai: str) -> None:
+        with self._lock:
+            turns = self._sessions.get(key)
+            if turns is None:
+                turns = deque(maxlen=self.max_turns)
+                self._sessions[key] = turns
+            else:
+                self._sessions.move_to_end(key)
+            turns.append({"user": user, "ai": ai})
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class RedisConversationStore:
+    """Redis-backed history store shared across workers.
+
+    Turns are kept in a capped list per session (LPUSH + LTRIM) and expire
+    after `ttl` seconds of inactivity, which plays the role of the LRU cap.
+    """
+
+    def __init__(self, redis, max_turns: int = 2, ttl: int = 86400):
+        self.redis = redis
+        self.max_turns = max(1, max_turns)
+        self.ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return f"{REDIS_SPICE_HISTORY_KEY}:{key}"
+
+    def get(self, key: str) -> List[Dict[str, str]]:
+        try:
+            raw = self.redis.lrange(self._key(key), 0, self.max_turns - 1)
+        except Exception as e:
+            log.warning(f"Failed to read SPICE chat history from Redis: {e}")
+            return []
+        # Stored newest-first; callers expect chronological order.
+        return [json.loads(item) for item in reversed(raw or [])]
+
+    def append(self, key: str, user: str, ai: str) -> None:
+        redis_key = self._key(key)
+        try:
+            pipe = self.redis.pipeline()
+            pipe.lpush(redis_key, json.dumps({"user": user, "ai": ai}))
+            pipe.ltrim(redis_key, 0, self.max_turns - 1)
+            if self.ttl:
+                pipe.expire(redis_key, self.ttl)
+            pipe.execute()
+        except Exception as e:
+            log.warning(f"Failed to write SPICE chat history to Redis: {e}")
+
+    def clear(self, key: str) -> None:
+        try:
+            self.redis.delete(self._key(key))
+        except Exception as e:
+            log.warning(f"Failed to clear SPICE chat history in Redis: {e}")
+
+
+def get_conversation_store(
+    max_turns: int = 2, max_sessions: int = 1000, ttl: int = 86400
+):
+    if REDIS_URL:
+        try:
+            redis = get_redis_connection(
+                redis_url=REDIS_URL,
+                redis_sentinels=get_sentinels_from_env(
+                    REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+                ),
+                redis_cluster=REDIS_CLUSTER,
+                decode_responses=True,
+            )
+            if redis is not None:
+                return RedisConversationStore(redis, max_turns=max_turns, ttl=ttl)
+        except Exception as e:
+            log.warning(f"Falling back to in-memory SPICE chat history: {e}")
+
+    return ConversationStore(max_turns=max_turns, max_sessions=max_sessions)
@@ -1,7 +1,7 @@
 """FastAPI wrapper exposing gui3.py backend features (upload, chat, diagnosis).
 
 This API surfaces three main capabilities formerly tied to the Tkinter UI:
-1) Circuit file upload (.cir + .log) → Supabase ingest + optional .meas block helper
+1) Circuit file upload (.cir + optional .log or .raw) → Supabase or local-database ingest + optional .meas block helper
 2) Chat assistant backed by lab-manual retrieval and LLM
 3) Circuit debugger that runs the LLM-based diagnosis on a selected circuit
 
@@ -11,24 +11,53 @@ Run locally with:
 Required deps (pip): fastapi, uvicorn, python-dotenv, supabase, langchain-ollama
 """
 
+import logging
 import math
 import os
 import re
+import shutil
 import tempfile
 import textwrap
+import asyncio
 import hashlib
+import json
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from uuid import uuid4
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, HTTPException, UploadFile, Depends
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from supabase import Client, create_client
 from langchain_ollama import OllamaLLM, OllamaEmbeddings
 
+from open_webui.env import REDIS_CLUSTER, REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT, REDIS_URL, SRC_LOG_LEVELS
 from open_webui.models.files import Files
+from open_webui.models.spice_circuits import SpiceCircuits
+from open_webui.spice.diagnosis_cache import diagnosis_key, get_diagnosis_cache
+from open_webui.spice.faults import (
+    FaultRanking,
+    elements_from_rows,
+    format_candidates,
+    format_direct_diagnosis,
+    rank_faults,
+)
+from open_webui.spice.mna import solve_operating_point
+from open_webui.spice.neighbors import CircuitFeatures, DiagnosisIndex, circuit_features
+from open_webui.spice.netlist import decode_text, parse_netlist_bytes, read_source
+from open_webui.spice.raw import RawSource, is_raw_file, read_raw_measurements
+from open_webui.spice.sessions import get_conversation_store, session_key
 from open_webui.storage.provider import Storage
-from open_webui.utils.auth import get_verified_user
+from open_webui.tasks import create_task, get_task_progress, set_task_progress
+from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+from open_webui.utils.telemetry.stages import StreamMetrics, record_cache, record_stage, stage
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 # ==========================================
 # 1. SETUP & GLOBAL CONFIGURATION
@@ -41,7 +70,6 @@ SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJ
 supabase: Optional[Client] = None
 llm: Optional[OllamaLLM] = None
 embedder: Optional[OllamaEmbeddings] = None
-conversation_history: List[Dict[str, str]] = []
 
 CONTEXT_MATCH_THRESHOLD = float(os.getenv("LAB_MATCH_THRESHOLD", "0.58"))
 SECOND_PASS_THRESHOLD = float(os.getenv("LAB_SECOND_PASS_THRESHOLD", "0.48"))
@@ -56,13 +84,68 @@ BM25_B = float(os.getenv("LAB_BM25_B", "0.75"))
 USE_LLM_RERANK = os.getenv("LAB_USE_LLM_RERANK", "false").lower() == "true"
 RERANK_TOP = int(os.getenv("LAB_RERANK_TOP", "15"))
 RERANK_KEEP = int(os.getenv("LAB_RERANK_KEEP", "8"))
+HISTORY_TURNS = int(os.getenv("LAB_HISTORY_TURNS", "2"))
+HISTORY_MAX_SESSIONS = int(os.getenv("LAB_HISTORY_MAX_SESSIONS", "1000"))
+HISTORY_TTL = int(os.getenv("LAB_HISTORY_TTL", "86400"))
+# Uploads up to this size are parsed straight from memory; larger ones (long
+# .raw waveforms) are spooled to disk so they can be memory-mapped.
+UPLOAD_MEMORY_LIMIT = int(os.getenv("LAB_UPLOAD_MEMORY_LIMIT", str(16 * 1024 * 1024)))
+LLM_MODEL = os.getenv("LAB_LLM_MODEL", "gpt-oss:120b-cloud")
+LLM_TEMPERATURE = float(os.getenv("LAB_TEMPERATURE", "0"))
+# Bump whenever build_diagnosis_prompt's instructions change, so cached
+# diagnoses produced by the old template are not served again.
+DIAGNOSIS_PROMPT_VERSION = "1"
+DIAGNOSIS_CACHE_SIZE = int(os.getenv("LAB_DIAGNOSIS_CACHE_SIZE", "512"))
+DIAGNOSIS_CACHE_TTL = int(os.getenv("LAB_DIAGNOSIS_CACHE_TTL", "604800"))
+# Past diagnoses of the same topology: a verified one closer than
+# NEIGHBOR_REUSE_DISTANCE is returned as-is, others within
+# NEIGHBOR_HINT_DISTANCE are shown to the LLM as hints.
+NEIGHBOR_K = int(os.getenv("LAB_NEIGHBOR_K", "3"))
+NEIGHBOR_REUSE_DISTANCE = float(os.getenv("LAB_NEIGHBOR_REUSE_DISTANCE", "0.02"))
+NEIGHBOR_HINT_DISTANCE = float(os.getenv("LAB_NEIGHBOR_HINT_DISTANCE", "0.15"))
+NEIGHBOR_MAX_PER_TOPOLOGY = int(os.getenv("LAB_NEIGHBOR_MAX_PER_TOPOLOGY", "500"))
+# Verified diagnoses are re-read from the circuit store this often (seconds), so
+# every worker sees diagnoses verified elsewhere and restarts lose nothing.
+NEIGHBOR_RELOAD_INTERVAL = int(os.getenv("LAB_NEIGHBOR_RELOAD_INTERVAL", "300"))
+# Concurrent LLM calls per batch diagnosis job.
+BATCH_CONCURRENCY = int(os.getenv("LAB_BATCH_CONCURRENCY", "4"))
+# "supabase" (shared project) or "local" (Open WebUI database, works offline).
+CIRCUIT_STORE = os.getenv("LAB_CIRCUIT_STORE", "supabase").lower()
+FAULT_TOP_K = int(os.getenv("LAB_FAULT_TOP_K", "5"))
+FAULT_CONFIDENT_DISTANCE = float(os.getenv("LAB_FAULT_CONFIDENT_DISTANCE", "0.05"))
+FAULT_MARGIN = float(os.getenv("LAB_FAULT_MARGIN", "3.0"))
+# Skip the LLM entirely when one simulated fault clearly explains the measurements.
+FAULT_DIRECT_ANSWER = os.getenv("LAB_FAULT_DIRECT_ANSWER", "true").lower() == "true"
+
+# Chat history is scoped per (user, lab) so students never see each other's turns.
+conversation_store = get_conversation_store(
+    max_turns=HISTORY_TURNS,
+    max_sessions=HISTORY_MAX_SESSIONS,
+    ttl=HISTORY_TTL,
+)
+
+diagnosis_cache = get_diagnosis_cache(max_entries=DIAGNOSIS_CACHE_SIZE, ttl=DIAGNOSIS_CACHE_TTL)
+diagnosis_index = DiagnosisIndex(max_per_topology=NEIGHBOR_MAX_PER_TOPOLOGY)
+
+# Batch jobs register in the shared task registry (see tasks.py), so they can be
+# listed and stopped through /api/tasks like chat tasks.
+task_redis = (
+    get_redis_connection(
+        redis_url=REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+        redis_cluster=REDIS_CLUSTER,
+        async_mode=True,
+    )
+    if REDIS_URL
+    else None
+)
 
 try:
     if SUPABASE_KEY:
         supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
         llm = OllamaLLM(
-            model=os.getenv("LAB_LLM_MODEL", "gpt-oss:120b-cloud"),
-            temperature=float(os.getenv("LAB_TEMPERATURE", "0")),
+            model=LLM_MODEL,
+            temperature=LLM_TEMPERATURE,
         )
         embedder = OllamaEmbeddings(model="mxbai-embed-large")
     else:
@@ -77,6 +160,9 @@ except Exception as e:  # pragma: no cover - startup diagnostics only
 
 
 def get_latest_circuit() -> Optional[Dict]:
+    if CIRCUIT_STORE == "local":
+        circuit = SpiceCircuits.get_latest_circuit()
+        return circuit.model_dump() if circuit else None
     res = supabase.table("spice_files").select("*").order("created_at", desc=True).limit(1).execute()
     return res.data[0] if res.data else None
 
@@ -87,13 +173,88 @@ def get_nodes_and_elements(spice_id: str) -> Tuple[List[Dict], List[Dict]]:
     return nodes_res.data or [], elems_res.data or []
 
 
-def insert_data_to_supabase(cir_path: str, merged_data: List[Dict], volts_data: Dict) -> str:
+def get_circuit(spice_id: str) -> Optional[Dict]:
+    if CIRCUIT_STORE == "local":
+        circuit = SpiceCircuits.get_circuit_by_id(spice_id)
+        return circuit.model_dump() if circuit else None
+    res = supabase.table("spice_files").select("*").eq("id", spice_id).execute()
+    return res.data[0] if res.data else None
+
+
+def list_circuits(circuit_ids: Optional[List[str]] = None, lab_id: Optional[str] = None, verified: bool = False) -> List[Dict]:
+    if CIRCUIT_STORE == "local":
+        return [c.model_dump() for c in SpiceCircuits.get_circuits(ids=circuit_ids, lab_id=lab_id, verified=verified)]
+    query = supabase.table("spice_files").select("*")
+    if circuit_ids is not None:
+        query = query.in_("id", circuit_ids)
+    if lab_id is not None:
+        query = query.eq("lab_id", lab_id)
+    if verified:
+        query = query.not_.is_("verified_diagnosis", "null")
+    return query.execute().data or []
+
+
+def save_verified_diagnosis(spice_id: str, diagnosis: str) -> bool:
+    if CIRCUIT_STORE == "local":
+        return SpiceCircuits.update_verified_diagnosis(spice_id, diagnosis)
+    res = supabase.table("spice_files").update({"verified_diagnosis": diagnosis}).eq("id", spice_id).execute()
+    return bool(res.data)
+
+
+def record_measurements(spice_id: str, nets: Dict[str, Dict], currents: Dict[str, float]) -> bool:
+    """Store bench measurements ({node: {"voltage"|stat: value}}, {element: amps})."""
+    if CIRCUIT_STORE == "local":
+        return SpiceCircuits.update_measurements(spice_id, nets, currents)
+    for node_name, stats in nets.items():
+        data = {f"measured_{key}": stats[key] for key in ("voltage",) + SIMULATED_STAT_KEYS if key in stats}
+        if data:
+            supabase.table("spice_nets").update(data).eq("spice_id", spice_id).eq("node_name", node_name).execute()
+    for element_name, current in currents.items():
+        supabase.table("spice_elements").update({"measured_current": current}).eq("spice_id", spice_id).eq("element_name", element_name).execute()
+    return True
+
+
+def delete_circuit(spice_id: str) -> bool:
+    if CIRCUIT_STORE == "local":
+        return SpiceCircuits.delete_circuit_by_id(spice_id)
+    # nets, elements and connections go with it (ON DELETE CASCADE)
+    res = supabase.table("spice_files").delete().eq("id", spice_id).execute()
+    return bool(res.data)
+
+
+def insert_circuit_data(cir_path: str, merged_data: List[Dict], volts_data: Dict, net_stats: Optional[Dict] = None, user_id: Optional[str] = None, lab_id: Optional[str] = None, models: Optional[Dict] = None) -> str:
+    if CIRCUIT_STORE != "local":
+        return insert_data_to_supabase(cir_path, merged_data, volts_data, net_stats, lab_id, models, user_id)
+
+    # One transaction, one bulk insert per table.
+    circuit = SpiceCircuits.insert_circuit(
+        os.path.basename(cir_path), merged_data, volts_data, net_stats, user_id=user_id, lab_id=lab_id, models=models
+    )
+    if not circuit:
+        return "Error: could not store circuit in the local database."
+    return f"Success! Uploaded ID: {circuit.id}"
+
+
+def insert_data_to_supabase(cir_path: str, merged_data: List[Dict], volts_data: Dict, net_stats: Optional[Dict] = None, lab_id: Optional[str] = None, models: Optional[Dict] = None, user_id: Optional[str] = None) -> str:
     try:
         circuit_name = os.path.basename(cir_path)  # works for paths OR plain filenames
-        file_res = supabase.table("spice_files").insert({"circuit_name": circuit_name}).execute()
+        file_row = {"circuit_name": circuit_name}
+        if user_id:
+            file_row["user_id"] = user_id  # uploader, may update measurements
+        if lab_id:
+            file_row["lab_id"] = lab_id  # labs.Lab.id, filtered on by /diagnose/batch
+        if models:
+            file_row["models"] = models  # .model cards, for re-simulating faults
+        file_res = supabase.table("spice_files").insert(file_row).execute()
         spice_id = file_res.data[0]["id"]
 
-        nets_payload = [{"spice_id": spice_id, "node_name": k, "simulated_voltage": v} for k, v in volts_data.items()]
+        nets_payload = []
+        for k, v in volts_data.items():
+            row = {"spice_id": spice_id, "node_name": k, "simulated_voltage": v}
+            stats = (net_stats or {}).get(k)
+            if stats:
+                row.update({f"simulated_{key}": stats.get(key) for key in SIMULATED_STAT_KEYS})
+            nets_payload.append(row)
         if nets_payload:
             supabase.table("spice_nets").insert(nets_payload).execute()
 
@@ -125,62 +286,19 @@ def insert_data_to_supabase(cir_path: str, merged_data: List[Dict], volts_data:
         return f"Error: {str(e)}"
 
 
-def read_text_auto(filepath: str) -> str:
-    data = Path(filepath).read_bytes()
+# Parsers take either a file path or the file contents already in memory.
+def read_text_auto(source: RawSource) -> str:
+    return decode_text(read_source(source))
 
-    if b"\x00" in data:
-        if data.startswith(b"\xff\xfe") or data.startswith(b"\xfe\xff"):
-            try:
-                return data.decode("utf-16")
-            except UnicodeError:
-                pass
-        for enc in ("utf-16-le", "utf-16-be"):
-            try:
-                return data.decode(enc)
-            except UnicodeError:
-                continue
 
-    try:
-        return data.decode("utf-8")
-    except UnicodeError:
-        return ""
+def parse_cir_lines(source: RawSource) -> List[Dict]:
+    # Parsed netlists are cached by content hash; the rows are fresh copies.
+    netlist = parse_netlist_bytes(read_source(source))
+    return netlist.element_dicts()
 
 
-def parse_cir_lines(path: str) -> List[Dict]:
-    text = read_text_auto(path)
-    elements = []
-    for line in text.splitlines():
-        line = line.strip()
-        if not line or line.startswith("*"):
-            continue
-        parts = line.split()
-        if parts[0][0].upper() not in ["R", "C", "V", "I", "X", "D"]:
-            continue
-        name, type_ = parts[0], parts[0][0].upper()
-        nodes, model, value, params = [], None, None, {}
-        if type_ == "X":
-            eq_idx = next((i for i, t in enumerate(parts) if "=" in t), None)
-            node_tokens = parts[1:eq_idx] if eq_idx else parts[1:]
-            if node_tokens:
-                *nodes, model = node_tokens
-        else:
-            if len(parts) >= 4:
-                name, nodes, value = parts[0], parts[1:3], parts[3]
-        elements.append({
-            "name": name,
-            "type": type_,
-            "nodes": nodes,
-            "model": model,
-            "value": value,
-            "params": params,
-            "simulated_current": None,
-            "node_voltages": {n: None for n in nodes},
-        })
-    return elements
-
-
-def parse_log_file(path: str) -> Tuple[Dict, Dict, Dict]:
-    text = read_text_auto(path).replace("\x00", "").replace("\xa0", " ")
+def parse_log_file(source: RawSource) -> Tuple[Dict, Dict, Dict]:
+    text = read_text_auto(source).replace("\x00", "").replace("\xa0", " ")
     text = re.sub(r"[ ]{2,}", " ", text)
     v = {m.group(1).upper(): float(m.group(2)) for m in re.finditer(r"V\(([^)]+)\)\s+([-+]?\d*\.?\d+(?:[Ee][-+]?\d+)?)", text, re.I)}
     i = {m.group(1).upper(): float(m.group(2)) for m in re.finditer(r"I\(([^)]+)\)\s+([-+]?\d*\.?\d+(?:[Ee][-+]?\d+)?)", text, re.I)}
@@ -189,6 +307,38 @@ def parse_log_file(path: str) -> Tuple[Dict, Dict, Dict]:
     return v, i, {}
 
 
+# Waveform statistics stored alongside simulated_voltage (see build_diagnosis_prompt).
+SIMULATED_STAT_KEYS = ("avg", "max", "min", "pp", "rms", "period", "freq")
+
+
+def parse_raw_file(source: RawSource) -> Tuple[Dict, Dict, Dict]:
+    """Read an LTspice .raw and reduce it to the same shape as parse_log_file.
+
+    Returns (volts, currents, net_stats): volts/currents hold the time-averaged
+    value per node/element, net_stats the full AVG/MAX/MIN/PP/RMS/freq set.
+    """
+    node_stats, elem_stats = read_raw_measurements(source)
+    v = {name: s["avg"] for name, s in node_stats.items()}
+    i = {name: s["avg"] for name, s in elem_stats.items()}
+    if "0" not in v:
+        v["0"] = 0.0
+    return v, i, node_stats
+
+
+def simulate_operating_point(source: RawSource) -> Tuple[Dict, Dict, Dict]:
+    """Compute DC node voltages and branch currents with the built-in MNA solver.
+
+    Returns the same (volts, currents, subckts) shape as parse_log_file.
+    """
+    op = solve_operating_point(parse_netlist_bytes(read_source(source)))
+    if not op.converged:
+        raise HTTPException(
+            status_code=422,
+            detail="DC operating point did not converge; upload the LTspice .log or .raw instead.",
+        )
+    return op.voltages, op.currents, {}
+
+
 def merge_simulation_data(elems: List[Dict], v: Dict, i: Dict, sub: Dict) -> List[Dict]:
     for e in elems:
         if e["name"].upper() in i:
@@ -221,31 +371,46 @@ def generate_meas_block(nodes: List[Dict]) -> str:
     return "\n".join(output)
 
 
-def fetch_spice_rows(spice_id: str) -> Tuple[List[Dict], List[Dict]]:
-    nets_res = supabase.table("spice_nets").select("*").eq("spice_id", spice_id).execute()
-    nets = nets_res.data if nets_res.data else []
+# PostgREST puts in_() filters in the URL, so large id sets are chunked.
+SUPABASE_IN_CHUNK = 200
+
+
+def _chunks(items: List[str], size: int = SUPABASE_IN_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
-    elems_res = supabase.table("spice_elements").select("*").eq("spice_id", spice_id).not_.is_("simulated_current", "null").execute()
-    elems_raw = elems_res.data if elems_res.data else []
 
-    elem_ids = [e["id"] for e in elems_raw] if elems_raw else []
-    connections = []
-    if elem_ids:
-        conn_res = supabase.table("element_connections").select("element_id, node_name, node_order").in_("element_id", elem_ids).execute()
-        connections = conn_res.data if conn_res.data else []
+def _fetch_supabase_rows_many(spice_ids: List[str]) -> Dict[str, Tuple[List[Dict], List[Dict]]]:
+    result = {sid: ([], []) for sid in spice_ids}
 
+    elems_raw = []
+    for chunk in _chunks(spice_ids):
+        nets_res = supabase.table("spice_nets").select("*").in_("spice_id", chunk).execute()
+        for n in nets_res.data or []:
+            result[n["spice_id"]][0].append(n)
+        elems_res = supabase.table("spice_elements").select("*").in_("spice_id", chunk).execute()
+        elems_raw.extend(elems_res.data or [])
+
+    elem_ids = [e["id"] for e in elems_raw]
     node_map = {}
-    for c in connections:
-        eid = c["element_id"]
-        node_map.setdefault(eid, []).append((c["node_order"], c["node_name"]))
+    for chunk in _chunks(elem_ids):
+        conn_res = supabase.table("element_connections").select("element_id, node_name, node_order").in_("element_id", chunk).execute()
+        for c in conn_res.data or []:
+            node_map.setdefault(c["element_id"], []).append((c["node_order"], c["node_name"]))
 
-    elements = []
     for e in elems_raw:
         nodes = sorted(node_map.get(e["id"], []), key=lambda x: x[0])
         e_updated = dict(e)
-        e_updated["node_pos"] = nodes[0][1] if len(nodes) >= 1 else None
-        e_updated["node_neg"] = nodes[1][1] if len(nodes) >= 2 else None
-        elements.append(e_updated)
+        e_updated["nodes"] = [name for _, name in nodes]
+        result[e["spice_id"]][1].append(e_updated)
+    return result
+
+
+def _normalize_circuit_rows(nets: List[Dict], all_elements: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    for e in all_elements:
+        e["node_pos"] = e["nodes"][0] if len(e["nodes"]) >= 1 else None
+        e["node_neg"] = e["nodes"][1] if len(e["nodes"]) >= 2 else None
+    elements = [e for e in all_elements if e.get("simulated_current") is not None]
 
     normalized_nets = []
     gnd_sim, gnd_meas = None, None
@@ -264,10 +429,33 @@ def fetch_spice_rows(spice_id: str) -> Tuple[List[Dict], List[Dict]]:
         "simulated_avg": gnd_sim or 0.0,
         "measured_avg": gnd_meas or 0.0,
     })
-    return normalized_nets, elements
+    return normalized_nets, elements, all_elements
 
 
-def build_diagnosis_prompt(circuit_name: str, nets: List[Dict], elems: List[Dict]) -> str:
+def fetch_circuit_rows_many(spice_ids: List[str]) -> Dict[str, Tuple[List[Dict], List[Dict], List[Dict]]]:
+    """Set-based fetch_circuit_rows: the query count does not grow with the number of circuits."""
+    if CIRCUIT_STORE == "local":
+        rows = SpiceCircuits.get_circuit_rows_many(spice_ids)
+    else:
+        rows = _fetch_supabase_rows_many(spice_ids)
+    return {sid: _normalize_circuit_rows(nets, elems) for sid, (nets, elems) in rows.items()}
+
+
+def fetch_circuit_rows(spice_id: str) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Return (nets, elements with a simulated current, all elements).
+
+    Every element row carries its ordered "nodes" so the fault ranker can
+    rebuild the circuit without another round trip.
+    """
+    return fetch_circuit_rows_many([spice_id])[spice_id]
+
+
+def fetch_spice_rows(spice_id: str) -> Tuple[List[Dict], List[Dict]]:
+    nets, elements, _ = fetch_circuit_rows(spice_id)
+    return nets, elements
+
+
+def build_diagnosis_prompt(circuit_name: str, nets: List[Dict], elems: List[Dict], fault_candidates: Optional[str] = None, similar_diagnoses: Optional[str] = None) -> str:
     def fmt(val, unit=""):
         if val is None:
             return "N/A"
@@ -322,6 +510,23 @@ def build_diagnosis_prompt(circuit_name: str, nets: List[Dict], elems: List[Dict
 
     elem_text = "\n".join(elem_lines)
 
+    candidates_text = ""
+    if fault_candidates:
+        candidates_text = (
+            "=== SIMULATED FAULT CANDIDATES (best fit first) ===\n"
+            "Each candidate was re-simulated and compared against the measurements; a lower fit\n"
+            "distance means the fault reproduces the data better. Prefer these unless the data\n"
+            "clearly points elsewhere.\n"
+            f"{fault_candidates}\n"
+        )
+    if similar_diagnoses:
+        candidates_text += (
+            "=== DIAGNOSES OF SIMILAR SUBMISSIONS (same circuit, similar measurements) ===\n"
+            "Earlier diagnoses of this circuit whose measurement errors look like this one.\n"
+            "Use them as hints only; the data above takes precedence.\n"
+            f"{similar_diagnoses}\n"
+        )
+
     instruction_template = """
     ======================================
     TASK (OPTIMIZED FOR BREADBOARD DEBUGGING)
@@ -439,10 +644,74 @@ def build_diagnosis_prompt(circuit_name: str, nets: List[Dict], elems: List[Dict
     === COMPONENT CURRENTS ===
     {elem_text}
 
+    {candidates_text}
     {textwrap.dedent(instruction_template)}
     """
 
 
+def _measured(row: Dict, *keys: str) -> Optional[float]:
+    for key in keys:
+        if row.get(key) is not None:
+            try:
+                return float(row[key])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def rank_circuit_faults(nets: List[Dict], all_elems: List[Dict], models: Optional[Dict] = None) -> Optional[FaultRanking]:
+    """Rank checklist faults against the stored measurements (None if nothing was measured).
+
+    `models` are the circuit's .model cards, so diodes are re-simulated with
+    their real parameters rather than the defaults.
+    """
+    measured_v = {
+        str(n.get("node_name")): _measured(n, "measured_voltage", "measured_avg")
+        for n in nets
+    }
+    measured_i = {
+        str(e.get("element_name")): _measured(e, "measured_current")
+        for e in all_elems
+    }
+    if not any(v is not None for v in list(measured_v.values()) + list(measured_i.values())):
+        return None
+    try:
+        return rank_faults(
+            elements_from_rows(all_elems),
+            measured_v,
+            measured_i,
+            models,
+            top_k=FAULT_TOP_K,
+            confident_distance=FAULT_CONFIDENT_DISTANCE,
+            confident_margin=FAULT_MARGIN,
+        )
+    except Exception:  # ranking is advisory; fall back to the LLM alone
+        log.exception("Fault ranking failed")
+        return None
+
+
+def key_discrepancy(nets: List[Dict], elems: List[Dict]) -> str:
+    """Describe the measurement that deviates most (relative) from the simulation."""
+    rows = []
+    for n in nets:
+        sim = _measured(n, "simulated_avg", "simulated_voltage")
+        meas = _measured(n, "measured_avg", "measured_voltage")
+        rows.append((f"V({n.get('node_name')})", "V", 0.05, sim, meas))
+    for e in elems:
+        sim = _measured(e, "simulated_current")
+        meas = _measured(e, "measured_current")
+        rows.append((f"I({e.get('element_name')})", "A", 1e-5, sim, meas))
+
+    best, best_score = None, -1.0
+    for label, unit, floor, sim, meas in rows:
+        if sim is None or meas is None:
+            continue
+        score = abs(meas - sim) / max(abs(sim), abs(meas), floor)
+        if score > best_score:
+            best, best_score = f"{label} measured {meas:.4g}{unit} vs simulated {sim:.4g}{unit}", score
+    return best or "No measurement differs from the simulation."
+
+
 # Retrieval helpers used by chat
 STOPWORDS = {"the", "a", "an", "of", "and", "or", "to", "for", "with", "in", "on", "at", "by", "from"}
 
@@ -476,7 +745,8 @@ def _bm25_score(query_tokens: list, doc_tokens: list, avg_dl: float, df_counts:
 
 def retrieve_context(query: str) -> List[str]:
     lab_filter = _normalize_lab_filter(query)
-    vec = embedder.embed_query(query)
+    with stage("spice.embedding"):
+        vec = embedder.embed_query(query)
     query_tokens = _tokenize(query)
 
     def _call_match_rpc(vector, lab_filter_local: Optional[str], manual_version: Optional[str], threshold: float, count: int):
@@ -487,7 +757,8 @@ def retrieve_context(query: str) -> List[str]:
             "filter_lab_name": lab_filter_local,
             "filter_manual_version": manual_version,
         }
-        return supabase.rpc("match_lab_manuals", payload).execute()
+        with stage("spice.rpc", rpc="match_lab_manuals"):
+            return supabase.rpc("match_lab_manuals", payload).execute()
 
     rows: list[dict] = []
     if lab_filter:
@@ -635,14 +906,21 @@ def _postprocess_answer(raw: str, context_snippets: list[str]) -> str:
 
 class ChatRequest(BaseModel):
     question: str
+    lab_id: Optional[str] = None
 
 
 class DiagnoseRequest(BaseModel):
     circuit_id: Optional[str] = None
+    stream: bool = False  # stream the answer back as server-sent events
 
 class UploadByIdRequest(BaseModel):
     circuit_file_id: str
-    log_file_id: str
+    log_file_id: Optional[str] = None  # omit to simulate the DC operating point locally
+    lab_id: Optional[str] = None
+
+class MeasurementsRequest(BaseModel):
+    nets: Dict[str, Dict[str, float]] = {}  # {node: {"voltage"|"avg"|"pp"|...: value}}
+    currents: Dict[str, float] = {}  # {element: amps}
 
 app = FastAPI(title="SPICE Lab Assistant API", version="0.1.0")
 
@@ -652,6 +930,11 @@ def _require_supabase():
         raise HTTPException(status_code=503, detail="Supabase client not initialized; set SUPABASE_KEY.")
 
 
+def _require_circuit_store():
+    if CIRCUIT_STORE != "local":
+        _require_supabase()
+
+
 def _require_llm():
     if not llm:
         raise HTTPException(status_code=503, detail="LLM client not initialized.")
@@ -661,73 +944,132 @@ def _require_llm():
 def health():
     return {
         "supabase": bool(supabase),
+        "circuit_store": CIRCUIT_STORE,
         "llm": bool(llm),
         "embedder": bool(embedder),
     }
 
 
-@app.post("/upload")
-async def upload_circuit(circuit_file: UploadFile = File(...), log_file: UploadFile = File(...)):
-    _require_supabase()
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".cir") as cir_tmp, \
-            tempfile.NamedTemporaryFile(delete=False, suffix=".log") as log_tmp:
-        cir_path = cir_tmp.name
-        log_path = log_tmp.name
-        cir_tmp.write(await circuit_file.read())
-        log_tmp.write(await log_file.read())
-
-    try:
-        cir_elems = parse_cir_lines(cir_path)
-        volts, currs, subckts = parse_log_file(log_path)
+def _ingest_circuit(circuit_name: str, cir_source: RawSource, sim_source: Optional[RawSource], user_id: Optional[str] = None, lab_id: Optional[str] = None) -> Dict:
+    cir_elems = parse_cir_lines(cir_source)
+    models = parse_netlist_bytes(read_source(cir_source)).models  # cached parse
+    if sim_source is None:
+        # No simulator output uploaded: solve the DC operating point locally.
+        volts, currs, _ = simulate_operating_point(cir_source)
+        merged = merge_simulation_data(cir_elems, volts, currs, {})
+        msg = insert_circuit_data(circuit_name, merged, volts, user_id=user_id, lab_id=lab_id, models=models)
+        net_stats = None
+    elif is_raw_file(sim_source):
+        # Waveforms already carry the statistics the .meas block would produce.
+        try:
+            volts, currs, net_stats = parse_raw_file(sim_source)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Could not read .raw file: {e}")
+        merged = merge_simulation_data(cir_elems, volts, currs, {})
+        msg = insert_circuit_data(circuit_name, merged, volts, net_stats, user_id=user_id, lab_id=lab_id, models=models)
+    else:
+        volts, currs, subckts = parse_log_file(sim_source)
         merged = merge_simulation_data(cir_elems, volts, currs, subckts)
-        msg = insert_data_to_supabase(cir_path, merged, volts)
-        response = {"message": msg}
+        msg = insert_circuit_data(circuit_name, merged, volts, user_id=user_id, lab_id=lab_id, models=models)
+        net_stats = None
 
-        if msg.lower().startswith("success"):
+    response = {"message": msg}
+    if msg.lower().startswith("success"):
+        if net_stats is None:
             node_objs = [{"node_name": n} for n in volts.keys() if str(n).upper() not in ("0", "GND", "GROUND")]
             response["meas_block"] = generate_meas_block(node_objs)
-            try:
-                response["spice_id"] = msg.split(":")[-1].strip()
-            except Exception:
-                pass
-        return response
+        else:
+            response["measurements"] = net_stats
+        response["spice_id"] = msg.split(":")[-1].strip()
+    return response
+
+
+def _spool_to_disk(upload: UploadFile, suffix: str) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        upload.file.seek(0)
+        shutil.copyfileobj(upload.file, tmp, 1024 * 1024)
+        return tmp.name
+
+
+def _load_stored_file(path: str) -> RawSource:
+    """Read a stored file into memory unless it is large enough to memory-map."""
+    if os.path.getsize(path) <= UPLOAD_MEMORY_LIMIT:
+        return Path(path).read_bytes()
+    return path
+
+
+@app.post("/upload")
+async def upload_circuit(
+    circuit_file: UploadFile = File(...),
+    log_file: Optional[UploadFile] = File(None),
+    lab_id: Optional[str] = Form(None),
+):
+    _require_circuit_store()
+
+    circuit_name = circuit_file.filename or "circuit.cir"
+    cir_data = await circuit_file.read()
+
+    if log_file is None:
+        return _ingest_circuit(circuit_name, cir_data, None, lab_id=lab_id)
+
+    if log_file.size is None or log_file.size <= UPLOAD_MEMORY_LIMIT:
+        return _ingest_circuit(circuit_name, cir_data, await log_file.read(), lab_id=lab_id)
+
+    log_path = _spool_to_disk(log_file, ".raw")
+    try:
+        return _ingest_circuit(circuit_name, cir_data, log_path, lab_id=lab_id)
     finally:
-        for p in (cir_path, log_path):
-            try:
-                os.remove(p)
-            except OSError:
-                pass
+        try:
+            os.remove(log_path)
+        except OSError:
+            pass
+
+
 @app.post("/upload/by-id")
 async def upload_circuit_by_id(payload: UploadByIdRequest, user=Depends(get_verified_user)):
-    _require_supabase()
+    _require_circuit_store()
 
     cir_item = Files.get_file_by_id_and_user_id(payload.circuit_file_id, user.id)
-    log_item = Files.get_file_by_id_and_user_id(payload.log_file_id, user.id)
+    log_item = (
+        Files.get_file_by_id_and_user_id(payload.log_file_id, user.id)
+        if payload.log_file_id
+        else None
+    )
 
-    if not cir_item or not log_item:
+    if not cir_item or (payload.log_file_id and not log_item):
         raise HTTPException(status_code=404, detail="One or both file IDs not found for this user.")
 
-    cir_path = Storage.get_file(cir_item.path)
-    log_path = Storage.get_file(log_item.path)
+    cir_data = Path(Storage.get_file(cir_item.path)).read_bytes()
+    log_source = _load_stored_file(Storage.get_file(log_item.path)) if log_item else None
 
-    cir_elems = parse_cir_lines(cir_path)
-    volts, currs, subckts = parse_log_file(log_path)
-    merged = merge_simulation_data(cir_elems, volts, currs, subckts)
+    return _ingest_circuit(cir_item.filename, cir_data, log_source, user_id=user.id, lab_id=payload.lab_id)
 
-    msg = insert_data_to_supabase(cir_item.filename, merged, volts)
 
-    response = {"message": msg}
-    if msg.lower().startswith("success"):
-        node_objs = [{"node_name": n} for n in volts.keys() if str(n).upper() not in ("0", "GND", "GROUND")]
-        response["meas_block"] = generate_meas_block(node_objs)
-        response["spice_id"] = msg.split(":")[-1].strip()
+@app.post("/circuits/{circuit_id}/measurements")
+def update_circuit_measurements(circuit_id: str, request: MeasurementsRequest, user=Depends(get_verified_user)):
+    _require_circuit_store()
+    circuit = get_circuit(circuit_id)
+    if not circuit:
+        raise HTTPException(status_code=404, detail="Circuit ID not found.")
+    # Measurements feed diagnoses and the neighbour index, so only the
+    # uploader (or an admin) may change them
+    if user.role != "admin" and circuit.get("user_id") != user.id:
+        raise HTTPException(status_code=403, detail="Only the uploader or an admin can update these measurements.")
+    if not record_measurements(circuit_id, request.nets, request.currents):
+        raise HTTPException(status_code=500, detail="Could not store the measurements.")
+    return {"circuit_id": circuit_id, "nets": len(request.nets), "currents": len(request.currents)}
 
-    return response
+
+@app.delete("/circuits/{circuit_id}")
+def delete_circuit_by_id(circuit_id: str, user=Depends(get_admin_user)):
+    _require_circuit_store()
+    if not delete_circuit(circuit_id):
+        raise HTTPException(status_code=404, detail="Circuit ID not found.")
+    return {"circuit_id": circuit_id, "deleted": True}
 
 
 @app.post("/chat")
-def chat(request: ChatRequest):
+def chat(request: ChatRequest, user=Depends(get_verified_user)):
     _require_supabase()
     _require_llm()
 
@@ -739,7 +1081,9 @@ def chat(request: ChatRequest):
     if not context:
         return {"answer": FALLBACK_NOT_FOUND}
 
-    history_txt = "\n".join([f"Q: {t.get('user','')}\nA: {t.get('ai','')}" for t in conversation_history[-2:]])
+    history_key = session_key(user.id, request.lab_id or _normalize_lab_filter(question))
+    history = conversation_store.get(history_key)
+    history_txt = "\n".join([f"Q: {t.get('user','')}\nA: {t.get('ai','')}" for t in history[-HISTORY_TURNS:]])
     context_txt = "\n---\n".join(context)
 
     prompt = f"""
@@ -762,15 +1106,16 @@ def chat(request: ChatRequest):
     Answer:
     """
 
-    answer = llm.invoke(prompt)
+    with stage("spice.llm", route="chat"):
+        answer = llm.invoke(prompt)
     final = _postprocess_answer(str(answer), context)
-    conversation_history.append({"user": question, "ai": str(final)})
+    conversation_store.append(history_key, question, str(final))
     return {"answer": str(final)}
 
 
 @app.post("/diagnose")
 def diagnose(request: DiagnoseRequest):
-    _require_supabase()
+    _require_circuit_store()
     _require_llm()
 
     circuit_id = request.circuit_id
@@ -778,25 +1123,295 @@ def diagnose(request: DiagnoseRequest):
         latest = get_latest_circuit()
         if not latest:
             raise HTTPException(status_code=404, detail="No circuits found in database.")
+        circuit = latest
         circuit_id = latest["id"]
-        circuit_name = latest["circuit_name"]
     else:
-        res = supabase.table("spice_files").select("id, circuit_name").eq("id", circuit_id).execute()
-        if not res.data:
+        circuit = get_circuit(circuit_id)
+        if not circuit:
             raise HTTPException(status_code=404, detail="Circuit ID not found.")
-        circuit_name = res.data[0]["circuit_name"]
+    circuit_name = circuit["circuit_name"]
 
-    nets, elems = fetch_spice_rows(circuit_id)
-    prompt = build_diagnosis_prompt(circuit_name, nets, elems)
-    diagnosis = llm.invoke(prompt)
-    return {
-        "circuit_id": circuit_id,
-        "circuit_name": circuit_name,
-        "diagnosis": str(diagnosis),
-    }
+    nets, elems, all_elems = fetch_circuit_rows(circuit_id)
+    prepared = prepare_diagnosis(circuit_name, nets, elems, all_elems, circuit.get("models"))
+    result = {"circuit_id": circuit_id, "circuit_name": circuit_name, "cached": prepared.cached}
+    if prepared.reused_from:
+        result["reused_from"] = prepared.reused_from
+
+    if prepared.diagnosis is not None:
+        return _diagnosis_response(result, prepared.diagnosis, request.stream)
+
+    if request.stream:
+        return StreamingResponse(
+            _stream_llm_diagnosis(result, prepared, circuit_id),
+            media_type="text/event-stream",
+        )
+
+    with stage("spice.llm", route="diagnose"):
+        diagnosis = str(llm.invoke(prepared.prompt))
+    remember_diagnosis(prepared, diagnosis, circuit_id)
+    return {**result, "diagnosis": diagnosis}
+
+
+class PreparedDiagnosis(NamedTuple):
+    cache_key: str
+    diagnosis: Optional[str]  # set when no LLM call is needed
+    prompt: Optional[str]  # set otherwise
+    cached: bool
+    features: Optional[CircuitFeatures] = None
+    reused_from: Optional[str] = None  # circuit whose verified diagnosis was reused
+
+
+def diagnosis_cache_key(nets: List[Dict], all_elems: List[Dict]) -> str:
+    # The fault settings change the answer too, so they are part of the version.
+    return diagnosis_key(
+        nets,
+        all_elems,
+        f"{LLM_MODEL}@{LLM_TEMPERATURE}",
+        f"{DIAGNOSIS_PROMPT_VERSION}:{FAULT_TOP_K}:{FAULT_CONFIDENT_DISTANCE}:{FAULT_MARGIN}:{FAULT_DIRECT_ANSWER}",
+    )
+
+
+def _format_neighbors(neighbors) -> str:
+    lines = []
+    for n, neighbor in enumerate(neighbors, start=1):
+        status = "verified by an instructor" if neighbor.verified else "not verified"
+        summary = " ".join(neighbor.diagnosis.split())
+        lines.append(f"{n}. (residual distance {neighbor.distance:.3f}, {status}) {summary[:600]}")
+    return "\n".join(lines)
+
+
+def prepare_diagnosis(circuit_name: str, nets: List[Dict], elems: List[Dict], all_elems: List[Dict], models: Optional[Dict] = None) -> PreparedDiagnosis:
+    """Serve from the cache, a verified neighbour or the fault ranker when possible, else build the LLM prompt."""
+    cache_key = diagnosis_cache_key(nets, all_elems)
+    diagnosis = diagnosis_cache.get(cache_key)
+    record_cache("spice.diagnosis", diagnosis is not None)
+    if diagnosis is not None:
+        return PreparedDiagnosis(cache_key, diagnosis, None, True)
+
+    features = circuit_features(nets, all_elems)
+    if features:
+        load_verified_diagnoses()
+    neighbors = diagnosis_index.search(features, NEIGHBOR_K) if features else []
+    for neighbor in neighbors:
+        if neighbor.verified and neighbor.distance <= NEIGHBOR_REUSE_DISTANCE:
+            diagnosis_cache.set(cache_key, neighbor.diagnosis)
+            return PreparedDiagnosis(cache_key, neighbor.diagnosis, None, False, features, neighbor.circuit_id)
+
+    ranking = rank_circuit_faults(nets, all_elems, models)
+    if ranking and ranking.confident and FAULT_DIRECT_ANSWER:
+        has_opamp = any(e.get("type") == "X" and len(e.get("nodes") or []) == 5 for e in all_elems)
+        diagnosis = format_direct_diagnosis(ranking, key_discrepancy(nets, elems), has_opamp)
+        diagnosis_cache.set(cache_key, diagnosis)
+        return PreparedDiagnosis(cache_key, diagnosis, None, False, features)
+
+    candidates = format_candidates(ranking) if ranking and ranking.candidates else None
+    hints = [n for n in neighbors if n.distance <= NEIGHBOR_HINT_DISTANCE]
+    prompt = build_diagnosis_prompt(
+        circuit_name, nets, elems, candidates, _format_neighbors(hints) if hints else None
+    )
+    return PreparedDiagnosis(cache_key, None, prompt, False, features)
+
+
+_index_lock = threading.Lock()
+_index_loaded_at: Optional[float] = None
+
+
+def load_verified_diagnoses(force: bool = False) -> None:
+    """(Re)build the verified part of the neighbour index from the circuit store."""
+    global _index_loaded_at
+    if CIRCUIT_STORE != "local" and not supabase:
+        return
+    with _index_lock:
+        now = time.monotonic()
+        if not force and _index_loaded_at is not None and now - _index_loaded_at < NEIGHBOR_RELOAD_INTERVAL:
+            return
+        _index_loaded_at = now
+        try:
+            circuits = list_circuits(verified=True)
+            rows = fetch_circuit_rows_many([c["id"] for c in circuits])
+        except Exception:
+            log.exception("Could not load verified diagnoses")
+            return
+    for c in circuits:
+        nets, _, all_elems = rows[c["id"]]
+        features = circuit_features(nets, all_elems)
+        if features is not None:
+            diagnosis_index.add(features, c["verified_diagnosis"], verified=True, circuit_id=c["id"])
+
+
+def remember_diagnosis(prepared: PreparedDiagnosis, diagnosis: str, circuit_id: Optional[str] = None) -> None:
+    """Cache an LLM diagnosis and index it for reuse by similar submissions."""
+    diagnosis_cache.set(prepared.cache_key, diagnosis)
+    if prepared.features is not None:
+        diagnosis_index.add(prepared.features, diagnosis, verified=False, circuit_id=circuit_id)
+
+
+def _sse(payload: Dict) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def _diagnosis_response(result: Dict, diagnosis: str, stream: bool):
+    if not stream:
+        return {**result, "diagnosis": diagnosis}
+
+    def events():
+        yield _sse(result)
+        yield _sse({"delta": diagnosis})
+        yield _sse({"done": True, "diagnosis": diagnosis})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def _stream_llm_diagnosis(result: Dict, prepared: PreparedDiagnosis, circuit_id: str):
+    """SSE events: the circuit header, one {"delta"} per LLM chunk, then {"done"}."""
+    yield _sse(result)
+    chunks = []
+    # No span here, the generator resumes in a different thread per chunk
+    stream_metrics = StreamMetrics(LLM_MODEL)
+    try:
+        for chunk in llm.stream(prepared.prompt):
+            text = str(chunk)
+            if text:
+                stream_metrics.token()
+                chunks.append(text)
+                yield _sse({"delta": text})
+    except Exception as e:
+        log.exception("Diagnosis stream failed")
+        yield _sse({"error": str(e)})
+        return
+    finally:
+        record_stage("spice.llm", time.perf_counter() - stream_metrics.started_at)
+    stream_metrics.finish()
+
+    diagnosis = "".join(chunks)
+    remember_diagnosis(prepared, diagnosis, circuit_id)
+    yield _sse({"done": True, "diagnosis": diagnosis})
+
+
+class VerifyDiagnosisRequest(BaseModel):
+    circuit_id: str
+    diagnosis: Optional[str] = None  # defaults to the last diagnosis of this circuit
+
+
+@app.post("/diagnose/verify")
+def verify_diagnosis(request: VerifyDiagnosisRequest, user=Depends(get_admin_user)):
+    """Mark a diagnosis as confirmed so matching submissions reuse it without the LLM."""
+    _require_circuit_store()
+    if not get_circuit(request.circuit_id):
+        raise HTTPException(status_code=404, detail="Circuit ID not found.")
+
+    nets, _, all_elems = fetch_circuit_rows(request.circuit_id)
+    cache_key = diagnosis_cache_key(nets, all_elems)
+    diagnosis = request.diagnosis or diagnosis_cache.get(cache_key)
+    if not diagnosis:
+        raise HTTPException(status_code=404, detail="No diagnosis to verify; run /diagnose first or pass one.")
+
+    features = circuit_features(nets, all_elems)
+    if features is None:
+        raise HTTPException(status_code=400, detail="Circuit has no measurements to compare against.")
+
+    if not save_verified_diagnosis(request.circuit_id, diagnosis):
+        raise HTTPException(status_code=500, detail="Could not store the verified diagnosis.")
+    diagnosis_cache.set(cache_key, diagnosis)
+    diagnosis_index.add(features, diagnosis, verified=True, circuit_id=request.circuit_id)
+    return {"circuit_id": request.circuit_id, "verified": True}
+
+
+# ==========================================
+# BATCH DIAGNOSIS (whole lab section at once)
+# ==========================================
+
+
+class BatchDiagnoseRequest(BaseModel):
+    lab_id: Optional[str] = None
+    circuit_ids: Optional[List[str]] = None
+
+
+async def _run_batch_diagnosis(job_id: str, circuits: List[Dict]) -> None:
+    names = {c["id"]: c["circuit_name"] for c in circuits}
+    models = {c["id"]: c.get("models") for c in circuits}
+    ids = list(names)
+    progress = {"status": "running", "total": len(ids), "completed": 0, "unique": 0, "results": {}}
+
+    try:
+        # Three queries (Supabase) or two (local) for the whole batch.
+        rows = await asyncio.to_thread(fetch_circuit_rows_many, ids)
+
+        # Identical measurement sets share a cache key and get one diagnosis.
+        groups: Dict[str, List[str]] = {}
+        for cid in ids:
+            nets, _, all_elems = rows[cid]
+            groups.setdefault(diagnosis_cache_key(nets, all_elems), []).append(cid)
+        progress["unique"] = len(groups)
+        await set_task_progress(task_redis, job_id, progress)
+
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def diagnose_group(members: List[str]) -> None:
+            cid = members[0]
+            async with semaphore:
+                try:
+                    prepared = await asyncio.to_thread(prepare_diagnosis, names[cid], *rows[cid], models[cid])
+                    if prepared.diagnosis is not None:
+                        entry = {"diagnosis": prepared.diagnosis, "cached": prepared.cached}
+                        if prepared.reused_from:
+                            entry["reused_from"] = prepared.reused_from
+                    else:
+                        with stage("spice.llm", route="diagnose_batch"):
+                            diagnosis = str(await llm.ainvoke(prepared.prompt))
+                        remember_diagnosis(prepared, diagnosis, cid)
+                        entry = {"diagnosis": diagnosis, "cached": False}
+                except Exception as e:
+                    log.exception(f"Batch diagnosis failed for {cid}")
+                    entry = {"error": str(e)}
+
+            for member in members:
+                progress["results"][member] = {"circuit_name": names[member], **entry}
+            progress["completed"] += len(members)
+            await set_task_progress(task_redis, job_id, progress)
+
+        await asyncio.gather(*(diagnose_group(members) for members in groups.values()))
+        progress["status"] = "completed"
+    except asyncio.CancelledError:
+        progress["status"] = "cancelled"
+        raise
+    except Exception as e:
+        log.exception(f"Batch diagnosis {job_id} failed")
+        progress["status"] = "failed"
+        progress["error"] = str(e)
+    finally:
+        await set_task_progress(task_redis, job_id, progress)
+
+
+@app.post("/diagnose/batch")
+async def diagnose_batch(request: BatchDiagnoseRequest, user=Depends(get_admin_user)):
+    _require_circuit_store()
+    _require_llm()
+
+    if not request.lab_id and not request.circuit_ids:
+        raise HTTPException(status_code=400, detail="Provide a lab_id or a list of circuit_ids.")
+
+    circuits = await asyncio.to_thread(list_circuits, request.circuit_ids, request.lab_id)
+    if not circuits:
+        raise HTTPException(status_code=404, detail="No circuits found for this batch.")
+
+    job_id = str(uuid4())
+    await set_task_progress(
+        task_redis, job_id, {"status": "queued", "total": len(circuits), "completed": 0, "results": {}}
+    )
+    task_id, _ = await create_task(task_redis, _run_batch_diagnosis(job_id, circuits), id=job_id)
+    return {"job_id": job_id, "task_id": task_id, "total": len(circuits)}
+
+
+@app.get("/diagnose/batch/{job_id}")
+async def diagnose_batch_status(job_id: str, user=Depends(get_admin_user)):
+    progress = await get_task_progress(task_redis, job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Batch job not found.")
+    return progress
 
 
 # Root helper for quick manual check
 @app.get("/")
 def root():
-    return {"message": "SPICE Lab Assistant API is running", "routes": ["/upload", "/chat", "/diagnose", "/health"]}
\ No newline at end of file
+    return {"message": "SPICE Lab Assistant API is running", "routes": ["/upload", "/chat", "/diagnose", "/diagnose/verify", "/diagnose/batch", "/health"]}
\ No newline at end of file
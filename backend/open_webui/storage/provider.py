@@ -59,6 +59,11 @@ class StorageProvider(ABC):
     def delete_file(self, file_path: str) -> None:
         pass
 
+    @abstractmethod
+    def get_file_path(self, filename: str) -> str:
+        """Returns the storage path upload_file produces for a filename."""
+        pass
+
 
 class LocalStorageProvider(StorageProvider):
     @staticmethod
@@ -78,6 +83,10 @@ class LocalStorageProvider(StorageProvider):
         """Handles downloading of the file from local storage."""
         return file_path
 
+    @staticmethod
+    def get_file_path(filename: str) -> str:
+        return f"{UPLOAD_DIR}/{filename}"
+
     @staticmethod
     def delete_file(file_path: str) -> None:
         """Handles deletion of the file from local storage."""
@@ -185,6 +194,9 @@ class S3StorageProvider(StorageProvider):
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
+    def get_file_path(self, filename: str) -> str:
+        return f"s3://{self.bucket_name}/{os.path.join(self.key_prefix, filename)}"
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from S3 storage."""
         try:
@@ -262,6 +274,9 @@ class GCSStorageProvider(StorageProvider):
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
+    def get_file_path(self, filename: str) -> str:
+        return "gs://" + self.bucket_name + "/" + filename
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from GCS storage."""
         try:
@@ -334,6 +349,9 @@ class AzureStorageProvider(StorageProvider):
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
+    def get_file_path(self, filename: str) -> str:
+        return f"{self.endpoint}/{self.container_name}/{filename}"
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from Azure Blob Storage."""
         try:
@@ -17,11 +17,16 @@ log.setLevel(SRC_LOG_LEVELS["MAIN"])
 # A dictionary to keep track of active tasks
 tasks: Dict[str, asyncio.Task] = {}
 item_tasks = {}
+# Progress/result payloads reported by long-running tasks, keyed by item ID
+task_progress: Dict[str, dict] = {}
+MAX_TASK_PROGRESS_ENTRIES = 1000
+TASK_PROGRESS_TTL = 24 * 60 * 60
 
 
 REDIS_TASKS_KEY = f"{REDIS_KEY_PREFIX}:tasks"
 REDIS_ITEM_TASKS_KEY = f"{REDIS_KEY_PREFIX}:tasks:item"
 REDIS_PUBSUB_CHANNEL = f"{REDIS_KEY_PREFIX}:tasks:commands"
+REDIS_TASK_PROGRESS_KEY = f"{REDIS_KEY_PREFIX}:tasks:progress"
 
 
 async def redis_task_command_listener(app):
@@ -78,6 +83,17 @@ async def redis_send_command(redis: Redis, command: dict):
     await redis.publish(REDIS_PUBSUB_CHANNEL, json.dumps(command))
 
 
+async def redis_set_task_progress(redis: Redis, id: str, progress: dict):
+    await redis.set(
+        f"{REDIS_TASK_PROGRESS_KEY}:{id}", json.dumps(progress), ex=TASK_PROGRESS_TTL
+    )
+
+
+async def redis_get_task_progress(redis: Redis, id: str) -> Optional[dict]:
+    data = await redis.get(f"{REDIS_TASK_PROGRESS_KEY}:{id}")
+    return json.loads(data) if data else None
+
+
 async def cleanup_task(redis, task_id: str, id=None):
     """
     Remove a completed or canceled task from the global `tasks` dictionary.
@@ -137,6 +153,30 @@ async def list_task_ids_by_item_id(redis, id):
     return item_tasks.get(id, [])
 
 
+async def set_task_progress(redis, id: str, progress: dict):
+    """
+    Record the progress (and eventually the results) of the task(s) running for an item ID.
+    Entries outlive the task so clients can collect results after completion.
+    """
+    if redis:
+        await redis_set_task_progress(redis, id, progress)
+        return
+
+    task_progress.pop(id, None)
+    task_progress[id] = progress
+    while len(task_progress) > MAX_TASK_PROGRESS_ENTRIES:
+        task_progress.pop(next(iter(task_progress)))
+
+
+async def get_task_progress(redis, id: str) -> Optional[dict]:
+    """
+    Return the last progress payload reported for an item ID.
+    """
+    if redis:
+        return await redis_get_task_progress(redis, id)
+    return task_progress.get(id)
+
+
 async def stop_task(redis, task_id: str):
     """
     Cancel a running task and remove it from the global task list.
@@ -0,0 +1,57 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway data directory and SQLite database before
+# anything imports open_webui.env, so tests never write to the database (or
+# uploads) the developer has configured. The router tests that run against
+# Postgres set DATABASE_URL themselves.
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="open-webui-test-")
+os.environ["DATA_DIR"] = TEST_DATA_DIR
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DATA_DIR}/webui.db"
+os.environ.pop("DATABASE_TYPE", None)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_data_dir():
+    yield TEST_DATA_DIR
+    shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    """Delete the rows a test created once it is done."""
+    yield
+
+    # Tests that never touched the database have nothing to clean up
+    if "open_webui.internal.db" not in sys.modules:
+        return
+
+    from open_webui.internal.db import get_db
+    from open_webui.models.chats import Chat
+    from open_webui.models.spice_circuits import (
+        SpiceCircuit,
+        SpiceElement,
+        SpiceElementConnection,
+        SpiceNet,
+    )
+    from open_webui.models.users import User, Users
+
+    with get_db() as db:
+        for table in (
+            SpiceElementConnection,
+            SpiceElement,
+            SpiceNet,
+            SpiceCircuit,
+            Chat,
+            User,
+        ):
+            db.query(table).delete()
+        db.commit()
+
+    Users._user_cache.clear()
+    with Users._last_active_lock:
+        Users._last_active.clear()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_db():
+    # Importing the config runs the alembic migrations against DATABASE_URL
+    import open_webui.config  # noqa: F401
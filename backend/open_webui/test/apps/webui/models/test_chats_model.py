@@ -0,0 +1,101 @@
+import uuid
+
+from open_webui.internal.db import get_db
+from open_webui.models.chats import Chat, ChatForm, Chats
+
+
+def _new_chat(user_id=None):
+    chat = Chats.insert_new_chat(
+        user_id or str(uuid.uuid4()),
+        ChatForm(
+            chat={
+                "title": "New Chat",
+                "history": {
+                    "messages": {"m1": {"id": "m1", "content": "hi"}},
+                    "currentId": "m1",
+                },
+            }
+        ),
+    )
+    assert chat is not None
+    return chat
+
+
+def test_update_title_and_message_writes_both():
+    chat = _new_chat()
+
+    updated = Chats.update_chat_title_and_message_by_id(
+        chat.id,
+        "m1",
+        title="Ohm's law",
+        message={"followUps": ["Why?"], "content": "hi\x00 there"},
+    )
+
+    assert updated.title == "Ohm's law"
+    stored = Chats.get_chat_by_id(chat.id).chat
+    assert stored["title"] == "Ohm's law"
+    # Merged into the existing message, with null characters stripped
+    assert stored["history"]["messages"]["m1"] == {
+        "id": "m1",
+        "content": "hi there",
+        "followUps": ["Why?"],
+    }
+    assert stored["history"]["currentId"] == "m1"
+
+
+def test_update_title_only_leaves_history_alone():
+    chat = _new_chat()
+
+    Chats.update_chat_title_and_message_by_id(chat.id, "m2", title="Renamed")
+
+    stored = Chats.get_chat_by_id(chat.id).chat
+    assert stored["title"] == "Renamed"
+    assert list(stored["history"]["messages"]) == ["m1"]
+    assert stored["history"]["currentId"] == "m1"
+    assert Chats.update_chat_title_and_message_by_id("missing", "m1", "x") is None
+
+
+def test_upsert_message_strips_null_characters():
+    chat = _new_chat()
+
+    Chats.upsert_message_to_chat_by_id_and_message_id(
+        chat.id, "m2", {"id": "m2", "content": "a\x00b"}
+    )
+
+    history = Chats.get_chat_by_id(chat.id).chat["history"]
+    assert history["messages"]["m2"]["content"] == "ab"
+    assert history["currentId"] == "m2"
+
+
+def test_get_chats_after_pages_by_created_at_and_id():
+    user_id = str(uuid.uuid4())
+    chats = [_new_chat(user_id) for _ in range(5)]
+    _new_chat()
+    # Two chats share a timestamp, the id breaks the tie
+    with get_db() as db:
+        for chat, created_at in zip(chats, [100, 200, 200, 300, 400]):
+            db.query(Chat).filter_by(id=chat.id).update({"created_at": created_at})
+        db.commit()
+
+    expected = sorted(
+        (Chats.get_chat_by_id(chat.id) for chat in chats),
+        key=lambda chat: (chat.created_at, chat.id),
+    )
+
+    seen = []
+    after = None
+    while True:
+        page = Chats.get_chats_after(user_id=user_id, after=after, limit=2)
+        if not page:
+            break
+        assert len(page) <= 2
+        seen.extend(page)
+        after = (page[-1].created_at, page[-1].id)
+
+        # A chat created while paging shows up at the end, not twice
+        if len(seen) == 2:
+            chats.append(_new_chat(user_id))
+            expected.append(Chats.get_chat_by_id(chats[-1].id))
+
+    assert [chat.id for chat in seen] == [chat.id for chat in expected]
+    assert Chats.count_chats(user_id) == 6
@@ -0,0 +1,74 @@
+import base64
+import os
+import uuid
+
+from open_webui.internal.db import get_db
+from open_webui.models.users import (
+    REDIS_PROFILE_IMAGE_MIGRATION_LOCK,
+    User,
+    Users,
+)
+from open_webui.utils.avatars import PROFILE_IMAGE_URL_PREFIX
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False, xx=False, ex=None):
+        if (nx and key in self.data) or (xx and key not in self.data):
+            return None
+        self.data[key] = value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def publish(self, channel, message):
+        pass
+
+
+def _inline_user():
+    image = base64.b64encode(b"\x89PNG\r\n\x1a\n" + os.urandom(32)).decode()
+    id = str(uuid.uuid4())
+    Users.insert_new_user(id, "Ada", f"{id}@example.com")
+    # Write the data URI directly, as rows from before the migration have it
+    with get_db() as db:
+        db.query(User).filter_by(id=id).update(
+            {"profile_image_url": f"data:image/png;base64,{image}"}
+        )
+        db.commit()
+    return id
+
+
+def test_migration_moves_inline_images_to_storage():
+    ids = [_inline_user() for _ in range(3)]
+
+    assert Users.migrate_inline_profile_images(batch_size=2) >= 3
+    for id in ids:
+        url = Users.get_user_by_id(id).profile_image_url
+        assert url.startswith(PROFILE_IMAGE_URL_PREFIX)
+
+    assert Users.migrate_inline_profile_images() == 0
+
+
+def test_migration_runs_on_one_worker_only(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(Users, "redis", redis)
+    id = _inline_user()
+
+    # Another worker holds the lock
+    redis.set(REDIS_PROFILE_IMAGE_MIGRATION_LOCK, "other", nx=True)
+    assert Users.migrate_inline_profile_images() == 0
+    assert Users.get_user_by_id(id).profile_image_url.startswith("data:image")
+
+    redis.delete(REDIS_PROFILE_IMAGE_MIGRATION_LOCK)
+    assert Users.migrate_inline_profile_images() >= 1
+    assert Users.get_user_by_id(id).profile_image_url.startswith(
+        PROFILE_IMAGE_URL_PREFIX
+    )
+    # Released once done
+    assert redis.get(REDIS_PROFILE_IMAGE_MIGRATION_LOCK) is None
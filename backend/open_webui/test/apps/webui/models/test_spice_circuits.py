@@ -0,0 +1,102 @@
+from open_webui.models.spice_circuits import SpiceCircuits
+
+ELEMENTS = [
+    {
+        "name": "R1",
+        "type": "R",
+        "model": None,
+        "value": "1k",
+        "params": {},
+        "nodes": ["in", "out"],
+        "simulated_current": 1e-3,
+    },
+    {
+        "name": "R2",
+        "type": "R",
+        "model": None,
+        "value": "2k",
+        "params": {},
+        "nodes": ["out", "0"],
+        "simulated_current": 1e-3,
+    },
+]
+VOLTS = {"in": 3.0, "out": 2.0, "0": 0.0}
+
+
+def _insert(**kwargs):
+    circuit = SpiceCircuits.insert_circuit("divider.cir", ELEMENTS, VOLTS, **kwargs)
+    assert circuit is not None
+    return circuit
+
+
+def test_insert_circuit_round_trip():
+    circuit = _insert(
+        net_stats={"out": {"avg": 2.0, "pp": 0.1, "period": 1e-3}},
+        lab_id="lab-1",
+        models={"D": {"type": "D", "IS": 1e-14}},
+    )
+
+    stored = SpiceCircuits.get_circuit_by_id(circuit.id)
+    assert stored.lab_id == "lab-1"
+    assert stored.models == {"D": {"type": "D", "IS": 1e-14}}
+    assert circuit.id in {c.id for c in SpiceCircuits.get_circuits(lab_id="lab-1")}
+
+    nets, elems = SpiceCircuits.get_circuit_rows(circuit.id)
+    out = next(n for n in nets if n["node_name"] == "out")
+    assert out["spice_id"] == circuit.id
+    assert out["simulated_voltage"] == 2.0
+    assert out["simulated_period"] == 1e-3
+    assert out["measured_voltage"] is None
+    # Elements keep netlist order and their ordered nodes
+    assert [e["element_name"] for e in elems] == ["R1", "R2"]
+    assert [e["nodes"] for e in elems] == [["in", "out"], ["out", "0"]]
+
+
+def test_get_circuit_rows_many_groups_by_circuit():
+    a, b = _insert(), _insert()
+
+    rows = SpiceCircuits.get_circuit_rows_many([a.id, b.id, "missing"])
+
+    assert len(rows[a.id][0]) == len(VOLTS)
+    assert len(rows[b.id][1]) == len(ELEMENTS)
+    assert {e["spice_id"] for e in rows[b.id][1]} == {b.id}
+    assert rows["missing"] == ([], [])
+
+
+def test_update_measurements():
+    circuit = _insert()
+
+    assert SpiceCircuits.update_measurements(
+        circuit.id,
+        {"out": {"voltage": 1.9, "pp": 0.2, "ignored": 1.0}},
+        {"R2": 0.95e-3},
+    )
+
+    nets, elems = SpiceCircuits.get_circuit_rows(circuit.id)
+    out = next(n for n in nets if n["node_name"] == "out")
+    assert out["measured_voltage"] == 1.9
+    assert out["measured_pp"] == 0.2
+    assert next(n for n in nets if n["node_name"] == "in")["measured_voltage"] is None
+    currents = {e["element_name"]: e["measured_current"] for e in elems}
+    assert currents == {"R1": None, "R2": 0.95e-3}
+
+
+def test_delete_circuit_removes_rows():
+    circuit, other = _insert(), _insert()
+
+    assert SpiceCircuits.delete_circuit_by_id(circuit.id)
+
+    assert SpiceCircuits.get_circuit_by_id(circuit.id) is None
+    assert SpiceCircuits.get_circuit_rows(circuit.id) == ([], [])
+    assert len(SpiceCircuits.get_circuit_rows(other.id)[1]) == len(ELEMENTS)
+    assert not SpiceCircuits.delete_circuit_by_id(circuit.id)
+
+
+def test_verified_diagnosis_is_stored_and_filtered():
+    circuit, other = _insert(), _insert()
+
+    assert SpiceCircuits.update_verified_diagnosis(circuit.id, "R2 open")
+    assert not SpiceCircuits.update_verified_diagnosis("missing", "R2 open")
+
+    verified = SpiceCircuits.get_circuits(ids=[circuit.id, other.id], verified=True)
+    assert [(c.id, c.verified_diagnosis) for c in verified] == [(circuit.id, "R2 open")]
@@ -0,0 +1,112 @@
+import time
+import uuid
+
+from open_webui.models import users as users_model
+from open_webui.models.users import REDIS_USER_CACHE_CHANNEL, Users
+
+
+class FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+def _new_user():
+    id = str(uuid.uuid4())
+    user = Users.insert_new_user(id, "Ada", f"{id}@example.com")
+    assert user is not None
+    return user
+
+
+def test_cached_user_is_reused_and_returned_as_copy(monkeypatch):
+    user = _new_user()
+    first = Users.get_cached_user_by_id(user.id)
+
+    # A second lookup within the TTL must not hit the database
+    monkeypatch.setattr(Users, "get_user_by_id", lambda id: None)
+    second = Users.get_cached_user_by_id(user.id)
+
+    assert second == first
+    second.name = "Changed"
+    assert Users.get_cached_user_by_id(user.id).name == "Ada"
+
+
+def test_cached_user_expires_after_ttl(monkeypatch):
+    monkeypatch.setattr(users_model, "USER_CACHE_TTL", 0.05)
+    user = _new_user()
+    Users.get_cached_user_by_id(user.id)
+
+    Users.update_user_role_by_id(user.id, "user")
+    Users.get_cached_user_by_id(user.id)
+    # Simulate a write made by another worker, which does not drop our entry
+    Users._user_cache[user.id][1].role = "pending"
+    time.sleep(0.1)
+
+    assert Users.get_cached_user_by_id(user.id).role == "user"
+
+
+def test_updates_invalidate_and_publish(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(Users, "redis", redis)
+    user = _new_user()
+    Users.get_cached_user_by_id(user.id)
+
+    Users.update_user_by_id(user.id, {"name": "Grace"})
+
+    assert user.id not in Users._user_cache
+    assert Users.get_cached_user_by_id(user.id).name == "Grace"
+    assert (REDIS_USER_CACHE_CHANNEL, user.id) in redis.published
+
+
+def test_drop_cached_user_does_not_publish(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(Users, "redis", redis)
+    user = _new_user()
+    Users.get_cached_user_by_id(user.id)
+
+    Users.drop_cached_user(user.id)
+
+    assert user.id not in Users._user_cache
+    assert redis.published == []
+
+
+def test_flush_user_last_active_writes_buffered_timestamps():
+    a, b = _new_user(), _new_user()
+    Users.record_user_last_active(a.id)
+    Users.record_user_last_active(b.id)
+    Users._last_active[a.id] = 123
+    Users._last_active[b.id] = 456
+
+    assert Users.flush_user_last_active() == 2
+    assert Users.get_user_by_id(a.id).last_active_at == 123
+    assert Users.get_user_by_id(b.id).last_active_at == 456
+    assert Users.flush_user_last_active() == 0
+
+
+def test_flush_user_last_active_drops_expired_cache_entries():
+    user = _new_user()
+    Users.get_cached_user_by_id(user.id)
+    _, cached = Users._user_cache[user.id]
+    Users._user_cache[user.id] = (time.monotonic() - 1, cached)
+
+    Users.flush_user_last_active()
+
+    assert user.id not in Users._user_cache
+
+
+def test_failed_flush_keeps_timestamps_for_next_flush(monkeypatch):
+    user = _new_user()
+    Users.record_user_last_active(user.id)
+    Users._last_active[user.id] = 789
+
+    def broken_db():
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(users_model, "get_db", broken_db)
+    assert Users.flush_user_last_active() == 0
+    monkeypatch.undo()
+
+    assert Users.flush_user_last_active() == 1
+    assert Users.get_user_by_id(user.id).last_active_at == 789
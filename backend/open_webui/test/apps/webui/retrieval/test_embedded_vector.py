@@ -0,0 +1,139 @@
+import multiprocessing
+import time
+
+import numpy as np
+import pytest
+
+from open_webui.retrieval.vector.dbs.embedded import EmbeddedClient
+
+
+def _items(prefix, vectors, file_id="f1"):
+    return [
+        {
+            "id": f"{prefix}{i}",
+            "text": f"doc {prefix}{i}",
+            "vector": list(vector),
+            "metadata": {"file_id": file_id, "page": i},
+        }
+        for i, vector in enumerate(vectors)
+    ]
+
+
+@pytest.fixture
+def client(tmp_path):
+    return EmbeddedClient(path=str(tmp_path), max_segments=2)
+
+
+def test_search_batches_queries_and_orders_by_score(client):
+    client.insert("c", _items("a", np.eye(4)))
+
+    result = client.search("c", [[1, 0, 0, 0], [0, 0.1, 1, 0]], limit=2)
+
+    assert result.ids[0][0] == "a0"
+    assert result.ids[1][0] == "a2"
+    assert result.distances[0][0] == pytest.approx(1.0)
+    assert result.distances[0][1] == pytest.approx(0.5)
+    assert client.search("missing", [[1, 0, 0, 0]], limit=1) is None
+
+
+def test_upsert_and_delete_hide_old_rows(client):
+    client.insert("c", _items("a", np.eye(3)))
+    client.upsert(
+        "c", [{"id": "a0", "text": "new", "vector": [0, 1, 0], "metadata": {}}]
+    )
+    client.delete("c", filter={"page": 2})
+
+    result = client.get("c")
+    assert sorted(result.ids[0]) == ["a0", "a1"]
+    assert "new" in result.documents[0]
+
+    query = client.query("c", filter={"file_id": "f1"})
+    assert query.ids[0] == ["a1"]
+
+
+def test_filters_support_operators(client):
+    client.insert("c", _items("a", np.eye(3), file_id="f1"))
+    client.insert("c", _items("b", np.eye(3), file_id="f2"))
+
+    result = client.query(
+        "c", filter={"$and": [{"file_id": {"$in": ["f2"]}}, {"page": {"$ne": 0}}]}
+    )
+    assert sorted(result.ids[0]) == ["b1", "b2"]
+
+
+def test_reopen_and_compaction_preserve_rows(tmp_path):
+    client = EmbeddedClient(path=str(tmp_path), max_segments=2, dtype="float16")
+    for n in range(4):
+        client.insert("c", _items(f"s{n}-", np.eye(3)))
+    client.delete("c", ids=["s0-0"])
+
+    for _ in range(100):
+        if not client._get_collection("c").compacting:
+            break
+        time.sleep(0.01)
+
+    reopened = EmbeddedClient(path=str(tmp_path))
+    ids = reopened.get("c").ids[0]
+    assert len(ids) == 11 and "s0-0" not in ids
+    assert len(reopened._get_collection("c").segments) <= 3
+
+    reopened.delete_collection("c")
+    assert not reopened.has_collection("c")
+
+
+def test_clients_sharing_a_path_see_each_others_writes(tmp_path):
+    a = EmbeddedClient(path=str(tmp_path), max_segments=100)
+    b = EmbeddedClient(path=str(tmp_path), max_segments=100)
+
+    a.insert("c", _items("a", np.eye(3)))
+    b.insert("c", _items("b", np.eye(3)))
+    a.delete("c", ids=["b1"])
+    b.delete("c", ids=["a2"])
+
+    # Both writers picked distinct segment names and kept each other's rows
+    for client in (a, b):
+        assert sorted(client.get("c").ids[0]) == ["a0", "a1", "b0", "b2"]
+    assert EmbeddedClient(path=str(tmp_path)).search("c", [[0, 1, 0]], 1).ids == [
+        ["a1"]
+    ]
+
+    b.delete_collection("c")
+    assert not a.has_collection("c")
+
+
+def _insert_batches(path, prefix, batches):
+    client = EmbeddedClient(path=path, max_segments=4)
+    for n in range(batches):
+        client.insert("c", _items(f"{prefix}{n}-", np.eye(3)))
+    # Let a background compaction finish before the process exits
+    for _ in range(200):
+        if not client._get_collection("c").compacting:
+            break
+        time.sleep(0.01)
+
+
+def test_concurrent_processes_do_not_lose_rows(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        ctx.Process(target=_insert_batches, args=(str(tmp_path), prefix, 10))
+        for prefix in ("p", "q")
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    ids = EmbeddedClient(path=str(tmp_path)).get("c").ids[0]
+    assert len(ids) == len(set(ids)) == 2 * 10 * 3
+
+
+def test_search_many_covers_every_collection(client):
+    client.insert("c1", _items("a", np.eye(3)))
+    client.insert("c2", _items("b", np.eye(3)))
+
+    results = client.search_many(["c1", "c2", "missing"], [[1, 0, 0], [0, 1, 0]], 1)
+
+    assert results["c1"].ids == [["a0"], ["a1"]]
+    assert results["c2"].ids == [["b0"], ["b1"]]
+    assert results["missing"] is None
@@ -0,0 +1,98 @@
+import logging
+import threading
+
+from open_webui.retrieval import utils
+from open_webui.retrieval.vector.main import SearchResult, VectorDBBase
+
+
+class FakeVectorDB(VectorDBBase):
+    def __init__(self, failing=(), barrier=None):
+        self.failing = set(failing)
+        self.barrier = barrier
+
+    def search(self, collection_name, vectors, limit):
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        if collection_name in self.failing:
+            raise RuntimeError(f"{collection_name} is down")
+        if collection_name == "missing":
+            return None
+        score = float(vectors[0][0])
+        return SearchResult(
+            ids=[[f"{collection_name}-{score}"]],
+            documents=[[f"{collection_name} doc {score}"]],
+            metadatas=[[{"collection": collection_name}]],
+            distances=[[score]],
+        )
+
+    def has_collection(self, collection_name):
+        return True
+
+    def delete_collection(self, collection_name):
+        pass
+
+    def insert(self, collection_name, items):
+        pass
+
+    def upsert(self, collection_name, items):
+        pass
+
+    def query(self, collection_name, filter, limit=None):
+        return None
+
+    def get(self, collection_name):
+        return None
+
+    def delete(self, collection_name, ids=None, filter=None):
+        pass
+
+    def reset(self):
+        pass
+
+
+def test_default_search_many_runs_searches_concurrently():
+    # Every (collection, vector) search has to be in flight at once to pass the barrier
+    db = FakeVectorDB(barrier=threading.Barrier(4))
+
+    results = db.search_many(["a", "b"], [[0.9], [0.4]], limit=1)
+
+    assert results["a"].ids == [["a-0.9"], ["a-0.4"]]
+    assert results["b"].distances == [[0.9], [0.4]]
+
+
+def test_default_search_many_maps_missing_collections_to_none():
+    results = FakeVectorDB().search_many(["good", "missing"], [[0.5]], limit=1)
+
+    assert results["missing"] is None
+    assert results["good"].ids == [["good-0.5"]]
+
+
+def _query(monkeypatch, db, collection_names):
+    monkeypatch.setattr(utils, "VECTOR_DB_CLIENT", db)
+    return utils.query_collection(
+        collection_names=collection_names,
+        queries=["q1", "q2"],
+        embedding_function=lambda queries, prefix: [[0.9], [0.4]],
+        k=3,
+    )
+
+
+def test_query_collection_isolates_failing_collections(monkeypatch, caplog):
+    db = FakeVectorDB(failing={"bad"})
+
+    with caplog.at_level(logging.WARNING):
+        result = _query(monkeypatch, db, ["good", "bad"])
+
+    assert result["documents"] == [["good doc 0.9", "good doc 0.4"]]
+    assert "All collection queries failed" not in caplog.text
+
+
+def test_query_collection_warns_only_when_queries_failed(monkeypatch, caplog):
+    with caplog.at_level(logging.WARNING):
+        result = _query(monkeypatch, FakeVectorDB(), ["missing"])
+    assert result["documents"] == [[]]
+    assert "All collection queries failed" not in caplog.text
+
+    with caplog.at_level(logging.WARNING):
+        _query(monkeypatch, FakeVectorDB(failing={"a", "b"}), ["a", "b"])
+    assert "All collection queries failed" in caplog.text
@@ -0,0 +1,114 @@
+import os
+import threading
+import wave
+
+import numpy as np
+import pytest
+
+from open_webui.routers import audio
+
+RATE = audio.AUDIO_SAMPLE_RATE
+WIDTH = audio.AUDIO_SAMPLE_WIDTH
+
+
+def _speech(seconds, silences=()):
+    """Loud noise with silent stretches at the given (start, end) seconds."""
+    pcm = np.random.default_rng(0).integers(
+        -20000, 20000, int(seconds * RATE), dtype=np.int16
+    )
+    for start, end in silences:
+        pcm[int(start * RATE) : int(end * RATE)] = 0
+    return pcm
+
+
+def _stream(monkeypatch, tmp_path, pcm, max_bytes, max_seconds=None, extra=b""):
+    data = pcm.tobytes() + extra
+    monkeypatch.setattr(
+        audio,
+        "decode_audio_stream",
+        lambda file_path: (data[i : i + 10007] for i in range(0, len(data), 10007)),
+    )
+    chunks = []
+    for path in audio.stream_audio_chunks(
+        str(tmp_path / "lecture.mp3"), max_bytes, max_seconds
+    ):
+        assert os.path.getsize(path) <= max_bytes
+        with wave.open(path) as f:
+            assert (f.getframerate(), f.getnchannels()) == (RATE, 1)
+            chunks.append(np.frombuffer(f.readframes(f.getnframes()), np.int16))
+    return chunks
+
+
+def test_chunks_respect_the_byte_budget_and_keep_every_sample(monkeypatch, tmp_path):
+    pcm = _speech(10)
+    max_bytes = audio.WAV_HEADER_SIZE + 3 * RATE * WIDTH
+
+    chunks = _stream(monkeypatch, tmp_path, pcm, max_bytes)
+
+    # Cuts land up to half a chunk early, so at least ceil(10 / 3) chunks
+    assert len(chunks) >= 4
+    assert all(len(c) <= 3 * RATE for c in chunks)
+    np.testing.assert_array_equal(np.concatenate(chunks), pcm)
+
+
+def test_chunks_are_cut_in_silence(monkeypatch, tmp_path):
+    pcm = _speech(5, silences=[(2.4, 2.6)])
+
+    chunks = _stream(monkeypatch, tmp_path, pcm, max_bytes=10**9, max_seconds=3)
+
+    first = len(chunks[0]) / RATE
+    assert 2.4 <= first <= 2.6
+    assert sum(len(c) for c in chunks) == len(pcm)
+
+
+def test_trailing_partial_sample_is_dropped(monkeypatch, tmp_path):
+    pcm = _speech(1)
+
+    chunks = _stream(
+        monkeypatch, tmp_path, pcm, max_bytes=10**9, max_seconds=30, extra=b"\x01"
+    )
+
+    assert len(chunks) == 1
+    np.testing.assert_array_equal(chunks[0], pcm)
+
+
+def test_find_silence_cut_picks_the_quietest_window():
+    pcm = _speech(2, silences=[(1.2, 1.3)])
+    window = RATE * audio.SILENCE_WINDOW_MS // 1000
+
+    cut = audio.find_silence_cut(pcm, RATE, 2 * RATE)
+
+    assert int(1.2 * RATE) <= cut <= int(1.3 * RATE)
+    assert (cut - RATE - window // 2) % window == 0
+    # Too short to compare two windows: cut at the end
+    assert audio.find_silence_cut(pcm, RATE, RATE + window) == RATE + window
+
+
+def test_decode_does_not_block_on_a_noisy_stderr(monkeypatch, tmp_path):
+    from pydub import AudioSegment
+
+    # Writes more to stderr than a pipe buffer holds before any stdout
+    converter = tmp_path / "ffmpeg"
+    converter.write_text(
+        "#!/bin/sh\n"
+        "head -c 300000 /dev/zero | tr '\\0' e >&2\n"
+        "printf abcd\n"
+        "exit 1\n"
+    )
+    converter.chmod(0o755)
+    monkeypatch.setattr(AudioSegment, "converter", str(converter))
+
+    outcome = {}
+
+    def decode():
+        try:
+            outcome["blocks"] = list(audio.decode_audio_stream("in.mp3"))
+        except Exception as e:
+            outcome["error"] = str(e)
+
+    thread = threading.Thread(target=decode, daemon=True)
+    thread.start()
+    thread.join(10)
+
+    assert not thread.is_alive()
+    assert outcome["error"].startswith("Error decoding audio file: eee")
@@ -0,0 +1,116 @@
+import asyncio
+import copy
+
+import pytest
+
+from open_webui import spice_api
+
+CIRCUITS = [{"id": f"c{i}", "circuit_name": f"lab{i}.cir"} for i in range(6)]
+
+
+class FakeLLM:
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            if prompt == "prompt c3":
+                raise RuntimeError("model crashed")
+            return f"diagnosis for {prompt}"
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    llm = FakeLLM()
+    snapshots = []
+
+    def fetch_rows(ids):
+        # c5 was measured exactly like c4
+        return {
+            id: (
+                [{"node_name": "out", "measured_voltage": min(int(id[1:]), 4)}],
+                [],
+                [],
+            )
+            for id in ids
+        }
+
+    def prepare(name, nets, elems, all_elems, models):
+        cid = f"c{nets[0]['measured_voltage']}"
+        key = spice_api.diagnosis_cache_key(nets, all_elems)
+        if cid == "c0":
+            return spice_api.PreparedDiagnosis(key, "cached", None, True)
+        return spice_api.PreparedDiagnosis(key, None, f"prompt {cid}", False)
+
+    async def set_progress(redis, id, progress):
+        snapshots.append(copy.deepcopy(progress))
+
+    monkeypatch.setattr(spice_api, "llm", llm)
+    monkeypatch.setattr(spice_api, "BATCH_CONCURRENCY", 2)
+    monkeypatch.setattr(spice_api, "fetch_circuit_rows_many", fetch_rows)
+    monkeypatch.setattr(spice_api, "prepare_diagnosis", prepare)
+    monkeypatch.setattr(spice_api, "remember_diagnosis", lambda *args: None)
+    monkeypatch.setattr(spice_api, "set_task_progress", set_progress)
+    return llm, snapshots
+
+
+@pytest.mark.asyncio
+async def test_batch_limits_concurrency_and_isolates_failures(batch):
+    llm, snapshots = batch
+
+    await spice_api._run_batch_diagnosis("job", CIRCUITS)
+
+    # One LLM call per distinct measurement set, at most two at a time
+    assert sorted(llm.prompts) == ["prompt c1", "prompt c2", "prompt c3", "prompt c4"]
+    assert llm.max_running == 2
+
+    progress = snapshots[-1]
+    assert progress["status"] == "completed"
+    assert progress["total"] == progress["completed"] == 6
+    assert progress["unique"] == 5
+
+    results = progress["results"]
+    assert results["c0"] == {
+        "circuit_name": "lab0.cir",
+        "diagnosis": "cached",
+        "cached": True,
+    }
+    assert results["c3"] == {"circuit_name": "lab3.cir", "error": "model crashed"}
+    assert results["c5"]["diagnosis"] == results["c4"]["diagnosis"]
+    assert results["c5"]["circuit_name"] == "lab5.cir"
+    for cid in ["c1", "c2", "c4"]:
+        assert results[cid]["diagnosis"] == f"diagnosis for prompt {cid}"
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_progress_as_groups_finish(batch):
+    _, snapshots = batch
+
+    await spice_api._run_batch_diagnosis("job", CIRCUITS)
+
+    completed = [snapshot["completed"] for snapshot in snapshots]
+    assert completed == sorted(completed)
+    assert completed[0] == 0 and completed[-1] == 6
+    assert all(s["status"] == "running" for s in snapshots[:-1])
+
+
+@pytest.mark.asyncio
+async def test_batch_fails_when_rows_cannot_be_loaded(batch, monkeypatch):
+    _, snapshots = batch
+
+    def broken(ids):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(spice_api, "fetch_circuit_rows_many", broken)
+    await spice_api._run_batch_diagnosis("job", CIRCUITS)
+
+    assert snapshots[-1]["status"] == "failed"
+    assert snapshots[-1]["error"] == "database is down"
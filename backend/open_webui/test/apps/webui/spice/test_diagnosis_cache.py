@@ -0,0 +1,131 @@
+import json
+
+from open_webui import spice_api
+from open_webui.spice import diagnosis_cache as cache_module
+from open_webui.spice.diagnosis_cache import DiagnosisCache, diagnosis_key
+
+NETS = [
+    {"id": 1, "spice_id": "a", "node_name": "in", "simulated_voltage": 3.0},
+    {"id": 2, "spice_id": "a", "node_name": "out", "simulated_voltage": 2.0},
+]
+ELEMENTS = [
+    {"id": "e1", "spice_id": "a", "element_name": "R1", "value": "1k"},
+    {"id": "e2", "spice_id": "a", "element_name": "R2", "value": "2k"},
+]
+
+
+def _key(nets=NETS, elements=ELEMENTS, model="llama3@0.2", prompt_version="v1"):
+    return diagnosis_key(nets, elements, model, prompt_version)
+
+
+def test_key_ignores_storage_ids_and_row_order():
+    stored_again = [
+        {**row, "id": row["id"] + 10, "spice_id": "b", "created_at": 1}
+        for row in reversed(NETS)
+    ]
+    elements = [{**row, "id": "x" + row["id"]} for row in reversed(ELEMENTS)]
+
+    assert _key(stored_again, elements) == _key()
+
+
+def test_key_changes_with_content_model_and_prompt_version():
+    changed = [{**NETS[0], "simulated_voltage": 3.1}, NETS[1]]
+
+    keys = {
+        _key(),
+        _key(nets=changed),
+        _key(elements=ELEMENTS[:1]),
+        _key(model="llama3@0.7"),
+        _key(prompt_version="v2"),
+    }
+    assert len(keys) == 5
+
+
+def test_cache_evicts_least_recently_used():
+    cache = DiagnosisCache(max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == "A"
+    cache.set("c", "C")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_cache_expires_entries_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = DiagnosisCache(ttl=60)
+    cache.set("a", "A")
+
+    now[0] += 59
+    assert cache.get("a") == "A"
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_without_ttl_keeps_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = DiagnosisCache()
+    cache.set("a", "A")
+
+    now[0] += 10**6
+    assert cache.get("a") == "A"
+
+
+class FakeLLM:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.prompts = []
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        for chunk in self.chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+def _events(stream):
+    return [json.loads(event.removeprefix("data: ")) for event in stream]
+
+
+def test_streamed_diagnosis_is_cached_on_a_miss(monkeypatch):
+    cache = DiagnosisCache()
+    llm = FakeLLM(["R2 is ", "", "open."])
+    monkeypatch.setattr(spice_api, "diagnosis_cache", cache)
+    monkeypatch.setattr(spice_api, "llm", llm)
+    prepared = spice_api.PreparedDiagnosis(_key(), None, "prompt", False)
+
+    events = _events(
+        spice_api._stream_llm_diagnosis({"circuit_id": "c1"}, prepared, "c1")
+    )
+
+    assert events == [
+        {"circuit_id": "c1"},
+        {"delta": "R2 is "},
+        {"delta": "open."},
+        {"done": True, "diagnosis": "R2 is open."},
+    ]
+    assert llm.prompts == ["prompt"]
+    assert cache.get(_key()) == "R2 is open."
+
+
+def test_failed_stream_is_not_cached(monkeypatch):
+    cache = DiagnosisCache()
+    monkeypatch.setattr(spice_api, "diagnosis_cache", cache)
+    monkeypatch.setattr(spice_api, "llm", FakeLLM(["R2", RuntimeError("gone")]))
+    prepared = spice_api.PreparedDiagnosis(_key(), None, "prompt", False)
+
+    events = _events(
+        spice_api._stream_llm_diagnosis({"circuit_id": "c1"}, prepared, "c1")
+    )
+
+    assert events[-1] == {"error": "gone"}
+    assert cache.get(_key()) is None
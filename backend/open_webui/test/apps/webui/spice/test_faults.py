@@ -0,0 +1,112 @@
+from dataclasses import replace
+
+import pytest
+
+from open_webui.spice import faults, mna, netlist
+
+
+DIVIDER = """* divider with clamp
+V1 a 0 10
+R1 a b 1k
+R2 b 0 2k
+R3 b c 1k
+D1 c 0 D
+.model D D
+"""
+
+
+def _measure(elements, models):
+    op = mna.solve_elements(elements, models)
+    currents = {k: v for k, v in op.currents.items() if k.startswith("R")}
+    return op.voltages, currents
+
+
+def test_generate_variants_covers_checklist():
+    parsed = netlist.parse_netlist(DIVIDER)
+    variants = faults.generate_variants(parsed.flatten())
+    classes = {v.fault_class for v in variants}
+    assert {
+        "open",
+        "reversed_diode",
+        "wrong_decade",
+        "swapped_values",
+        "supply_off",
+        "wrong_rail",
+    } <= classes
+
+
+def test_rank_faults_finds_wrong_decade():
+    parsed = netlist.parse_netlist(DIVIDER)
+    elements = parsed.flatten()
+    faulty = [
+        replace(e, value_si=e.value_si * 10) if e.name == "R2" else e for e in elements
+    ]
+    volts, currents = _measure(faulty, parsed.models)
+
+    ranking = faults.rank_faults(elements, volts, currents, parsed.models)
+
+    best = ranking.candidates[0]
+    assert best.fault_class == "wrong_decade"
+    assert "R2" in best.description
+    assert best.distance == pytest.approx(0.0, abs=1e-6)
+    assert ranking.confident
+
+
+def test_rank_faults_finds_reversed_diode():
+    parsed = netlist.parse_netlist(DIVIDER)
+    elements = parsed.flatten()
+    faulty = [
+        replace(e, nodes=e.nodes[::-1]) if e.name == "D1" else e for e in elements
+    ]
+    volts, currents = _measure(faulty, parsed.models)
+
+    ranking = faults.rank_faults(elements, volts, currents, parsed.models)
+    assert ranking.candidates[0].fault_class == "reversed_diode"
+
+
+def test_rank_faults_without_measurements():
+    parsed = netlist.parse_netlist(DIVIDER)
+    assert faults.rank_faults(parsed.flatten(), {}, {}) is None
+
+
+def test_elements_from_rows_round_trip():
+    parsed = netlist.parse_netlist(DIVIDER)
+    rows = parsed.element_dicts()
+    for row in rows:
+        row["element_name"] = row.pop("name")
+    rebuilt = faults.elements_from_rows(rows)
+
+    assert [e.name for e in rebuilt] == [e.name for e in parsed.elements]
+    assert rebuilt[2].value_si == pytest.approx(2000.0)
+    assert rebuilt[1].nodes == ("a", "b")
+
+
+INVERTING_AMP = """* inverting amplifier
+V1 in 0 1
+VCC vcc 0 5
+VEE vee 0 -5
+R1 in inv 1k
+R2 inv out 2k
+XU1 0 inv vcc vee out opamp
+"""
+
+
+def test_rank_faults_finds_latched_swapped_opamp():
+    parsed = netlist.parse_netlist(INVERTING_AMP)
+    # With the inputs swapped the feedback is positive: OUT sits at the +5 V rail
+    # instead of the metastable point a zero initial guess converges to.
+    volts = {
+        "IN": 1.0,
+        "INV": (1.0 * 2 + 5.0 * 1) / 3,
+        "OUT": 5.0,
+        "VCC": 5.0,
+        "VEE": -5.0,
+    }
+
+    ranking = faults.rank_faults(parsed.flatten(), volts, {}, parsed.models)
+
+    best = ranking.candidates[0]
+    assert best.fault_class == "swapped_opamp_inputs"
+    assert "V+ rail" in best.description
+    assert best.distance == pytest.approx(0.0, abs=1e-3)
+    assert ranking.confident
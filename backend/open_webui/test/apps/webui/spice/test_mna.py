@@ -0,0 +1,55 @@
+import pytest
+
+from open_webui.spice.mna import solve_operating_point
+from open_webui.spice.netlist import parse_netlist
+
+
+def solve(text):
+    op = solve_operating_point(parse_netlist(text))
+    assert op.converged
+    return op
+
+
+def test_resistor_divider():
+    op = solve("* divider\nV1 a 0 10\nR1 a b 1k\nR2 b 0 4k\n")
+    assert op.voltages["B"] == pytest.approx(8.0)
+    assert op.currents["R1"] == pytest.approx(2e-3)
+    # SPICE convention: a sourcing supply reports negative branch current.
+    assert op.currents["V1"] == pytest.approx(-2e-3)
+
+
+def test_diode_forward_drop():
+    op = solve("* diode\nV1 a 0 5\nR1 a b 1k\nD1 b 0 D\n.model D D\n")
+    assert 0.6 < op.voltages["B"] < 0.75
+    assert op.currents["D1"] == pytest.approx(op.currents["R1"], rel=1e-3)
+
+
+def test_reversed_diode_blocks():
+    op = solve("* diode\nV1 a 0 5\nR1 a b 1k\nD1 0 b D\n.model D D\n")
+    assert op.voltages["B"] == pytest.approx(5.0, abs=1e-6)
+
+
+def test_opamp_macro_non_inverting_and_saturation():
+    op = solve(
+        "* gain 10\nV1 vcc 0 15\nV2 vee 0 -15\nV3 in 0 1\n"
+        "R1 out n 9k\nR2 n 0 1k\nX1 in n vcc vee out OPAMP\n"
+    )
+    assert op.voltages["OUT"] == pytest.approx(10.0, rel=1e-3)
+
+    op = solve(
+        "* gain -10 into 5 V rails\nV1 vcc 0 5\nV2 vee 0 -5\nV3 in 0 1\n"
+        "R1 in n 1k\nR2 n out 10k\nX1 0 n vcc vee out OPAMP\n"
+    )
+    assert op.voltages["OUT"] == pytest.approx(-5.0, abs=1e-3)
+
+
+def test_controlled_sources():
+    op = solve(
+        "* controlled\nV1 a 0 1\nR1 a 0 1k\n"
+        "E1 b 0 a 0 3\nR2 b 0 1k\n"
+        "G1 c 0 a 0 1m\nR3 c 0 1k\n"
+        "H1 d 0 V1 1k\nR4 d 0 1k\n"
+    )
+    assert op.voltages["B"] == pytest.approx(3.0)
+    assert op.voltages["C"] == pytest.approx(-1.0)
+    assert op.voltages["D"] == pytest.approx(-1.0)
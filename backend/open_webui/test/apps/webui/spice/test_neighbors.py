@@ -0,0 +1,120 @@
+import pytest
+
+from open_webui.spice import neighbors
+
+
+ELEMENTS = [
+    {"element_name": "V1", "type": "V", "value": "5", "nodes": ["N001", "0"]},
+    {"element_name": "R1", "type": "R", "value": "1k", "nodes": ["N001", "N002"]},
+    {"element_name": "R2", "type": "R", "value": "2k", "nodes": ["N002", "0"]},
+]
+
+
+def _rows(v2_measured, i_measured):
+    nets = [
+        {"node_name": "N001", "simulated_voltage": 5.0, "measured_voltage": 5.0},
+        {
+            "node_name": "N002",
+            "simulated_voltage": 3.333,
+            "measured_voltage": v2_measured,
+        },
+        {"node_name": "0", "simulated_voltage": 0.0, "measured_voltage": 0.0},
+    ]
+    elements = [dict(e) for e in ELEMENTS]
+    for e in elements:
+        e["simulated_current"] = 1.667e-3 if e["type"] == "R" else -1.667e-3
+        e["measured_current"] = i_measured if e["type"] == "R" else None
+    return nets, elements
+
+
+def test_topology_hash_ignores_measurements_and_order():
+    _, a = _rows(3.3, 1.6e-3)
+    _, b = _rows(0.5, 4.5e-3)
+    assert neighbors.topology_hash(a) == neighbors.topology_hash(list(reversed(b)))
+
+    changed = [dict(e) for e in a]
+    changed[1]["value"] = "10k"
+    assert neighbors.topology_hash(changed) != neighbors.topology_hash(a)
+
+
+def test_features_require_measurements():
+    nets, elements = _rows(None, None)
+    for n in nets:
+        n["measured_voltage"] = None
+    assert neighbors.circuit_features(nets, elements) is None
+
+
+def test_search_returns_closest_same_topology():
+    index = neighbors.DiagnosisIndex()
+    index.add(
+        neighbors.circuit_features(*_rows(5.0, 0.0)),
+        "R2 open",
+        verified=True,
+        circuit_id="a",
+    )
+    index.add(
+        neighbors.circuit_features(*_rows(0.45, 4.5e-3)),
+        "R2 wrong decade",
+        circuit_id="b",
+    )
+
+    query = neighbors.circuit_features(*_rows(4.98, 1e-6))
+    found = index.search(query, k=2)
+
+    assert [n.diagnosis for n in found] == ["R2 open", "R2 wrong decade"]
+    assert found[0].verified
+    assert found[0].distance < found[1].distance
+
+
+def test_readding_circuit_replaces_entry():
+    index = neighbors.DiagnosisIndex()
+    features = neighbors.circuit_features(*_rows(5.0, 0.0))
+    index.add(features, "draft", circuit_id="a")
+    index.add(features, "R2 open", verified=True, circuit_id="a")
+
+    assert len(index) == 1
+    (match,) = index.search(features, k=3)
+    assert match.diagnosis == "R2 open"
+    assert match.distance == pytest.approx(0.0)
+
+
+def test_capacity_drops_unverified_first():
+    index = neighbors.DiagnosisIndex(max_per_topology=2)
+    index.add(
+        neighbors.circuit_features(*_rows(5.0, 0.0)),
+        "keep",
+        verified=True,
+        circuit_id="a",
+    )
+    index.add(neighbors.circuit_features(*_rows(4.0, 1e-3)), "old", circuit_id="b")
+    index.add(neighbors.circuit_features(*_rows(3.0, 1e-3)), "new", circuit_id="c")
+
+    diagnoses = {
+        n.diagnosis
+        for n in index.search(neighbors.circuit_features(*_rows(5.0, 0.0)), k=5)
+    }
+    assert diagnoses == {"keep", "new"}
+
+
+def test_auto_named_nodes_do_not_change_topology():
+    nets, elements = _rows(0.5, 4.5e-3)
+    # Same schematic drawn in another order: LTspice swaps the net numbers
+    renumber = {"N001": "N002", "N002": "N001"}
+    renumbered = [
+        dict(e, nodes=[renumber.get(n, n) for n in e["nodes"]]) for e in elements
+    ]
+    renumbered_nets = [
+        dict(n, node_name=renumber.get(n["node_name"], n["node_name"])) for n in nets
+    ]
+
+    a = neighbors.circuit_features(nets, elements)
+    b = neighbors.circuit_features(renumbered_nets, renumbered)
+    assert a.topology == b.topology
+    assert a.vector == pytest.approx(b.vector)
+
+    # Named nodes still count: a relabelled output is a different circuit
+    named = [
+        dict(e, nodes=["OUT" if n == "N002" else n for n in e["nodes"]])
+        for e in elements
+    ]
+    assert neighbors.topology_hash(named) != neighbors.topology_hash(elements)
@@ -0,0 +1,153 @@
+import io
+
+import pytest
+
+from open_webui.spice import netlist
+
+
+BENCH_6_5 = b"""* /Users/blake/Desktop/CAPSTONE/6.5_bench/6.5.asc
+V1 N004 0 5
+V2 N006 0 -5
+R1 N002 N001 100k
+R2 N005 0 4.621k
+R3 N002 N005 5.379k
+C1 N001 0 10u
+XU2 N005 N001 N004 N006 N002 AD8040
+D1 N003 0 D
+D2 0 N003 D
+R4 N003 N002 1k
+.model D D
+.lib "/Users/blake/Library/Application Support/LTspice/lib/sub/ADI.lib"
+.tran 0 10
+.backanno
+.end
+"""
+
+
+@pytest.mark.parametrize(
+    "token, expected",
+    [
+        ("4.621k", 4621.0),
+        ("10u", 10e-6),
+        ("1Meg", 1e6),
+        ("3m", 3e-3),
+        ("4k7", 4700.0),
+        ("100nF", 100e-9),
+        ("-5", -5.0),
+        ("1e-3", 1e-3),
+        ("D", None),
+    ],
+)
+def test_parse_si_value(token, expected):
+    value = netlist.parse_si_value(token)
+    if expected is None:
+        assert value is None
+    else:
+        assert value == pytest.approx(expected)
+
+
+def test_parse_bench_circuit():
+    parsed = netlist.parse_netlist_bytes(BENCH_6_5)
+
+    names = [e.name for e in parsed.elements]
+    assert names == ["V1", "V2", "R1", "R2", "R3", "C1", "XU2", "D1", "D2", "R4"]
+
+    xu2 = parsed.elements[names.index("XU2")]
+    assert xu2.type == "X"
+    assert xu2.model == "AD8040"
+    assert xu2.nodes == ("N005", "N001", "N004", "N006", "N002")
+
+    assert parsed.elements[names.index("R2")].value_si == pytest.approx(4621.0)
+    assert parsed.models["D"]["type"] == "D"
+    assert parsed.includes[0].endswith("ADI.lib")
+    assert ("R4", 0) in parsed.nets["N003"]
+
+
+def test_parse_cache_returns_same_netlist():
+    first = netlist.parse_netlist_bytes(BENCH_6_5)
+    second = netlist.parse_netlist_bytes(BENCH_6_5)
+    assert first is second
+
+    rows = first.element_dicts()
+    rows[0]["simulated_current"] = 1.0
+    assert first.element_dicts()[0]["simulated_current"] is None
+
+
+def test_continuation_and_element_types():
+    parsed = netlist.parse_netlist(
+        "\n".join(
+            [
+                "* title",
+                "L1 a b 10m",
+                "+ ic=0",
+                "Q1 c b 0 2N3904",
+                "M1 d g s s NMOS L=1u W=10u",
+                "E1 o 0 a b 1e5",
+                "G1 o 0 value={V(a)*2}",
+                "F1 o 0 V1 2",
+                "H1 o 0 V1 1k",
+                "B1 o 0 V=V(a)**2",
+            ]
+        )
+    )
+    by_name = {e.name: e for e in parsed.elements}
+
+    assert by_name["L1"].params == {"ic": "0"}
+    assert by_name["L1"].value_si == pytest.approx(10e-3)
+    assert by_name["Q1"].nodes == ("c", "b", "0")
+    assert by_name["Q1"].model == "2N3904"
+    assert by_name["M1"].nodes == ("d", "g", "s", "s")
+    assert by_name["E1"].nodes == ("o", "0", "a", "b")
+    assert by_name["G1"].nodes == ("o", "0")
+    assert by_name["F1"].model == "V1"
+    assert by_name["H1"].value_si == pytest.approx(1e3)
+    assert by_name["B1"].value == "V=V(a)**2"
+
+
+def test_subckt_flatten_with_params():
+    parsed = netlist.parse_netlist(
+        "\n".join(
+            [
+                "* divider",
+                ".param rv=2k",
+                ".subckt div in out gnd params: r=1k",
+                "R1 in out {r}",
+                "R2 out gnd {2*r}",
+                ".ends div",
+                "X1 a b 0 div params: r={rv}",
+                "XU1 a b 0 UNKNOWN",
+            ]
+        )
+    )
+    flat = {e.name: e for e in parsed.flatten()}
+
+    assert flat["X1.R1"].nodes == ("a", "b")
+    assert flat["X1.R2"].nodes == ("b", "0")
+    assert flat["X1.R1"].value_si == pytest.approx(2000.0)
+    assert flat["X1.R2"].value_si == pytest.approx(4000.0)
+    assert flat["XU1"].type == "X"
+
+
+@pytest.mark.parametrize(
+    "encoding, expected",
+    [
+        ("utf-8", "utf-8"),
+        ("utf-16-le", "utf-16-le"),
+        ("utf-16-be", "utf-16-be"),
+        ("utf-16", "utf-16"),
+    ],
+)
+def test_sniff_and_decode(encoding, expected):
+    text = "Circuit: * bench\nV(n001): 5\n"
+    data = text.encode(encoding)
+    assert netlist.sniff_encoding(data[: netlist.SNIFF_BYTES]) == expected
+    assert netlist.decode_text(data) == text
+
+
+def test_read_source_accepts_buffers_streams_and_paths(tmp_path):
+    path = tmp_path / "bench.cir"
+    path.write_bytes(BENCH_6_5)
+
+    assert netlist.read_source(BENCH_6_5) == BENCH_6_5
+    assert netlist.read_source(io.BytesIO(BENCH_6_5)) == BENCH_6_5
+    assert netlist.read_source(str(path)) == BENCH_6_5
@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+
+from open_webui.spice import raw
+
+
+def write_raw(path, n_points=20001, binary=True):
+    t = np.linspace(0.0, 0.01, n_points)
+    v1 = np.sin(2 * np.pi * 1000 * t)
+    v2 = np.full(n_points, 5.0)
+    i1 = 1e-3 * v1
+
+    header = (
+        "Title: * test\n"
+        "Date: Mon Jan 1 00:00:00 2024\n"
+        "Plotname: Transient Analysis\n"
+        "Flags: real forward\n"
+        "No. Variables: 4\n"
+        f"No. Points: {n_points}\n"
+        "Offset:   0.0000000000000000e+000\n"
+        "Command: Linear Technology Corporation LTspice XVII\n"
+        "Variables:\n"
+        "\t0\ttime\ttime\n"
+        "\t1\tV(n001)\tvoltage\n"
+        "\t2\tV(n002)\tvoltage\n"
+        "\t3\tI(R1)\tdevice_current\n"
+    )
+
+    if binary:
+        dtype = np.dtype([("t", "<f8"), ("a", "<f4"), ("b", "<f4"), ("c", "<f4")])
+        records = np.empty(n_points, dtype=dtype)
+        records["t"], records["a"], records["b"], records["c"] = t, v1, v2, i1
+        # LTspice marks compressed points with a negative time stamp.
+        records["t"][3] *= -1
+        path.write_bytes((header + "Binary:\n").encode("utf-16-le") + records.tobytes())
+    else:
+        lines = [header + "Values:"]
+        for k in range(n_points):
+            lines.append(
+                f"{k}\t{t[k]:.15e}\n\t{v1[k]:.9e}\n\t{v2[k]:.9e}\n\t{i1[k]:.9e}"
+            )
+        path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_read_raw_measurements(tmp_path, binary):
+    path = write_raw(
+        tmp_path / "bench.raw", n_points=2001 if not binary else 20001, binary=binary
+    )
+    assert raw.is_raw_file(str(path))
+
+    volts, currs = raw.read_raw_measurements(str(path))
+
+    n001 = volts["N001"]
+    assert n001["max"] == pytest.approx(1.0, abs=1e-3)
+    assert n001["min"] == pytest.approx(-1.0, abs=1e-3)
+    assert n001["pp"] == pytest.approx(2.0, abs=2e-3)
+    assert n001["avg"] == pytest.approx(0.0, abs=1e-3)
+    assert n001["rms"] == pytest.approx(2**-0.5, rel=1e-3)
+    assert n001["freq"] == pytest.approx(1000.0, rel=1e-3)
+
+    assert n001["period"] == pytest.approx(1e-3, rel=1e-3)
+
+    assert volts["N002"]["avg"] == pytest.approx(5.0)
+    assert volts["N002"]["freq"] is None
+    assert currs["R1"]["pp"] == pytest.approx(2e-3, rel=1e-3)
+
+
+def test_log_file_is_not_raw(tmp_path):
+    path = tmp_path / "bench.log"
+    path.write_text("Circuit: * bench\nV(n001): 5\n")
+    assert not raw.is_raw_file(str(path))
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_read_raw_from_buffer_matches_file(tmp_path, binary):
+    path = write_raw(tmp_path / "bench.raw", n_points=2001, binary=binary)
+    data = path.read_bytes()
+    assert raw.is_raw_file(data)
+
+    from_buffer = raw.read_raw_measurements(data)
+    from_file = raw.read_raw_measurements(str(path))
+    assert from_buffer == from_file
+
+
+def test_binary_traces_stay_mapped(tmp_path):
+    path = write_raw(tmp_path / "bench.raw", n_points=2001)
+
+    rf = raw.read_raw(str(path))
+
+    assert [c.dtype for c in rf.columns] == [np.dtype("<f8")] + [np.dtype("<f4")] * 3
+    assert all(isinstance(c, np.memmap) for c in rf.columns)
+    assert rf.trace("V(n002)")[0] == pytest.approx(5.0)
+
+
+def _binary_header(plotname, flags, variables, n_points, command):
+    lines = [
+        "Title: * test",
+        f"Plotname: {plotname}",
+        f"Flags: {flags}",
+        f"No. Variables: {len(variables)}",
+        f"No. Points: {n_points}",
+        f"Command: {command}",
+        "Variables:",
+        *(f"\t{i}\t{name}\t{kind}" for i, (name, kind) in enumerate(variables)),
+        "Binary:",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def test_operating_point_plot_is_all_float32(tmp_path):
+    variables = [
+        ("V(n001)", "voltage"),
+        ("V(n002)", "voltage"),
+        ("I(R1)", "device_current"),
+    ]
+    header = _binary_header(
+        "Operating Point",
+        "real",
+        variables,
+        1,
+        "Linear Technology Corporation LTspice XVII",
+    )
+    values = np.array([5.0, 2.5, 1e-3], dtype="<f4")
+    path = tmp_path / "op.raw"
+    path.write_bytes(header.encode("utf-16-le") + values.tobytes())
+
+    volts, currs = raw.read_raw_measurements(str(path))
+
+    assert volts["N001"]["avg"] == pytest.approx(5.0)
+    assert volts["N002"]["max"] == pytest.approx(2.5)
+    assert currs["R1"]["avg"] == pytest.approx(1e-3)
+
+
+def test_fastaccess_and_ngspice_layouts_match(tmp_path):
+    t = np.linspace(0.0, 0.01, 2001)
+    v = np.sin(2 * np.pi * 1000 * t)
+    variables = [("time", "time"), ("V(n001)", "voltage")]
+
+    fast = tmp_path / "fast.raw"
+    fast.write_bytes(
+        _binary_header(
+            "Transient Analysis",
+            "real forward fastaccess",
+            variables,
+            len(t),
+            "LTspice",
+        ).encode("utf-16-le")
+        + t.astype("<f8").tobytes()
+        + v.astype("<f4").tobytes()
+    )
+
+    # ngspice writes an ASCII header and only doubles, point by point
+    ngspice = tmp_path / "ngspice.raw"
+    ngspice.write_bytes(
+        _binary_header(
+            "Transient Analysis", "real", variables, len(t), "ngspice-42"
+        ).encode()
+        + np.column_stack([t, v]).astype("<f8").tobytes()
+    )
+
+    for path in (fast, ngspice):
+        volts, _ = raw.read_raw_measurements(str(path))
+        assert volts["N001"]["freq"] == pytest.approx(1000.0, rel=1e-3)
+        assert volts["N001"]["rms"] == pytest.approx(2**-0.5, rel=1e-3)
@@ -0,0 +1,46 @@
+from open_webui.spice.sessions import ConversationStore, session_key
+
+
+def test_session_key_separates_users_and_labs():
+    assert session_key("u1", "lab1") != session_key("u1", "lab2")
+    assert session_key("u1", "lab1") != session_key("u2", "lab1")
+    assert session_key("u1") == session_key("u1", None)
+
+
+def test_history_is_trimmed_to_max_turns():
+    store = ConversationStore(max_turns=2)
+    for i in range(3):
+        store.append("s", f"q{i}", f"a{i}")
+
+    assert store.get("s") == [{"user": "q1", "ai": "a1"}, {"user": "q2", "ai": "a2"}]
+    assert store.get("missing") == []
+
+
+def test_least_recently_used_session_is_evicted():
+    store = ConversationStore(max_turns=2, max_sessions=2)
+    store.append("a", "q", "a")
+    store.append("b", "q", "a")
+
+    # Reading "a" makes "b" the least recently used session
+    store.get("a")
+    store.append("c", "q", "a")
+
+    assert len(store) == 2
+    assert store.get("a")
+    assert store.get("b") == []
+    assert store.get("c")
+
+
+def test_append_refreshes_session_and_clear_drops_it():
+    store = ConversationStore(max_turns=2, max_sessions=2)
+    store.append("a", "q1", "a1")
+    store.append("b", "q1", "a1")
+    store.append("a", "q2", "a2")
+    store.append("c", "q1", "a1")
+
+    assert store.get("b") == []
+    assert len(store.get("a")) == 2
+
+    store.clear("a")
+    assert store.get("a") == []
+    assert len(store) == 1
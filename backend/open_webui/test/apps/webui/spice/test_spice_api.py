@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from open_webui import spice_api
+from open_webui.spice_api import MeasurementsRequest, update_circuit_measurements
+
+
+@pytest.fixture
+def store(monkeypatch):
+    circuits = {"c1": {"id": "c1", "user_id": "owner"}, "c2": {"id": "c2"}}
+    recorded = []
+
+    monkeypatch.setattr(spice_api, "CIRCUIT_STORE", "local")
+    monkeypatch.setattr(spice_api, "get_circuit", circuits.get)
+    monkeypatch.setattr(
+        spice_api,
+        "record_measurements",
+        lambda id, nets, currents: recorded.append(id) or True,
+    )
+    return recorded
+
+
+def _user(id, role="user"):
+    return SimpleNamespace(id=id, role=role)
+
+
+def _measurements():
+    return MeasurementsRequest(nets={"OUT": {"voltage": 2.0}}, currents={"R1": 1e-3})
+
+
+def test_owner_and_admin_can_update_measurements(store):
+    assert update_circuit_measurements("c1", _measurements(), user=_user("owner"))
+    assert update_circuit_measurements("c2", _measurements(), user=_user("a", "admin"))
+    assert store == ["c1", "c2"]
+
+
+@pytest.mark.parametrize("circuit_id", ["c1", "c2"])
+def test_other_users_cannot_update_measurements(store, circuit_id):
+    with pytest.raises(HTTPException) as exc:
+        update_circuit_measurements(circuit_id, _measurements(), user=_user("other"))
+    assert exc.value.status_code == 403
+    assert store == []
+
+
+def test_unknown_circuit_is_not_found(store):
+    with pytest.raises(HTTPException) as exc:
+        update_circuit_measurements("missing", _measurements(), user=_user("owner"))
+    assert exc.value.status_code == 404
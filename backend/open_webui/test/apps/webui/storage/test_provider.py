@@ -80,6 +80,13 @@ class TestLocalStorageProvider:
         file_path_return = self.Storage.get_file(file_path)
         assert file_path == file_path_return
 
+    def test_get_file_path(self, monkeypatch, tmp_path):
+        mock_upload_dir(monkeypatch, tmp_path)
+        _, file_path = self.Storage.upload_file(
+            io.BytesIO(self.file_content), self.filename, {}
+        )
+        assert self.Storage.get_file_path(self.filename) == file_path
+
     def test_delete_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         (upload_dir / self.filename).write_bytes(self.file_content)
@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import os
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from open_webui.routers.users import get_user_avatar
+from open_webui.utils.avatars import (
+    PROFILE_IMAGE_URL_PREFIX,
+    get_profile_image_file,
+    store_profile_image,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + os.urandom(32)
+
+
+def _data_uri(data, mime_type="image/png"):
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode()}"
+
+
+def _request(headers=None):
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (key.lower().encode(), value.encode())
+                for key, value in (headers or {}).items()
+            ],
+        }
+    )
+
+
+def test_store_profile_image_is_content_addressed():
+    url = store_profile_image(_data_uri(PNG))
+
+    filename = f"avatar-{hashlib.sha256(PNG).hexdigest()}.png"
+    assert url == f"{PROFILE_IMAGE_URL_PREFIX}{filename}"
+    with open(get_profile_image_file(filename), "rb") as f:
+        assert f.read() == PNG
+
+    # The same image stored again maps to the same file
+    assert store_profile_image(_data_uri(PNG, "image/PNG")) == url
+
+
+def test_store_profile_image_leaves_other_values_alone():
+    svg = _data_uri(b"<svg onload='alert(1)'/>", "image/svg+xml")
+
+    assert store_profile_image(None) is None
+    assert store_profile_image("/user.png") == "/user.png"
+    assert store_profile_image(svg) == svg
+    assert store_profile_image("data:image/png;base64,!!!") == (
+        "data:image/png;base64,!!!"
+    )
+
+
+def test_get_profile_image_file_rejects_other_names():
+    assert get_profile_image_file("../webui.db") is None
+    assert get_profile_image_file("avatar-abc.png") is None
+
+
+@pytest.mark.asyncio
+async def test_avatar_is_served_with_etag_and_revalidated():
+    url = store_profile_image(_data_uri(PNG))
+    filename = url.removeprefix(PROFILE_IMAGE_URL_PREFIX)
+
+    response = await get_user_avatar(filename, _request(), user=None)
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{filename}"'
+    assert "immutable" in response.headers["cache-control"]
+
+    response = await get_user_avatar(
+        filename, _request({"If-None-Match": f'"{filename}"'}), user=None
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == f'"{filename}"'
+
+
+@pytest.mark.asyncio
+async def test_unknown_avatar_is_not_found():
+    with pytest.raises(HTTPException) as exc:
+        await get_user_avatar("avatar-" + "0" * 64 + ".png", _request(), user=None)
+    assert exc.value.status_code == 404
+
+    with pytest.raises(HTTPException) as exc:
+        await get_user_avatar("webui.db", _request(), user=None)
+    assert exc.value.status_code == 404
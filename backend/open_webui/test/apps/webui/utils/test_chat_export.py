@@ -0,0 +1,115 @@
+import json
+import uuid
+
+import pytest
+
+from open_webui.models.chats import ChatForm, Chats
+from open_webui.tasks import get_task_progress
+from open_webui.utils import chat_export
+from open_webui.utils.chat_export import get_export_progress_id, run_chat_export
+
+
+class FakePDF:
+    def output(self, name):
+        with open(name, "wb") as f:
+            f.write(b"%PDF-")
+
+
+class FakePDFGenerator:
+    """Records the pages written; the real one needs fonts fetched at build time."""
+
+    pages = []
+
+    def __init__(self, form_data):
+        self.title = form_data.title
+
+    def create_pdf(self):
+        return FakePDF()
+
+    def write_messages(self, pdf, messages):
+        self.pages.append([message["content"] for message in messages])
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_export, "EXPORT_DIR", tmp_path)
+    monkeypatch.setattr(chat_export, "EXPORT_PAGE_SIZE", 2)
+    monkeypatch.setattr(chat_export, "PDFGenerator", FakePDFGenerator)
+    FakePDFGenerator.pages = []
+    return tmp_path
+
+
+def _new_chat(user_id, messages=1):
+    history = {
+        f"m{i}": {
+            "id": f"m{i}",
+            "parentId": f"m{i - 1}" if i else None,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"message {i}",
+            "timestamp": 1700000000 + i,
+        }
+        for i in range(messages)
+    }
+    return Chats.insert_new_chat(
+        user_id,
+        ChatForm(
+            chat={
+                "title": "Export me",
+                "history": {"messages": history, "currentId": f"m{messages - 1}"},
+            }
+        ),
+    )
+
+
+async def _progress(export_id):
+    return await get_task_progress(None, get_export_progress_id(export_id))
+
+
+@pytest.mark.asyncio
+async def test_exports_all_chats_of_a_user_as_json(export_dir):
+    user_id = str(uuid.uuid4())
+    chats = [_new_chat(user_id) for _ in range(5)]
+    _new_chat(str(uuid.uuid4()))
+
+    export_id = str(uuid.uuid4())
+    await run_chat_export(None, export_id, user_id, "json")
+
+    progress = await _progress(export_id)
+    assert progress["status"] == "completed"
+    assert progress["total"] == progress["completed"] == 5
+
+    with open(export_dir / f"{export_id}.json") as f:
+        exported = json.load(f)
+    assert sorted(chat["id"] for chat in exported) == sorted(c.id for c in chats)
+    assert list(export_dir.iterdir()) == [export_dir / f"{export_id}.json"]
+
+
+@pytest.mark.asyncio
+async def test_exports_one_chat_as_pdf(export_dir):
+    chat = _new_chat(str(uuid.uuid4()), messages=5)
+
+    export_id = str(uuid.uuid4())
+    await run_chat_export(None, export_id, chat.user_id, "pdf", chat_id=chat.id)
+
+    progress = await _progress(export_id)
+    assert progress["status"] == "completed"
+    assert progress["total"] == progress["completed"] == 5
+    # The current branch, in order, a page at a time
+    assert FakePDFGenerator.pages == [
+        ["message 0", "message 1"],
+        ["message 2", "message 3"],
+        ["message 4"],
+    ]
+    with open(export_dir / f"{export_id}.pdf", "rb") as f:
+        assert f.read(5) == b"%PDF-"
+
+
+@pytest.mark.asyncio
+async def test_failed_export_reports_error_and_leaves_no_file(export_dir):
+    export_id = str(uuid.uuid4())
+    await run_chat_export(None, export_id, "user", "json", chat_id="missing")
+
+    progress = await _progress(export_id)
+    assert progress["status"] == "failed"
+    assert "missing" in progress["error"]
+    assert list(export_dir.iterdir()) == []
@@ -0,0 +1,248 @@
+import html
+import json
+import random
+
+import pytest
+
+from open_webui.utils.streaming import ContentBlockSerializer
+
+
+####################################
+# Reference: serialize_content_blocks as it was in process_chat_response
+# before it was made incremental, rendering every block on each call
+####################################
+
+
+def split_content_and_whitespace(content):
+    content_stripped = content.rstrip()
+    original_whitespace = (
+        content[len(content_stripped) :] if len(content) > len(content_stripped) else ""
+    )
+    return content_stripped, original_whitespace
+
+
+def is_opening_code_block(content):
+    backtick_segments = content.split("```")
+    # Even number of segments means the last backticks are opening a new block
+    return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
+
+
+def serialize_content_blocks(content_blocks, raw=False):
+    content = ""
+
+    for block in content_blocks:
+        if block["type"] == "text":
+            block_content = block["content"].strip()
+            if block_content:
+                content = f"{content}{block_content}\n"
+        elif block["type"] == "tool_calls":
+            tool_calls = block.get("content", [])
+            results = block.get("results", [])
+
+            if content and not content.endswith("\n"):
+                content += "\n"
+
+            if results:
+
+                tool_calls_display_content = ""
+                for tool_call in tool_calls:
+
+                    tool_call_id = tool_call.get("id", "")
+                    tool_name = tool_call.get("function", {}).get("name", "")
+                    tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                    tool_result = None
+                    tool_result_files = None
+                    for result in results:
+                        if tool_call_id == result.get("tool_call_id", ""):
+                            tool_result = result.get("content", None)
+                            tool_result_files = result.get("files", None)
+                            break
+
+                    if tool_result is not None:
+                        tool_result_embeds = result.get("embeds", "")
+                        tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}" embeds="{html.escape(json.dumps(tool_result_embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
+                    else:
+                        tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+                if not raw:
+                    content = f"{content}{tool_calls_display_content}"
+            else:
+                tool_calls_display_content = ""
+
+                for tool_call in tool_calls:
+                    tool_call_id = tool_call.get("id", "")
+                    tool_name = tool_call.get("function", {}).get("name", "")
+                    tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                    tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+                if not raw:
+                    content = f"{content}{tool_calls_display_content}"
+
+        elif block["type"] == "reasoning":
+            reasoning_display_content = "\n".join(
+                (f"> {line}" if not line.startswith(">") else line)
+                for line in block["content"].splitlines()
+            )
+
+            reasoning_duration = block.get("duration", None)
+
+            start_tag = block.get("start_tag", "")
+            end_tag = block.get("end_tag", "")
+
+            if content and not content.endswith("\n"):
+                content += "\n"
+
+            if reasoning_duration is not None:
+                if raw:
+                    content = f'{content}{start_tag}{block["content"]}{end_tag}\n'
+                else:
+                    content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
+            else:
+                if raw:
+                    content = f'{content}{start_tag}{block["content"]}{end_tag}\n'
+                else:
+                    content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
+
+        elif block["type"] == "code_interpreter":
+            attributes = block.get("attributes", {})
+            output = block.get("output", None)
+            lang = attributes.get("lang", "")
+
+            content_stripped, original_whitespace = split_content_and_whitespace(
+                content
+            )
+            if is_opening_code_block(content_stripped):
+                # Remove trailing backticks that would open a new block
+                content = content_stripped.rstrip("`").rstrip() + original_whitespace
+            else:
+                # Keep content as is - either closing backticks or no backticks
+                content = content_stripped + original_whitespace
+
+            if content and not content.endswith("\n"):
+                content += "\n"
+
+            if output:
+                output = html.escape(json.dumps(output))
+
+                if raw:
+                    content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
+                else:
+                    content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+            else:
+                if raw:
+                    content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
+                else:
+                    content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+
+        else:
+            block_content = str(block["content"]).strip()
+            if block_content:
+                content = f"{content}{block['type']}: {block_content}\n"
+
+    return content.strip()
+
+
+####################################
+# Random streams, updated the way process_chat_response updates blocks:
+# fields are reassigned, never mutated in place
+####################################
+
+DELTAS = ["a", " b", "\n", "\n\n", "> q", "```", "```py\n", "x = 1", "é", "  ", "\t"]
+
+
+def _delta(rng):
+    return "".join(rng.choice(DELTAS) for _ in range(rng.randint(1, 4)))
+
+
+def _new_block(rng):
+    kind = rng.choice(["text", "reasoning", "tool_calls", "code_interpreter", "x"])
+    if kind == "text":
+        return {"type": "text", "content": _delta(rng)}
+    if kind == "reasoning":
+        return {
+            "type": "reasoning",
+            "start_tag": "<think>",
+            "end_tag": "</think>",
+            "attributes": {},
+            "content": _delta(rng),
+            "started_at": 0,
+        }
+    if kind == "tool_calls":
+        return {
+            "type": "tool_calls",
+            "content": [
+                {
+                    "id": f"call_{i}",
+                    "function": {"name": "ohm", "arguments": '{"v": "<5>"}'},
+                }
+                for i in range(rng.randint(1, 2))
+            ],
+        }
+    if kind == "code_interpreter":
+        return {
+            "type": "code_interpreter",
+            "attributes": {"lang": "python"},
+            "content": _delta(rng),
+        }
+    return {"type": "x", "content": _delta(rng)}
+
+
+def _update(rng, blocks):
+    op = rng.random()
+    if not blocks or op < 0.15:
+        blocks.append(_new_block(rng))
+    elif op < 0.6:
+        block = blocks[-1]
+        if isinstance(block["content"], str):
+            block["content"] = block["content"] + _delta(rng)
+        else:
+            blocks.append({"type": "text", "content": _delta(rng)})
+    elif op < 0.7:
+        blocks.pop()
+    elif op < 0.8:
+        block = rng.choice(blocks)
+        if block["type"] == "reasoning":
+            block["duration"] = rng.randint(1, 9)
+        elif block["type"] == "tool_calls":
+            block["results"] = [
+                {"tool_call_id": "call_0", "content": "5 Ω", "files": ["a.png"]}
+            ]
+        elif block["type"] == "code_interpreter":
+            block["output"] = {"stdout": "1\n"}
+        else:
+            block["content"] = _delta(rng)
+    elif op < 0.9:
+        # Replace an earlier block, as the tool call handling does
+        blocks[rng.randrange(len(blocks))] = _new_block(rng)
+    else:
+        # A new list sharing the block objects
+        blocks[:] = list(blocks)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_full_rendering_on_random_streams(seed):
+    rng = random.Random(seed)
+    serializer = ContentBlockSerializer()
+    blocks = []
+
+    for _ in range(200):
+        _update(rng, blocks)
+        for raw in (False, True):
+            assert serializer.serialize(blocks, raw) == serialize_content_blocks(
+                blocks, raw
+            )
+
+
+def test_matches_full_rendering_for_a_fresh_list():
+    rng = random.Random(0)
+    serializer = ContentBlockSerializer()
+    blocks = []
+    for _ in range(50):
+        _update(rng, blocks)
+    serializer.serialize(blocks)
+
+    other = [dict(block) for block in blocks]
+    other.insert(0, {"type": "text", "content": "first"})
+    assert serializer.serialize(other) == serialize_content_blocks(other)
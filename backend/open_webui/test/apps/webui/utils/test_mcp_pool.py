@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+import pytest
+from mcp import types
+
+from open_webui.utils.mcp import pool as mcp_pool
+
+
+class FakeSession:
+    def __init__(self, client):
+        self.client = client
+
+    async def send_ping(self):
+        self.client.pings += 1
+        if self.client.ping_fails:
+            raise ConnectionError("server went away")
+
+
+class FakeMCPClient:
+    instances = []
+
+    def __init__(self, message_handler=None):
+        self.message_handler = message_handler
+        self.session = None
+        self.url = None
+        self.headers = None
+        self.pings = 0
+        self.ping_fails = False
+        self.tool_lists = 0
+        self.disconnected = False
+        FakeMCPClient.instances.append(self)
+
+    async def connect(self, url, headers=None):
+        await asyncio.sleep(0.01)  # let concurrent callers interleave
+        self.url, self.headers = url, headers
+        self.session = FakeSession(self)
+
+    async def disconnect(self):
+        self.session = None
+        self.disconnected = True
+
+    async def list_tool_specs(self):
+        self.tool_lists += 1
+        return [{"name": f"tool_{self.tool_lists}"}]
+
+    async def call_tool(self, function_name, function_args):
+        if self.session is None:
+            raise ConnectionError("session closed")
+        return {"tool": function_name, "args": function_args}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    FakeMCPClient.instances = []
+    monkeypatch.setattr(mcp_pool, "MCPClient", FakeMCPClient)
+    return mcp_pool.MCPSessionPool(idle_timeout=60)
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_reused_per_url_and_headers(pool):
+    a = await pool.get("http://mcp/a", {"Authorization": "Bearer 1", "X": "y"})
+    again = await pool.get("http://mcp/a", {"X": "y", "Authorization": "Bearer 1"})
+    other_user = await pool.get("http://mcp/a", {"Authorization": "Bearer 2"})
+    other_server = await pool.get("http://mcp/b", {"Authorization": "Bearer 1"})
+
+    assert again is a
+    assert len({id(a), id(other_user), id(other_server)}) == 3
+    assert len(FakeMCPClient.instances) == 3
+    assert other_user.client.headers == {"Authorization": "Bearer 2"}
+
+    await pool.close_all()
+    assert all(client.disconnected for client in FakeMCPClient.instances)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_opens_one_session(pool):
+    sessions = await asyncio.gather(*(pool.get("http://mcp/a") for _ in range(5)))
+
+    assert all(session is sessions[0] for session in sessions)
+    assert len(FakeMCPClient.instances) == 1
+    await pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_idle_session_is_pinged_before_reuse(pool):
+    session = await pool.get("http://mcp/a")
+
+    # Recently used: handed out without a ping
+    assert await pool.get("http://mcp/a") is session
+    assert session.client.pings == 0
+
+    session.last_used -= mcp_pool.HEALTH_CHECK_INTERVAL + 1
+    assert await pool.get("http://mcp/a") is session
+    assert session.client.pings == 1
+
+    session.last_used -= mcp_pool.HEALTH_CHECK_INTERVAL + 1
+    session.client.ping_fails = True
+    replacement = await pool.get("http://mcp/a")
+    assert replacement is not session
+    assert session.client.disconnected
+    await pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_evicted_unless_busy(pool):
+    idle = await pool.get("http://mcp/idle")
+    busy = await pool.get("http://mcp/busy")
+    idle.last_used = busy.last_used = time.monotonic() - pool.idle_timeout - 1
+    busy.active_calls = 1
+
+    await pool.evict_idle()
+
+    assert idle.client.disconnected
+    assert not busy.client.disconnected
+    assert await pool.get("http://mcp/busy") is busy
+    busy.active_calls = 0
+    await pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_failed_call_on_dead_session_invalidates_it(pool):
+    session = await pool.get("http://mcp/a")
+    assert await session.call_tool("echo", {"x": 1}) == {
+        "tool": "echo",
+        "args": {"x": 1},
+    }
+
+    # The server dropped the connection
+    session.client.session = None
+    with pytest.raises(ConnectionError):
+        await session.call_tool("echo", {"x": 1})
+    assert session.active_calls == 0
+    assert not session.alive
+    await pool.invalidate(session)
+
+    replacement = await pool.get("http://mcp/a")
+    assert replacement is not session
+    assert replacement.alive
+
+    # Invalidating the stale session again leaves its replacement pooled
+    await pool.invalidate(session)
+    assert await pool.get("http://mcp/a") is replacement
+    await pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_tool_specs_are_cached_until_ttl_or_list_changed(pool, monkeypatch):
+    monkeypatch.setattr(mcp_pool, "MCP_TOOL_SPECS_CACHE_TTL", 300)
+    session = await pool.get("http://mcp/a")
+
+    assert await session.list_tool_specs() == [{"name": "tool_1"}]
+    assert await session.list_tool_specs() == [{"name": "tool_1"}]
+    assert session.client.tool_lists == 1
+
+    session.tool_specs_at -= 301
+    assert await session.list_tool_specs() == [{"name": "tool_2"}]
+
+    await session._handle_message(
+        types.ServerNotification(
+            types.ToolListChangedNotification(method="notifications/tools/list_changed")
+        )
+    )
+    assert await session.list_tool_specs() == [{"name": "tool_3"}]
+    assert session.client.tool_lists == 3
+    await pool.close_all()
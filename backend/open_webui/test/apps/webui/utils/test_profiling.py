@@ -0,0 +1,97 @@
+import uuid
+
+import pytest
+
+from open_webui.models.users import Users
+from open_webui.utils import profiling
+from open_webui.utils.auth import create_token
+from open_webui.utils.profiling import RequestProfilingMiddleware
+
+
+def _scope(headers=None, query_string=b""):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/models",
+        "query_string": query_string,
+        "headers": [
+            (key.lower().encode(), value.encode())
+            for key, value in (headers or {}).items()
+        ],
+    }
+
+
+def _token(role):
+    id = str(uuid.uuid4())
+    Users.insert_new_user(id, "Ada", f"{id}@example.com", role=role)
+    return create_token({"id": id})
+
+
+async def _call(scope):
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def send(message):
+        sent.append(message)
+
+    await RequestProfilingMiddleware(app)(scope, None, send)
+    return dict(sent[0]["headers"])
+
+
+@pytest.fixture(autouse=True)
+def profiles_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "get_profiles_dir", lambda: tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "headers, query_string, expected",
+    [
+        ({"X-Profile": "1"}, b"", True),
+        ({"X-Profile": "TRUE"}, b"", True),
+        ({"X-Profile": "0"}, b"profile=1", False),
+        ({}, b"a=b&profile=1", True),
+        ({}, b"profile=true", True),
+        ({}, b"xprofile=1", False),
+        ({}, b"profile=10", False),
+        ({}, b"", False),
+    ],
+)
+def test_wants_profile(headers, query_string, expected):
+    scope = _scope(headers, query_string)
+    assert RequestProfilingMiddleware._wants_profile(scope) is expected
+
+
+@pytest.mark.asyncio
+async def test_admin_requests_are_profiled(profiles_dir):
+    headers = await _call(
+        _scope({"Authorization": f"Bearer {_token('admin')}", "X-Profile": "1"})
+    )
+
+    profile_id = headers[b"x-profile-id"].decode()
+    assert (profiles_dir / f"{profile_id}.folded").exists()
+
+
+@pytest.mark.asyncio
+async def test_admin_cookie_is_accepted():
+    headers = await _call(_scope({"Cookie": f"token={_token('admin')}"}, b"profile=1"))
+    assert b"x-profile-id" in headers
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "authorization",
+    [None, "Bearer not-a-token", "user"],
+)
+async def test_other_requests_are_not_profiled(profiles_dir, authorization):
+    headers = {"X-Profile": "1"}
+    if authorization == "user":
+        headers["Authorization"] = f"Bearer {_token('user')}"
+    elif authorization:
+        headers["Authorization"] = authorization
+
+    assert b"x-profile-id" not in await _call(_scope(headers))
+    assert list(profiles_dir.iterdir()) == []
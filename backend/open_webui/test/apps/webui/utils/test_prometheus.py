@@ -0,0 +1,75 @@
+from opentelemetry.metrics import Observation
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
+
+from open_webui.utils.telemetry.prometheus import render_metrics
+
+
+def _render(record):
+    reader = InMemoryMetricReader()
+    provider = MeterProvider(
+        metric_readers=[reader],
+        views=[
+            View(
+                instrument_name="webui.stage.duration",
+                aggregation=ExplicitBucketHistogramAggregation([10, 100]),
+            )
+        ],
+    )
+    record(provider.get_meter("test"))
+    try:
+        return render_metrics(reader.get_metrics_data())
+    finally:
+        provider.shutdown()
+
+
+def test_counter_is_rendered_with_total_suffix_and_labels():
+    def record(meter):
+        counter = meter.create_counter("webui.cache.requests", description="Lookups")
+        counter.add(2, {"cache": "users", "result": "hit"})
+        counter.add(1, {"cache": "users", "result": "hit"})
+        counter.add(1, {"cache": "users", "result": "miss"})
+
+    assert _render(record).splitlines() == [
+        "# HELP webui_cache_requests_total Lookups",
+        "# TYPE webui_cache_requests_total counter",
+        'webui_cache_requests_total{cache="users",result="hit"} 3',
+        'webui_cache_requests_total{cache="users",result="miss"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    def record(meter):
+        histogram = meter.create_histogram("webui.stage.duration", unit="ms")
+        for value in [5, 50, 60, 500]:
+            histogram.record(value, {"stage": "rag"})
+
+    assert _render(record).splitlines() == [
+        "# TYPE webui_stage_duration histogram",
+        'webui_stage_duration_bucket{stage="rag",le="10.0"} 1',
+        'webui_stage_duration_bucket{stage="rag",le="100.0"} 3',
+        'webui_stage_duration_bucket{stage="rag",le="+Inf"} 4',
+        'webui_stage_duration_sum{stage="rag"} 615',
+        'webui_stage_duration_count{stage="rag"} 4',
+    ]
+
+
+def test_gauges_and_label_values_are_escaped():
+    def record(meter):
+        meter.create_up_down_counter("webui.active").add(-1)
+        meter.create_observable_gauge(
+            "webui.queue",
+            callbacks=[lambda options: [Observation(1.5, {"name": 'a"b\nc'})]],
+        )
+
+    assert _render(record).splitlines() == [
+        "# TYPE webui_active gauge",
+        "webui_active -1",
+        "# TYPE webui_queue gauge",
+        'webui_queue{name="a\\"b\\nc"} 1.5',
+    ]
+
+
+def test_empty_metrics():
+    assert render_metrics(None) == "\n"
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from open_webui.utils.startup import LazyASGIApp, LazyProxy, StartupTimer
+
+
+class Model:
+    def __init__(self):
+        self.dimensions = 384
+
+    def __call__(self, text):
+        return [len(text)]
+
+    def encode(self, text):
+        return text.upper()
+
+
+def test_lazy_proxy_loads_on_first_use_only():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return Model()
+
+    proxy = LazyProxy(loader, "model")
+    assert bool(proxy)
+    assert "unloaded" in repr(proxy)
+    assert calls == []
+
+    assert proxy.encode("ohm") == "OHM"
+    assert proxy("volt") == [4]
+    assert proxy.dimensions == 384
+    assert calls == [1]
+
+
+def test_lazy_proxy_loads_once_across_threads():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return Model()
+
+    proxy = LazyProxy(loader, "model")
+    threads = [threading.Thread(target=lambda: proxy.encode("x")) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+
+
+def test_lazy_proxy_retries_after_failed_load():
+    results = [None, Model()]
+    proxy = LazyProxy(lambda: results.pop(0), "model")
+
+    with pytest.raises(RuntimeError, match="model could not be loaded"):
+        proxy.encode("x")
+    assert proxy.encode("x") == "X"
+
+
+@pytest.mark.asyncio
+async def test_lazy_asgi_app_loads_once():
+    calls = []
+    received = []
+
+    async def app(scope, receive, send):
+        received.append(scope["path"])
+
+    def loader():
+        calls.append(1)
+        return app
+
+    lazy = LazyASGIApp(loader, "app")
+    await asyncio.gather(*(lazy({"path": f"/{i}"}, None, None) for i in range(3)))
+
+    assert calls == [1]
+    assert sorted(received) == ["/0", "/1", "/2"]
+
+
+def test_startup_timer_records_marks_and_phases():
+    timer = StartupTimer()
+    time.sleep(0.01)
+    timer.mark("imports")
+    with timer.phase("models"):
+        time.sleep(0.02)
+    timer.mark("routers")
+
+    report = timer.report()
+    assert list(report["phases"]) == ["imports", "models", "routers"]
+    assert report["phases"]["imports"] >= 0.01
+    assert report["phases"]["models"] >= 0.02
+    # The phase moves the last mark, so it is not counted again
+    assert report["phases"]["routers"] < 0.01
+    assert report["total"] >= sum(report["phases"].values()) - 0.003
+
+
+def test_startup_timer_phase_records_on_error():
+    timer = StartupTimer()
+    with pytest.raises(ValueError):
+        with timer.phase("dependencies"):
+            raise ValueError()
+
+    assert "dependencies" in timer.report()["phases"]
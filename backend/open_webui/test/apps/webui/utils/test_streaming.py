@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from open_webui.utils.streaming import StreamEmitter, iter_sse_data
+
+
+async def _aiter(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(chunks):
+    return [data async for data in iter_sse_data(_aiter(chunks))]
+
+
+@pytest.mark.asyncio
+async def test_iter_sse_data_joins_lines_split_across_chunks():
+    assert await _collect([b'data: {"a"', b": 1}\n\nda", b'ta: {"b": 2}\n\n']) == [
+        '{"a": 1}',
+        '{"b": 2}',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_sse_data_splits_merged_events():
+    chunk = (
+        b'data: {"a": 1}\n\ndata: {"b": 2}\n\n: keep-alive\nevent: x\ndata: [DONE]\n\n'
+    )
+    assert await _collect([chunk]) == ['{"a": 1}', '{"b": 2}']
+
+
+@pytest.mark.asyncio
+async def test_iter_sse_data_decodes_characters_split_across_chunks():
+    encoded = 'data: "Ω"\n'.encode()
+    split = encoded.index("Ω".encode()) + 1
+    assert await _collect([encoded[:split], encoded[split:]]) == ['"Ω"']
+
+
+@pytest.mark.asyncio
+async def test_iter_sse_data_handles_events_without_newlines():
+    assert await _collect(["data: 1", "data: 2", "data: 3"]) == ["1", "2", "3"]
+
+
+class Recorder:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def __call__(self, event, superseded=False):
+        assert superseded
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(event["data"])
+
+
+@pytest.mark.asyncio
+async def test_stream_emitter_coalesces_updates_within_interval():
+    recorder = Recorder()
+    emitter = StreamEmitter(recorder, interval=0.05, max_bytes=10_000)
+
+    for i in range(10):
+        emitter.push({"content": str(i)}, size=1)
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.1)
+
+    # The first update goes out right away, the rest collapse into the latest
+    assert recorder.sent == [{"content": "0"}, {"content": "9"}]
+
+
+@pytest.mark.asyncio
+async def test_stream_emitter_sends_early_over_max_bytes():
+    recorder = Recorder()
+    emitter = StreamEmitter(recorder, interval=10, max_bytes=5)
+
+    emitter.push({"content": "a"}, size=1)
+    await asyncio.sleep(0)
+    emitter.push({"content": "ab"}, size=1)
+    await asyncio.sleep(0.01)
+    assert recorder.sent == [{"content": "a"}]
+
+    emitter.push({"content": "abcdef"}, size=5)
+    await asyncio.sleep(0.01)
+    assert recorder.sent[-1] == {"content": "abcdef"}
+
+
+@pytest.mark.asyncio
+async def test_stream_emitter_waits_for_min_deltas_and_serializes_lazily():
+    recorder = Recorder()
+    emitter = StreamEmitter(recorder, interval=0, max_bytes=10_000, min_deltas=3)
+    calls = []
+
+    def update(i):
+        def data():
+            calls.append(i)
+            return {"content": str(i)}
+
+        return data
+
+    emitter.push(update(1))
+    emitter.push(update(2))
+    await asyncio.sleep(0.01)
+    assert recorder.sent == []
+
+    emitter.push(update(3))
+    await asyncio.sleep(0.01)
+    assert recorder.sent == [{"content": "3"}]
+    # Superseded updates are never serialized
+    assert calls == [3]
+
+
+@pytest.mark.asyncio
+async def test_stream_emitter_flush_sends_pending_before_later_events():
+    recorder = Recorder(delay=0.02)
+    emitter = StreamEmitter(recorder, interval=10, max_bytes=10_000)
+
+    emitter.push({"content": "a"})
+    await asyncio.sleep(0)
+    emitter.push({"content": "ab"})
+    emitter.push({"content": "abc"})
+
+    # Slow client: the pending update waits for the send in flight
+    await emitter.flush()
+    recorder.sent.append({"done": True})
+    await emitter.flush()
+
+    assert recorder.sent == [{"content": "a"}, {"content": "abc"}, {"done": True}]
@@ -0,0 +1,198 @@
+import hashlib
+import json
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.utils import tools
+
+SERVERS = [
+    {
+        "id": "weather",
+        "idx": 0,
+        "specs": [{"name": "forecast"}, {"name": "alerts"}],
+    },
+    {"id": "files", "idx": 1, "specs": [{"name": "read"}]},
+]
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+
+
+class FakeRedis:
+    def __init__(self, messages=()):
+        self.data = {}
+        self.published = []
+        self.gets = 0
+        self.messages = list(messages)
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.data[key] = value
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def pubsub(self):
+        return FakePubSub(self.messages)
+
+
+def _app(redis):
+    return SimpleNamespace(
+        state=SimpleNamespace(
+            redis=redis,
+            config=SimpleNamespace(TOOL_SERVER_CONNECTIONS=[{}, {}]),
+            TOOL_SERVERS=None,
+        )
+    )
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    async def get_tool_servers_data(connections):
+        calls.append(connections)
+        return json.loads(json.dumps(SERVERS))
+
+    monkeypatch.setattr(tools, "tool_server_registry", tools.ToolServerRegistry())
+    monkeypatch.setattr(tools, "get_tool_servers_data", get_tool_servers_data)
+    return calls
+
+
+def test_registry_indexes_servers_and_functions():
+    registry = tools.ToolServerRegistry()
+    assert registry.stale
+
+    registry.load(SERVERS, "v1")
+
+    assert not registry.stale
+    assert registry.get_server("files")["idx"] == 1
+    assert registry.get_function_spec("weather", "alerts") == {"name": "alerts"}
+    assert registry.get_function_spec("files", "alerts") is None
+    assert registry.get_server("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_shares_specs_and_publishes_only_changes(fetches):
+    redis = FakeRedis()
+    app = _app(redis)
+
+    await tools.refresh_tool_servers(app)
+    await tools.refresh_tool_servers(app)
+
+    data = redis.data[tools.REDIS_TOOL_SERVERS_KEY]
+    version = hashlib.sha256(data.encode()).hexdigest()
+    assert json.loads(data) == SERVERS
+    assert tools.tool_server_registry.version == version
+    assert app.state.TOOL_SERVERS == SERVERS
+    # The second refresh found the same specs: nothing to announce
+    assert redis.published == [(tools.REDIS_TOOL_SERVERS_CHANNEL, version)]
+
+
+@pytest.mark.asyncio
+async def test_stale_worker_reloads_from_redis_without_fetching(fetches):
+    redis = FakeRedis()
+    redis.data[tools.REDIS_TOOL_SERVERS_KEY] = json.dumps(SERVERS).encode()
+    request = SimpleNamespace(app=_app(redis))
+
+    assert await tools.get_tool_servers(request) == SERVERS
+    assert await tools.get_tool_servers(request) == SERVERS
+
+    assert fetches == []
+    assert redis.gets == 1
+    assert tools.tool_server_registry.get_server("weather")["idx"] == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_redis_copy_triggers_a_refresh(fetches):
+    request = SimpleNamespace(app=_app(FakeRedis()))
+
+    assert await tools.get_tool_servers(request) == SERVERS
+    assert len(fetches) == 1
+
+
+@pytest.mark.asyncio
+async def test_listener_marks_registry_stale_on_new_versions(fetches):
+    tools.tool_server_registry.load(SERVERS, "v1")
+    redis = FakeRedis(
+        messages=[
+            {"type": "subscribe", "data": 1},
+            {"type": "message", "data": b"v1"},
+        ]
+    )
+
+    await tools.redis_tool_servers_listener(_app(redis))
+    assert not tools.tool_server_registry.stale
+
+    redis.messages.append({"type": "message", "data": b"v2"})
+    await tools.redis_tool_servers_listener(_app(redis))
+    assert tools.tool_server_registry.stale
+
+
+SPEC = {
+    "paths": {
+        "/forecast": {
+            "get": {
+                "operationId": "forecast",
+                "summary": "Weather forecast",
+                "parameters": [
+                    {"name": "city", "required": True, "schema": {"type": "string"}}
+                ],
+            }
+        }
+    }
+}
+
+
+@pytest.fixture
+def payload_builds(monkeypatch):
+    builds = []
+    build = tools.build_tool_payload
+
+    def counting_build(spec):
+        builds.append(spec)
+        return build(spec)
+
+    monkeypatch.setattr(tools, "_tool_payload_cache", OrderedDict())
+    monkeypatch.setattr(tools, "build_tool_payload", counting_build)
+    return builds
+
+
+def test_tool_payload_is_memoized_by_spec_content(payload_builds):
+    first = tools.convert_openapi_to_tool_payload(SPEC)
+    first[0]["name"] = "mutated"
+    second = tools.convert_openapi_to_tool_payload(json.loads(json.dumps(SPEC)))
+
+    assert len(payload_builds) == 1
+    # Callers get copies, so mutating one does not poison the cache
+    assert second[0]["name"] == "forecast"
+    assert second[0]["parameters"]["required"] == ["city"]
+
+
+def test_tool_payload_cache_is_bounded(payload_builds, monkeypatch):
+    monkeypatch.setattr(tools, "TOOL_PAYLOAD_CACHE_SIZE", 2)
+    specs = [{"paths": {}, "info": {"title": str(i)}} for i in range(3)]
+
+    for spec in specs:
+        tools.convert_openapi_to_tool_payload(spec)
+    tools.convert_openapi_to_tool_payload(specs[2])
+    tools.convert_openapi_to_tool_payload(specs[0])
+
+    assert len(tools._tool_payload_cache) == 2
+    # specs[0] was evicted as least recently used and rebuilt
+    assert payload_builds == [*specs, specs[0]]
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import uuid
 import jwt
@@ -21,7 +22,7 @@ from typing import Optional, Union, List, Dict
 
 from opentelemetry import trace
 
-from open_webui.models.users import Users
+from open_webui.models.users import REDIS_USER_CACHE_CHANNEL, Users
 
 from open_webui.constants import ERROR_MESSAGES
 
@@ -34,6 +35,7 @@ from open_webui.env import (
     STATIC_DIR,
     SRC_LOG_LEVELS,
     WEBUI_AUTH_TRUSTED_EMAIL_HEADER,
+    USER_LAST_ACTIVE_FLUSH_INTERVAL,
 )
 
 from fastapi import BackgroundTasks, Depends, HTTPException, Request, Response, status
@@ -272,7 +274,7 @@ def get_current_user(
             )
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = Users.get_cached_user_by_id(data["id"])
             if user is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -299,7 +301,9 @@ def get_current_user(
 
                 # Refresh the user's last active timestamp asynchronously
                 # to prevent blocking the request
-                if background_tasks:
+                if USER_LAST_ACTIVE_FLUSH_INTERVAL > 0:
+                    Users.record_user_last_active(user.id)
+                elif background_tasks:
                     background_tasks.add_task(
                         Users.update_user_last_active_by_id, user.id
                     )
@@ -341,11 +345,40 @@ def get_current_user_by_api_key(api_key: str):
             current_span.set_attribute("client.user.role", user.role)
             current_span.set_attribute("client.auth.type", "api_key")
 
-        Users.update_user_last_active_by_id(user.id)
+        if USER_LAST_ACTIVE_FLUSH_INTERVAL > 0:
+            Users.record_user_last_active(user.id)
+        else:
+            Users.update_user_last_active_by_id(user.id)
 
     return user
 
 
+async def periodic_user_last_active_flush():
+    if USER_LAST_ACTIVE_FLUSH_INTERVAL <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(USER_LAST_ACTIVE_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(Users.flush_user_last_active)
+        except Exception as e:
+            log.exception(f"Error flushing last active timestamps: {e}")
+
+
+async def redis_user_cache_listener(app):
+    pubsub = app.state.redis.pubsub()
+    await pubsub.subscribe(REDIS_USER_CACHE_CHANNEL)
+
+    async for message in pubsub.listen():
+        if message["type"] != "message":
+            continue
+
+        id = message["data"]
+        if isinstance(id, bytes):
+            id = id.decode()
+        Users.drop_cached_user(id)
+
+
 def get_verified_user(user=Depends(get_current_user)):
     if user.role not in {"user", "admin"}:
         raise HTTPException(
@@ -0,0 +1,85 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+import re
+from typing import Optional
+
+from open_webui.config import UPLOAD_DIR
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.storage.provider import Storage
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+PROFILE_IMAGE_URL_PREFIX = "/api/v1/users/avatars/"
+
+# SVG is left inline, serving it from our origin would allow scripts
+PROFILE_IMAGE_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+PROFILE_IMAGE_FILENAME_PATTERN = re.compile(
+    r"avatar-([0-9a-f]{64})\.(png|jpg|gif|webp)"
+)
+
+
+def store_profile_image(profile_image_url: Optional[str]) -> Optional[str]:
+    """
+    Moves an inline data URI avatar into storage under its content hash and
+    returns the URL it is served from. Other values are returned unchanged.
+    """
+    if not profile_image_url or not profile_image_url.startswith("data:image"):
+        return profile_image_url
+
+    try:
+        header, base64_data = profile_image_url.split(",", 1)
+        mime_type = header.removeprefix("data:").split(";")[0].lower()
+        extension = PROFILE_IMAGE_EXTENSIONS.get(mime_type)
+        if extension is None:
+            return profile_image_url
+
+        image_data = base64.b64decode(base64_data)
+        digest = hashlib.sha256(image_data).hexdigest()
+        filename = f"avatar-{digest}.{extension}"
+    except Exception as e:
+        log.error(f"Error decoding profile image: {e}")
+        return profile_image_url
+
+    # Same content, same file; skip the upload if we already have it
+    file_path = f"{UPLOAD_DIR}/{filename}"
+    if not os.path.isfile(file_path):
+        try:
+            Storage.upload_file(
+                io.BytesIO(image_data), filename, {"OpenWebUI-Avatar": digest}
+            )
+        except Exception as e:
+            log.error(f"Error storing profile image: {e}")
+            # Remote providers write the local copy first, drop it so the
+            # next attempt uploads again
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+            return profile_image_url
+
+    return f"{PROFILE_IMAGE_URL_PREFIX}{filename}"
+
+
+def get_profile_image_file(filename: str) -> Optional[str]:
+    """Returns a local path for a stored avatar, or None if the name is invalid."""
+    if not PROFILE_IMAGE_FILENAME_PATTERN.fullmatch(filename):
+        return None
+
+    # Every provider keeps a local copy in UPLOAD_DIR
+    file_path = f"{UPLOAD_DIR}/{filename}"
+    if os.path.isfile(file_path):
+        return file_path
+
+    # The local provider returns the path without checking it exists
+    file_path = Storage.get_file(Storage.get_file_path(filename))
+    return file_path if os.path.isfile(file_path) else None
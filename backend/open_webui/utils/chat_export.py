@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from open_webui.config import CACHE_DIR
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.chats import ChatResponse, Chats, ChatTitleMessagesForm
+from open_webui.tasks import set_task_progress
+from open_webui.utils.misc import get_message_list
+from open_webui.utils.pdf_generator import PDFGenerator
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+EXPORT_DIR = CACHE_DIR / "exports"
+
+# Chats (JSON) or messages (PDF) handled per step in a worker thread
+EXPORT_PAGE_SIZE = 20
+
+# Matches how long task progress entries are kept
+EXPORT_FILE_TTL = 24 * 60 * 60
+
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "pdf": "application/pdf",
+}
+
+
+def get_export_progress_id(export_id: str) -> str:
+    return f"chat_export:{export_id}"
+
+
+def get_export_file_path(export_id: str, format: str) -> Path:
+    return EXPORT_DIR / f"{export_id}.{format}"
+
+
+def cleanup_exports():
+    """Remove export files older than EXPORT_FILE_TTL."""
+    if not EXPORT_DIR.exists():
+        return
+
+    cutoff = time.time() - EXPORT_FILE_TTL
+    for path in EXPORT_DIR.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError as e:
+            log.debug(f"Error removing export file {path}: {e}")
+
+
+def write_chats_json_page(
+    f, user_id: Optional[str], after: Optional[tuple[int, str]], first: bool
+) -> tuple[int, Optional[tuple[int, str]]]:
+    chats = Chats.get_chats_after(user_id=user_id, after=after, limit=EXPORT_PAGE_SIZE)
+    for idx, chat in enumerate(chats):
+        if not (first and idx == 0):
+            f.write(",")
+        f.write(ChatResponse(**chat.model_dump()).model_dump_json())
+
+    if not chats:
+        return 0, after
+    return len(chats), (chats[-1].created_at, chats[-1].id)
+
+
+async def export_chats_json(
+    redis, export_id: str, path: Path, progress: dict, user_id: Optional[str]
+):
+    """
+    Write chats as a JSON list, the same shape /chats/all returns, a page
+    of chats at a time.
+    """
+    progress["total"] = await asyncio.to_thread(Chats.count_chats, user_id)
+    await set_task_progress(redis, get_export_progress_id(export_id), progress)
+
+    with open(path, "w") as f:
+        f.write("[")
+        after = None
+        while True:
+            count, after = await asyncio.to_thread(
+                write_chats_json_page, f, user_id, after, progress["completed"] == 0
+            )
+            if count == 0:
+                break
+
+            progress["completed"] += count
+            await set_task_progress(redis, get_export_progress_id(export_id), progress)
+        f.write("]")
+
+
+async def export_chat_json(redis, export_id: str, path: Path, progress: dict, chat):
+    progress["total"] = 1
+    with open(path, "w") as f:
+        f.write("[")
+        f.write(ChatResponse(**chat.model_dump()).model_dump_json())
+        f.write("]")
+    progress["completed"] = 1
+
+
+async def export_chat_pdf(redis, export_id: str, path: Path, progress: dict, chat):
+    """
+    Render the current branch of a chat to PDF, a page of messages per step.
+    """
+    history = chat.chat.get("history", {})
+    messages = get_message_list(
+        history.get("messages", {}), history.get("currentId")
+    ) or chat.chat.get("messages", [])
+
+    progress["total"] = len(messages)
+    await set_task_progress(redis, get_export_progress_id(export_id), progress)
+
+    generator = PDFGenerator(ChatTitleMessagesForm(title=chat.title, messages=[]))
+    pdf = await asyncio.to_thread(generator.create_pdf)
+
+    for start in range(0, len(messages), EXPORT_PAGE_SIZE):
+        page = messages[start : start + EXPORT_PAGE_SIZE]
+        await asyncio.to_thread(generator.write_messages, pdf, page)
+
+        progress["completed"] += len(page)
+        await set_task_progress(redis, get_export_progress_id(export_id), progress)
+
+    await asyncio.to_thread(pdf.output, str(path))
+
+
+async def run_chat_export(
+    redis,
+    export_id: str,
+    user_id: str,
+    format: str,
+    chat_id: Optional[str] = None,
+    all_users: bool = False,
+):
+    """
+    Export one chat (JSON or PDF) or all chats of a user (JSON) to a file in
+    EXPORT_DIR, reporting progress through the task progress store.
+    """
+    progress = {
+        "status": "running",
+        "user_id": user_id,
+        "format": format,
+        "total": 0,
+        "completed": 0,
+    }
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    path = get_export_file_path(export_id, format)
+    partial_path = path.with_name(f"{path.name}.part")
+
+    try:
+        if chat_id:
+            chat = await asyncio.to_thread(Chats.get_chat_by_id, chat_id)
+            if chat is None:
+                raise ValueError(f"Chat {chat_id} not found")
+
+            if format == "pdf":
+                await export_chat_pdf(redis, export_id, partial_path, progress, chat)
+            else:
+                await export_chat_json(redis, export_id, partial_path, progress, chat)
+        else:
+            await export_chats_json(
+                redis,
+                export_id,
+                partial_path,
+                progress,
+                None if all_users else user_id,
+            )
+
+        os.replace(partial_path, path)
+        progress["status"] = "completed"
+        progress["download_url"] = f"/api/v1/chats/export/{export_id}/download"
+    except asyncio.CancelledError:
+        progress["status"] = "cancelled"
+        raise
+    except Exception as e:
+        log.exception(f"Chat export {export_id} failed: {e}")
+        progress["status"] = "failed"
+        progress["error"] = str(e)
+    finally:
+        if partial_path.exists():
+            partial_path.unlink()
+        await set_task_progress(redis, get_export_progress_id(export_id), progress)
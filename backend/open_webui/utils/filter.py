@@ -1,5 +1,6 @@
 import inspect
 import logging
+from contextlib import nullcontext
 
 from open_webui.utils.plugin import (
     load_function_module_by_id,
@@ -7,6 +8,7 @@ from open_webui.utils.plugin import (
 )
 from open_webui.models.functions import Functions
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.telemetry.stages import stage
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
@@ -22,6 +24,25 @@ def get_function_module(request, function_id, load_from_db=True):
     return function_module
 
 
+def get_filter_functions_with_handler(request, filter_functions, filter_type):
+    """
+    Keep the filters that implement `filter_type`, so hooks that run per
+    chunk ("stream") do not look up every filter each time.
+    """
+    functions = []
+    for function in filter_functions:
+        try:
+            function_module = get_function_module(
+                request, function.id, load_from_db=(filter_type != "stream")
+            )
+        except Exception as e:
+            log.debug(f"Error loading filter {function.id}: {e}")
+            continue
+        if hasattr(function_module, filter_type):
+            functions.append(function)
+    return functions
+
+
 def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None):
     def get_priority(function_id):
         function = Functions.get_function_by_id(function_id)
@@ -116,11 +137,17 @@ async def process_filter_functions(
                     except Exception as e:
                         log.exception(f"Failed to get user values: {e}")
 
-            # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
-            else:
-                form_data = handler(**params)
+            # Execute handler, stream filters run per chunk and are counted
+            # in chat.stream.process instead
+            with (
+                stage(f"filter.{filter_type}", filter_id=filter_id)
+                if filter_type != "stream"
+                else nullcontext()
+            ):
+                if inspect.iscoroutinefunction(handler):
+                    form_data = await handler(**params)
+                else:
+                    form_data = handler(**params)
 
         except Exception as e:
             log.debug(f"Error in {filter_type} handler {filter_id}: {e}")
@@ -9,9 +9,10 @@ from mcp.shared.auth import OAuthClientInformationFull, OAuthClientMetadata, OAu
 
 
 class MCPClient:
-    def __init__(self):
+    def __init__(self, message_handler=None):
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
+        self.message_handler = message_handler
 
     async def connect(self, url: str, headers: Optional[dict] = None):
         try:
@@ -21,7 +22,7 @@ class MCPClient:
             read_stream, write_stream, _ = transport
 
             self._session_context = ClientSession(
-                read_stream, write_stream
+                read_stream, write_stream, message_handler=self.message_handler
             )  # pylint: disable=W0201
 
             self.session = await self.exit_stack.enter_async_context(
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Optional
+
+from mcp import types
+
+from open_webui.utils.mcp.client import MCPClient
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    MCP_SESSION_IDLE_TIMEOUT,
+    MCP_TOOL_SPECS_CACHE_TTL,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Sessions idle for longer than this are pinged before being handed out again.
+HEALTH_CHECK_INTERVAL = 30
+HEALTH_CHECK_TIMEOUT = 5
+
+
+class PooledMCPSession:
+    """
+    An MCP client owned by a background task.
+
+    The streamable HTTP transport and ClientSession are anyio contexts that
+    must be exited by the task that entered them, so a dedicated task connects,
+    waits until the session is closed and then disconnects. Requests from any
+    task go through `client`.
+    """
+
+    def __init__(self, url: str, headers: Optional[dict] = None):
+        self.url = url
+        self.headers = headers
+        self.client = MCPClient(message_handler=self._handle_message)
+
+        self.last_used = time.monotonic()
+        self.active_calls = 0
+        self.tool_specs: Optional[list] = None
+        self.tool_specs_at = 0.0
+
+        self._ready = asyncio.Event()
+        self._closed = asyncio.Event()
+        self._error: Optional[Exception] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self._error:
+            raise self._error
+
+    async def _run(self):
+        try:
+            await self.client.connect(url=self.url, headers=self.headers)
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+
+        self._ready.set()
+        try:
+            await self._closed.wait()
+        finally:
+            try:
+                await self.client.disconnect()
+            except Exception as e:
+                log.debug(f"Error disconnecting MCP session {self.url}: {e}")
+
+    async def _handle_message(self, message):
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            self.tool_specs = None
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self.client.session is not None
+        )
+
+    async def healthy(self) -> bool:
+        if not self.alive:
+            return False
+        if time.monotonic() - self.last_used < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            await asyncio.wait_for(
+                self.client.session.send_ping(), timeout=HEALTH_CHECK_TIMEOUT
+            )
+            return True
+        except Exception as e:
+            log.debug(f"MCP session {self.url} failed health check: {e}")
+            return False
+
+    async def list_tool_specs(self) -> list:
+        if (
+            self.tool_specs is None
+            or time.monotonic() - self.tool_specs_at > MCP_TOOL_SPECS_CACHE_TTL
+        ):
+            self.tool_specs = await self.client.list_tool_specs()
+            self.tool_specs_at = time.monotonic()
+        return self.tool_specs
+
+    async def call_tool(self, function_name: str, function_args: dict):
+        self.active_calls += 1
+        try:
+            return await self.client.call_tool(function_name, function_args)
+        finally:
+            self.active_calls -= 1
+            self.last_used = time.monotonic()
+
+    async def close(self):
+        self._closed.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=HEALTH_CHECK_TIMEOUT)
+            except Exception:
+                self._task.cancel()
+
+
+class MCPSessionPool:
+    """Per-worker MCP sessions keyed by server URL and auth identity."""
+
+    def __init__(self, idle_timeout: int = MCP_SESSION_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._sessions: dict[tuple[str, str], PooledMCPSession] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+    @staticmethod
+    def _key(url: str, headers: Optional[dict]) -> tuple[str, str]:
+        # Hash the headers so tokens are not kept around as dict keys
+        identity = hashlib.sha256(
+            json.dumps(headers or {}, sort_keys=True).encode()
+        ).hexdigest()
+        return url, identity
+
+    async def get(self, url: str, headers: Optional[dict] = None) -> PooledMCPSession:
+        await self.evict_idle()
+
+        key = self._key(url, headers)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                if await session.healthy():
+                    session.last_used = time.monotonic()
+                    return session
+                self._sessions.pop(key, None)
+                await session.close()
+
+            session = PooledMCPSession(url, headers)
+            await session.start()
+            self._sessions[key] = session
+            return session
+
+    async def invalidate(self, session: PooledMCPSession):
+        key = self._key(session.url, session.headers)
+        if self._sessions.get(key) is session:
+            self._sessions.pop(key, None)
+        await session.close()
+
+    async def evict_idle(self):
+        now = time.monotonic()
+        for key, session in list(self._sessions.items()):
+            if not session.alive or (
+                session.active_calls == 0
+                and now - session.last_used > self.idle_timeout
+            ):
+                self._sessions.pop(key, None)
+                lock = self._locks.get(key)
+                if lock is not None and not lock.locked():
+                    self._locks.pop(key, None)
+                await session.close()
+
+    async def close_all(self):
+        sessions = list(self._sessions.values())
+        self._sessions = {}
+        await asyncio.gather(
+            *(session.close() for session in sessions), return_exceptions=True
+        )
@@ -10,13 +10,11 @@ from aiocache import cached
 from typing import Any, Optional
 import random
 import json
-import html
 import inspect
 import re
 import ast
 
 from uuid import uuid4
-from concurrent.futures import ThreadPoolExecutor
 
 
 from fastapi import Request, HTTPException
@@ -65,7 +63,7 @@ from open_webui.models.users import UserModel
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
-from open_webui.retrieval.utils import get_sources_from_items
+from open_webui.retrieval.utils import get_sources_from_items, merge_sources
 
 
 from open_webui.utils.chat import generate_chat_completion
@@ -88,12 +86,18 @@ from open_webui.utils.misc import (
 from open_webui.utils.tools import get_tools
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
+    get_filter_functions_with_handler,
     get_sorted_filter_ids,
     process_filter_functions,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
 from open_webui.utils.payload import apply_system_prompt_to_body
-from open_webui.utils.mcp.client import MCPClient
+from open_webui.utils.telemetry.stages import StreamMetrics, stage
+from open_webui.utils.streaming import (
+    ContentBlockSerializer,
+    StreamEmitter,
+    iter_sse_data,
+)
 
 
 from open_webui.config import (
@@ -106,10 +110,14 @@ from open_webui.env import (
     SRC_LOG_LEVELS,
     GLOBAL_LOG_LEVEL,
     CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
+    CHAT_RESPONSE_STREAM_FLUSH_INTERVAL,
+    CHAT_RESPONSE_STREAM_FLUSH_BYTES,
     CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
     ENABLE_QUERIES_CACHE,
+    ENABLE_SPECULATIVE_RETRIEVAL,
+    SPECULATIVE_RETRIEVAL_BUDGET,
 )
 from open_webui.constants import TASKS
 
@@ -823,18 +831,19 @@ async def chat_completion_files_handler(
         # Check if all files are in full context mode
         all_full_context = all(item.get("context") == "full" for item in files)
 
-        queries = []
-        if not all_full_context:
+        async def generate_retrieval_queries():
+            queries = []
             try:
-                queries_response = await generate_queries(
-                    request,
-                    {
-                        "model": body["model"],
-                        "messages": body["messages"],
-                        "type": "retrieval",
-                    },
-                    user,
-                )
+                with stage("rag.query_generation"):
+                    queries_response = await generate_queries(
+                        request,
+                        {
+                            "model": body["model"],
+                            "messages": body["messages"],
+                            "type": "retrieval",
+                        },
+                        user,
+                    )
                 queries_response = queries_response["choices"][0]["message"]["content"]
 
                 try:
@@ -852,11 +861,39 @@ async def chat_completion_files_handler(
                 queries = queries_response.get("queries", [])
             except:
                 pass
+            return queries
 
-        if len(queries) == 0:
-            queries = [get_last_user_message(body["messages"])]
+        async def retrieve(queries):
+            # Offload get_sources_from_items to a separate thread
+            with stage("rag.retrieval", queries=len(queries)):
+                return await asyncio.to_thread(
+                    get_sources_from_items,
+                    request=request,
+                    items=files,
+                    queries=queries,
+                    embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
+                        query, prefix=prefix, user=user
+                    ),
+                    k=request.app.state.config.TOP_K,
+                    reranking_function=(
+                        (
+                            lambda sentences: request.app.state.RERANKING_FUNCTION(
+                                sentences, user=user
+                            )
+                        )
+                        if request.app.state.RERANKING_FUNCTION
+                        else None
+                    ),
+                    k_reranker=request.app.state.config.TOP_K_RERANKER,
+                    r=request.app.state.config.RELEVANCE_THRESHOLD,
+                    hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
+                    hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+                    full_context=all_full_context
+                    or request.app.state.config.RAG_FULL_CONTEXT,
+                    user=user,
+                )
 
-        if not all_full_context:
+        async def emit_queries(queries):
             await __event_emitter__(
                 {
                     "type": "status",
@@ -868,40 +905,86 @@ async def chat_completion_files_handler(
                 }
             )
 
-        try:
-            # Offload get_sources_from_items to a separate thread
-            loop = asyncio.get_running_loop()
-            with ThreadPoolExecutor() as executor:
-                sources = await loop.run_in_executor(
-                    executor,
-                    lambda: get_sources_from_items(
-                        request=request,
-                        items=files,
-                        queries=queries,
-                        embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
-                            query, prefix=prefix, user=user
-                        ),
-                        k=request.app.state.config.TOP_K,
-                        reranking_function=(
-                            (
-                                lambda sentences: request.app.state.RERANKING_FUNCTION(
-                                    sentences, user=user
-                                )
-                            )
-                            if request.app.state.RERANKING_FUNCTION
-                            else None
-                        ),
-                        k_reranker=request.app.state.config.TOP_K_RERANKER,
-                        r=request.app.state.config.RELEVANCE_THRESHOLD,
-                        hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
-                        hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
-                        full_context=all_full_context
-                        or request.app.state.config.RAG_FULL_CONTEXT,
-                        user=user,
-                    ),
+        start_time = time.monotonic()
+        timings = {}
+
+        # None for image-only messages, which leaves nothing to speculate with
+        user_query = get_last_user_message(body["messages"])
+        if not all_full_context and ENABLE_SPECULATIVE_RETRIEVAL and user_query:
+            # Retrieve with the last user message right away and merge in the
+            # results for the generated queries if they arrive within budget.
+            deadline = start_time + SPECULATIVE_RETRIEVAL_BUDGET
+
+            async def timed_retrieve(queries, timing):
+                result = await retrieve(queries)
+                timings[timing] = time.monotonic() - start_time
+                return result
+
+            speculative_task = asyncio.create_task(
+                timed_retrieve([user_query], "speculative_retrieval")
+            )
+            queries_task = asyncio.create_task(generate_retrieval_queries())
+
+            queries = []
+            try:
+                queries = await asyncio.wait_for(
+                    queries_task, timeout=max(deadline - time.monotonic(), 0)
                 )
-        except Exception as e:
-            log.exception(e)
+                timings["query_generation"] = time.monotonic() - start_time
+            except asyncio.TimeoutError:
+                queries_task.cancel()
+                log.debug("Query generation exceeded the speculative retrieval budget")
+
+            # Retrieve for the generated queries while the speculative retrieval
+            # is still running, and wait for both only until the deadline.
+            queries = [query for query in queries if query != user_query]
+            if time.monotonic() >= deadline:
+                # Too late for another search to make it into the results
+                queries = []
+            tasks = [speculative_task]
+            if queries:
+                tasks.append(asyncio.create_task(timed_retrieve(queries, "retrieval")))
+            await emit_queries([user_query, *queries])
+
+            done, pending = await asyncio.wait(
+                tasks, timeout=max(deadline - time.monotonic(), 0)
+            )
+            if not done:
+                # Nothing within budget: use whichever retrieval finishes first
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+            if pending:
+                log.debug("Retrieval exceeded the speculative retrieval budget")
+            # This drops the result, but the search already running in a
+            # worker thread (asyncio.to_thread) still runs to completion
+            for task in pending:
+                task.cancel()
+
+            sources = []
+            for task in tasks:
+                if task in done:
+                    try:
+                        sources = merge_sources(sources, task.result())
+                    except Exception as e:
+                        log.exception(e)
+        else:
+            queries = []
+            if not all_full_context:
+                queries = await generate_retrieval_queries()
+                timings["query_generation"] = time.monotonic() - start_time
+
+            if len(queries) == 0:
+                queries = [user_query]
+
+            if not all_full_context:
+                await emit_queries(queries)
+
+            try:
+                sources = await retrieve(queries)
+            except Exception as e:
+                log.exception(e)
+            timings["retrieval"] = time.monotonic() - start_time
 
         log.debug(f"rag_contexts:sources: {sources}")
 
@@ -932,6 +1015,9 @@ async def chat_completion_files_handler(
                 "data": {
                     "action": "sources_retrieved",
                     "count": sources_count,
+                    "timings": {
+                        name: round(seconds, 3) for name, seconds in timings.items()
+                    },
                     "done": True,
                 },
             }
@@ -1189,105 +1275,107 @@ async def process_chat_payload(request, form_data, user, metadata, model):
 
     tools_dict = {}
 
-    mcp_clients = {}
     mcp_tools_dict = {}
 
-    if tool_ids:
-        for tool_id in tool_ids:
-            if tool_id.startswith("server:mcp:"):
-                try:
-                    server_id = tool_id[len("server:mcp:") :]
-
-                    mcp_server_connection = None
-                    for (
-                        server_connection
-                    ) in request.app.state.config.TOOL_SERVER_CONNECTIONS:
-                        if (
-                            server_connection.get("type", "") == "mcp"
-                            and server_connection.get("info", {}).get("id") == server_id
-                        ):
-                            mcp_server_connection = server_connection
-                            break
+    async def connect_mcp_server(server_id):
+        mcp_server_connection = None
+        for server_connection in request.app.state.config.TOOL_SERVER_CONNECTIONS:
+            if (
+                server_connection.get("type", "") == "mcp"
+                and server_connection.get("info", {}).get("id") == server_id
+            ):
+                mcp_server_connection = server_connection
+                break
+
+        if not mcp_server_connection:
+            log.error(f"MCP server with id {server_id} not found")
+            return
+
+        auth_type = mcp_server_connection.get("auth_type", "")
+
+        headers = {}
+        if auth_type == "bearer":
+            headers["Authorization"] = f"Bearer {mcp_server_connection.get('key', '')}"
+        elif auth_type == "none":
+            # No authentication
+            pass
+        elif auth_type == "session":
+            headers["Authorization"] = f"Bearer {request.state.token.credentials}"
+        elif auth_type == "system_oauth":
+            oauth_token = extra_params.get("__oauth_token__", None)
+            if oauth_token:
+                headers["Authorization"] = (
+                    f"Bearer {oauth_token.get('access_token', '')}"
+                )
+        elif auth_type == "oauth_2.1":
+            try:
+                splits = server_id.split(":")
+                server_id = splits[-1] if len(splits) > 1 else server_id
 
-                    if not mcp_server_connection:
-                        log.error(f"MCP server with id {server_id} not found")
-                        continue
+                oauth_token = (
+                    await request.app.state.oauth_client_manager.get_oauth_token(
+                        user.id, f"mcp:{server_id}"
+                    )
+                )
 
-                    auth_type = mcp_server_connection.get("auth_type", "")
+                if oauth_token:
+                    headers["Authorization"] = (
+                        f"Bearer {oauth_token.get('access_token', '')}"
+                    )
+            except Exception as e:
+                log.error(f"Error getting OAuth token: {e}")
+                oauth_token = None
+
+        # Sessions are pooled per (server, auth identity) and reused across chats
+        mcp_session_pool = request.app.state.mcp_session_pool
+        client = await mcp_session_pool.get(
+            url=mcp_server_connection.get("url", ""),
+            headers=headers if headers else None,
+        )
+        tool_specs = await client.list_tool_specs()
+        for tool_spec in tool_specs:
 
-                    headers = {}
-                    if auth_type == "bearer":
-                        headers["Authorization"] = (
-                            f"Bearer {mcp_server_connection.get('key', '')}"
-                        )
-                    elif auth_type == "none":
-                        # No authentication
-                        pass
-                    elif auth_type == "session":
-                        headers["Authorization"] = (
-                            f"Bearer {request.state.token.credentials}"
+            def make_tool_function(client, function_name):
+                async def tool_function(**kwargs):
+                    try:
+                        return await client.call_tool(
+                            function_name,
+                            function_args=kwargs,
                         )
-                    elif auth_type == "system_oauth":
-                        oauth_token = extra_params.get("__oauth_token__", None)
-                        if oauth_token:
-                            headers["Authorization"] = (
-                                f"Bearer {oauth_token.get('access_token', '')}"
-                            )
-                    elif auth_type == "oauth_2.1":
-                        try:
-                            splits = server_id.split(":")
-                            server_id = splits[-1] if len(splits) > 1 else server_id
+                    except Exception:
+                        if not client.alive:
+                            await mcp_session_pool.invalidate(client)
+                        raise
 
-                            oauth_token = await request.app.state.oauth_client_manager.get_oauth_token(
-                                user.id, f"mcp:{server_id}"
-                            )
-
-                            if oauth_token:
-                                headers["Authorization"] = (
-                                    f"Bearer {oauth_token.get('access_token', '')}"
-                                )
-                        except Exception as e:
-                            log.error(f"Error getting OAuth token: {e}")
-                            oauth_token = None
-
-                    mcp_clients[server_id] = MCPClient()
-                    await mcp_clients[server_id].connect(
-                        url=mcp_server_connection.get("url", ""),
-                        headers=headers if headers else None,
-                    )
-
-                    tool_specs = await mcp_clients[server_id].list_tool_specs()
-                    for tool_spec in tool_specs:
-
-                        def make_tool_function(client, function_name):
-                            async def tool_function(**kwargs):
-                                print(kwargs)
-                                print(client)
-                                print(await client.list_tool_specs())
-                                return await client.call_tool(
-                                    function_name,
-                                    function_args=kwargs,
-                                )
+                return tool_function
 
-                            return tool_function
+            tool_function = make_tool_function(client, tool_spec["name"])
 
-                        tool_function = make_tool_function(
-                            mcp_clients[server_id], tool_spec["name"]
-                        )
+            mcp_tools_dict[f"{server_id}_{tool_spec['name']}"] = {
+                "spec": {
+                    **tool_spec,
+                    "name": f"{server_id}_{tool_spec['name']}",
+                },
+                "callable": tool_function,
+                "type": "mcp",
+                "client": client,
+                "direct": False,
+            }
 
-                        mcp_tools_dict[f"{server_id}_{tool_spec['name']}"] = {
-                            "spec": {
-                                **tool_spec,
-                                "name": f"{server_id}_{tool_spec['name']}",
-                            },
-                            "callable": tool_function,
-                            "type": "mcp",
-                            "client": mcp_clients[server_id],
-                            "direct": False,
-                        }
-                except Exception as e:
-                    log.debug(e)
-                    continue
+    if tool_ids:
+        # Connect to all MCP servers concurrently
+        mcp_server_ids = [
+            tool_id[len("server:mcp:") :]
+            for tool_id in tool_ids
+            if tool_id.startswith("server:mcp:")
+        ]
+        results = await asyncio.gather(
+            *(connect_mcp_server(server_id) for server_id in mcp_server_ids),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                log.debug(result)
 
         tools_dict = await get_tools(
             request,
@@ -1314,9 +1402,6 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                     "server": tool_server,
                 }
 
-    if mcp_clients:
-        metadata["mcp_clients"] = mcp_clients
-
     if tools_dict:
         if metadata.get("params", {}).get("function_calling") == "native":
             # If the function calling is native, then call the tools function calling handler
@@ -1459,162 +1544,133 @@ async def process_chat_response(
                 )
 
             if tasks and messages:
-                if (
-                    TASKS.FOLLOW_UP_GENERATION in tasks
-                    and tasks[TASKS.FOLLOW_UP_GENERATION]
-                ):
+                # Follow-ups, title and tags are independent task-model calls;
+                # run them concurrently and write the chat JSON once at the end.
+
+                def get_task_result(res, key, default):
+                    if len(res.get("choices", [])) == 1:
+                        content = (
+                            res.get("choices", [])[0]
+                            .get("message", {})
+                            .get("content", "")
+                        )
+                    else:
+                        content = ""
+
+                    content = content[content.find("{") : content.rfind("}") + 1]
+                    try:
+                        return json.loads(content).get(key, default)
+                    except Exception:
+                        return default
+
+                form_data = {
+                    "model": message["model"],
+                    "messages": messages,
+                    "chat_id": metadata["chat_id"],
+                }
+                updates = {}
+                # Sent once the title and follow-ups are saved, clients
+                # reload the chat list when they get the title
+                saved_events = []
+
+                async def follow_ups_task():
                     res = await generate_follow_ups(
                         request,
-                        {
-                            "model": message["model"],
-                            "messages": messages,
-                            "message_id": metadata["message_id"],
-                            "chat_id": metadata["chat_id"],
-                        },
+                        {**form_data, "message_id": metadata["message_id"]},
                         user,
                     )
 
                     if res and isinstance(res, dict):
-                        if len(res.get("choices", [])) == 1:
-                            follow_ups_string = (
-                                res.get("choices", [])[0]
-                                .get("message", {})
-                                .get("content", "")
-                            )
-                        else:
-                            follow_ups_string = ""
-
-                        follow_ups_string = follow_ups_string[
-                            follow_ups_string.find("{") : follow_ups_string.rfind("}")
-                            + 1
-                        ]
-
-                        try:
-                            follow_ups = json.loads(follow_ups_string).get(
-                                "follow_ups", []
-                            )
+                        follow_ups = get_task_result(res, "follow_ups", None)
+                        if follow_ups is None:
+                            return
 
-                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                metadata["chat_id"],
-                                metadata["message_id"],
-                                {
-                                    "followUps": follow_ups,
+                        updates["followUps"] = follow_ups
+                        saved_events.append(
+                            {
+                                "type": "chat:message:follow_ups",
+                                "data": {
+                                    "follow_ups": follow_ups,
                                 },
-                            )
-
-                            await event_emitter(
-                                {
-                                    "type": "chat:message:follow_ups",
-                                    "data": {
-                                        "follow_ups": follow_ups,
-                                    },
-                                }
-                            )
-                        except Exception as e:
-                            pass
+                            }
+                        )
 
-                if TASKS.TITLE_GENERATION in tasks:
+                async def title_task():
                     user_message = get_last_user_message(messages)
                     if user_message and len(user_message) > 100:
                         user_message = user_message[:100] + "..."
 
                     if tasks[TASKS.TITLE_GENERATION]:
-
-                        res = await generate_title(
-                            request,
-                            {
-                                "model": message["model"],
-                                "messages": messages,
-                                "chat_id": metadata["chat_id"],
-                            },
-                            user,
-                        )
+                        res = await generate_title(request, form_data, user)
 
                         if res and isinstance(res, dict):
-                            if len(res.get("choices", [])) == 1:
-                                title_string = (
-                                    res.get("choices", [])[0]
-                                    .get("message", {})
-                                    .get(
-                                        "content", message.get("content", user_message)
-                                    )
-                                )
-                            else:
-                                title_string = ""
-
-                            title_string = title_string[
-                                title_string.find("{") : title_string.rfind("}") + 1
-                            ]
-
-                            try:
-                                title = json.loads(title_string).get(
-                                    "title", user_message
-                                )
-                            except Exception as e:
-                                title = ""
-
+                            title = get_task_result(res, "title", user_message)
                             if not title:
                                 title = messages[0].get("content", user_message)
 
-                            Chats.update_chat_title_by_id(metadata["chat_id"], title)
-
-                            await event_emitter(
+                            updates["title"] = title
+                            saved_events.append(
                                 {
                                     "type": "chat:title",
                                     "data": title,
                                 }
                             )
                     elif len(messages) == 2:
-                        title = messages[0].get("content", user_message)
+                        updates["title"] = messages[0].get("content", user_message)
 
-                        Chats.update_chat_title_by_id(metadata["chat_id"], title)
-
-                        await event_emitter(
+                        saved_events.append(
                             {
                                 "type": "chat:title",
                                 "data": message.get("content", user_message),
                             }
                         )
 
-                if TASKS.TAGS_GENERATION in tasks and tasks[TASKS.TAGS_GENERATION]:
-                    res = await generate_chat_tags(
-                        request,
-                        {
-                            "model": message["model"],
-                            "messages": messages,
-                            "chat_id": metadata["chat_id"],
-                        },
-                        user,
-                    )
+                async def tags_task():
+                    res = await generate_chat_tags(request, form_data, user)
 
                     if res and isinstance(res, dict):
-                        if len(res.get("choices", [])) == 1:
-                            tags_string = (
-                                res.get("choices", [])[0]
-                                .get("message", {})
-                                .get("content", "")
-                            )
-                        else:
-                            tags_string = ""
+                        tags = get_task_result(res, "tags", None)
+                        if tags is None:
+                            return
 
-                        tags_string = tags_string[
-                            tags_string.find("{") : tags_string.rfind("}") + 1
-                        ]
+                        # Tags live in their own table, not in the chat JSON.
+                        Chats.update_chat_tags_by_id(metadata["chat_id"], tags, user)
+                        await event_emitter(
+                            {
+                                "type": "chat:tags",
+                                "data": tags,
+                            }
+                        )
 
-                        try:
-                            tags = json.loads(tags_string).get("tags", [])
-                            Chats.update_chat_tags_by_id(
-                                metadata["chat_id"], tags, user
-                            )
+                background_tasks = []
+                if tasks.get(TASKS.FOLLOW_UP_GENERATION):
+                    background_tasks.append(follow_ups_task())
+                if TASKS.TITLE_GENERATION in tasks:
+                    background_tasks.append(title_task())
+                if tasks.get(TASKS.TAGS_GENERATION):
+                    background_tasks.append(tags_task())
 
-                            await event_emitter(
-                                {
-                                    "type": "chat:tags",
-                                    "data": tags,
-                                }
-                            )
-                        except Exception as e:
-                            pass
+                results = await asyncio.gather(
+                    *background_tasks, return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        log.debug(f"Error in background task: {result}")
+
+                if updates:
+                    Chats.update_chat_title_and_message_by_id(
+                        metadata["chat_id"],
+                        metadata["message_id"],
+                        title=updates.get("title"),
+                        message=(
+                            {"followUps": updates["followUps"]}
+                            if "followUps" in updates
+                            else None
+                        ),
+                    )
+
+                for event in saved_events:
+                    await event_emitter(event)
 
     event_emitter = None
     event_caller = None
@@ -1816,154 +1872,12 @@ async def process_chat_response(
         task_id = str(uuid4())  # Create a unique task ID.
         model_id = form_data.get("model", "")
 
-        def split_content_and_whitespace(content):
-            content_stripped = content.rstrip()
-            original_whitespace = (
-                content[len(content_stripped) :]
-                if len(content) > len(content_stripped)
-                else ""
-            )
-            return content_stripped, original_whitespace
-
-        def is_opening_code_block(content):
-            backtick_segments = content.split("```")
-            # Even number of segments means the last backticks are opening a new block
-            return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
-
         # Handle as a background task
         async def response_handler(response, events):
-            def serialize_content_blocks(content_blocks, raw=False):
-                content = ""
-
-                for block in content_blocks:
-                    if block["type"] == "text":
-                        block_content = block["content"].strip()
-                        if block_content:
-                            content = f"{content}{block_content}\n"
-                    elif block["type"] == "tool_calls":
-                        attributes = block.get("attributes", {})
-
-                        tool_calls = block.get("content", [])
-                        results = block.get("results", [])
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if results:
-
-                            tool_calls_display_content = ""
-                            for tool_call in tool_calls:
-
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
-
-                                tool_result = None
-                                tool_result_files = None
-                                for result in results:
-                                    if tool_call_id == result.get("tool_call_id", ""):
-                                        tool_result = result.get("content", None)
-                                        tool_result_files = result.get("files", None)
-                                        break
-
-                                if tool_result is not None:
-                                    tool_result_embeds = result.get("embeds", "")
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}" embeds="{html.escape(json.dumps(tool_result_embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
-                                else:
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
-
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
-                        else:
-                            tool_calls_display_content = ""
+            content_serializer = ContentBlockSerializer()
 
-                            for tool_call in tool_calls:
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
-
-                                tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
-
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
-
-                    elif block["type"] == "reasoning":
-                        reasoning_display_content = "\n".join(
-                            (f"> {line}" if not line.startswith(">") else line)
-                            for line in block["content"].splitlines()
-                        )
-
-                        reasoning_duration = block.get("duration", None)
-
-                        start_tag = block.get("start_tag", "")
-                        end_tag = block.get("end_tag", "")
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if reasoning_duration is not None:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
-                        else:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
-
-                    elif block["type"] == "code_interpreter":
-                        attributes = block.get("attributes", {})
-                        output = block.get("output", None)
-                        lang = attributes.get("lang", "")
-
-                        content_stripped, original_whitespace = (
-                            split_content_and_whitespace(content)
-                        )
-                        if is_opening_code_block(content_stripped):
-                            # Remove trailing backticks that would open a new block
-                            content = (
-                                content_stripped.rstrip("`").rstrip()
-                                + original_whitespace
-                            )
-                        else:
-                            # Keep content as is - either closing backticks or no backticks
-                            content = content_stripped + original_whitespace
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if output:
-                            output = html.escape(json.dumps(output))
-
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
-                        else:
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
-
-                    else:
-                        block_content = str(block["content"]).strip()
-                        if block_content:
-                            content = f"{content}{block['type']}: {block_content}\n"
-
-                return content.strip()
+            def serialize_content_blocks(content_blocks, raw=False):
+                return content_serializer.serialize(content_blocks, raw)
 
             def convert_content_blocks_to_messages(content_blocks, raw=False):
                 messages = []
@@ -1974,7 +1888,9 @@ async def process_chat_response(
                         messages.append(
                             {
                                 "role": "assistant",
-                                "content": serialize_content_blocks(temp_blocks, raw),
+                                "content": ContentBlockSerializer().serialize(
+                                    temp_blocks, raw
+                                ),
                                 "tool_calls": block.get("content"),
                             }
                         )
@@ -1994,7 +1910,7 @@ async def process_chat_response(
                         temp_blocks.append(block)
 
                 if temp_blocks:
-                    content = serialize_content_blocks(temp_blocks, raw)
+                    content = ContentBlockSerializer().serialize(temp_blocks, raw)
                     if content:
                         messages.append(
                             {
@@ -2251,7 +2167,6 @@ async def process_chat_response(
 
                     response_tool_calls = []
 
-                    delta_count = 0
                     delta_chunk_size = max(
                         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
                         int(
@@ -2259,47 +2174,46 @@ async def process_chat_response(
                             or 1
                         ),
                     )
-                    last_delta_data = None
-
-                    async def flush_pending_delta_data(threshold: int = 0):
-                        nonlocal delta_count
-                        nonlocal last_delta_data
-
-                        if delta_count >= threshold and last_delta_data:
-                            await event_emitter(
-                                {
-                                    "type": "chat:completion",
-                                    "data": last_delta_data,
-                                }
-                            )
-                            delta_count = 0
-                            last_delta_data = None
-
-                    async for line in response.body_iterator:
-                        line = line.decode("utf-8") if isinstance(line, bytes) else line
-                        data = line
+                    stream_emitter = StreamEmitter(
+                        event_emitter,
+                        interval=CHAT_RESPONSE_STREAM_FLUSH_INTERVAL,
+                        max_bytes=CHAT_RESPONSE_STREAM_FLUSH_BYTES,
+                        min_deltas=delta_chunk_size,
+                    )
+                    stream_filter_functions = get_filter_functions_with_handler(
+                        request, filter_functions, "stream"
+                    )
 
-                        # Skip empty lines
-                        if not data.strip():
-                            continue
+                    def content_snapshot():
+                        # Serialized only for the updates that are sent
+                        return {"content": serialize_content_blocks(content_blocks)}
 
-                        # "data:" is the prefix for each event
-                        if not data.startswith("data:"):
-                            continue
-
-                        # Remove the prefix
-                        data = data[len("data:") :].strip()
+                    stream_metrics = StreamMetrics(
+                        form_data.get("model"),
+                        getattr(request.state, "chat_started_at", None),
+                    )
+                    # Follow-up streams (after tool calls) are timed from
+                    # when they start
+                    request.state.chat_started_at = None
 
+                    async for data in iter_sse_data(
+                        stream_metrics.iterate(response.body_iterator)
+                    ):
                         try:
                             data = json.loads(data)
-
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params={"__body__": form_data, **extra_params},
-                            )
+                            delta_size = 0
+
+                            if stream_filter_functions:
+                                data, _ = await process_filter_functions(
+                                    request=request,
+                                    filter_functions=stream_filter_functions,
+                                    filter_type="stream",
+                                    form_data=data,
+                                    extra_params={
+                                        "__body__": form_data,
+                                        **extra_params,
+                                    },
+                                )
 
                             if data:
                                 if "event" in data:
@@ -2327,6 +2241,7 @@ async def process_chat_response(
                                     usage = data.get("usage", {}) or {}
                                     usage.update(data.get("timings", {}))  # llama.cpp
                                     if usage:
+                                        stream_metrics.usage(usage)
                                         await event_emitter(
                                             {
                                                 "type": "chat:completion",
@@ -2418,6 +2333,8 @@ async def process_chat_response(
                                         or delta.get("thinking")
                                     )
                                     if reasoning_content:
+                                        stream_metrics.token()
+                                        delta_size += len(reasoning_content)
                                         if (
                                             not content_blocks
                                             or content_blocks[-1]["type"] != "reasoning"
@@ -2438,13 +2355,11 @@ async def process_chat_response(
 
                                         reasoning_block["content"] += reasoning_content
 
-                                        data = {
-                                            "content": serialize_content_blocks(
-                                                content_blocks
-                                            )
-                                        }
+                                        data = content_snapshot
 
                                     if value:
+                                        stream_metrics.token()
+                                        delta_size += len(value)
                                         if (
                                             content_blocks
                                             and content_blocks[-1]["type"]
@@ -2525,18 +2440,12 @@ async def process_chat_response(
                                                 },
                                             )
                                         else:
-                                            data = {
-                                                "content": serialize_content_blocks(
-                                                    content_blocks
-                                                ),
-                                            }
+                                            data = content_snapshot
 
                                 if delta:
-                                    delta_count += 1
-                                    last_delta_data = data
-                                    if delta_count >= delta_chunk_size:
-                                        await flush_pending_delta_data(delta_chunk_size)
+                                    stream_emitter.push(data, delta_size)
                                 else:
+                                    await stream_emitter.flush()
                                     await event_emitter(
                                         {
                                             "type": "chat:completion",
@@ -2544,13 +2453,10 @@ async def process_chat_response(
                                         }
                                     )
                         except Exception as e:
-                            done = "data: [DONE]" in line
-                            if done:
-                                pass
-                            else:
-                                log.debug(f"Error: {e}")
-                                continue
-                    await flush_pending_delta_data()
+                            log.debug(f"Error: {e}")
+                            continue
+                    await stream_emitter.flush()
+                    stream_metrics.finish()
 
                     if content_blocks:
                         # Clean up the last text block
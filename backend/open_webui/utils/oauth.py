@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import hashlib
 import logging
@@ -65,6 +66,7 @@ from open_webui.env import (
     OAUTH_CLIENT_INFO_ENCRYPTION_KEY,
 )
 from open_webui.utils.misc import parse_duration
+from open_webui.utils.avatars import store_profile_image
 from open_webui.utils.auth import get_password_hash, create_token
 from open_webui.utils.webhook import post_webhook
 
@@ -1006,14 +1008,14 @@ class OAuthManager:
     async def _process_picture_url(
         self, picture_url: str, access_token: str = None
     ) -> str:
-        """Process a picture URL and return a base64 encoded data URL.
+        """Process a picture URL and store the picture as a profile image.
 
         Args:
             picture_url: The URL of the picture to process
             access_token: Optional OAuth access token for authenticated requests
 
         Returns:
-            A data URL containing the base64 encoded picture, or "/user.png" if processing fails
+            The URL of the stored picture, or "/user.png" if processing fails
         """
         if not picture_url:
             return "/user.png"
@@ -1036,8 +1038,11 @@ class OAuthManager:
                         guessed_mime_type = mimetypes.guess_type(picture_url)[0]
                         if guessed_mime_type is None:
                             guessed_mime_type = "image/jpeg"
-                        return (
-                            f"data:{guessed_mime_type};base64,{base64_encoded_picture}"
+                        # Stored under its content hash, so an unchanged
+                        # picture maps to the URL the user already has
+                        return await asyncio.to_thread(
+                            store_profile_image,
+                            f"data:{guessed_mime_type};base64,{base64_encoded_picture}",
                         )
                     else:
                         log.warning(
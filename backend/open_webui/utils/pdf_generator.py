@@ -25,8 +25,6 @@ class PDFGenerator:
     """
 
     def __init__(self, form_data: ChatTitleMessagesForm):
-        self.html_body = None
-        self.messages_html = None
         self.form_data = form_data
 
         self.css = Path(STATIC_DIR / "assets" / "pdf-style.css").read_text()
@@ -75,72 +73,55 @@ class PDFGenerator:
           """
         return html_message
 
-    def _generate_html_body(self) -> str:
-        """Generate the full HTML body for the PDF."""
-        escaped_title = escape(self.form_data.title)
-        return f"""
-        <html>
-            <head>
-                <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-            </head>
-            <body>
-            <div>
-                <div>
-                    <h2>{escaped_title}</h2>
-                    {self.messages_html}
-                </div>
-            </div>
-            </body>
-        </html>
+    def create_pdf(self) -> FPDF:
+        """
+        Create a PDF document with fonts set up and the chat title written.
         """
+        global FONTS_DIR
+
+        pdf = FPDF()
+        pdf.add_page()
+
+        # When running using `pip install` the static directory is in the site packages.
+        if not FONTS_DIR.exists():
+            FONTS_DIR = Path(site.getsitepackages()[0]) / "static/fonts"
+        # When running using `pip install -e .` the static directory is in the site packages.
+        # This path only works if `open-webui serve` is run from the root of this project.
+        if not FONTS_DIR.exists():
+            FONTS_DIR = Path(".") / "backend" / "static" / "fonts"
+
+        pdf.add_font("NotoSans", "", f"{FONTS_DIR}/NotoSans-Regular.ttf")
+        pdf.add_font("NotoSans", "b", f"{FONTS_DIR}/NotoSans-Bold.ttf")
+        pdf.add_font("NotoSans", "i", f"{FONTS_DIR}/NotoSans-Italic.ttf")
+        pdf.add_font("NotoSansKR", "", f"{FONTS_DIR}/NotoSansKR-Regular.ttf")
+        pdf.add_font("NotoSansJP", "", f"{FONTS_DIR}/NotoSansJP-Regular.ttf")
+        pdf.add_font("NotoSansSC", "", f"{FONTS_DIR}/NotoSansSC-Regular.ttf")
+        pdf.add_font("Twemoji", "", f"{FONTS_DIR}/Twemoji.ttf")
+
+        pdf.set_font("NotoSans", size=12)
+        pdf.set_fallback_fonts(["NotoSansKR", "NotoSansJP", "NotoSansSC", "Twemoji"])
+
+        pdf.set_auto_page_break(auto=True, margin=15)
+
+        pdf.write_html(f"<h2>{escape(self.form_data.title)}</h2>")
+        return pdf
+
+    def write_messages(self, pdf: FPDF, messages: List[Dict[str, Any]]) -> None:
+        """
+        Render messages into the PDF one at a time, so the HTML for the whole
+        chat is never built at once.
+        """
+        for message in messages:
+            pdf.write_html(self._build_html_message(message))
 
     def generate_chat_pdf(self) -> bytes:
         """
         Generate a PDF from chat messages.
         """
-        try:
-            global FONTS_DIR
-
-            pdf = FPDF()
-            pdf.add_page()
-
-            # When running using `pip install` the static directory is in the site packages.
-            if not FONTS_DIR.exists():
-                FONTS_DIR = Path(site.getsitepackages()[0]) / "static/fonts"
-            # When running using `pip install -e .` the static directory is in the site packages.
-            # This path only works if `open-webui serve` is run from the root of this project.
-            if not FONTS_DIR.exists():
-                FONTS_DIR = Path(".") / "backend" / "static" / "fonts"
-
-            pdf.add_font("NotoSans", "", f"{FONTS_DIR}/NotoSans-Regular.ttf")
-            pdf.add_font("NotoSans", "b", f"{FONTS_DIR}/NotoSans-Bold.ttf")
-            pdf.add_font("NotoSans", "i", f"{FONTS_DIR}/NotoSans-Italic.ttf")
-            pdf.add_font("NotoSansKR", "", f"{FONTS_DIR}/NotoSansKR-Regular.ttf")
-            pdf.add_font("NotoSansJP", "", f"{FONTS_DIR}/NotoSansJP-Regular.ttf")
-            pdf.add_font("NotoSansSC", "", f"{FONTS_DIR}/NotoSansSC-Regular.ttf")
-            pdf.add_font("Twemoji", "", f"{FONTS_DIR}/Twemoji.ttf")
-
-            pdf.set_font("NotoSans", size=12)
-            pdf.set_fallback_fonts(
-                ["NotoSansKR", "NotoSansJP", "NotoSansSC", "Twemoji"]
-            )
-
-            pdf.set_auto_page_break(auto=True, margin=15)
-
-            # Build HTML messages
-            messages_html_list: List[str] = [
-                self._build_html_message(msg) for msg in self.form_data.messages
-            ]
-            self.messages_html = "<div>" + "".join(messages_html_list) + "</div>"
-
-            # Generate full HTML body
-            self.html_body = self._generate_html_body()
-
-            pdf.write_html(self.html_body)
-
-            # Save the pdf with name .pdf
-            pdf_bytes = pdf.output()
-
-            return bytes(pdf_bytes)
-        except Exception as e:
-            raise e
+        pdf = self.create_pdf()
+        self.write_messages(pdf, self.form_data.messages)
+
+        # Save the pdf with name .pdf
+        pdf_bytes = pdf.output()
+
+        return bytes(pdf_bytes)
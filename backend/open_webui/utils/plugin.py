@@ -5,6 +5,7 @@ import sys
 from importlib import util
 import types
 import tempfile
+import threading
 import logging
 
 from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
@@ -14,6 +15,11 @@ from open_webui.models.tools import Tools
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# Cleared while install_tool_and_function_dependencies runs in the background;
+# a function that fails to load before then is not deactivated
+dependencies_ready = threading.Event()
+dependencies_ready.set()
+
 
 def extract_frontmatter(content):
     """
@@ -160,7 +166,8 @@ def load_function_module_by_id(function_id: str, content: str | None = None):
         # Cleanup by removing the module in case of error
         del sys.modules[module_name]
 
-        Functions.update_function_by_id(function_id, {"is_active": False})
+        if dependencies_ready.is_set():
+            Functions.update_function_by_id(function_id, {"is_active": False})
         raise e
     finally:
         os.unlink(temp_file.name)
@@ -310,3 +317,5 @@ def install_tool_and_function_dependencies():
         install_frontmatter_requirements(all_dependencies.strip(", "))
     except Exception as e:
         log.error(f"Error installing requirements: {e}")
+    finally:
+        dependencies_ready.set()
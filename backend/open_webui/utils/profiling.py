@@ -0,0 +1,310 @@
+"""
+Profiling helpers: an import-time tracer and an opt-in sampling profiler for
+individual requests that writes folded stacks (the input format of
+flamegraph.pl, speedscope and inferno).
+
+This module is imported before anything else in main.py so the tracer sees
+every import, which is why it reads its settings from os.environ directly
+instead of open_webui.env.
+"""
+
+import asyncio
+import importlib.abc
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+ENABLE_IMPORT_PROFILING = (
+    os.environ.get("ENABLE_IMPORT_PROFILING", "False").lower() == "true"
+)
+ENABLE_REQUEST_PROFILING = (
+    os.environ.get("ENABLE_REQUEST_PROFILING", "False").lower() == "true"
+)
+
+try:
+    REQUEST_PROFILING_INTERVAL = float(
+        os.environ.get("REQUEST_PROFILING_INTERVAL", "0.005")
+    )
+except Exception:
+    REQUEST_PROFILING_INTERVAL = 0.005
+
+# Admin requests are profiled when they carry this header (or ?profile=1)
+REQUEST_PROFILING_HEADER = b"x-profile"
+REQUEST_PROFILING_VALUES = {"1", "true"}
+
+MAX_STORED_PROFILES = 50
+
+
+####################################
+# Import tracer
+####################################
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, tracer: "ImportTracer", loader):
+        self.tracer = tracer
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.tracer.enter(module.__name__)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.tracer.exit(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ImportTracer(importlib.abc.MetaPathFinder):
+    """
+    Times module execution. `inclusive` includes the modules a module
+    imports while it runs, `self` does not.
+    """
+
+    def __init__(self):
+        self.inclusive: dict[str, float] = {}
+        self.self_time: dict[str, float] = {}
+        self._stack: list[list] = []
+        self._lock = threading.RLock()
+        self._finding = threading.local()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        # Ask the remaining finders, skipping ourselves
+        if getattr(self._finding, "active", False):
+            return None
+        self._finding.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(self, spec.loader)
+                    return spec
+            return None
+        finally:
+            self._finding.active = False
+
+    def enter(self, name: str):
+        with self._lock:
+            # [name, started at, time spent in nested imports]
+            self._stack.append([name, time.perf_counter(), 0.0])
+
+    def exit(self, name: str):
+        with self._lock:
+            if not self._stack or self._stack[-1][0] != name:
+                return
+            _, started_at, nested = self._stack.pop()
+            elapsed = time.perf_counter() - started_at
+            self.inclusive[name] = elapsed
+            self.self_time[name] = elapsed - nested
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def report(self, limit: int = 50) -> dict:
+        packages: Counter = Counter()
+        for name, elapsed in self.self_time.items():
+            packages[name.split(".")[0]] += elapsed
+
+        slowest = sorted(self.self_time.items(), key=lambda x: x[1], reverse=True)
+        return {
+            "modules": len(self.self_time),
+            "total": round(sum(self.self_time.values()), 3),
+            "packages": {
+                name: round(elapsed, 3) for name, elapsed in packages.most_common(limit)
+            },
+            "slowest": [
+                {
+                    "module": name,
+                    "self": round(elapsed, 4),
+                    "inclusive": round(self.inclusive[name], 4),
+                }
+                for name, elapsed in slowest[:limit]
+            ],
+        }
+
+
+import_tracer: Optional[ImportTracer] = None
+if ENABLE_IMPORT_PROFILING:
+    import_tracer = ImportTracer()
+    import_tracer.install()
+
+
+####################################
+# Request sampling profiler
+####################################
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread at a fixed interval from a background
+    thread and counts identical stacks.
+
+    Async handlers share the event loop thread, so a profile also contains
+    whatever else the loop ran while the request was in flight.
+    """
+
+    def __init__(self, thread_id: int, interval: float = REQUEST_PROFILING_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+
+def get_profiles_dir() -> Path:
+    from open_webui.config import CACHE_DIR
+
+    path = CACHE_DIR / "profiles"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def make_profile_id(method: str, path: str) -> str:
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", path).strip("_")[:60] or "root"
+    return f"{int(time.time() * 1000)}-{method.lower()}-{slug}"
+
+
+def save_profile(sampler: StackSampler, profile_id: str):
+    profiles_dir = get_profiles_dir()
+    (profiles_dir / f"{profile_id}.folded").write_text(sampler.folded())
+
+    # Keep only the most recent profiles
+    profiles = sorted(profiles_dir.glob("*.folded"))
+    for old in profiles[:-MAX_STORED_PROFILES]:
+        old.unlink(missing_ok=True)
+
+
+def list_profiles() -> list[dict]:
+    return [
+        {"id": path.stem, "size": path.stat().st_size}
+        for path in sorted(get_profiles_dir().glob("*.folded"), reverse=True)
+    ]
+
+
+def get_profile_path(profile_id: str) -> Optional[Path]:
+    if not re.fullmatch(r"[a-zA-Z0-9_\-]+", profile_id):
+        return None
+    path = get_profiles_dir() / f"{profile_id}.folded"
+    return path if path.exists() else None
+
+
+class RequestProfilingMiddleware:
+    """
+    Profiles admin requests sent with an `X-Profile: 1` header or
+    `?profile=1` and returns the id of the stored profile in
+    `X-Profile-Id`. Only active when ENABLE_REQUEST_PROFILING is set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self._wants_profile(scope)
+            or not await self._is_admin(scope)
+        ):
+            return await self.app(scope, receive, send)
+
+        profile_id = make_profile_id(scope.get("method", "GET"), scope.get("path", ""))
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            # Joining the sampler and writing the file would block the loop
+            await asyncio.to_thread(sampler.stop)
+            await asyncio.to_thread(save_profile, sampler, profile_id)
+
+    @staticmethod
+    def _wants_profile(scope) -> bool:
+        for key, value in scope.get("headers", []):
+            if key == REQUEST_PROFILING_HEADER:
+                return value.decode("latin-1").lower() in REQUEST_PROFILING_VALUES
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        return any(
+            value.lower() in REQUEST_PROFILING_VALUES
+            for value in query.get("profile", [])
+        )
+
+    @staticmethod
+    async def _is_admin(scope) -> bool:
+        # Imported here, this module is loaded before the rest of the app
+        from starlette.requests import Request
+
+        from open_webui.models.users import Users
+        from open_webui.utils.auth import decode_token
+
+        request = Request(scope)
+        token = None
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            token = authorization[len("bearer ") :]
+        if not token:
+            token = request.cookies.get("token")
+        if not token:
+            return False
+
+        if token.startswith("sk-"):
+            user = await asyncio.to_thread(Users.get_user_by_api_key, token)
+        else:
+            data = decode_token(token)
+            if not data or "id" not in data:
+                return False
+            user = await asyncio.to_thread(Users.get_cached_user_by_id, data["id"])
+
+        return user is not None and user.role == "admin"
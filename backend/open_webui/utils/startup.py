@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class StartupTimer:
+    """Records how long each phase of worker startup takes."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.last_mark = self.started_at
+        self.phases: dict[str, float] = {}
+
+    def mark(self, name: str):
+        """Record the time since the previous mark as phase `name`."""
+        now = time.perf_counter()
+        self.phases[name] = round(now - self.last_mark, 3)
+        self.last_mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - start, 3)
+            self.last_mark = time.perf_counter()
+
+    def report(self) -> dict:
+        return {
+            "total": round(time.perf_counter() - self.started_at, 3),
+            "phases": dict(self.phases),
+        }
+
+
+startup_timer = StartupTimer()
+
+_UNSET = object()
+
+
+class LazyProxy:
+    """
+    Stands in for an object that is expensive to build (an embedding model,
+    a vector database client) and builds it on first attribute access.
+    """
+
+    def __init__(self, loader: Callable[[], Any], name: str):
+        self._loader = loader
+        self._name = name
+        self._obj = _UNSET
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._obj is _UNSET:
+            with self._lock:
+                if self._obj is _UNSET:
+                    start = time.perf_counter()
+                    obj = self._loader()
+                    if obj is None:
+                        raise RuntimeError(f"{self._name} could not be loaded")
+                    self._obj = obj
+                    log.info(
+                        f"Loaded {self._name} in {time.perf_counter() - start:.2f}s"
+                    )
+        return self._obj
+
+    def __getattr__(self, name):
+        # Only called for attributes not set in __init__
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        state = "unloaded" if self._obj is _UNSET else repr(self._obj)
+        return f"<LazyProxy {self._name}: {state}>"
+
+
+class LazyASGIApp:
+    """Imports a mounted ASGI sub-application on its first request."""
+
+    def __init__(self, loader: Callable[[], Any], name: str):
+        self.loader = loader
+        self.name = name
+        self.app = None
+        self.lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if self.app is None:
+            async with self.lock:
+                if self.app is None:
+                    start = time.perf_counter()
+                    self.app = await asyncio.to_thread(self.loader)
+                    log.info(
+                        f"Loaded {self.name} in {time.perf_counter() - start:.2f}s"
+                    )
+        await self.app(scope, receive, send)
@@ -0,0 +1,349 @@
+import asyncio
+import codecs
+import html
+import json
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional, Union
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+async def iter_sse_data(iterator: AsyncIterator) -> AsyncIterator[str]:
+    """
+    Yield the payload of every `data:` line of an upstream SSE stream.
+
+    Chunks may hold several events or end mid-line (and mid-character), so
+    lines are reassembled across chunks. `[DONE]` and other fields are
+    skipped.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+
+    async for chunk in iterator:
+        text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        if not text:
+            continue
+
+        # Some producers yield one event per chunk without a newline
+        if pending and text.startswith("data:"):
+            pending += "\n"
+
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+
+        for line in lines:
+            if line.startswith("data:"):
+                data = line[5:].strip()
+                if data and data != "[DONE]":
+                    yield data
+
+    pending += decoder.decode(b"", final=True)
+    if pending.startswith("data:"):
+        data = pending[5:].strip()
+        if data and data != "[DONE]":
+            yield data
+
+
+EventData = Union[dict, Callable[[], dict]]
+
+
+class StreamEmitter:
+    """
+    Relays the updates of one streamed response to the client.
+
+    Every update supersedes the previous one, so instead of emitting each
+    delta the latest update is kept and sent once `min_deltas` arrived and
+    either `interval` seconds passed since the last send or `max_bytes` of
+    new content piled up. At most one send is in flight: while the client
+    is slow to take an update, newer ones replace the pending update rather
+    than queueing behind it, and reading from upstream never waits on it.
+
+    Updates can be given as callables so the (full) content is only
+    serialized for the updates that are actually sent.
+    """
+
+    def __init__(
+        self,
+        event_emitter: Callable[..., Awaitable],
+        interval: float,
+        max_bytes: int,
+        min_deltas: int = 1,
+    ):
+        self.event_emitter = event_emitter
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.min_deltas = max(min_deltas, 1)
+
+        self._pending: Optional[EventData] = None
+        self._pending_deltas = 0
+        self._pending_bytes = 0
+        self._last_sent = 0.0
+
+        self._ready = asyncio.Event()
+        self._over_budget = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def push(self, data: EventData, size: int = 0):
+        self._pending = data
+        self._pending_deltas += 1
+        self._pending_bytes += size
+
+        if self._pending_deltas >= self.min_deltas:
+            self._ready.set()
+            if self._pending_bytes >= self.max_bytes:
+                self._over_budget.set()
+
+            if self._task is None:
+                self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        # Exits once nothing is pending, a later push starts a new one
+        try:
+            while self._ready.is_set():
+                delay = self._last_sent + self.interval - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._over_budget.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+
+                try:
+                    await self.flush()
+                except Exception as e:
+                    log.debug(f"Error emitting stream update: {e}")
+        finally:
+            self._task = None
+
+    async def flush(self):
+        """Send the pending update now, e.g. before an event that must follow it."""
+        async with self._lock:
+            data = self._pending
+            self._pending = None
+            self._pending_deltas = 0
+            self._pending_bytes = 0
+            self._ready.clear()
+            self._over_budget.clear()
+
+            if data is None:
+                return
+
+            await self.event_emitter(
+                {
+                    "type": "chat:completion",
+                    "data": data() if callable(data) else data,
+                },
+                superseded=True,
+            )
+            self._last_sent = time.monotonic()
+
+
+def _split_content_and_whitespace(content):
+    content_stripped = content.rstrip()
+    original_whitespace = (
+        content[len(content_stripped) :] if len(content) > len(content_stripped) else ""
+    )
+    return content_stripped, original_whitespace
+
+
+def _is_opening_code_block(content):
+    backtick_segments = content.split("```")
+    # Even number of segments means the last backticks are opening a new block
+    return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
+
+
+def _quote_reasoning_line(line):
+    return f"> {line}" if not line.startswith(">") else line
+
+
+class ContentBlockSerializer:
+    """
+    Renders the content blocks of a streamed response (text, reasoning, tool
+    calls, code interpreter) into the message content.
+
+    While streaming, only the last block changes: blocks are appended or
+    popped at the end, and earlier ones are left alone. So the content
+    rendered up to every block but the last is kept, and each call only
+    renders the last block on top of it. A kept block is rendered again if
+    any of its fields was reassigned since. Reasoning blocks additionally
+    keep their quoted lines up to the last newline, as they are usually the
+    long block that is still being written.
+
+    Use one instance per list of blocks; a list that does not share the
+    cached blocks is rendered from scratch.
+    """
+
+    def __init__(self):
+        # raw -> [(block, its field values, content rendered up to it)]
+        self._prefixes = {False: [], True: []}
+        # (block, content quoted so far, number of lines, quoted lines)
+        self._reasoning = None
+
+    def serialize(self, content_blocks, raw=False):
+        prefixes = self._prefixes[raw]
+        last = len(content_blocks) - 1
+
+        cached = 0
+        while (
+            cached < len(prefixes)
+            and cached < last
+            and self._is_unchanged(prefixes[cached], content_blocks[cached])
+        ):
+            cached += 1
+        del prefixes[cached:]
+
+        content = prefixes[-1][2] if prefixes else ""
+        for idx in range(cached, len(content_blocks)):
+            block = content_blocks[idx]
+            content = self._serialize_block(content, block, raw)
+            if idx < last:
+                prefixes.append((block, tuple(block.values()), content))
+
+        return content.strip()
+
+    @staticmethod
+    def _is_unchanged(prefix, block):
+        # Updates replace the (immutable) field values, so comparing their
+        # identity is enough and does not depend on the content length
+        cached_block, values, _ = prefix
+        return (
+            cached_block is block
+            and len(values) == len(block)
+            and all(a is b for a, b in zip(values, block.values()))
+        )
+
+    def _reasoning_display_content(self, block):
+        text = block["content"]
+
+        done, line_count, display = "", 0, ""
+        if self._reasoning and self._reasoning[0] is block:
+            if text.startswith(self._reasoning[1]):
+                _, done, line_count, display = self._reasoning
+
+        # Lines up to the last newline are complete and only quoted once
+        end = text.rfind("\n") + 1
+        if end > len(done):
+            lines = [
+                _quote_reasoning_line(line)
+                for line in text[len(done) : end].splitlines()
+            ]
+            display = "\n".join([display, *lines] if line_count else lines)
+            line_count += len(lines)
+            done = text[:end]
+            self._reasoning = (block, done, line_count, display)
+
+        tail = [_quote_reasoning_line(line) for line in text[end:].splitlines()]
+        if not line_count:
+            return "\n".join(tail)
+        return "\n".join([display, *tail]) if tail else display
+
+    def _serialize_block(self, content, block, raw):
+        if block["type"] == "text":
+            block_content = block["content"].strip()
+            if block_content:
+                content = f"{content}{block_content}\n"
+        elif block["type"] == "tool_calls":
+            tool_calls = block.get("content", [])
+            results = block.get("results", [])
+
+            if content and not content.endswith("\n"):
+                content += "\n"
+
+            if results:
+
+                tool_calls_display_content = ""
+                for tool_call in tool_calls:
+
+                    tool_call_id = tool_call.get("id", "")
+                    tool_name = tool_call.get("function", {}).get("name", "")
+                    tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                    tool_result = None
+                    tool_result_files = None
+                    for result in results:
+                        if tool_call_id == result.get("tool_call_id", ""):
+                            tool_result = result.get("content", None)
+                            tool_result_files = result.get("files", None)
+                            break
+
+                    if tool_result is not None:
+                        tool_result_embeds = result.get("embeds", "")
+                        tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}" embeds="{html.escape(json.dumps(tool_result_embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
+                    else:
+                        tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+                if not raw:
+                    content = f"{content}{tool_calls_display_content}"
+            else:
+                tool_calls_display_content = ""
+
+                for tool_call in tool_calls:
+                    tool_call_id = tool_call.get("id", "")
+                    tool_name = tool_call.get("function", {}).get("name", "")
+                    tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                    tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+                if not raw:
+                    content = f"{content}{tool_calls_display_content}"
+
+        elif block["type"] == "reasoning":
+            reasoning_duration = block.get("duration", None)
+
+            start_tag = block.get("start_tag", "")
+            end_tag = block.get("end_tag", "")
+
+            if content and not content.endswith("\n"):
+                content += "\n"
+
+            if raw:
+                content = f'{content}{start_tag}{block["content"]}{end_tag}\n'
+            else:
+                reasoning_display_content = self._reasoning_display_content(block)
+
+                if reasoning_duration is not None:
+                    content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
+                else:
+                    content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
+
+        elif block["type"] == "code_interpreter":
+            attributes = block.get("attributes", {})
+            output = block.get("output", None)
+            lang = attributes.get("lang", "")
+
+            content_stripped, original_whitespace = _split_content_and_whitespace(
+                content
+            )
+            if _is_opening_code_block(content_stripped):
+                # Remove trailing backticks that would open a new block
+                content = content_stripped.rstrip("`").rstrip() + original_whitespace
+            else:
+                # Keep content as is - either closing backticks or no backticks
+                content = content_stripped + original_whitespace
+
+            if content and not content.endswith("\n"):
+                content += "\n"
+
+            if output:
+                output = html.escape(json.dumps(output))
+
+                if raw:
+                    content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
+                else:
+                    content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+            else:
+                if raw:
+                    content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
+                else:
+                    content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+
+        else:
+            block_content = str(block["content"]).strip()
+            if block_content:
+                content = f"{content}{block['type']}: {block_content}\n"
+
+        return content
@@ -1,13 +1,14 @@
 """OpenTelemetry metrics bootstrap for Open WebUI.
 
 This module initialises a MeterProvider that sends metrics to an OTLP
-collector. The collector is responsible for exposing a Prometheus
-`/metrics` endpoint – WebUI does **not** expose it directly.
+collector (ENABLE_OTEL_METRICS) and/or serves them in the Prometheus text
+format at `/metrics` (ENABLE_PROMETHEUS_METRICS, admin or API key auth).
 
 Metrics collected:
 
 * http.server.requests (counter)
 * http.server.duration (histogram, milliseconds)
+* the stage, streaming and cache metrics listed in `stages.py`
 
 Attributes used: http.method, http.route, http.status_code
 
@@ -17,11 +18,12 @@ high-cardinality label sets.
 
 from __future__ import annotations
 
+import asyncio
 import time
 from typing import Dict, List, Sequence, Any
 from base64 import b64encode
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request, Response
 from opentelemetry import metrics
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import (
     OTLPMetricExporter,
@@ -31,13 +33,18 @@ from opentelemetry.exporter.otlp.proto.http.metric_exporter import (
     OTLPMetricExporter as OTLPHttpMetricExporter,
 )
 from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.view import View
+from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
 from opentelemetry.sdk.metrics.export import (
+    InMemoryMetricReader,
+    MetricReader,
     PeriodicExportingMetricReader,
 )
 from opentelemetry.sdk.resources import Resource
 
 from open_webui.env import (
+    ENABLE_OTEL,
+    ENABLE_OTEL_METRICS,
+    ENABLE_PROMETHEUS_METRICS,
     OTEL_SERVICE_NAME,
     OTEL_METRICS_EXPORTER_OTLP_ENDPOINT,
     OTEL_METRICS_BASIC_AUTH_USERNAME,
@@ -47,12 +54,14 @@ from open_webui.env import (
 )
 from open_webui.socket.main import get_active_user_ids
 from open_webui.models.users import Users
+from open_webui.utils.auth import get_admin_user
+from open_webui.utils.telemetry.prometheus import CONTENT_TYPE, render_metrics
+from open_webui.utils.telemetry.stages import TOKENS_PER_SECOND_BUCKETS
 
 _EXPORT_INTERVAL_MILLIS = 10_000  # 10 seconds
 
 
-def _build_meter_provider(resource: Resource) -> MeterProvider:
-    """Return a configured MeterProvider."""
+def _build_otlp_reader() -> PeriodicExportingMetricReader:
     headers = []
     if OTEL_METRICS_BASIC_AUTH_USERNAME and OTEL_METRICS_BASIC_AUTH_PASSWORD:
         auth_string = (
@@ -63,25 +72,27 @@ def _build_meter_provider(resource: Resource) -> MeterProvider:
 
     # Periodic reader pushes metrics over OTLP/gRPC to collector
     if OTEL_METRICS_OTLP_SPAN_EXPORTER == "http":
-        readers: List[PeriodicExportingMetricReader] = [
-            PeriodicExportingMetricReader(
-                OTLPHttpMetricExporter(
-                    endpoint=OTEL_METRICS_EXPORTER_OTLP_ENDPOINT, headers=headers
-                ),
-                export_interval_millis=_EXPORT_INTERVAL_MILLIS,
-            )
-        ]
+        return PeriodicExportingMetricReader(
+            OTLPHttpMetricExporter(
+                endpoint=OTEL_METRICS_EXPORTER_OTLP_ENDPOINT, headers=headers
+            ),
+            export_interval_millis=_EXPORT_INTERVAL_MILLIS,
+        )
     else:
-        readers: List[PeriodicExportingMetricReader] = [
-            PeriodicExportingMetricReader(
-                OTLPMetricExporter(
-                    endpoint=OTEL_METRICS_EXPORTER_OTLP_ENDPOINT,
-                    insecure=OTEL_METRICS_EXPORTER_OTLP_INSECURE,
-                    headers=headers,
-                ),
-                export_interval_millis=_EXPORT_INTERVAL_MILLIS,
-            )
-        ]
+        return PeriodicExportingMetricReader(
+            OTLPMetricExporter(
+                endpoint=OTEL_METRICS_EXPORTER_OTLP_ENDPOINT,
+                insecure=OTEL_METRICS_EXPORTER_OTLP_INSECURE,
+                headers=headers,
+            ),
+            export_interval_millis=_EXPORT_INTERVAL_MILLIS,
+        )
+
+
+def _build_meter_provider(
+    resource: Resource, readers: List[MetricReader]
+) -> MeterProvider:
+    """Return a configured MeterProvider."""
 
     # Optional view to limit cardinality: drop user-agent etc.
     views: List[View] = [
@@ -99,6 +110,12 @@ def _build_meter_provider(resource: Resource) -> MeterProvider:
         View(
             instrument_name="webui.users.active",
         ),
+        View(
+            instrument_name="webui.chat.tokens_per_second",
+            aggregation=ExplicitBucketHistogramAggregation(
+                boundaries=TOKENS_PER_SECOND_BUCKETS
+            ),
+        ),
     ]
 
     provider = MeterProvider(
@@ -112,7 +129,16 @@ def _build_meter_provider(resource: Resource) -> MeterProvider:
 def setup_metrics(app: FastAPI, resource: Resource) -> None:
     """Attach OTel metrics middleware to *app* and initialise provider."""
 
-    metrics.set_meter_provider(_build_meter_provider(resource))
+    readers: List[MetricReader] = []
+    if ENABLE_OTEL and ENABLE_OTEL_METRICS:
+        readers.append(_build_otlp_reader())
+
+    prometheus_reader = None
+    if ENABLE_PROMETHEUS_METRICS:
+        prometheus_reader = InMemoryMetricReader()
+        readers.append(prometheus_reader)
+
+    metrics.set_meter_provider(_build_meter_provider(resource, readers))
     meter = metrics.get_meter(__name__)
 
     # Instruments
@@ -141,7 +167,7 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
     ) -> Sequence[metrics.Observation]:
         return [
             metrics.Observation(
-                value=len(Users.get_users()["users"]),
+                value=Users.get_num_users() or 0,
             )
         ]
 
@@ -187,3 +213,16 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
 
             request_counter.add(1, attrs)
             duration_histogram.record(elapsed_ms, attrs)
+
+    if prometheus_reader is not None:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def _prometheus_metrics(user=Depends(get_admin_user)):
+            return Response(
+                # Collecting runs the observable gauge callbacks, which query
+                # the database
+                content=render_metrics(
+                    await asyncio.to_thread(prometheus_reader.get_metrics_data)
+                ),
+                media_type=CONTENT_TYPE,
+            )
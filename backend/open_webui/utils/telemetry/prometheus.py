@@ -0,0 +1,97 @@
+"""Render OpenTelemetry metrics in the Prometheus text exposition format.
+
+Used by the `/metrics` endpoint (ENABLE_PROMETHEUS_METRICS) so a Prometheus
+server can scrape WebUI directly, without an OTLP collector in between. The
+metrics are read from an in-memory reader with cumulative temporality.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Iterable, Mapping
+
+from opentelemetry.sdk.metrics.export import Gauge, Histogram, MetricsData, Sum
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _metric_name(name: str) -> str:
+    name = re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+    return f"_{name}" if name[0].isdigit() else name
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if math.isnan(value):
+            return "NaN"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(attributes: Mapping, extra: Iterable[tuple[str, str]] = ()) -> str:
+    pairs = [
+        f'{_metric_name(key)}="{_escape(value)}"'
+        for key, value in (attributes or {}).items()
+    ]
+    pairs += [f'{key}="{value}"' for key, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render_metrics(metrics_data: MetricsData) -> str:
+    lines: list[str] = []
+    seen: set[str] = set()
+
+    for resource_metrics in metrics_data.resource_metrics if metrics_data else []:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                name = _metric_name(metric.name)
+                data = metric.data
+
+                if isinstance(data, Sum):
+                    kind = "counter" if data.is_monotonic else "gauge"
+                    if data.is_monotonic:
+                        name = f"{name}_total"
+                elif isinstance(data, Gauge):
+                    kind = "gauge"
+                elif isinstance(data, Histogram):
+                    kind = "histogram"
+                else:
+                    # Exponential histograms have no text format equivalent
+                    continue
+
+                if name not in seen:
+                    seen.add(name)
+                    if metric.description:
+                        lines.append(f"# HELP {name} {_escape(metric.description)}")
+                    lines.append(f"# TYPE {name} {kind}")
+
+                for point in data.data_points:
+                    if kind != "histogram":
+                        lines.append(
+                            f"{name}{_labels(point.attributes)} {_format_value(point.value)}"
+                        )
+                        continue
+
+                    cumulative = 0
+                    for bound, count in zip(point.explicit_bounds, point.bucket_counts):
+                        cumulative += count
+                        labels = _labels(
+                            point.attributes, [("le", _format_value(float(bound)))]
+                        )
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = _labels(point.attributes, [("le", "+Inf")])
+                    lines.append(f"{name}_bucket{labels} {point.count}")
+                    lines.append(
+                        f"{name}_sum{_labels(point.attributes)} {_format_value(point.sum)}"
+                    )
+                    lines.append(
+                        f"{name}_count{_labels(point.attributes)} {point.count}"
+                    )
+
+    return "\n".join(lines) + "\n"
@@ -14,6 +14,8 @@ from base64 import b64encode
 from open_webui.utils.telemetry.instrumentors import Instrumentor
 from open_webui.utils.telemetry.metrics import setup_metrics
 from open_webui.env import (
+    ENABLE_OTEL,
+    ENABLE_PROMETHEUS_METRICS,
     OTEL_SERVICE_NAME,
     OTEL_EXPORTER_OTLP_ENDPOINT,
     OTEL_EXPORTER_OTLP_INSECURE,
@@ -28,7 +30,7 @@ from open_webui.env import (
 def setup(app: FastAPI, db_engine: Engine):
     # set up trace
     resource = Resource.create(attributes={SERVICE_NAME: OTEL_SERVICE_NAME})
-    if ENABLE_OTEL_TRACES:
+    if ENABLE_OTEL and ENABLE_OTEL_TRACES:
         trace.set_tracer_provider(TracerProvider(resource=resource))
 
         # Add basic auth header only if both username and password are not empty
@@ -54,5 +56,5 @@ def setup(app: FastAPI, db_engine: Engine):
         Instrumentor(app=app, db_engine=db_engine).instrument()
 
     # set up metrics only if enabled
-    if ENABLE_OTEL_METRICS:
+    if (ENABLE_OTEL and ENABLE_OTEL_METRICS) or ENABLE_PROMETHEUS_METRICS:
         setup_metrics(app, resource)
@@ -0,0 +1,138 @@
+"""Spans and metrics for the internal stages of a request.
+
+Only the OpenTelemetry API is used here, so every helper is a cheap no-op
+until `setup_metrics` / the tracer provider in `setup.py` are installed.
+
+Metrics recorded:
+
+* webui.stage.duration (histogram, milliseconds) – attributes: stage
+* webui.chat.time_to_first_token (histogram, milliseconds) – attributes: model
+* webui.chat.output_tokens (counter) – attributes: model
+* webui.chat.tokens_per_second (histogram) – attributes: model
+* webui.cache.requests (counter) – attributes: cache, result (hit / miss)
+* webui.vector_db.queries (counter) – attributes: result (hit / empty)
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Optional
+
+from opentelemetry import metrics, trace
+
+tracer = trace.get_tracer("open_webui")
+meter = metrics.get_meter("open_webui")
+
+stage_duration = meter.create_histogram(
+    name="webui.stage.duration",
+    description="Duration of internal request stages",
+    unit="ms",
+)
+time_to_first_token = meter.create_histogram(
+    name="webui.chat.time_to_first_token",
+    description="Time from receiving a chat request to its first streamed token",
+    unit="ms",
+)
+output_tokens = meter.create_counter(
+    name="webui.chat.output_tokens",
+    description="Streamed output tokens",
+    unit="tokens",
+)
+tokens_per_second = meter.create_histogram(
+    name="webui.chat.tokens_per_second",
+    description="Output token throughput of streamed responses",
+    unit="tokens/s",
+)
+cache_requests = meter.create_counter(
+    name="webui.cache.requests",
+    description="Cache lookups by cache and result",
+    unit="1",
+)
+vector_db_queries = meter.create_counter(
+    name="webui.vector_db.queries",
+    description="Vector DB searches by whether they returned results",
+    unit="1",
+)
+
+TOKENS_PER_SECOND_BUCKETS = [1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 300, 500]
+
+
+@contextmanager
+def stage(name: str, **attributes):
+    """Run a block as span `name` and record its duration as stage `name`."""
+    start = time.perf_counter()
+    with tracer.start_as_current_span(name, attributes=attributes):
+        try:
+            yield
+        finally:
+            stage_duration.record(
+                (time.perf_counter() - start) * 1000.0, {"stage": name}
+            )
+
+
+def record_stage(name: str, seconds: float):
+    """Record a stage that was timed elsewhere, e.g. summed over many chunks."""
+    stage_duration.record(seconds * 1000.0, {"stage": name})
+
+
+def record_cache(cache: str, hit: bool):
+    cache_requests.add(1, {"cache": cache, "result": "hit" if hit else "miss"})
+
+
+def record_vector_db_query(result) -> None:
+    hit = bool(result and getattr(result, "ids", None) and any(result.ids))
+    vector_db_queries.add(1, {"result": "hit" if hit else "empty"})
+
+
+class StreamMetrics:
+    """
+    Collects per-stream numbers without touching OpenTelemetry per chunk and
+    records them once the stream is done.
+
+    `iterate` wraps the upstream body iterator to split the stream's wall
+    time into waiting on the model and processing chunks on our side.
+    """
+
+    def __init__(self, model: Optional[str], started_at: Optional[float] = None):
+        self.attributes = {"model": model or "unknown"}
+        self.started_at = started_at or time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.tokens = 0
+        self.usage_tokens: Optional[int] = None
+        self.processing_time: Optional[float] = None
+
+    async def iterate(self, iterator: AsyncIterator) -> AsyncIterator:
+        self.processing_time = 0.0
+        async for item in iterator:
+            resumed = time.perf_counter()
+            yield item
+            self.processing_time += time.perf_counter() - resumed
+
+    def token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += 1
+
+    def usage(self, usage: dict):
+        # Providers that report usage give an exact count, prefer it
+        completion_tokens = usage.get("completion_tokens")
+        if isinstance(completion_tokens, int):
+            self.usage_tokens = completion_tokens
+
+    def finish(self):
+        if self.processing_time is not None:
+            record_stage("chat.stream.process", self.processing_time)
+        if self.first_token_at is None:
+            return
+
+        tokens = self.usage_tokens if self.usage_tokens is not None else self.tokens
+        now = time.perf_counter()
+        time_to_first_token.record(
+            (self.first_token_at - self.started_at) * 1000.0, self.attributes
+        )
+        output_tokens.add(tokens, self.attributes)
+        if now > self.first_token_at:
+            tokens_per_second.record(
+                tokens / (now - self.first_token_at), self.attributes
+            )
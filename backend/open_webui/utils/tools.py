@@ -6,6 +6,7 @@ import aiohttp
 import asyncio
 import yaml
 import json
+import hashlib
 
 from pydantic import BaseModel
 from pydantic.fields import FieldInfo
@@ -23,6 +24,7 @@ from typing import (
     Optional,
     Type,
 )
+from collections import OrderedDict
 from functools import update_wrapper, partial
 
 
@@ -37,11 +39,14 @@ from langchain_core.utils.function_calling import (
 from open_webui.models.tools import Tools
 from open_webui.models.users import UserModel
 from open_webui.utils.plugin import load_tool_module_by_id
+from open_webui.utils.telemetry.stages import record_cache
 from open_webui.env import (
     SRC_LOG_LEVELS,
     AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA,
     AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL,
+    REDIS_KEY_PREFIX,
+    TOOL_SERVER_SPECS_REFRESH_INTERVAL,
 )
 
 import copy
@@ -50,6 +55,48 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
 
+REDIS_TOOL_SERVERS_KEY = "tool_servers"
+REDIS_TOOL_SERVERS_CHANNEL = f"{REDIS_KEY_PREFIX}:tool_servers:updated"
+
+TOOL_PAYLOAD_CACHE_SIZE = 64
+
+
+class ToolServerRegistry:
+    """
+    Parsed OpenAPI tool server specs for this worker, indexed by server id and
+    function name. `version` is a digest of the serialized servers, so workers
+    sharing Redis agree on it and can skip reloading specs they already have.
+    """
+
+    def __init__(self):
+        self.servers: list[dict] = []
+        self.servers_by_id: dict[str, dict] = {}
+        self.functions: dict[tuple[str, str], dict] = {}
+        self.version: Optional[str] = None
+        self.stale = True
+        self.lock = asyncio.Lock()
+
+    def load(self, servers: list[dict], version: str):
+        self.servers = servers
+        self.servers_by_id = {server["id"]: server for server in servers}
+        self.functions = {
+            (server["id"], spec["name"]): spec
+            for server in servers
+            for spec in server.get("specs", [])
+        }
+        self.version = version
+        self.stale = False
+
+    def get_server(self, server_id: str) -> Optional[dict]:
+        return self.servers_by_id.get(server_id)
+
+    def get_function_spec(self, server_id: str, name: str) -> Optional[dict]:
+        return self.functions.get((server_id, name))
+
+
+tool_server_registry = ToolServerRegistry()
+
+
 def get_async_tool_function_and_apply_extra_params(
     function: Callable, extra_params: dict
 ) -> Callable[..., Awaitable]:
@@ -114,11 +161,8 @@ async def get_tools(
 
                 if type == "openapi":
 
-                    tool_server_data = None
-                    for server in await get_tool_servers(request):
-                        if server["id"] == server_id:
-                            tool_server_data = server
-                            break
+                    await get_tool_servers(request)
+                    tool_server_data = tool_server_registry.get_server(server_id)
 
                     if tool_server_data is None:
                         log.warning(f"Tool server data not found for {server_id}")
@@ -435,9 +479,13 @@ def resolve_schema(schema, components):
     return resolved_schema
 
 
+_tool_payload_cache: "OrderedDict[str, list]" = OrderedDict()
+
+
 def convert_openapi_to_tool_payload(openapi_spec):
     """
     Converts an OpenAPI specification into a custom tool payload structure.
+    Payloads are memoized by the content of the spec.
 
     Args:
         openapi_spec (dict): The OpenAPI specification as a Python dict.
@@ -445,6 +493,24 @@ def convert_openapi_to_tool_payload(openapi_spec):
     Returns:
         list: A list of tool payloads.
     """
+    key = hashlib.sha256(
+        json.dumps(openapi_spec, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+    tool_payload = _tool_payload_cache.get(key)
+    record_cache("tool_payload", tool_payload is not None)
+    if tool_payload is None:
+        tool_payload = build_tool_payload(openapi_spec)
+        _tool_payload_cache[key] = tool_payload
+        while len(_tool_payload_cache) > TOOL_PAYLOAD_CACHE_SIZE:
+            _tool_payload_cache.popitem(last=False)
+    else:
+        _tool_payload_cache.move_to_end(key)
+
+    return copy.deepcopy(tool_payload)
+
+
+def build_tool_payload(openapi_spec):
     tool_payload = []
 
     for path, methods in openapi_spec.get("paths", {}).items():
@@ -516,32 +582,87 @@ def convert_openapi_to_tool_payload(openapi_spec):
     return tool_payload
 
 
-async def set_tool_servers(request: Request):
-    request.app.state.TOOL_SERVERS = await get_tool_servers_data(
-        request.app.state.config.TOOL_SERVER_CONNECTIONS
-    )
+async def refresh_tool_servers(app) -> list[dict]:
+    """
+    Fetch and parse the specs of all enabled OpenAPI tool servers, load them
+    into the registry and share them with the other workers through Redis.
+    """
+    tool_servers = await get_tool_servers_data(app.state.config.TOOL_SERVER_CONNECTIONS)
 
-    if request.app.state.redis is not None:
-        await request.app.state.redis.set(
-            "tool_servers", json.dumps(request.app.state.TOOL_SERVERS)
-        )
+    data = json.dumps(tool_servers)
+    version = hashlib.sha256(data.encode()).hexdigest()
+    changed = version != tool_server_registry.version
+
+    tool_server_registry.load(tool_servers, version)
+    app.state.TOOL_SERVERS = tool_servers
+
+    if app.state.redis is not None:
+        await app.state.redis.set(REDIS_TOOL_SERVERS_KEY, data)
+        if changed:
+            await app.state.redis.publish(REDIS_TOOL_SERVERS_CHANNEL, version)
+
+    return tool_servers
 
-    return request.app.state.TOOL_SERVERS
+
+async def set_tool_servers(request: Request):
+    return await refresh_tool_servers(request.app)
 
 
 async def get_tool_servers(request: Request):
-    tool_servers = []
-    if request.app.state.redis is not None:
-        try:
-            tool_servers = json.loads(await request.app.state.redis.get("tool_servers"))
-            request.app.state.TOOL_SERVERS = tool_servers
-        except Exception as e:
-            log.error(f"Error fetching tool_servers from Redis: {e}")
+    registry = tool_server_registry
+    if not registry.stale:
+        return registry.servers
+
+    async with registry.lock:
+        if not registry.stale:
+            return registry.servers
+
+        if request.app.state.redis is not None:
+            try:
+                data = await request.app.state.redis.get(REDIS_TOOL_SERVERS_KEY)
+                if data:
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    registry.load(
+                        json.loads(data), hashlib.sha256(data.encode()).hexdigest()
+                    )
+                    request.app.state.TOOL_SERVERS = registry.servers
+            except Exception as e:
+                log.error(f"Error fetching tool_servers from Redis: {e}")
 
-    if not tool_servers:
-        tool_servers = await set_tool_servers(request)
+        if registry.stale:
+            await refresh_tool_servers(request.app)
 
-    return tool_servers
+    return registry.servers
+
+
+async def redis_tool_servers_listener(app):
+    pubsub = app.state.redis.pubsub()
+    await pubsub.subscribe(REDIS_TOOL_SERVERS_CHANNEL)
+
+    async for message in pubsub.listen():
+        if message["type"] != "message":
+            continue
+
+        version = message["data"]
+        if isinstance(version, bytes):
+            version = version.decode()
+
+        # Reload lazily from Redis on the next lookup
+        if version != tool_server_registry.version:
+            tool_server_registry.stale = True
+
+
+async def periodic_tool_servers_refresh(app):
+    if TOOL_SERVER_SPECS_REFRESH_INTERVAL <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(TOOL_SERVER_SPECS_REFRESH_INTERVAL)
+        try:
+            await refresh_tool_servers(app)
+        except Exception as e:
+            log.exception(f"Error refreshing tool servers: {e}")
 
 
 async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
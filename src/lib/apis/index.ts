@@ -2,6 +2,7 @@ import { WEBUI_API_BASE_URL, WEBUI_BASE_URL, SPICE_API_BASE_URL } from '$lib/con
 import { convertOpenApiToToolPayload } from '$lib/utils';
 import { getOpenAIModelsDirect } from './openai';
 
+import { EventSourceParserStream } from 'eventsource-parser/stream';
 import { parse } from 'yaml';
 import { toast } from 'svelte-sonner';
 
@@ -224,7 +225,11 @@ export const spiceHealth = async () => {
 	return res;
 };
 
-export const spiceChat = async (question: string, token: string = '') => {
+export const spiceChat = async (
+	question: string,
+	token: string = '',
+	lab_id: string | null = null
+) => {
 	let error = null;
 	const res = await fetch(`${SPICE_API_BASE_URL}/chat`, {
 		method: 'POST',
@@ -233,7 +238,7 @@ export const spiceChat = async (question: string, token: string = '') => {
 			'Content-Type': 'application/json',
 			...(token && { authorization: `Bearer ${token}` })
 		},
-		body: JSON.stringify({ question })
+		body: JSON.stringify({ question, lab_id })
 	})
 		.then(async (res) => {
 			if (!res.ok) throw await res.json();
@@ -274,15 +279,62 @@ export const spiceDiagnose = async (circuit_id: string | null = null, token: str
 	return res;
 };
 
+// Streams the diagnosis over SSE; `onDelta` receives the text generated so far.
+export const spiceDiagnoseStream = async (
+	circuit_id: string | null = null,
+	token: string = '',
+	onDelta: (text: string) => void = () => {}
+) => {
+	const res = await fetch(`${SPICE_API_BASE_URL}/diagnose`, {
+		method: 'POST',
+		headers: {
+			Accept: 'text/event-stream',
+			'Content-Type': 'application/json',
+			...(token && { authorization: `Bearer ${token}` })
+		},
+		body: JSON.stringify({ circuit_id, stream: true })
+	});
+
+	if (!res.ok || !res.body) throw await res.json();
+
+	const reader = res.body
+		.pipeThrough(new TextDecoderStream())
+		.pipeThrough(new EventSourceParserStream())
+		.getReader();
+
+	let result: Record<string, any> = {};
+	let text = '';
+	while (true) {
+		const { value, done } = await reader.read();
+		if (done) break;
+		if (!value?.data) continue;
+
+		const data = JSON.parse(value.data);
+		if (data.error) throw data;
+		if (data.delta) {
+			text += data.delta;
+			onDelta(text);
+		} else if (data.done) {
+			result.diagnosis = data.diagnosis;
+		} else {
+			result = { ...result, ...data };
+		}
+	}
+
+	return { ...result, diagnosis: result.diagnosis ?? text };
+};
+
 export const spiceUploadCircuit = async (
 	circuit_file: File,
-	log_file: File,
-	token: string = ''
+	log_file: File | null,
+	token: string = '',
+	lab_id: string | null = null
 ) => {
 	let error = null;
 	const form = new FormData();
 	form.append('circuit_file', circuit_file);
-	form.append('log_file', log_file);
+	if (log_file) form.append('log_file', log_file);
+	if (lab_id) form.append('lab_id', lab_id);
 
 	const res = await fetch(`${SPICE_API_BASE_URL}/upload`, {
 		method: 'POST',
@@ -308,8 +360,9 @@ export const spiceUploadCircuit = async (
 
 export const spiceUploadById = async (
 	circuit_file_id: string,
-	log_file_id: string,
-	token: string = ''
+	log_file_id: string | null,
+	token: string = '',
+	lab_id: string | null = null
 ) => {
 	let error = null;
 
@@ -320,7 +373,91 @@ export const spiceUploadById = async (
 			'Content-Type': 'application/json',
 			...(token && { authorization: `Bearer ${token}` })
 		},
-		body: JSON.stringify({ circuit_file_id, log_file_id })
+		body: JSON.stringify({ circuit_file_id, log_file_id, lab_id })
+	})
+		.then(async (res) => {
+			if (!res.ok) throw await res.json();
+			return res.json();
+		})
+		.catch((err) => {
+			error = err;
+			console.error(err);
+			return null;
+		});
+
+	if (error) throw error;
+	return res;
+};
+
+export const spiceVerifyDiagnosis = async (
+	token: string,
+	circuit_id: string,
+	diagnosis: string | null = null
+) => {
+	let error = null;
+
+	const res = await fetch(`${SPICE_API_BASE_URL}/diagnose/verify`, {
+		method: 'POST',
+		headers: {
+			Accept: 'application/json',
+			'Content-Type': 'application/json',
+			...(token && { authorization: `Bearer ${token}` })
+		},
+		body: JSON.stringify({ circuit_id, diagnosis })
+	})
+		.then(async (res) => {
+			if (!res.ok) throw await res.json();
+			return res.json();
+		})
+		.catch((err) => {
+			error = err;
+			console.error(err);
+			return null;
+		});
+
+	if (error) throw error;
+	return res;
+};
+
+export const spiceDiagnoseBatch = async (
+	token: string,
+	lab_id: string | null = null,
+	circuit_ids: string[] | null = null
+) => {
+	let error = null;
+
+	const res = await fetch(`${SPICE_API_BASE_URL}/diagnose/batch`, {
+		method: 'POST',
+		headers: {
+			Accept: 'application/json',
+			'Content-Type': 'application/json',
+			...(token && { authorization: `Bearer ${token}` })
+		},
+		body: JSON.stringify({ lab_id, circuit_ids })
+	})
+		.then(async (res) => {
+			if (!res.ok) throw await res.json();
+			return res.json();
+		})
+		.catch((err) => {
+			error = err;
+			console.error(err);
+			return null;
+		});
+
+	if (error) throw error;
+	return res;
+};
+
+export const getSpiceDiagnoseBatchStatus = async (token: string, job_id: string) => {
+	let error = null;
+
+	const res = await fetch(`${SPICE_API_BASE_URL}/diagnose/batch/${job_id}`, {
+		method: 'GET',
+		headers: {
+			Accept: 'application/json',
+			...(token && { authorization: `Bearer ${token}` })
+		}
 	})
 		.then(async (res) => {
 			if (!res.ok) throw await res.json();